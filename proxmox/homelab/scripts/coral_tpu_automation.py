@@ -10,6 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from homelab.coral_automation import CoralAutomationEngine
+from homelab.coral_detection import CoralDetector, SysfsCoralDetector  # noqa: E402
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -68,6 +69,11 @@ def main() -> int:
         action="store_true", 
         help="Enable verbose logging"
     )
+    parser.add_argument(
+        "--lsusb",
+        action="store_true",
+        help="Detect the Coral with lsusb instead of sysfs/udev"
+    )
     parser.add_argument(
         "--status-only", 
         action="store_true",
@@ -86,7 +92,8 @@ def main() -> int:
             container_id=args.container_id,
             coral_init_dir=args.coral_dir,
             config_path=args.config_path,
-            backup_dir=args.backup_dir
+            backup_dir=args.backup_dir,
+            detector=CoralDetector() if args.lsusb else SysfsCoralDetector()
         )
         
         if args.status_only:
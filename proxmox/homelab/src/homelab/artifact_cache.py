@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+src/homelab/artifact_cache.py
+
+Local cache of downloaded release artifacts on the controller.
+
+Artifacts are downloaded once, verified against a SHA-256 checksum, and
+kept under the cache directory (HOMELAB_ARTIFACT_CACHE, default
+~/.cache/homelab/artifacts) so later runs, and every host in a rollout,
+reuse the same verified file instead of each fetching it from the internet.
+The verified digest is recorded next to the artifact, so later runs need
+no network access to know which file they have.
+
+Usage:
+    from homelab.artifact_cache import ArtifactCache
+
+    cache = ArtifactCache()
+    tarball = cache.fetch(url, sha256="...")
+    binary = cache.extract(tarball, "zfs_exporter")
+"""
+
+import hashlib
+import logging
+import os
+import tarfile
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "~/.cache/homelab/artifacts"
+DOWNLOAD_TIMEOUT = 60
+CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path: Path) -> str:
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_checksums(text: str, filename: str) -> Optional[str]:
+    """Find filename's digest in a sha256sums.txt ('<digest>  <name>' per line)."""
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1].lstrip("*") == filename:
+            return parts[0].lower()
+    return None
+
+
+class ArtifactCache:
+    """Downloads, verifies and caches artifacts on the controller."""
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        self.cache_dir = Path(
+            cache_dir or os.getenv("HOMELAB_ARTIFACT_CACHE", DEFAULT_CACHE_DIR)
+        ).expanduser()
+
+    def cached_checksum(self, url: str) -> Optional[str]:
+        """SHA-256 recorded when url's artifact was last verified, or None."""
+        target = self._target(url)
+        record = target.with_name(target.name + ".sha256")
+        if not target.exists() or not record.exists():
+            return None
+        return record.read_text().strip() or None
+
+    def fetch_checksum(self, checksums_url: str, filename: str) -> str:
+        """
+        Look up an artifact's published SHA-256 in a release checksums file.
+
+        Raises:
+            ValueError: If the checksums file does not list filename
+        """
+        response = requests.get(checksums_url, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        digest = parse_checksums(response.text, filename)
+        if not digest:
+            raise ValueError(f"{filename} not listed in {checksums_url}")
+        return digest
+
+    def fetch(self, url: str, sha256: Optional[str] = None) -> Path:
+        """
+        Return a verified local copy of url, downloading it if needed.
+
+        Args:
+            url: Artifact URL
+            sha256: Expected SHA-256; a cached file is reused only if it matches
+
+        Returns:
+            Path of the cached artifact
+
+        Raises:
+            ValueError: If the downloaded file does not match sha256
+        """
+        target = self._target(url)
+
+        if target.exists() and (sha256 is None or sha256_file(target) == sha256.lower()):
+            logger.info(f"Using cached artifact {target}")
+            if sha256:
+                self._record_checksum(target, sha256)
+            return target
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".partial")
+        digest = hashlib.sha256()
+
+        logger.info(f"Downloading {url}")
+        try:
+            with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                with open(partial, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            digest.update(chunk)
+
+            if sha256 and digest.hexdigest() != sha256.lower():
+                raise ValueError(
+                    f"Checksum mismatch for {url}: expected {sha256}, got {digest.hexdigest()}"
+                )
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+
+        if sha256:
+            self._record_checksum(target, sha256)
+        logger.info(f"Cached {target.name} ({digest.hexdigest()[:12]})")
+        return target
+
+    def extract(self, archive: Path, member: str, archive_sha256: Optional[str] = None) -> Path:
+        """
+        Extract one file from a tar.gz artifact into the cache.
+
+        Extracted files live in a directory keyed by the tarball's digest,
+        so a re-downloaded tarball never reuses files from an older one.
+
+        Args:
+            archive: Cached tarball
+            member: File name inside the archive (matched on its basename)
+            archive_sha256: The tarball's SHA-256, if already known
+
+        Returns:
+            Path of the extracted, executable file
+        """
+        digest = (archive_sha256 or sha256_file(archive)).lower()
+        target = self.cache_dir / f"{archive.name.split('.tar')[0]}-{digest[:16]}" / member
+        if target.exists():
+            return target
+
+        with tarfile.open(archive, "r:gz") as tar:
+            for info in tar.getmembers():
+                if info.isfile() and Path(info.name).name == member:
+                    source = tar.extractfile(info)
+                    break
+            else:
+                raise FileNotFoundError(f"{member} not found in {archive}")
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            partial = target.with_name(target.name + ".partial")
+            with open(partial, "wb") as f:
+                f.write(source.read())
+            partial.chmod(0o755)
+            os.replace(partial, target)
+
+        return target
+
+    def _target(self, url: str) -> Path:
+        return self.cache_dir / url.rstrip("/").rsplit("/", 1)[-1]
+
+    @staticmethod
+    def _record_checksum(target: Path, sha256: str) -> None:
+        record = target.with_name(target.name + ".sha256")
+        if not record.exists() or record.read_text().strip() != sha256.lower():
+            record.write_text(sha256.lower() + "\n")
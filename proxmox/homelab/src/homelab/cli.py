@@ -16,7 +16,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
 from homelab.crucible_config import CrucibleConfig
-from homelab.enhanced_vm_manager import CrucibleVMManager
+from homelab.enhanced_vm_manager import CrucibleVMManager, VMSpec, load_vm_specs
 from homelab.oxide_storage_api import DiskCreate, DiskSource, SnapshotCreate
 
 # Initialize CLI app and console
@@ -262,15 +262,30 @@ app.add_typer(vm_app, name="vm")
 
 @vm_app.command("create")
 def create_vm(
-    name: str = typer.Argument(..., help="VM name"),
-    node: str = typer.Argument(..., help="Proxmox node name"),
+    name: Optional[str] = typer.Argument(None, help="VM name (prefix with --count)"),
+    node: Optional[str] = typer.Argument(None, help="Proxmox node name"),
     disk_size_gb: int = typer.Option(50, help="Boot disk size in GB"),
     memory_mb: int = typer.Option(4096, help="RAM in MB"),
     cpu_cores: int = typer.Option(2, help="CPU cores"),
+    count: int = typer.Option(1, "--count", "-n", help="Create N VMs named <name>-01..<name>-NN"),
+    spec: Optional[Path] = typer.Option(None, "--spec", help="YAML/JSON file listing VMs to create"),
+    parallel: int = typer.Option(4, help="Maximum VMs created at once"),
+    rollback_all: bool = typer.Option(False, help="Delete the whole batch if any VM fails"),
     project_id: str = typer.Option("homelab", help="Project ID"),
     enable_mocking: bool = typer.Option(False, help="Enable mock backend")
 ) -> None:
-    """Create a VM with Crucible storage."""
+    """Create one or many VMs with Crucible storage."""
+
+    if spec:
+        specs = load_vm_specs(spec)
+    elif name and node:
+        specs = [VMSpec(name=name, node=node, disk_size_gb=disk_size_gb,
+                        memory_mb=memory_mb, cpu_cores=cpu_cores)]
+        if count > 1:
+            specs = specs[0].numbered(count)
+    else:
+        console.print("❌ Give a VM name and node, or --spec")
+        raise typer.Exit(1)
     
     async def _create_vm() -> None:
         vm_manager = CrucibleVMManager(project_id, enable_mocking)
@@ -311,7 +326,52 @@ def create_vm(
         else:
             console.print(f"❌ Failed to create VM: {name}")
     
-    asyncio.run(_create_vm())
+    async def _create_vms() -> None:
+        vm_manager = CrucibleVMManager(project_id, enable_mocking)
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            task = progress.add_task(f"Creating {len(specs)} VMs ({parallel} at a time)...", total=None)
+            result = await vm_manager.create_vms_with_storage(
+                specs, max_parallel=parallel, rollback_all_on_failure=rollback_all
+            )
+            progress.update(task, completed=True)
+
+        table = Table(title=f"VM Batch: {result['created']} created, {result['failed']} failed "
+                            f"in {result['elapsed_sec']:.1f}s")
+        table.add_column("Name", style="cyan")
+        table.add_column("VMID", style="blue")
+        table.add_column("Status", style="green")
+        table.add_column("Started", style="yellow")
+        table.add_column("Elapsed", style="yellow")
+        table.add_column("Timeline", style="magenta")
+
+        for vm in result["vms"]:
+            steps = vm["timeline"]
+            started = steps[0]["start_sec"] if steps else 0.0
+            finished = max((step["start_sec"] + step["elapsed_sec"] for step in steps), default=started)
+            timeline = ", ".join(f"{step['step']} {step['elapsed_sec']:.2f}s" for step in steps)
+            status = vm["status"] if vm["status"] != "failed" else f"failed: {vm['error']}"
+            table.add_row(
+                vm["name"],
+                str(vm.get("vm", {}).get("vmid", "N/A")),
+                status,
+                f"{started:.2f}s",
+                f"{finished - started:.2f}s",
+                timeline
+            )
+
+        console.print(table)
+        if result["status"] != "success":
+            raise typer.Exit(1)
+
+    if len(specs) == 1 and not spec:
+        asyncio.run(_create_vm())
+    else:
+        asyncio.run(_create_vms())
 
 
 @vm_app.command("list")
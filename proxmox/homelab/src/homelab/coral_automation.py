@@ -28,7 +28,8 @@ class CoralAutomationEngine:
         coral_init_dir: Optional[Path] = None,
         config_path: Optional[Path] = None,
         backup_dir: Optional[Path] = None,
-        python_cmd: str = "python3"
+        python_cmd: str = "python3",
+        detector: Optional[CoralDetector] = None
     ):
         """
         Initialize the automation engine.
@@ -39,14 +40,17 @@ class CoralAutomationEngine:
             config_path: Path to LXC config file
             backup_dir: Directory for config backups
             python_cmd: Python command to use
+            detector: Device detector shared with the initializer
+                (default: lsusb-based CoralDetector)
         """
         self.container_id = container_id
         
         # Initialize components
-        self.detector = CoralDetector()
+        self.detector = detector or CoralDetector()
         self.initializer = CoralInitializer(
             coral_init_dir=coral_init_dir or Path.home() / "code",
-            python_cmd=python_cmd
+            python_cmd=python_cmd,
+            detector=self.detector
         )
         self.config_manager = LXCConfigManager(
             container_id=container_id,
@@ -1,14 +1,28 @@
 """Coral TPU device detection and monitoring."""
 
 import logging
+import os
 import re
 import subprocess
-from typing import Optional
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pyudev
 
 from .coral_models import CoralDevice, CoralMode, DeviceNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Vendor names lsusb shows for each mode, used when sysfs has no manufacturer string
+VENDOR_NAMES = {
+    CoralMode.GOOGLE: "Google Inc.",
+    CoralMode.UNICHIP: "Global Unichip Corp.",
+}
+
+# Re-scan interval when no udev monitor is available
+SYSFS_POLL_INTERVAL = 0.1
+
 
 class CoralDetector:
     """Detects and monitors Coral TPU devices."""
@@ -154,4 +168,160 @@ class CoralDetector:
         
         raise DeviceNotFoundError(
             f"Device did not reach {expected_mode.name} mode within {timeout} seconds"
-        )
\ No newline at end of file
+        )
+
+
+class SysfsCoralDetector(CoralDetector):
+    """Detects Coral TPU devices from sysfs and waits for mode changes on udev events.
+
+    Reads idVendor/idProduct of every USB device under
+    ``<sysfs_root>/bus/usb/devices`` instead of running lsusb, and
+    wait_for_mode_change() sleeps on the udev netlink socket until a USB
+    device is added or removed, so a mode switch is seen as soon as the
+    kernel re-enumerates the device.
+    """
+
+    def __init__(
+        self,
+        sysfs_root: Path = Path("/sys"),
+        monitor_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        """
+        Initialize the detector.
+
+        Args:
+            sysfs_root: Root of the sysfs tree (a fake tree in tests)
+            monitor_factory: Returns a started-on-demand udev monitor with
+                start() and poll(timeout); defaults to a pyudev netlink monitor
+        """
+        super().__init__()
+        self.sysfs_root = Path(sysfs_root)
+        self.monitor_factory = monitor_factory or self._udev_monitor
+
+    @staticmethod
+    def _udev_monitor() -> Any:
+        """Netlink monitor for USB device add/remove events."""
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by(subsystem="usb", device_type="usb_device")
+        return monitor
+
+    @staticmethod
+    def _read_attr(device_dir: Path, name: str) -> Optional[str]:
+        """Read one sysfs attribute, or None if it is missing."""
+        try:
+            return (device_dir / name).read_text().strip()
+        except OSError:
+            return None
+
+    def _scan_sysfs(self) -> dict[CoralMode, CoralDevice]:
+        """Coral devices per mode found under the sysfs USB device directory."""
+        devices_dir = self.sysfs_root / "bus/usb/devices"
+        try:
+            entries = sorted(devices_dir.iterdir())
+        except OSError as e:
+            logger.error(f"Failed to read {devices_dir}: {e}")
+            raise DeviceNotFoundError(f"Could not read USB devices from {devices_dir}") from e
+
+        ids = {mode.value: mode for mode in VENDOR_NAMES}
+        found: dict[CoralMode, CoralDevice] = {}
+        for entry in entries:
+            usb_id = f"{self._read_attr(entry, 'idVendor')}:{self._read_attr(entry, 'idProduct')}"
+            mode = ids.get(usb_id)
+            busnum = self._read_attr(entry, "busnum")
+            devnum = self._read_attr(entry, "devnum")
+            if mode is None or mode in found or not busnum or not devnum:
+                continue
+
+            bus, device = f"{int(busnum):03d}", f"{int(devnum):03d}"
+            names = [self._read_attr(entry, "manufacturer"), self._read_attr(entry, "product")]
+            found[mode] = CoralDevice(
+                mode=mode,
+                bus=bus,
+                device=device,
+                device_path=f"/dev/bus/usb/{bus}/{device}",
+                description=" ".join(n for n in names if n) or VENDOR_NAMES[mode],
+            )
+        return found
+
+    def detect_coral(self) -> CoralDevice:
+        """
+        Detect current Coral TPU device state from sysfs.
+
+        Returns:
+            CoralDevice with current state
+
+        Raises:
+            DeviceNotFoundError: If the sysfs USB device directory cannot be read
+        """
+        logger.debug(f"Detecting Coral TPU device in {self.sysfs_root}")
+        found = self._scan_sysfs()
+
+        # Google mode (initialized) takes priority over Unichip mode
+        for mode in (CoralMode.GOOGLE, CoralMode.UNICHIP):
+            if mode in found:
+                logger.info(f"Coral detected in {mode.name.capitalize()} mode: {found[mode].description}")
+                self._last_detection = found[mode]
+                return found[mode]
+
+        no_device = CoralDevice(mode=CoralMode.NOT_FOUND)
+        logger.warning("No Coral TPU device detected")
+        self._last_detection = no_device
+        return no_device
+
+    def verify_device_accessible(self, device: CoralDevice) -> bool:
+        """Check the device node exists and is readable and writable."""
+        if not device.device_path:
+            return False
+        if os.access(device.device_path, os.R_OK | os.W_OK):
+            return True
+        logger.warning(f"Device not accessible: {device.device_path}")
+        return False
+
+    def wait_for_mode_change(self, expected_mode: CoralMode, timeout: int = 30) -> CoralDevice:
+        """
+        Wait for device to change to expected mode, waking on udev USB events.
+
+        Falls back to re-reading sysfs every SYSFS_POLL_INTERVAL seconds
+        when no udev monitor can be opened.
+
+        Args:
+            expected_mode: Mode to wait for
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            CoralDevice in expected mode
+
+        Raises:
+            DeviceNotFoundError: If device doesn't reach expected mode within timeout
+        """
+        logger.info(f"Waiting for Coral to enter {expected_mode.name} mode (timeout: {timeout}s)")
+
+        # Listen before the first scan so an event between the two is not lost
+        try:
+            monitor = self.monitor_factory()
+            monitor.start()
+        except (ImportError, OSError) as e:
+            logger.warning(f"udev monitor unavailable, polling sysfs instead: {e}")
+            monitor = None
+
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self.detect_coral()
+            if current.mode == expected_mode:
+                logger.info(f"Device reached {expected_mode.name} mode")
+                return current
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if monitor is None:
+                time.sleep(min(SYSFS_POLL_INTERVAL, remaining))
+                continue
+
+            event = monitor.poll(timeout=remaining)
+            if event is not None:
+                logger.debug(f"USB {event.action}: {event.sys_path}")
+
+        raise DeviceNotFoundError(
+            f"Device did not reach {expected_mode.name} mode within {timeout} seconds"
+        )
@@ -17,7 +17,8 @@ class CoralInitializer:
     def __init__(
         self,
         coral_init_dir: Path = Path("/root/code"),
-        python_cmd: str = "python3"
+        python_cmd: str = "python3",
+        detector: Optional[CoralDetector] = None
     ):
         """
         Initialize the Coral initializer.
@@ -25,10 +26,11 @@ class CoralInitializer:
         Args:
             coral_init_dir: Directory containing coral repos
             python_cmd: Python command to use
+            detector: Device detector (default: lsusb-based CoralDetector)
         """
         self.coral_init_dir = coral_init_dir
         self.python_cmd = python_cmd
-        self.detector = CoralDetector()
+        self.detector = detector or CoralDetector()
 
         # Required files for initialization
         self.init_script = coral_init_dir / "coral/pycoral/examples/classify_image.py"
@@ -0,0 +1,320 @@
+"""
+fio-style benchmarks for Crucible storage.
+
+Runs sequential, random and mixed workloads at a chosen block size and
+queue depth against a disk created through OxideStorageAPI, and reports
+IOPS, throughput and latency percentiles. Results serialize to JSON so runs
+with different replication factors, block sizes or mock latencies can be
+compared before deploying to the MA90 sleds.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from homelab.crucible_mock import MockCrucibleManager
+from homelab.oxide_storage_api import DiskCreate, DiskSource, OxideStorageAPI, create_storage_api
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket growth factor: ~5% relative error on reported percentiles
+_BUCKET_BASE = 1.05
+
+
+@dataclass
+class WorkloadProfile:
+    """One benchmark workload, named after fio's rw= modes."""
+    name: str
+    pattern: str = "random"  # sequential or random
+    read_ratio: float = 1.0  # 1.0 = all reads, 0.0 = all writes
+    block_size: int = 4096
+    queue_depth: int = 1
+    working_set_bytes: int = 64 * 1024**2
+    duration_sec: float = 5.0
+    max_ops: Optional[int] = None  # Stop after this many ops (before duration)
+    seed: int = 0
+
+    def validate(self) -> None:
+        """Reject profiles that cannot run."""
+        if self.pattern not in ("sequential", "random"):
+            raise ValueError(f"Invalid pattern '{self.pattern}', must be sequential or random")
+        if not 0.0 <= self.read_ratio <= 1.0:
+            raise ValueError(f"Invalid read ratio {self.read_ratio}, must be 0.0-1.0")
+        if self.queue_depth < 1:
+            raise ValueError(f"Invalid queue depth {self.queue_depth}")
+        if self.block_size <= 0 or self.working_set_bytes < self.block_size:
+            raise ValueError(
+                f"Working set ({self.working_set_bytes}) must hold at least one {self.block_size}-byte block"
+            )
+
+
+# Built-in profiles; block size and queue depth can be overridden per run
+PROFILES: Dict[str, WorkloadProfile] = {
+    "read": WorkloadProfile("read", pattern="sequential", read_ratio=1.0, block_size=1024**2),
+    "write": WorkloadProfile("write", pattern="sequential", read_ratio=0.0, block_size=1024**2),
+    "randread": WorkloadProfile("randread", pattern="random", read_ratio=1.0),
+    "randwrite": WorkloadProfile("randwrite", pattern="random", read_ratio=0.0),
+    "randrw": WorkloadProfile("randrw", pattern="random", read_ratio=0.7),
+    "randread-qd32": WorkloadProfile("randread-qd32", pattern="random", read_ratio=1.0, queue_depth=32),
+}
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with JSON-friendly buckets."""
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample."""
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log(micros, _BUCKET_BASE))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Latency in seconds at the pct-th percentile (bucket upper bound)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(_BUCKET_BASE ** (bucket + 1) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary in milliseconds plus raw buckets."""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": round(mean * 1000, 4),
+            "p50_ms": round(self.percentile(50) * 1000, 4),
+            "p99_ms": round(self.percentile(99) * 1000, 4),
+            "p999_ms": round(self.percentile(99.9) * 1000, 4),
+            "max_ms": round(self.max * 1000, 4),
+            "buckets": {str(bucket): n for bucket, n in sorted(self.buckets.items())},
+        }
+
+
+@dataclass
+class BenchResult:
+    """Measured outcome of one workload."""
+    profile: Dict[str, Any]
+    backend: Dict[str, Any]
+    ops: int
+    errors: int
+    bytes_read: int
+    bytes_written: int
+    elapsed_sec: float
+    iops: float
+    throughput_mib_s: float
+    latency: Dict[str, Any]
+    read_latency: Dict[str, Any]
+    write_latency: Dict[str, Any]
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+class StorageBenchmark:
+    """Runs workload profiles against an OxideStorageAPI and its backend."""
+
+    def __init__(self, storage_api: OxideStorageAPI):
+        self.storage_api = storage_api
+
+    async def run(self, profile: WorkloadProfile) -> BenchResult:
+        """
+        Run one workload on a fresh disk and delete the disk afterwards.
+
+        Args:
+            profile: Workload to run
+
+        Returns:
+            Measured IOPS, throughput and latency histograms
+        """
+        profile.validate()
+        disk = await self.storage_api.disk_create(DiskCreate(
+            name=f"bench-{profile.name}-{uuid.uuid4().hex[:8]}",
+            description=f"Benchmark disk for {profile.name}",
+            size=profile.working_set_bytes,
+            disk_source=DiskSource.BLANK,
+            block_size=self.storage_api.config.default_block_size
+        ))
+        try:
+            return await self._run_on_volume(profile, disk["volume_id"])
+        finally:
+            await self.storage_api.disk_delete(disk["id"])
+
+    async def run_suite(self, profiles: List[WorkloadProfile]) -> List[BenchResult]:
+        """Run profiles one after another."""
+        results = []
+        for profile in profiles:
+            logger.info(f"Running benchmark {profile.name}")
+            results.append(await self.run(profile))
+        return results
+
+    async def _run_on_volume(self, profile: WorkloadProfile, volume_id: str) -> BenchResult:
+        """Drive queue_depth workers against a volume until ops or time run out."""
+        backend = self.storage_api.storage_backend
+        rng = random.Random(profile.seed)
+        blocks = profile.working_set_bytes // profile.block_size
+        payload = memoryview(rng.randbytes(profile.block_size))
+
+        overall = LatencyHistogram()
+        reads = LatencyHistogram()
+        writes = LatencyHistogram()
+        counters = {"issued": 0, "errors": 0, "bytes_read": 0, "bytes_written": 0}
+        deadline = time.perf_counter() + profile.duration_sec
+
+        def next_op() -> Optional[Tuple[int, bool]]:
+            if profile.max_ops is not None and counters["issued"] >= profile.max_ops:
+                return None
+            if time.perf_counter() >= deadline:
+                return None
+            index = counters["issued"]
+            counters["issued"] += 1
+            block = index % blocks if profile.pattern == "sequential" else rng.randrange(blocks)
+            is_read = rng.random() < profile.read_ratio
+            return block * profile.block_size, is_read
+
+        async def worker() -> None:
+            while True:
+                op = next_op()
+                if op is None:
+                    return
+                offset, is_read = op
+                start = time.perf_counter()
+                try:
+                    if is_read:
+                        await backend.read_volume(volume_id, offset, profile.block_size)
+                    else:
+                        await backend.write_volume(volume_id, offset, payload)
+                except Exception as e:
+                    counters["errors"] += 1
+                    logger.debug(f"Benchmark I/O failed at {offset}: {e}")
+                    continue
+                elapsed = time.perf_counter() - start
+                overall.record(elapsed)
+                if is_read:
+                    reads.record(elapsed)
+                    counters["bytes_read"] += profile.block_size
+                else:
+                    writes.record(elapsed)
+                    counters["bytes_written"] += profile.block_size
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(profile.queue_depth)))
+        elapsed = max(time.perf_counter() - started, 1e-9)
+
+        if isinstance(backend, MockCrucibleManager):
+            await backend.wait_for_background_io()
+
+        moved = counters["bytes_read"] + counters["bytes_written"]
+        return BenchResult(
+            profile=asdict(profile),
+            backend=self._backend_settings(),
+            ops=overall.count,
+            errors=counters["errors"],
+            bytes_read=counters["bytes_read"],
+            bytes_written=counters["bytes_written"],
+            elapsed_sec=round(elapsed, 4),
+            iops=round(overall.count / elapsed, 2),
+            throughput_mib_s=round(moved / elapsed / 1024**2, 3),
+            latency=overall.to_dict(),
+            read_latency=reads.to_dict(),
+            write_latency=writes.to_dict(),
+        )
+
+    def _backend_settings(self) -> Dict[str, Any]:
+        """Backend settings that affect results, recorded with each run."""
+        config = self.storage_api.config
+        return {
+            "replication_factor": config.replication_factor,
+            "write_quorum": config.effective_write_quorum(config.replication_factor),
+            "default_block_size": config.default_block_size,
+            "mock_latency_ms": config.mock_latency_ms,
+            "mock_failure_rate": config.mock_failure_rate,
+            "data_bearing": bool(config.mock_data_dir),
+        }
+
+
+def create_bench_api(project_id: str = "bench", **overrides: Any) -> OxideStorageAPI:
+    """
+    Create a mock-backed storage API with CrucibleConfig overrides.
+
+    Args:
+        project_id: Project identifier
+        **overrides: CrucibleConfig fields, e.g. replication_factor=2
+
+    Returns:
+        OxideStorageAPI on a fresh MockCrucibleManager
+    """
+    api = create_storage_api(project_id, enable_mocking=True)
+    settings = {key: value for key, value in overrides.items() if value is not None}
+    if settings:
+        api.config = replace(api.config, **settings)
+        api.config.validate()
+        api.storage_backend = MockCrucibleManager(api.config)
+    return api
+
+
+def results_to_json(results: List[BenchResult]) -> Dict[str, Any]:
+    """Wrap results in a versioned document for saving and comparison."""
+    return {
+        "version": 1,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def save_results(results: List[BenchResult], path: Path) -> None:
+    """Write results as JSON."""
+    path.write_text(json.dumps(results_to_json(results), indent=2))
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare two saved runs profile by profile.
+
+    Args:
+        baseline: Document produced by results_to_json
+        current: Document produced by results_to_json
+
+    Returns:
+        Per-profile IOPS, throughput and tail latency changes in percent
+    """
+    previous = {r["profile"]["name"]: r for r in baseline.get("results", [])}
+    comparisons = []
+    for result in current.get("results", []):
+        name = result["profile"]["name"]
+        if name not in previous:
+            continue
+        before = previous[name]
+        comparisons.append({
+            "profile": name,
+            "iops_change_pct": _pct_change(before["iops"], result["iops"]),
+            "throughput_change_pct": _pct_change(before["throughput_mib_s"], result["throughput_mib_s"]),
+            "p99_change_pct": _pct_change(before["latency"]["p99_ms"], result["latency"]["p99_ms"]),
+            "p999_change_pct": _pct_change(before["latency"]["p999_ms"], result["latency"]["p999_ms"]),
+        })
+    return comparisons
+
+
+def _pct_change(before: float, after: float) -> Optional[float]:
+    """Percent change, or None when the baseline is zero."""
+    if not before:
+        return None
+    return round((after - before) / before * 100, 2)
@@ -20,6 +20,13 @@ class CrucibleStorageSled:
     ports: List[int] = field(default_factory=lambda: [8001, 8002, 8003])
     max_regions: int = 3
     credentials: Optional[Dict[str, str]] = None
+    # Sleds sharing a failure domain never both get replicas of a volume if avoidable
+    failure_domain: Optional[str] = None
+
+    @property
+    def domain(self) -> str:
+        """Failure domain, defaulting to the host (each ma90-N is its own box)."""
+        return self.failure_domain or self.hostname
 
 
 @dataclass
@@ -36,16 +43,25 @@ class CrucibleConfig:
     deployment_mode: str = "development"  # development, testing, production
     enable_encryption: bool = True
     replication_factor: int = 3
+    # Replica acks needed for a write to succeed; None means a majority
+    write_quorum: Optional[int] = None
     
     # Performance settings
     default_block_size: int = 512
     max_disk_size_gb: int = 1023
     io_timeout_sec: int = 30
+    # Latency percentile a read waits for before hedging to another replica
+    read_hedge_percentile: float = 95.0
     
     # Mock settings for testing
     enable_mocking: bool = False
     mock_latency_ms: float = 2.5
     mock_failure_rate: float = 0.0
+    # Directory for sparse region files; None keeps the mock metadata-only
+    mock_data_dir: Optional[str] = None
+
+    # SQLite file for disk/snapshot/VM metadata; None keeps it in memory
+    metadata_path: Optional[str] = None
     
     # Integration settings
     proxmox_integration: bool = True
@@ -74,7 +90,8 @@ class CrucibleConfig:
                 credentials={
                     "username": os.getenv(f"CRUCIBLE_SLED_{i+1}_USER", "ubuntu"),
                     "ssh_key": os.getenv("SSH_PUBKEY_PATH", "~/.ssh/id_rsa")
-                }
+                },
+                failure_domain=os.getenv(f"CRUCIBLE_SLED_{i+1}_FAILURE_DOMAIN") or None
             )
             sleds.append(sled)
         
@@ -85,12 +102,16 @@ class CrucibleConfig:
             deployment_mode=os.getenv("CRUCIBLE_DEPLOYMENT_MODE", "development"),
             enable_encryption=os.getenv("CRUCIBLE_ENCRYPTION", "true").lower() == "true",
             replication_factor=int(os.getenv("CRUCIBLE_REPLICATION_FACTOR", "3")),
+            write_quorum=int(os.getenv("CRUCIBLE_WRITE_QUORUM")) if os.getenv("CRUCIBLE_WRITE_QUORUM") else None,
             default_block_size=int(os.getenv("CRUCIBLE_BLOCK_SIZE", "512")),
             max_disk_size_gb=int(os.getenv("CRUCIBLE_MAX_DISK_SIZE_GB", "1023")),
             io_timeout_sec=int(os.getenv("CRUCIBLE_IO_TIMEOUT", "30")),
+            read_hedge_percentile=float(os.getenv("CRUCIBLE_READ_HEDGE_PERCENTILE", "95")),
             enable_mocking=os.getenv("CRUCIBLE_ENABLE_MOCKING", "false").lower() == "true",
             mock_latency_ms=float(os.getenv("CRUCIBLE_MOCK_LATENCY_MS", "2.5")),
             mock_failure_rate=float(os.getenv("CRUCIBLE_MOCK_FAILURE_RATE", "0.0")),
+            mock_data_dir=os.getenv("CRUCIBLE_MOCK_DATA_DIR") or None,
+            metadata_path=os.getenv("CRUCIBLE_METADATA_PATH") or None,
             proxmox_integration=os.getenv("CRUCIBLE_PROXMOX_INTEGRATION", "true").lower() == "true",
             auto_attach_disks=os.getenv("CRUCIBLE_AUTO_ATTACH", "false").lower() == "true"
         )
@@ -103,12 +124,26 @@ class CrucibleConfig:
         if self.replication_factor > len(self.storage_sleds):
             raise ValueError(f"Replication factor ({self.replication_factor}) cannot exceed number of sleds ({len(self.storage_sleds)})")
         
+        if self.write_quorum is not None and not 1 <= self.write_quorum <= self.replication_factor:
+            raise ValueError(
+                f"Write quorum ({self.write_quorum}) must be between 1 and "
+                f"replication factor ({self.replication_factor})"
+            )
+
+        if not 0 < self.read_hedge_percentile <= 100:
+            raise ValueError(f"Invalid read hedge percentile {self.read_hedge_percentile}, must be in (0, 100]")
+
         if self.default_block_size not in [512, 2048, 4096]:
             raise ValueError(f"Invalid block size {self.default_block_size}, must be 512, 2048, or 4096")
         
         if self.max_disk_size_gb <= 0 or self.max_disk_size_gb > 10240:
             raise ValueError(f"Invalid max disk size {self.max_disk_size_gb}GB, must be 1-10240")
     
+    def effective_write_quorum(self, replica_count: int) -> int:
+        """Acks required for a write to a volume with replica_count replicas."""
+        quorum = self.write_quorum if self.write_quorum is not None else replica_count // 2 + 1
+        return min(quorum, replica_count)
+
     def to_dict(self) -> Dict[str, Union[str, int, bool, List[Dict[str, Union[str, int]]]]]:
         """Convert to dictionary for serialization."""
         return {
@@ -117,7 +152,8 @@ class CrucibleConfig:
                     "ip": sled.ip,
                     "hostname": sled.hostname,
                     "ports": sled.ports,
-                    "max_regions": sled.max_regions
+                    "max_regions": sled.max_regions,
+                    "failure_domain": sled.domain
                 }
                 for sled in self.storage_sleds
             ],
@@ -125,6 +161,7 @@ class CrucibleConfig:
             "deployment_mode": self.deployment_mode,
             "enable_encryption": self.enable_encryption,
             "replication_factor": self.replication_factor,
+            "write_quorum": self.effective_write_quorum(self.replication_factor),
             "default_block_size": self.default_block_size,
             "max_disk_size_gb": self.max_disk_size_gb,
             "enable_mocking": self.enable_mocking,
@@ -0,0 +1,187 @@
+"""
+Parallel, resumable image upload into OxideStorageAPI disks.
+
+Splits a local raw image into chunks and writes them with several
+concurrent streams. Before uploading it asks the API which byte ranges are
+still missing, so rerunning an interrupted upload only sends what the disk
+does not have yet. The image is hashed while it uploads and the hash is
+checked by disk_finalize_import.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homelab.oxide_storage_api import DEFAULT_IMPORT_CHUNK_SIZE, DiskState, OxideStorageAPI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPLOAD_STREAMS = 4
+
+# Called with (bytes uploaded so far, bytes to upload in this run)
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class UploadResult:
+    """Outcome of one upload run."""
+    disk_id: str
+    image_size: int
+    bytes_uploaded: int
+    bytes_skipped: int
+    chunks: int
+    elapsed_sec: float
+    sha256: Optional[str]
+    finalized: Optional[Dict[str, Any]] = None
+
+
+class ParallelImageUploader:
+    """Uploads a local image to a disk with N concurrent write streams."""
+
+    def __init__(self, storage_api: OxideStorageAPI, streams: int = DEFAULT_UPLOAD_STREAMS,
+                 chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE, progress: Optional[ProgressCallback] = None):
+        if streams < 1:
+            raise ValueError(f"Invalid stream count {streams}")
+        if chunk_size <= 0:
+            raise ValueError(f"Invalid chunk size {chunk_size}")
+
+        self.storage_api = storage_api
+        self.streams = streams
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    async def upload(self, disk_id: str, image_path: Path, finalize: bool = True,
+                     create_snapshot: bool = False, verify_checksum: bool = True) -> UploadResult:
+        """
+        Upload an image, resuming any earlier partial upload to the same disk.
+
+        Args:
+            disk_id: Disk created with DiskSource.IMPORTING_BLOCKS
+            image_path: Local raw image
+            finalize: Finalize the import once every byte is written
+            create_snapshot: Snapshot the disk when finalizing
+            verify_checksum: Hash the image and have finalize verify it
+
+        Returns:
+            Bytes uploaded and skipped, timing, and the finalize response
+        """
+        image_path = Path(image_path)
+        image_size = image_path.stat().st_size
+        disk = await self.storage_api.disk_view(disk_id)
+
+        if image_size == 0 or image_size > disk["size"]:
+            raise ValueError(f"Image size {image_size} must be between 1 and disk size {disk['size']}")
+        if self.chunk_size % disk["block_size"]:
+            raise ValueError(f"Chunk size must be a multiple of block size {disk['block_size']}")
+
+        if disk["state"] == DiskState.IMPORT_READY.value:
+            await self.storage_api.disk_bulk_write_import_start(disk_id, expected_size=image_size)
+
+        status = await self.storage_api.disk_bulk_write_import_status(disk_id)
+        chunks = self._plan_chunks(status["missing"], image_size)
+        to_upload = sum(length for _, length in chunks)
+        logger.info(
+            f"📤 Uploading {image_path.name} to disk {disk_id}: {len(chunks)} chunks, "
+            f"{to_upload} of {image_size} bytes, {self.streams} streams"
+        )
+
+        started = time.perf_counter()
+        hashing = asyncio.ensure_future(asyncio.to_thread(_sha256_file, image_path)) if verify_checksum else None
+        try:
+            uploaded = await self._upload_chunks(disk_id, image_path, chunks, to_upload)
+            sha256 = await hashing if hashing else None
+        except BaseException:
+            if hashing:
+                hashing.cancel()
+            raise
+        elapsed = time.perf_counter() - started
+
+        result = UploadResult(
+            disk_id=disk_id,
+            image_size=image_size,
+            bytes_uploaded=uploaded,
+            bytes_skipped=image_size - to_upload,
+            chunks=len(chunks),
+            elapsed_sec=round(elapsed, 4),
+            sha256=sha256,
+        )
+
+        if finalize:
+            result.finalized = await self.storage_api.disk_finalize_import(
+                disk_id, create_snapshot=create_snapshot, expected_sha256=sha256, image_size=image_size
+            )
+
+        logger.info(f"✅ Uploaded {uploaded} bytes to disk {disk_id} in {elapsed:.2f}s")
+        return result
+
+    def _plan_chunks(self, missing: List[List[int]], image_size: int) -> List[Tuple[int, int]]:
+        """Split missing ranges within the image into (offset, length) chunks."""
+        chunks = []
+        for start, end in missing:
+            end = min(end, image_size)
+            for offset in range(start, end, self.chunk_size):
+                chunks.append((offset, min(self.chunk_size, end - offset)))
+        return chunks
+
+    async def _upload_chunks(self, disk_id: str, image_path: Path,
+                             chunks: List[Tuple[int, int]], total: int) -> int:
+        """Drain the chunk list with self.streams workers; return bytes written."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for chunk in chunks:
+            queue.put_nowait(chunk)
+        uploaded = 0
+
+        async def worker() -> None:
+            nonlocal uploaded
+            buffer = bytearray(self.chunk_size)
+            view = memoryview(buffer)
+            with open(image_path, "rb") as image:
+                while not queue.empty():
+                    offset, length = queue.get_nowait()
+                    count = await asyncio.to_thread(_read_at, image, offset, view[:length])
+                    if count != length:
+                        raise IOError(f"Short read from {image_path} at {offset}: {count} of {length} bytes")
+                    await self.storage_api.disk_bulk_write_import(disk_id, view[:length], offset=offset)
+                    uploaded += length
+                    if self.progress:
+                        self.progress(uploaded, total)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.streams, len(chunks)))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        return uploaded
+
+
+async def upload_image(storage_api: OxideStorageAPI, disk_id: str, image_path: Path,
+                       streams: int = DEFAULT_UPLOAD_STREAMS, **kwargs: Any) -> UploadResult:
+    """Upload an image with a default ParallelImageUploader."""
+    return await ParallelImageUploader(storage_api, streams=streams).upload(disk_id, image_path, **kwargs)
+
+
+def _read_at(image: Any, offset: int, out: memoryview) -> int:
+    """Fill out from offset in the file (runs in a worker thread)."""
+    image.seek(offset)
+    filled = 0
+    while filled < len(out):
+        count = image.readinto(out[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as image:
+        for block in iter(lambda: image.read(DEFAULT_IMPORT_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
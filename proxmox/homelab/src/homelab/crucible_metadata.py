@@ -0,0 +1,232 @@
+"""
+Durable metadata store for Crucible disks, snapshots, imports and VMs.
+
+Records live in one SQLite table (WAL journal) keyed by kind and id, with
+indexed columns for the lookups the storage API needs: name, state and
+owner (the VM a disk is attached to). Payloads are stored as JSON in their
+API form, so listing pages straight out of the database without rebuilding
+dataclasses. Without a path the store is in-memory and behaves like the
+plain dicts it replaces.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    name TEXT,
+    state TEXT,
+    owner TEXT,
+    created TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS records_name ON records (kind, project_id, name);
+CREATE INDEX IF NOT EXISTS records_state ON records (kind, project_id, state);
+CREATE INDEX IF NOT EXISTS records_owner ON records (kind, owner);
+CREATE INDEX IF NOT EXISTS records_order ON records (kind, project_id, created, id);
+"""
+
+
+class MetadataStore:
+    """SQLite-backed record store with indexed name/state/owner lookups."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or ":memory:"
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        logger.debug(f"Opened metadata store at {self.path}")
+
+    def put(self, kind: str, record_id: str, data: Dict[str, Any], project_id: str,
+            name: Optional[str] = None, state: Optional[str] = None,
+            owner: Optional[str] = None, created: str = "") -> None:
+        """Insert or replace one record."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO records (kind, id, project_id, name, state, owner, created, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, id) DO UPDATE SET "
+                "name = excluded.name, state = excluded.state, owner = excluded.owner, data = excluded.data",
+                (kind, record_id, project_id, name, state, owner, created, json.dumps(data)),
+            )
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Return a record's data, or None if missing."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        """Delete a record; return whether it existed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+            )
+        return cursor.rowcount > 0
+
+    def find(self, kind: str, project_id: Optional[str] = None, name: Optional[str] = None,
+             state: Optional[str] = None, owner: Optional[str] = None,
+             limit: Optional[int] = None,
+             page_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Look up records by indexed columns, oldest first.
+
+        Args:
+            kind: Record kind (disk, snapshot, import_session, vm)
+            project_id: Restrict to one project
+            name: Exact name match
+            state: Exact state match
+            owner: Exact owner match (e.g. attached VM)
+            limit: Page size; None returns everything
+            page_token: Token from a previous page
+
+        Returns:
+            Tuple of (records, next page token or None)
+        """
+        where, params = self._filters(kind, project_id, name, state, owner)
+        if page_token:
+            created, last_id = _decode_token(page_token)
+            where.append("(created, id) > (?, ?)")
+            params.extend([created, last_id])
+
+        sql = f"SELECT id, created, data FROM records WHERE {' AND '.join(where)} ORDER BY created, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit + 1)  # One extra row tells us whether another page exists
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_token = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_token = _encode_token(rows[-1][1], rows[-1][0])
+        return [json.loads(row[2]) for row in rows], next_token
+
+    def ids(self, kind: str, project_id: Optional[str] = None) -> List[str]:
+        """Return record ids of a kind, oldest first."""
+        where, params = self._filters(kind, project_id)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM records WHERE {' AND '.join(where)} ORDER BY created, id", params
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, kind: str, project_id: Optional[str] = None, state: Optional[str] = None) -> int:
+        """Count records of a kind."""
+        where, params = self._filters(kind, project_id, state=state)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COUNT(*) FROM records WHERE {' AND '.join(where)}", params
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filters(kind: str, project_id: Optional[str] = None, name: Optional[str] = None,
+                 state: Optional[str] = None, owner: Optional[str] = None) -> Tuple[List[str], List[Any]]:
+        """Build WHERE clauses for the indexed columns that are set."""
+        where = ["kind = ?"]
+        params: List[Any] = [kind]
+        for column, value in (("project_id", project_id), ("name", name), ("state", state), ("owner", owner)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        return where, params
+
+
+class StoreBackedDict(MutableMapping):
+    """
+    Write-through mapping over one record kind of a MetadataStore.
+
+    Values are decoded lazily on first access and cached. Assigning or
+    deleting a key writes through immediately; objects mutated in place
+    must be persisted with save(key).
+    """
+
+    def __init__(self, store: MetadataStore, kind: str, project_id: str,
+                 encode: Callable[[Any], Dict[str, Any]] = lambda value: value,
+                 decode: Callable[[Dict[str, Any]], Any] = lambda data: data,
+                 index: Callable[[Any], Dict[str, Optional[str]]] = lambda value: {}):
+        self.store = store
+        self.kind = kind
+        self.project_id = project_id
+        self._encode = encode
+        self._decode = decode
+        self._index = index
+        self._cache: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._cache:
+            return self._cache[key]
+        data = self.store.get(self.kind, key)
+        if data is None:
+            raise KeyError(key)
+        value = self._decode(data)
+        self._cache[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._cache[key] = value
+        self.save(key)
+
+    def __delitem__(self, key: str) -> None:
+        self._cache.pop(key, None)
+        if not self.store.delete(self.kind, key):
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._cache or (isinstance(key, str) and self.store.get(self.kind, key) is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.ids(self.kind, self.project_id))
+
+    def __len__(self) -> int:
+        return self.store.count(self.kind, self.project_id)
+
+    def save(self, key: str) -> None:
+        """Persist the cached value for key (after an in-place change)."""
+        value = self._cache[key]
+        index = self._index(value)
+        self.store.put(
+            self.kind, key, self._encode(value), self.project_id,
+            name=index.get("name"), state=index.get("state"),
+            owner=index.get("owner"), created=index.get("created") or "",
+        )
+
+
+def _encode_token(created: str, record_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created, record_id]).encode()).decode()
+
+
+def _decode_token(token: str) -> Tuple[str, str]:
+    try:
+        created, record_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page token: {token}") from e
+    return created, record_id
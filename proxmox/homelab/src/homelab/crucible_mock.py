@@ -5,23 +5,198 @@ Provides complete API compatibility without requiring actual infrastructure.
 
 import asyncio
 import base64
+import errno
+import filecmp
 import json
 import logging
+import mmap
+import os
 import random
 import time
 import uuid
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, BinaryIO, Deque, Dict, List, Optional, Set, Tuple
 from unittest.mock import MagicMock
 
 from homelab.crucible_config import CrucibleConfig, CrucibleStorageSled
+from homelab.crucible_placement import (
+    PlacedRegion,
+    PlacementDecision,
+    PlacementEngine,
+    RegionMove,
+    SledLoad,
+)
+from homelab.interval_set import IntervalSet
 
 logger = logging.getLogger(__name__)
 
 
+class RegionLayer:
+    """
+    One copy-on-write layer of a region.
+
+    A layer holds only the blocks written to it; everything else resolves
+    through its parent chain. Frozen layers back snapshots and are shared by
+    every clone taken from them, kept alive by a reference count.
+    """
+
+    def __init__(self, layer_id: str, size_bytes: int, block_size: int,
+                 path: Optional[Path] = None, parent: Optional["RegionLayer"] = None,
+                 reopen: bool = False):
+        self.id = layer_id
+        self.size_bytes = size_bytes
+        self.block_size = block_size
+        self.parent = parent
+        self.refcount = 0
+        self.frozen = False
+        self.written = IntervalSet()  # Block-aligned ranges stored in this layer
+        self.accounted_bytes = 0
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+
+        if parent is not None:
+            parent.refcount += 1
+
+        if path is not None:
+            if reopen:
+                # Keep the bytes a previous process left in the file
+                self._file = open(path, "r+b")
+                actual = os.fstat(self._file.fileno()).st_size
+                if actual != size_bytes:
+                    self._file.close()
+                    raise ValueError(f"Layer file {path} is {actual} bytes, expected {size_bytes}")
+            else:
+                self._file = open(path, "w+b")
+                self._file.truncate(size_bytes)  # Sparse: no blocks allocated yet
+            if size_bytes > 0:
+                self._map = mmap.mmap(self._file.fileno(), size_bytes)
+            if reopen:
+                self._load_written()
+
+    @property
+    def data_bearing(self) -> bool:
+        """True if this layer stores real bytes."""
+        return self._map is not None
+
+    def allocated_bytes(self) -> int:
+        """Bytes this layer occupies: file blocks if data-bearing, else written blocks."""
+        if self._file is not None:
+            return os.fstat(self._file.fileno()).st_blocks * 512
+        return self.written.covered_bytes()
+
+    def resolve(self, offset: int, length: int) -> List[Tuple[int, int, Optional["RegionLayer"]]]:
+        """
+        Map [offset, offset + length) to the layers that own each piece.
+
+        Walks the chain top-down; each layer claims the ranges it has written
+        and passes the remaining gaps to its parent. Unowned ranges map to None
+        (zeros).
+        """
+        pending = [(offset, offset + length)]
+        resolved = []
+        layer: Optional[RegionLayer] = self
+        while layer is not None and pending:
+            gaps = []
+            for start, end in pending:
+                limit = min(end, layer.size_bytes)
+                missing = layer.written.missing(start, limit) if start < limit else []
+                position = start
+                for gap_start, gap_end in missing:
+                    if position < gap_start:
+                        resolved.append((position, gap_start, layer))
+                    position = gap_end
+                if position < limit:
+                    resolved.append((position, limit, layer))
+                gaps.extend(missing)
+                if limit < end:
+                    gaps.append((max(start, limit), end))
+            pending = gaps
+            layer = layer.parent
+        resolved.extend((start, end, None) for start, end in pending)
+        return sorted(resolved, key=lambda piece: piece[0])
+
+    def read_into(self, offset: int, out: memoryview) -> None:
+        """Fill ``out`` with the layered contents starting at ``offset``."""
+        for start, end, owner in self.resolve(offset, len(out)):
+            target = out[start - offset:end - offset]
+            if owner is None or owner._map is None:
+                target[:] = bytes(end - start)
+            else:
+                with memoryview(owner._map) as source:
+                    target[:] = source[start:end]
+
+    def write(self, offset: int, view: memoryview) -> None:
+        """Write into this layer, copying up partial blocks from the parent chain."""
+        if self.frozen:
+            raise RuntimeError(f"Layer {self.id} is frozen")
+
+        end = offset + len(view)
+        block_start = offset - offset % self.block_size
+        block_end = min(-(-end // self.block_size) * self.block_size, self.size_bytes)
+
+        # Only the head and tail blocks can be partially covered by this write
+        if self.parent is not None:
+            for edge in {block_start, block_end - self.block_size}:
+                edge_end = min(edge + self.block_size, self.size_bytes)
+                partial = edge < offset or edge_end > end
+                if edge >= 0 and partial and not self.written.contains(edge, edge_end):
+                    block = bytearray(edge_end - edge)
+                    self.read_into(edge, memoryview(block))
+                    self._store(edge, memoryview(block))
+
+        self._store(offset, view)
+        self.written.add(block_start, block_end)
+
+    def _load_written(self) -> None:
+        """Rebuild the written map of a reopened layer from its file's data extents."""
+        fd = self._file.fileno()
+        position = 0
+        try:
+            while position < self.size_bytes:
+                start = os.lseek(fd, position, os.SEEK_DATA)
+                end = min(os.lseek(fd, start, os.SEEK_HOLE), self.size_bytes)
+                block_end = min(-(-end // self.block_size) * self.block_size, self.size_bytes)
+                self.written.add(start - start % self.block_size, block_end)
+                position = end
+        except OSError as e:
+            if e.errno != errno.ENXIO:  # ENXIO: no data past position
+                self.written.add(0, self.size_bytes)
+        except AttributeError:
+            # No SEEK_DATA on this platform: every byte may hold data
+            self.written.add(0, self.size_bytes)
+
+    def _store(self, offset: int, view: memoryview) -> None:
+        """Write bytes into this layer's backing file."""
+        if self._map is not None:
+            self._map[offset:offset + len(view)] = view
+
+    def close(self) -> None:
+        """Close this layer's mapping and file handle."""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a view; the mapping is freed with it
+                logger.debug(f"Layer {self.id} mapping still exported, deferring unmap")
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
 class MockCrucibleSled:
-    """Mock implementation of a Crucible storage sled."""
+    """
+    Mock implementation of a Crucible storage sled.
+
+    Each region is a stack of copy-on-write layers, so snapshots and clones
+    are instant and share unchanged blocks. Regions are metadata-only by
+    default and read as zeros; when ``mock_data_dir`` is configured each layer
+    is a sparse file accessed through mmap, so written bytes round-trip.
+    Used capacity follows allocated blocks, not provisioned size.
+    """
     
     def __init__(self, config: CrucibleStorageSled, crucible_config: CrucibleConfig):
         self.config = config
@@ -30,6 +205,9 @@ class MockCrucibleSled:
         self.is_online = True
         self.total_capacity_bytes = 256 * 1024**3  # 256GB per sled
         self.used_capacity_bytes = 0
+        self.extra_latency_ms = 0.0  # Added by simulate_sled_slowdown
+        self.block_size = crucible_config.default_block_size
+        self._recent_ops: Deque[float] = deque(maxlen=4096)  # Op timestamps for recent_iops
         self.performance_metrics = {
             "read_ops": 0,
             "write_ops": 0,
@@ -37,6 +215,19 @@ class MockCrucibleSled:
             "total_bytes_written": 0,
             "avg_latency_ms": crucible_config.mock_latency_ms
         }
+
+        # Data-bearing mode: one sparse file + mmap per layer
+        self.data_dir: Optional[Path] = None
+        if crucible_config.mock_data_dir:
+            self.data_dir = Path(crucible_config.mock_data_dir) / config.ip
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._region_layers: Dict[str, RegionLayer] = {}
+        self._layers: Dict[str, RegionLayer] = {}  # Every live layer, incl. orphaned snapshot bases
+
+    @property
+    def data_bearing(self) -> bool:
+        """True if regions store real bytes in sparse memory-mapped files."""
+        return self.data_dir is not None
     
     async def create_region(self, region_id: str, size_bytes: int) -> Dict[str, Any]:
         """Create a new storage region on this sled."""
@@ -45,25 +236,96 @@ class MockCrucibleSled:
         if not self.is_online:
             raise RuntimeError(f"Sled {self.config.ip} is offline")
         
-        if size_bytes > (self.total_capacity_bytes - self.used_capacity_bytes):
+        # Regions are thin; only the size against the whole sled matters
+        if size_bytes > self.total_capacity_bytes:
             raise RuntimeError(f"Insufficient capacity on sled {self.config.ip}")
         
-        region_info = {
-            "id": region_id,
-            "size_bytes": size_bytes,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "port": random.choice(self.config.ports),
-            "path": f"/crucible/regions/{region_id}",
-            "blocks": {},
-            "status": "ready"
-        }
+        layer = self._new_layer(region_id, size_bytes)
+        return self._register_region(region_id, layer)
+
+    async def snapshot_region(self, region_id: str, snapshot_region_id: str) -> Dict[str, Any]:
+        """
+        Freeze a region's current block map as a snapshot region.
         
-        self.regions[region_id] = region_info
-        self.used_capacity_bytes += size_bytes
+        The existing layer becomes the read-only snapshot and the region
+        continues on a new empty layer stacked on top of it, so no data moves.
+        """
+        await self._simulate_latency()
         
-        logger.debug(f"Created region {region_id} on sled {self.config.ip}")
-        return region_info.copy()
+        if not self.is_online:
+            raise RuntimeError(f"Sled {self.config.ip} is offline")
+
+        if region_id not in self.regions:
+            raise ValueError(f"Region {region_id} not found")
+
+        frozen = self._region_layers[region_id]
+        frozen.frozen = True
+
+        head = self._new_layer(f"{region_id}@{snapshot_region_id}", frozen.size_bytes, parent=frozen)
+        head.refcount += 1
+        self._region_layers[region_id] = head
+        self.regions[region_id]["layer_id"] = head.id
+
+        # The snapshot region takes over the region's reference to the frozen layer
+        info = self._register_region(snapshot_region_id, frozen, take_reference=False)
+        self.regions[snapshot_region_id]["frozen"] = True
+        return info
+
+    async def clone_region(self, source_region_id: str, region_id: str, size_bytes: int) -> Dict[str, Any]:
+        """
+        Create a region that shares every block of a frozen source region.
+
+        The clone starts as an empty layer on top of the source, so it is
+        instant and allocates nothing until it is written.
+        """
+        await self._simulate_latency()
+
+        if not self.is_online:
+            raise RuntimeError(f"Sled {self.config.ip} is offline")
+
+        if source_region_id not in self.regions:
+            raise ValueError(f"Region {source_region_id} not found")
+
+        source = self._region_layers[source_region_id]
+        if not source.frozen:
+            raise ValueError(f"Region {source_region_id} must be a snapshot to clone")
+
+        layer = self._new_layer(region_id, size_bytes, parent=source)
+        return self._register_region(region_id, layer)
     
+    async def reopen_region(self, region_id: str, size_bytes: int) -> Optional[Dict[str, Any]]:
+        """
+        Register a region whose file survived a restart, keeping its bytes.
+
+        Returns None if the sled holds no file for the region. A region that
+        was snapshotted or cloned is refused: its data is spread over layers
+        whose written maps were lost, so no single file holds its contents.
+        """
+        if self.data_dir is None:
+            raise RuntimeError(f"Sled {self.config.ip} does not store region data")
+
+        if not self.is_online:
+            raise RuntimeError(f"Sled {self.config.ip} is offline")
+
+        path = self.data_dir / f"{region_id}.img"
+        if not path.exists():
+            return None
+
+        if path.with_suffix(".parent").exists() or any(self.data_dir.glob(f"{region_id}@*.img")):
+            raise ValueError(f"Region {region_id} on sled {self.config.ip} is layered on snapshots")
+
+        layer = self._new_layer(region_id, size_bytes, reopen=True)
+        self._account(layer)
+        return self._register_region(region_id, layer)
+
+    def forget_region(self, region_id: str) -> None:
+        """Drop a region from this sled without deleting its file."""
+        del self.regions[region_id]
+        layer = self._region_layers.pop(region_id)
+        layer.close()
+        self.used_capacity_bytes -= layer.accounted_bytes
+        self._layers.pop(layer.id, None)
+
     async def delete_region(self, region_id: str) -> None:
         """Delete a storage region from this sled."""
         await self._simulate_latency()
@@ -71,9 +333,8 @@ class MockCrucibleSled:
         if region_id not in self.regions:
             raise ValueError(f"Region {region_id} not found on sled {self.config.ip}")
         
-        region = self.regions[region_id]
-        self.used_capacity_bytes -= region["size_bytes"]
         del self.regions[region_id]
+        self._release_layer(self._region_layers.pop(region_id))
         
         logger.debug(f"Deleted region {region_id} from sled {self.config.ip}")
     
@@ -82,46 +343,113 @@ class MockCrucibleSled:
         await self._simulate_latency()
         await self._check_failure_rate()
         
-        if not self.is_online:
-            raise RuntimeError(f"Sled {self.config.ip} is offline")
-        
-        if region_id not in self.regions:
-            raise ValueError(f"Region {region_id} not found")
+        layer = self._get_io_layer(region_id, offset, length)
         
-        region = self.regions[region_id]
-        
-        # Simulate reading from mock storage
-        data = b"\x00" * length  # Return zeros for simplicity
+        if self.data_bearing:
+            buffer = bytearray(length)
+            layer.read_into(offset, memoryview(buffer))
+            data = bytes(buffer)
+        else:
+            data = b"\x00" * length  # Metadata-only regions read as zeros
         
         # Update metrics
+        self._recent_ops.append(time.monotonic())
         self.performance_metrics["read_ops"] += 1
         self.performance_metrics["total_bytes_read"] += length
         
         logger.debug(f"Read {length} bytes from region {region_id} at offset {offset}")
         return data
     
-    async def write_blocks(self, region_id: str, offset: int, data: bytes) -> None:
-        """Write data blocks to a region."""
+    async def read_blocks_into(self, region_id: str, offset: int, buffer: Any) -> int:
+        """
+        Read data blocks directly into a caller-provided writable buffer.
+
+        Copies straight from the owning layers' mappings into ``buffer``
+        without building an intermediate bytes object. Returns bytes read.
+        """
         await self._simulate_latency()
         await self._check_failure_rate()
         
-        if not self.is_online:
-            raise RuntimeError(f"Sled {self.config.ip} is offline")
+        out = memoryview(buffer).cast("B")
+        length = len(out)
+        layer = self._get_io_layer(region_id, offset, length)
+        layer.read_into(offset, out)
         
-        if region_id not in self.regions:
-            raise ValueError(f"Region {region_id} not found")
+        self._recent_ops.append(time.monotonic())
+        self.performance_metrics["read_ops"] += 1
+        self.performance_metrics["total_bytes_read"] += length
+        return length
+
+    async def write_blocks(self, region_id: str, offset: int, data: Any) -> None:
+        """Write data blocks to a region (accepts any bytes-like object)."""
+        await self._simulate_latency()
+        await self._check_failure_rate()
         
-        region = self.regions[region_id]
+        view = memoryview(data).cast("B")
+        length = len(view)
+        layer = self._get_io_layer(region_id, offset, length)
         
-        # Store block in mock storage
-        block_key = f"{offset}:{len(data)}"
-        region["blocks"][block_key] = len(data)  # Just store size for mock
+        if self.used_capacity_bytes + length > self.total_capacity_bytes:
+            raise RuntimeError(f"Insufficient capacity on sled {self.config.ip}")
+        layer.write(offset, view)
+        self._account(layer)
         
         # Update metrics
+        self._recent_ops.append(time.monotonic())
         self.performance_metrics["write_ops"] += 1
-        self.performance_metrics["total_bytes_written"] += len(data)
+        self.performance_metrics["total_bytes_written"] += length
         
-        logger.debug(f"Wrote {len(data)} bytes to region {region_id} at offset {offset}")
+        logger.debug(f"Wrote {length} bytes to region {region_id} at offset {offset}")
+
+    def copy_region_to(self, region_id: str, target: "MockCrucibleSled", target_region_id: str,
+                       chunk_size: int = 1024**2) -> int:
+        """
+        Copy a region's visible contents into a region on another sled.
+
+        Used when a clone cannot share blocks (its sled does not hold the
+        source). Only ranges written somewhere in the source chain are copied.
+        Returns the number of bytes copied.
+        """
+        source = self._region_layers[region_id]
+        dest = target._region_layers[target_region_id]
+        limit = min(source.size_bytes, dest.size_bytes)
+
+        visible = IntervalSet()
+        layer: Optional[RegionLayer] = source
+        while layer is not None:
+            for start, end in layer.written:
+                visible.add(start, min(end, limit))
+            layer = layer.parent
+
+        buffer = bytearray(chunk_size)
+        copied = 0
+        for start, end in visible:
+            for position in range(start, end, chunk_size):
+                length = min(chunk_size, end - position)
+                chunk = memoryview(buffer)[:length]
+                source.read_into(position, chunk)
+                dest.write(position, chunk)
+                copied += length
+
+        target._account(dest)
+        return copied
+
+    def region_space(self, region_id: str) -> Dict[str, int]:
+        """
+        Report how much of a region's visible data it owns vs. shares.
+
+        Exclusive bytes live in the region's own layer; shared bytes are
+        resolved from frozen ancestor layers that other regions may also use.
+        """
+        layer = self._region_layers[region_id]
+        exclusive = 0
+        shared = 0
+        for start, end, owner in layer.resolve(0, layer.size_bytes):
+            if owner is layer:
+                exclusive += end - start
+            elif owner is not None:
+                shared += end - start
+        return {"exclusive_bytes": exclusive, "shared_bytes": shared}
     
     async def get_region_info(self, region_id: str) -> Dict[str, Any]:
         """Get information about a specific region."""
@@ -130,7 +458,10 @@ class MockCrucibleSled:
         if region_id not in self.regions:
             raise ValueError(f"Region {region_id} not found")
         
-        return self.regions[region_id].copy()
+        info = self.regions[region_id].copy()
+        info["allocated_bytes"] = self._region_layers[region_id].allocated_bytes()
+        info.update(self.region_space(region_id))
+        return info
     
     async def get_sled_status(self) -> Dict[str, Any]:
         """Get current status and metrics for this sled."""
@@ -138,26 +469,126 @@ class MockCrucibleSled:
             "ip": self.config.ip,
             "hostname": self.config.hostname,
             "is_online": self.is_online,
+            "data_bearing": self.data_bearing,
             "total_capacity_bytes": self.total_capacity_bytes,
             "used_capacity_bytes": self.used_capacity_bytes,
             "free_capacity_bytes": self.total_capacity_bytes - self.used_capacity_bytes,
+            "provisioned_bytes": sum(r["size_bytes"] for r in self.regions.values()),
             "region_count": len(self.regions),
+            "max_regions": self.config.max_regions,
+            "failure_domain": self.config.domain,
+            "recent_iops": self.recent_iops(),
+            "layer_count": len(self._layers),
             "performance_metrics": self.performance_metrics.copy()
         }
     
+    def recent_iops(self, window_sec: float = 10.0) -> float:
+        """Average operations per second over the last window_sec."""
+        cutoff = time.monotonic() - window_sec
+        while self._recent_ops and self._recent_ops[0] < cutoff:
+            self._recent_ops.popleft()
+        return len(self._recent_ops) / window_sec
+
     def set_online(self, online: bool) -> None:
         """Simulate sled going online/offline."""
         self.is_online = online
         status = "online" if online else "offline"
         logger.info(f"Sled {self.config.ip} is now {status}")
     
+    def close(self) -> None:
+        """Unmap and close all layer files (data is left on disk)."""
+        for layer in self._layers.values():
+            layer.close()
+
+    def _new_layer(self, layer_id: str, size_bytes: int,
+                   parent: Optional[RegionLayer] = None, reopen: bool = False) -> RegionLayer:
+        """Create and track a layer, backed by a sparse file in data-bearing mode."""
+        path = None
+        if self.data_dir is not None:
+            path = self.data_dir / f"{layer_id}.img"
+            if parent is not None:
+                # Record the lineage so the file is never reopened as a whole region
+                path.with_suffix(".parent").write_text(parent.id)
+        layer = RegionLayer(layer_id, size_bytes, self.block_size, path=path, parent=parent, reopen=reopen)
+        self._layers[layer_id] = layer
+        return layer
+
+    def _register_region(self, region_id: str, layer: RegionLayer,
+                         take_reference: bool = True) -> Dict[str, Any]:
+        """Expose a layer as a named region."""
+        if take_reference:
+            layer.refcount += 1
+        self._region_layers[region_id] = layer
+
+        region_info = {
+            "id": region_id,
+            "size_bytes": layer.size_bytes,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "port": self._least_used_port(),
+            "path": str(layer.path) if layer.path else f"/crucible/regions/{region_id}",
+            "block_size": self.block_size,
+            "layer_id": layer.id,
+            "parent_layer_id": layer.parent.id if layer.parent else None,
+            "frozen": layer.frozen,
+            "status": "ready"
+        }
+        self.regions[region_id] = region_info
+
+        logger.debug(f"Created region {region_id} on sled {self.config.ip}")
+        return region_info.copy()
+
+    def _least_used_port(self) -> int:
+        """Pick the downstairs port serving the fewest regions."""
+        in_use = {port: 0 for port in self.config.ports}
+        for region in self.regions.values():
+            if region["port"] in in_use:
+                in_use[region["port"]] += 1
+        return min(self.config.ports, key=lambda port: in_use[port])
+
+    def _release_layer(self, layer: Optional[RegionLayer]) -> None:
+        """Drop one reference; free the layer (and walk up) when unreferenced."""
+        while layer is not None:
+            layer.refcount -= 1
+            if layer.refcount > 0:
+                return
+            layer.close()
+            if layer.path is not None:
+                layer.path.unlink(missing_ok=True)
+                layer.path.with_suffix(".parent").unlink(missing_ok=True)
+            self.used_capacity_bytes -= layer.accounted_bytes
+            self._layers.pop(layer.id, None)
+            layer = layer.parent
+
+    def _account(self, layer: RegionLayer) -> None:
+        """Update used capacity after a layer's allocation changed."""
+        allocated = layer.allocated_bytes()
+        self.used_capacity_bytes += allocated - layer.accounted_bytes
+        layer.accounted_bytes = allocated
+
+    def _get_io_layer(self, region_id: str, offset: int, length: int) -> RegionLayer:
+        """Validate sled state and I/O bounds, returning the region's top layer."""
+        if not self.is_online:
+            raise RuntimeError(f"Sled {self.config.ip} is offline")
+
+        if region_id not in self.regions:
+            raise ValueError(f"Region {region_id} not found")
+
+        layer = self._region_layers[region_id]
+        if offset < 0 or offset + length > layer.size_bytes:
+            raise ValueError(
+                f"I/O range {offset}+{length} outside region {region_id} ({layer.size_bytes} bytes)"
+            )
+        return layer
+
     async def _simulate_latency(self) -> None:
         """Simulate network/storage latency."""
+        latency = self.extra_latency_ms
         if self.crucible_config.mock_latency_ms > 0:
-            latency = random.uniform(
+            latency += random.uniform(
                 self.crucible_config.mock_latency_ms * 0.5,
                 self.crucible_config.mock_latency_ms * 1.5
             )
+        if latency > 0:
             await asyncio.sleep(latency / 1000.0)
     
     async def _check_failure_rate(self) -> None:
@@ -167,8 +598,47 @@ class MockCrucibleSled:
             raise RuntimeError(f"Simulated failure on sled {self.config.ip}")
 
 
+class LatencyTracker:
+    """Rolling window of I/O latencies observed for one sled."""
+
+    def __init__(self, window: int = 256):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.ewma: Optional[float] = None
+        self.errors = 0
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        """Record one request's latency (failures still count as slow)."""
+        self.samples.append(seconds)
+        self.ewma = seconds if self.ewma is None else 0.8 * self.ewma + 0.2 * seconds
+        if failed:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile latency, or None without samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency figures in milliseconds for status output."""
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "samples": len(self.samples),
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+            "errors": self.errors
+        }
+
+
 class MockCrucibleManager:
     """Mock implementation of Crucible storage management."""
+
+    # Volumes and snapshots do not survive a restart; reopen_volume brings
+    # back what the region files still hold
+    persistent = False
     
     def __init__(self, config: CrucibleConfig):
         self.config = config
@@ -180,6 +650,24 @@ class MockCrucibleManager:
         for sled_config in config.storage_sleds:
             self.sleds[sled_config.ip] = MockCrucibleSled(sled_config, config)
         
+        # Replica health: observed latency per sled, ranges each replica has
+        # missed (awaiting repair) and ranges with writes still in flight
+        self.latency: Dict[str, LatencyTracker] = {ip: LatencyTracker() for ip in self.sleds}
+        self._stale: Dict[Tuple[str, str], IntervalSet] = {}
+        self._inflight: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        self._inflight_waiters: List[asyncio.Future] = []
+        self._moving: Dict[str, asyncio.Event] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._repairing: Set[str] = set()
+        self.placement = PlacementEngine()
+        self.io_stats = {
+            "hedged_reads": 0,
+            "quorum_writes": 0,
+            "degraded_writes": 0,
+            "repairs": 0,
+            "repaired_bytes": 0
+        }
+
         logger.info(f"Initialized MockCrucibleManager with {len(self.sleds)} sleds")
     
     async def discover_sleds(self) -> Dict[str, Dict[str, Any]]:
@@ -204,12 +692,9 @@ class MockCrucibleManager:
         
         logger.info(f"Creating volume {volume_id} ({size_bytes} bytes, {replica_count} replicas)")
         
-        # Select online sleds for replicas
-        online_sleds = [sled for sled in self.sleds.values() if sled.is_online]
-        if len(online_sleds) < replica_count:
-            raise RuntimeError(f"Insufficient online sleds ({len(online_sleds)}) for {replica_count} replicas")
-        
-        selected_sleds = random.sample(online_sleds, replica_count)
+        # Score sleds and pick one per failure domain where possible
+        decisions = self.placement.place(self._sled_loads(), size_bytes, replica_count)
+        selected_sleds = [self.sleds[decision.sled_ip] for decision in decisions]
         
         # Create regions on selected sleds
         replicas = []
@@ -227,6 +712,7 @@ class MockCrucibleManager:
                 "id": volume_id,
                 "size_bytes": size_bytes,
                 "replicas": replicas,
+                "placement": [decision.explain() for decision in decisions],
                 "created_at": datetime.now(timezone.utc).isoformat(),
                 "status": "ready",
                 "encryption_enabled": self.config.enable_encryption
@@ -246,10 +732,68 @@ class MockCrucibleManager:
                     pass
             raise e
     
+    async def reopen_volume(self, volume_id: str, size_bytes: int,
+                            replica_count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Bring a volume back after a restart.
+
+        Metadata-only sleds never held the volume's bytes, so it is created
+        again. Data-bearing sleds reopen the replica files left on disk; the
+        volume is refused if replicas are missing, disagree or sit on
+        snapshot layers, because its contents can no longer be trusted.
+        """
+        if not self.config.mock_data_dir:
+            return await self.create_volume(volume_id, size_bytes, replica_count)
+
+        if replica_count is None:
+            replica_count = self.config.replication_factor
+
+        replicas = []
+        try:
+            for sled in self.sleds.values():
+                region_id = f"{volume_id}-replica-{sled.config.ip.split('.')[-1]}"
+                region_info = await sled.reopen_region(region_id, size_bytes)
+                if region_info is not None:
+                    replicas.append({
+                        "sled_ip": sled.config.ip,
+                        "region_id": region_id,
+                        "port": region_info["port"]
+                    })
+
+            if len(replicas) < replica_count:
+                raise RuntimeError(
+                    f"Only {len(replicas)} of {replica_count} replicas of volume {volume_id} survived"
+                )
+
+            # A replica that missed writes before the restart cannot be told apart
+            paths = [self.sleds[r["sled_ip"]].regions[r["region_id"]]["path"] for r in replicas]
+            for path in paths[1:]:
+                if not await asyncio.to_thread(filecmp.cmp, paths[0], path, False):
+                    raise RuntimeError(f"Replicas of volume {volume_id} disagree")
+        except Exception:
+            for replica in replicas:
+                self.sleds[replica["sled_ip"]].forget_region(replica["region_id"])
+            raise
+
+        volume_info = {
+            "id": volume_id,
+            "size_bytes": size_bytes,
+            "replicas": replicas,
+            "placement": [],
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "status": "ready",
+            "encryption_enabled": self.config.enable_encryption
+        }
+
+        self.volumes[volume_id] = volume_info
+        logger.info(f"Reopened volume {volume_id} with {len(replicas)} replicas")
+        return volume_info.copy()
+
     async def delete_volume(self, volume_id: str) -> None:
         """Delete a volume and all its replicas."""
         logger.info(f"Deleting volume {volume_id}")
         
+        await self._wait_for_move(volume_id)
         if volume_id not in self.volumes:
             raise ValueError(f"Volume {volume_id} not found")
         
@@ -264,65 +808,222 @@ class MockCrucibleManager:
                 logger.warning(f"Failed to delete replica {replica['region_id']}: {e}")
         
         del self.volumes[volume_id]
+        for key in [k for k in self._stale if k[0] == volume_id]:
+            del self._stale[key]
         logger.info(f"Deleted volume {volume_id}")
     
     async def read_volume(self, volume_id: str, offset: int, length: int) -> bytes:
-        """Read data from a volume (uses first available replica)."""
+        """
+        Read data from a volume, hedging across replicas.
+
+        Replicas are tried fastest-first by observed latency. If the current
+        one has not answered within its latency budget (the configured
+        percentile of its recent reads) the read is also sent to the next
+        replica, and the first successful answer wins. Replicas that missed
+        or are still applying a write to the range are skipped; if every
+        replica is still applying one, the read waits for the first to ack.
+        """
         if volume_id not in self.volumes:
             raise ValueError(f"Volume {volume_id} not found")
         
-        volume = self.volumes[volume_id]
+        candidates = self._read_candidates(volume_id, offset, length)
+        while not candidates and self._has_inflight(volume_id, offset, offset + length):
+            await self._inflight_settled()
+            if volume_id not in self.volumes:
+                raise ValueError(f"Volume {volume_id} not found")
+            candidates = self._read_candidates(volume_id, offset, length)
+        if not candidates:
+            raise RuntimeError(f"Failed to read from volume {volume_id}: no current replica available")
         
-        # Try replicas in order until one succeeds
-        last_error = None
-        for replica in volume["replicas"]:
-            try:
-                sled = self.sleds[replica["sled_ip"]]
-                data = await sled.read_blocks(replica["region_id"], offset, length)
-                return data
-            except Exception as e:
-                last_error = e
-                continue
+        pending: Set[asyncio.Task] = set()
+        next_index = 0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal next_index
+            replica = candidates[next_index]
+            next_index += 1
+            pending.add(asyncio.ensure_future(
+                self._timed_read(replica["sled_ip"], replica["region_id"], offset, length)
+            ))
+
+        launch()
+        try:
+            while pending:
+                budget = self._hedge_budget(candidates[next_index - 1]["sled_ip"])
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=budget if next_index < len(candidates) else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slow replica: hedge to the next one, keep waiting on both
+                    self.io_stats["hedged_reads"] += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                if next_index < len(candidates):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
         
         raise RuntimeError(f"Failed to read from volume {volume_id}: {last_error}")
     
     async def write_volume(self, volume_id: str, offset: int, data: bytes) -> None:
-        """Write data to a volume (writes to all replicas)."""
+        """
+        Write data to a volume, returning once a quorum of replicas ack.
+
+        Writes to the remaining replicas continue in the background; any
+        replica that fails has the range marked stale and repaired from a
+        current replica once its sled is reachable.
+        """
+        await self._wait_for_move(volume_id)
         if volume_id not in self.volumes:
             raise ValueError(f"Volume {volume_id} not found")
         
         volume = self.volumes[volume_id]
+        replicas = volume["replicas"]
+        quorum = self.config.effective_write_quorum(len(replicas))
+        end = offset + len(data)
         
-        # Write to all replicas
-        write_tasks = []
-        for replica in volume["replicas"]:
-            sled = self.sleds[replica["sled_ip"]]
-            task = sled.write_blocks(replica["region_id"], offset, data)
-            write_tasks.append(task)
+        # Stragglers may still be writing after we return, when the caller
+        # is free to reuse its buffer; give them an immutable copy
+        if quorum < len(replicas) and not isinstance(data, bytes):
+            data = bytes(data)
+
+        outcome = {"acked": 0, "failed": [], "remaining": len(replicas)}
+        tasks = {}
+        for replica in replicas:
+            key = (volume_id, replica["sled_ip"])
+            self._inflight.setdefault(key, []).append((offset, end))
+            task = asyncio.ensure_future(
+                self._timed_write(replica["sled_ip"], replica["region_id"], offset, data)
+            )
+            task.add_done_callback(
+                lambda t, key=key: self._finish_replica_write(key, offset, end, t, outcome)
+            )
+            tasks[task] = replica
+
+        acks = 0
+        failures = 0
+        pending = set(tasks)
+        while pending and acks < quorum and failures <= len(replicas) - quorum:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    acks += 1
+                else:
+                    failures += 1
+
+        # Stragglers finish (or fail into the repair queue) in the background.
+        # Finished replicas are tracked too: asyncio.wait can report a task
+        # done before its settle callback has run.
+        for task in tasks:
+            self._track_background(task)
+
+        if acks < quorum:
+            raise RuntimeError(
+                f"Write failed on {failures}/{len(replicas)} replicas (quorum {quorum})"
+            )
         
-        # Wait for all writes to complete
-        results = await asyncio.gather(*write_tasks, return_exceptions=True)
+        self.io_stats["quorum_writes"] += 1
+        if failures or pending:
+            self.io_stats["degraded_writes"] += 1
+
+    async def repair_volume(self, volume_id: str) -> int:
+        """
+        Copy stale ranges onto lagging replicas from a current replica.
         
-        # Check for any failures
-        failures = [r for r in results if isinstance(r, Exception)]
-        if failures:
-            raise RuntimeError(f"Write failed on {len(failures)}/{len(results)} replicas")
+        Replicas on offline sleds are left for a later pass. Returns the
+        number of bytes repaired.
+        """
+        if volume_id not in self.volumes:
+            return 0
+
+        repaired = 0
+        for replica in self.volumes[volume_id]["replicas"]:
+            key = (volume_id, replica["sled_ip"])
+            stale = self._stale.get(key)
+            target = self.sleds[replica["sled_ip"]]
+            if not stale or not target.is_online:
+                continue
+
+            for start, end in stale.to_list():
+                sources = [
+                    r for r in self._read_candidates(volume_id, start, end - start)
+                    if r["sled_ip"] != replica["sled_ip"]
+                ]
+                if not sources:
+                    continue
+
+                source = self.sleds[sources[0]["sled_ip"]]
+                try:
+                    data = await source.read_blocks(sources[0]["region_id"], start, end - start)
+                    await target.write_blocks(replica["region_id"], start, data)
+                except Exception as e:
+                    logger.warning(f"Repair of {volume_id} on {replica['sled_ip']} failed: {e}")
+                    break
+
+                stale.remove(start, end)
+                repaired += end - start
+
+            # A concurrent repair pass may already have dropped the entry
+            if not stale and self._stale.get(key) is stale:
+                del self._stale[key]
+
+        if repaired:
+            self.io_stats["repairs"] += 1
+            self.io_stats["repaired_bytes"] += repaired
+            logger.info(f"Repaired {repaired} bytes of volume {volume_id}")
+        return repaired
+
+    async def wait_for_background_io(self) -> None:
+        """Wait for straggling replica writes and scheduled repairs to finish."""
+        while self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
     
     async def create_snapshot(self, snapshot_id: str, volume_id: str) -> Dict[str, Any]:
         """Create a point-in-time snapshot of a volume."""
         logger.info(f"Creating snapshot {snapshot_id} of volume {volume_id}")
         
+        await self._wait_for_move(volume_id)
         if volume_id not in self.volumes:
             raise ValueError(f"Volume {volume_id} not found")
         
         volume = self.volumes[volume_id]
         
-        # In a real implementation, this would create copy-on-write snapshots
-        # For the mock, we just record the snapshot metadata
+        # Let acknowledged writes reach every replica and bring lagging
+        # replicas up to date, so the frozen layers all hold the same data
+        while self._has_inflight(volume_id):
+            await self._inflight_settled()
+        await self.repair_volume(volume_id)
+
+        # Freeze each current replica's block map; the volume keeps writing to a
+        # new layer on top, so the snapshot costs no copying and no space.
+        # Replicas still stale (e.g. on an offline sled) are left out.
+        replicas = []
+        for replica in volume["replicas"]:
+            sled = self.sleds[replica["sled_ip"]]
+            if not sled.is_online or (volume_id, replica["sled_ip"]) in self._stale:
+                continue
+            region_id = f"{snapshot_id}-snap-{sled.config.ip.split('.')[-1]}"
+            await sled.snapshot_region(replica["region_id"], region_id)
+            replicas.append({"sled_ip": sled.config.ip, "region_id": region_id})
+
+        if not replicas:
+            raise RuntimeError(f"No current online replicas available to snapshot volume {volume_id}")
+
         snapshot_info = {
             "id": snapshot_id,
             "volume_id": volume_id,
             "size_bytes": volume["size_bytes"],
+            "replicas": replicas,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "status": "ready"
         }
@@ -331,16 +1032,116 @@ class MockCrucibleManager:
         logger.info(f"Created snapshot {snapshot_id}")
         return snapshot_info.copy()
     
+    async def create_volume_from_snapshot(self, volume_id: str, snapshot_id: str, size_bytes: int,
+                                          replica_count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Create a volume whose contents start as a snapshot.
+
+        Replicas are cloned on the sleds holding the snapshot, sharing its
+        blocks copy-on-write. Only when too few of those sleds are online are
+        the remaining replicas placed elsewhere and filled by copying.
+        """
+        if snapshot_id not in self.snapshots:
+            raise ValueError(f"Snapshot {snapshot_id} not found")
+
+        if replica_count is None:
+            replica_count = self.config.replication_factor
+
+        snapshot = self.snapshots[snapshot_id]
+        logger.info(f"Cloning volume {volume_id} from snapshot {snapshot_id}")
+
+        sources = [r for r in snapshot["replicas"] if self.sleds[r["sled_ip"]].is_online]
+        if not sources:
+            raise RuntimeError(f"No online replicas of snapshot {snapshot_id}")
+
+        clone_sources = sources[:replica_count]
+        used_ips = {r["sled_ip"] for r in clone_sources}
+        extra: List[PlacementDecision] = []
+        if len(clone_sources) < replica_count:
+            extra = self.placement.place(
+                self._sled_loads(), size_bytes, replica_count - len(clone_sources),
+                exclude=used_ips,
+                avoid_domains={self.sleds[ip].config.domain for ip in used_ips}
+            )
+
+        replicas = []
+        try:
+            for source in clone_sources:
+                sled = self.sleds[source["sled_ip"]]
+                region_id = f"{volume_id}-replica-{sled.config.ip.split('.')[-1]}"
+                region_info = await sled.clone_region(source["region_id"], region_id, size_bytes)
+                replicas.append({"sled_ip": sled.config.ip, "region_id": region_id, "port": region_info["port"]})
+
+            # Fallback: full copy from a snapshot replica onto other sleds
+            origin = self.sleds[sources[0]["sled_ip"]]
+            for decision in extra:
+                sled = self.sleds[decision.sled_ip]
+                region_id = f"{volume_id}-replica-{sled.config.ip.split('.')[-1]}"
+                region_info = await sled.create_region(region_id, size_bytes)
+                replicas.append({"sled_ip": sled.config.ip, "region_id": region_id, "port": region_info["port"]})
+                await asyncio.to_thread(origin.copy_region_to, sources[0]["region_id"], sled, region_id)
+        except Exception as e:
+            for replica in replicas:
+                try:
+                    await self.sleds[replica["sled_ip"]].delete_region(replica["region_id"])
+                except Exception:
+                    pass
+            raise e
+
+        volume_info = {
+            "id": volume_id,
+            "size_bytes": size_bytes,
+            "replicas": replicas,
+            "source_snapshot_id": snapshot_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "status": "ready",
+            "encryption_enabled": self.config.enable_encryption
+        }
+
+        self.volumes[volume_id] = volume_info
+        logger.info(f"Created volume {volume_id} from snapshot {snapshot_id} with {len(replicas)} replicas")
+        return volume_info.copy()
+
     async def delete_snapshot(self, snapshot_id: str) -> None:
-        """Delete a snapshot."""
+        """Delete a snapshot (blocks still used by clones stay allocated)."""
         logger.info(f"Deleting snapshot {snapshot_id}")
         
         if snapshot_id not in self.snapshots:
             raise ValueError(f"Snapshot {snapshot_id} not found")
         
+        for replica in self.snapshots[snapshot_id].get("replicas", []):
+            try:
+                await self.sleds[replica["sled_ip"]].delete_region(replica["region_id"])
+            except Exception as e:
+                logger.warning(f"Failed to delete snapshot region {replica['region_id']}: {e}")
+
         del self.snapshots[snapshot_id]
         logger.info(f"Deleted snapshot {snapshot_id}")
     
+    async def get_volume_space_usage(self, volume_id: str) -> Dict[str, Any]:
+        """
+        Report shared vs. exclusive bytes for each replica of a volume.
+
+        Exclusive bytes were written by the volume itself; shared bytes are
+        still served from snapshot layers.
+        """
+        if volume_id not in self.volumes:
+            raise ValueError(f"Volume {volume_id} not found")
+
+        volume = self.volumes[volume_id]
+        replicas = {}
+        for replica in volume["replicas"]:
+            sled = self.sleds[replica["sled_ip"]]
+            replicas[replica["sled_ip"]] = sled.region_space(replica["region_id"])
+
+        return {
+            "volume_id": volume_id,
+            "size_bytes": volume["size_bytes"],
+            "exclusive_bytes": max((r["exclusive_bytes"] for r in replicas.values()), default=0),
+            "shared_bytes": max((r["shared_bytes"] for r in replicas.values()), default=0),
+            "replicas": replicas
+        }
+
     async def get_volume_info(self, volume_id: str) -> Dict[str, Any]:
         """Get detailed information about a volume."""
         if volume_id not in self.volumes:
@@ -356,6 +1157,136 @@ class MockCrucibleManager:
         """List all snapshots."""
         return [info.copy() for info in self.snapshots.values()]
     
+    def close(self) -> None:
+        """Cancel background I/O and release region mappings on all sleds."""
+        for task in list(self._background):
+            task.cancel()
+        for sled in self.sleds.values():
+            sled.close()
+
+    def plan_rebalance(self, threshold: Optional[float] = None, max_moves: int = 10) -> List[RegionMove]:
+        """
+        Plan replica moves that even out sled pressure.
+
+        Only plain volume replicas are candidates. Snapshot regions, replicas
+        sharing blocks with a snapshot (moving them would materialize the
+        shared data) and replicas with pending writes or repairs stay put.
+        """
+        regions = []
+        for volume_id, volume in self.volumes.items():
+            busy = any(key[0] == volume_id for key in list(self._stale) + list(self._inflight))
+            for replica in volume["replicas"]:
+                sled = self.sleds[replica["sled_ip"]]
+                layer = sled._region_layers.get(replica["region_id"])
+                if busy or layer is None or layer.parent is not None:
+                    continue
+                regions.append(PlacedRegion(
+                    volume_id=volume_id,
+                    region_id=replica["region_id"],
+                    sled_ip=replica["sled_ip"],
+                    size_bytes=volume["size_bytes"],
+                    allocated_bytes=layer.allocated_bytes()
+                ))
+
+        return self.placement.plan_rebalance(self._sled_loads(), regions, threshold, max_moves)
+
+    async def rebalance(self, threshold: Optional[float] = None, max_moves: int = 10) -> List[RegionMove]:
+        """
+        Plan and execute replica moves.
+
+        Each move is re-checked just before it runs, since earlier moves and
+        concurrent I/O change the cluster after planning; moves that no
+        longer hold are skipped. The region's visible data is copied to the
+        target sled in a worker thread while writes to the volume wait, then
+        the volume's replica entry is swapped and the source region deleted.
+
+        Returns:
+            The moves that were executed
+        """
+        executed = []
+        for move in self.plan_rebalance(threshold, max_moves):
+            problem = self._move_problem(move)
+            if problem:
+                logger.warning(f"Skipping move of {move.region_id} to {move.target_ip}: {problem}")
+                continue
+
+            source = self.sleds[move.source_ip]
+            target = self.sleds[move.target_ip]
+            volume = self.volumes[move.volume_id]
+            region_id = f"{move.volume_id}-replica-{move.target_ip.split('.')[-1]}"
+
+            self._moving[move.volume_id] = asyncio.Event()
+            try:
+                region_info = await target.create_region(region_id, volume["size_bytes"])
+                try:
+                    await asyncio.to_thread(source.copy_region_to, move.region_id, target, region_id)
+                except Exception:
+                    await target.delete_region(region_id)
+                    raise
+
+                volume["replicas"] = [
+                    {"sled_ip": move.target_ip, "region_id": region_id, "port": region_info["port"]}
+                    if r["region_id"] == move.region_id and r["sled_ip"] == move.source_ip else r
+                    for r in volume["replicas"]
+                ]
+            finally:
+                self._moving.pop(move.volume_id).set()
+
+            await source.delete_region(move.region_id)
+            executed.append(move)
+            logger.info(f"Moved {move.region_id} from {move.source_ip} to {move.target_ip}: {move.reason}")
+
+        return executed
+
+    def _move_problem(self, move: RegionMove) -> Optional[str]:
+        """Why a planned move can no longer run safely, or None if it can."""
+        volume = self.volumes.get(move.volume_id)
+        if volume is None:
+            return "volume deleted"
+
+        replica_ips = [r["sled_ip"] for r in volume["replicas"]]
+        if not any(r["region_id"] == move.region_id and r["sled_ip"] == move.source_ip
+                   for r in volume["replicas"]):
+            return "replica no longer on source sled"
+        if move.target_ip in replica_ips:
+            return "target already holds a replica of the volume"
+        if self._has_inflight(move.volume_id) or any(key[0] == move.volume_id for key in self._stale):
+            return "volume has pending writes or repairs"
+
+        source = self.sleds[move.source_ip]
+        target = self.sleds[move.target_ip]
+        if not source.is_online or not target.is_online:
+            return "sled offline"
+        layer = source._region_layers.get(move.region_id)
+        if layer is None or layer.parent is not None:
+            return "region now shares blocks with a snapshot"
+        if target.total_capacity_bytes - target.used_capacity_bytes < layer.allocated_bytes():
+            return "target lacks capacity"
+        return None
+
+    async def _wait_for_move(self, volume_id: str) -> None:
+        """Wait while a rebalance is copying one of the volume's replicas."""
+        while volume_id in self._moving:
+            await self._moving[volume_id].wait()
+
+    def _sled_loads(self) -> List[SledLoad]:
+        """Snapshot every sled's load for the placement engine."""
+        loads = []
+        for ip, sled in self.sleds.items():
+            p95 = self.latency[ip].percentile(95)
+            loads.append(SledLoad(
+                ip=ip,
+                failure_domain=sled.config.domain,
+                online=sled.is_online,
+                total_bytes=sled.total_capacity_bytes,
+                used_bytes=sled.used_capacity_bytes,
+                region_count=len(sled.regions),
+                max_regions=sled.config.max_regions,
+                recent_iops=sled.recent_iops(),
+                latency_ms=p95 * 1000 if p95 is not None else None
+            ))
+        return loads
+
     async def simulate_sled_failure(self, sled_ip: str) -> None:
         """Simulate a storage sled going offline."""
         if sled_ip in self.sleds:
@@ -369,9 +1300,148 @@ class MockCrucibleManager:
         if sled_ip in self.sleds:
             self.sleds[sled_ip].set_online(True)
             logger.info(f"Simulated recovery of sled {sled_ip}")
+            for volume_id, ip in list(self._stale):
+                if ip == sled_ip:
+                    self._schedule_repair(volume_id)
         else:
             raise ValueError(f"Sled {sled_ip} not found")
     
+    async def simulate_sled_slowdown(self, sled_ip: str, latency_ms: float) -> None:
+        """Simulate a sled that answers, but slowly (0 restores normal latency)."""
+        if sled_ip not in self.sleds:
+            raise ValueError(f"Sled {sled_ip} not found")
+        self.sleds[sled_ip].extra_latency_ms = latency_ms
+        logger.warning(f"Simulated {latency_ms}ms slowdown of sled {sled_ip}")
+
+    def _read_candidates(self, volume_id: str, offset: int, length: int) -> List[Dict[str, Any]]:
+        """Replicas current for a range, online and fastest first."""
+        end = offset + length
+        candidates = []
+        for replica in self.volumes[volume_id]["replicas"]:
+            key = (volume_id, replica["sled_ip"])
+            stale = self._stale.get(key)
+            if stale is not None and stale.overlaps(offset, end):
+                continue
+            if self._has_inflight(volume_id, offset, end, replica["sled_ip"]):
+                continue
+            candidates.append(replica)
+
+        default = self.config.mock_latency_ms / 1000.0
+
+        def rank(replica: Dict[str, Any]) -> Tuple[bool, float]:
+            tracker = self.latency[replica["sled_ip"]]
+            ewma = tracker.ewma if tracker.ewma is not None else default
+            return (not self.sleds[replica["sled_ip"]].is_online, ewma)
+
+        return sorted(candidates, key=rank)
+
+    def _hedge_budget(self, sled_ip: str) -> float:
+        """Seconds to wait on a sled before hedging a read elsewhere."""
+        observed = self.latency[sled_ip].percentile(self.config.read_hedge_percentile)
+        if observed is None:
+            observed = self.config.mock_latency_ms * 1.5 / 1000.0
+        return max(observed, 0.001)
+
+    async def _timed_read(self, sled_ip: str, region_id: str, offset: int, length: int) -> bytes:
+        """Read from one replica, recording its latency (also when cancelled)."""
+        start = time.perf_counter()
+        try:
+            data = await self.sleds[sled_ip].read_blocks(region_id, offset, length)
+        except BaseException as e:
+            self.latency[sled_ip].record(time.perf_counter() - start, failed=not isinstance(e, asyncio.CancelledError))
+            raise
+        self.latency[sled_ip].record(time.perf_counter() - start)
+        return data
+
+    async def _timed_write(self, sled_ip: str, region_id: str, offset: int, data: bytes) -> None:
+        """Write to one replica, recording its latency."""
+        start = time.perf_counter()
+        try:
+            await self.sleds[sled_ip].write_blocks(region_id, offset, data)
+        except Exception:
+            self.latency[sled_ip].record(time.perf_counter() - start, failed=True)
+            raise
+        self.latency[sled_ip].record(time.perf_counter() - start)
+
+    def _finish_replica_write(self, key: Tuple[str, str], start: int, end: int,
+                              task: asyncio.Task, outcome: Dict[str, Any]) -> None:
+        """
+        Settle one replica's part of a write.
+
+        Acked replicas are readable again immediately. Failed ones stay
+        in-flight until every replica has answered; then, if any replica
+        took the write, the failed ones are marked stale and queued for repair.
+        """
+        outcome["remaining"] -= 1
+        if task.cancelled() or task.exception() is not None:
+            outcome["failed"].append(key)
+        else:
+            outcome["acked"] += 1
+            self._clear_inflight(key, start, end)
+
+        if outcome["remaining"]:
+            return
+
+        for failed_key in outcome["failed"]:
+            self._clear_inflight(failed_key, start, end)
+            volume_id = failed_key[0]
+            if not outcome["acked"] or volume_id not in self.volumes:
+                continue
+            self._stale.setdefault(failed_key, IntervalSet()).add(start, end)
+            logger.warning(
+                f"Replica of {volume_id} on {failed_key[1]} missed write {start}+{end - start}, queued for repair"
+            )
+            self._schedule_repair(volume_id)
+
+    def _has_inflight(self, volume_id: str, offset: int = 0, end: Optional[int] = None,
+                      sled_ip: Optional[str] = None) -> bool:
+        """Whether a write overlapping [offset, end) is still being applied to a replica."""
+        for (vid, ip), ranges in self._inflight.items():
+            if vid != volume_id or (sled_ip is not None and ip != sled_ip):
+                continue
+            if any(end is None or (start < end and offset < stop) for start, stop in ranges):
+                return True
+        return False
+
+    async def _inflight_settled(self) -> None:
+        """Wait until any replica finishes applying an in-flight write."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._inflight_waiters.append(waiter)
+        await waiter
+
+    def _clear_inflight(self, key: Tuple[str, str], start: int, end: int) -> None:
+        """Remove one in-flight write range for a replica and wake waiting readers."""
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            return
+        inflight.remove((start, end))
+        if not inflight:
+            del self._inflight[key]
+
+        waiters, self._inflight_waiters = self._inflight_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _schedule_repair(self, volume_id: str) -> None:
+        """Start a background repair pass for a volume unless one is running."""
+        if volume_id in self._repairing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (e.g. during close); repair on the next recovery
+
+        self._repairing.add(volume_id)
+        task = loop.create_task(self.repair_volume(volume_id))
+        task.add_done_callback(lambda _: self._repairing.discard(volume_id))
+        self._track_background(task)
+
+    def _track_background(self, task: asyncio.Task) -> None:
+        """Keep a reference to a background task until it finishes."""
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
     async def get_cluster_status(self) -> Dict[str, Any]:
         """Get overall cluster status and metrics."""
         sled_status = await self.discover_sleds()
@@ -390,5 +1460,10 @@ class MockCrucibleManager:
             "total_volumes": len(self.volumes),
             "total_snapshots": len(self.snapshots),
             "replication_factor": self.config.replication_factor,
+            "write_quorum": self.config.effective_write_quorum(self.config.replication_factor),
+            "stale_replicas": len(self._stale),
+            "placement_imbalance": round(self.placement.imbalance(self._sled_loads()), 3),
+            "io_stats": self.io_stats.copy(),
+            "sled_latency": {ip: tracker.summary() for ip, tracker in self.latency.items()},
             "sleds": sled_status
         }
\ No newline at end of file
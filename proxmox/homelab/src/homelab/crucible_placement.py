@@ -0,0 +1,298 @@
+"""
+Replica placement and rebalancing for Crucible volumes.
+
+Scores storage sleds by free capacity, region count, recent IOPS and
+latency, spreads replicas across failure domains, and plans region moves
+when sleds drift out of balance. Pure logic: callers pass in a snapshot of
+sled load and apply the resulting decisions themselves.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PlacementError(RuntimeError):
+    """Raised when a volume's replicas cannot be placed."""
+
+
+@dataclass
+class PlacementWeights:
+    """Relative importance of each scoring factor."""
+    capacity: float = 0.4
+    regions: float = 0.3
+    iops: float = 0.15
+    latency: float = 0.15
+
+
+@dataclass
+class SledLoad:
+    """Point-in-time load of one sled, as seen by the placement engine."""
+    ip: str
+    failure_domain: str
+    online: bool
+    total_bytes: int
+    used_bytes: int
+    region_count: int
+    max_regions: int
+    recent_iops: float = 0.0
+    latency_ms: Optional[float] = None
+
+    @property
+    def free_bytes(self) -> int:
+        return self.total_bytes - self.used_bytes
+
+    @property
+    def pressure(self) -> float:
+        """Fullness of the tighter resource: capacity or region slots."""
+        capacity = self.used_bytes / self.total_bytes if self.total_bytes else 1.0
+        regions = self.region_count / self.max_regions if self.max_regions else 0.0
+        return max(capacity, regions)
+
+
+@dataclass
+class PlacementDecision:
+    """Where one replica goes and why."""
+    sled_ip: str
+    failure_domain: str
+    score: float
+    components: Dict[str, float] = field(default_factory=dict)
+    reasons: List[str] = field(default_factory=list)
+
+    def explain(self) -> str:
+        """One-line human-readable explanation."""
+        return f"{self.sled_ip} ({self.failure_domain}) score {self.score:.3f}: " + "; ".join(self.reasons)
+
+
+@dataclass
+class PlacedRegion:
+    """A volume replica region currently on a sled."""
+    volume_id: str
+    region_id: str
+    sled_ip: str
+    size_bytes: int
+    allocated_bytes: int
+
+
+@dataclass
+class RegionMove:
+    """A planned move of one replica region between sleds."""
+    volume_id: str
+    region_id: str
+    source_ip: str
+    target_ip: str
+    allocated_bytes: int
+    reason: str
+
+
+class PlacementEngine:
+    """Capacity-, load- and failure-domain-aware replica placement."""
+
+    def __init__(self, weights: Optional[PlacementWeights] = None, rebalance_threshold: float = 0.25):
+        self.weights = weights or PlacementWeights()
+        self.rebalance_threshold = rebalance_threshold
+
+    def place(self, loads: List[SledLoad], size_bytes: int, replica_count: int,
+              exclude: Iterable[str] = (), avoid_domains: Iterable[str] = ()) -> List[PlacementDecision]:
+        """
+        Choose sleds for replica_count replicas of size_bytes.
+
+        Picks the best-scoring sled in each unused failure domain first and
+        only doubles up on a domain when there are not enough domains.
+        Sleds at their region limit are penalised rather than excluded.
+
+        Args:
+            loads: Current load of every sled
+            size_bytes: Provisioned size of each replica
+            replica_count: Number of replicas to place
+            exclude: Sled IPs that must not be used
+            avoid_domains: Failure domains already holding replicas of the volume
+
+        Returns:
+            One decision per replica, best first
+
+        Raises:
+            PlacementError: If fewer than replica_count sleds can take the replica
+        """
+        excluded = set(exclude)
+        candidates = [
+            load for load in loads
+            if load.online and load.ip not in excluded and load.total_bytes >= size_bytes
+        ]
+        if len(candidates) < replica_count:
+            raise PlacementError(
+                f"Insufficient online sleds ({len(candidates)}) for {replica_count} replicas"
+            )
+
+        scored = sorted(
+            (self._score(load, candidates, size_bytes) for load in candidates),
+            key=lambda decision: decision.score,
+            reverse=True
+        )
+
+        used_domains: Set[str] = set(avoid_domains)
+        chosen: List[PlacementDecision] = []
+        for decision in scored:
+            if len(chosen) == replica_count:
+                break
+            if decision.failure_domain not in used_domains:
+                decision.reasons.append(f"new failure domain {decision.failure_domain}")
+                used_domains.add(decision.failure_domain)
+                chosen.append(decision)
+
+        for decision in scored:
+            if len(chosen) == replica_count:
+                break
+            if decision not in chosen:
+                decision.reasons.append(f"shares failure domain {decision.failure_domain}")
+                chosen.append(decision)
+
+        for decision in chosen:
+            logger.debug(f"Placement: {decision.explain()}")
+        return chosen
+
+    def imbalance(self, loads: List[SledLoad]) -> float:
+        """Spread between the most and least pressured online sleds."""
+        pressures = [load.pressure for load in loads if load.online]
+        if len(pressures) < 2:
+            return 0.0
+        return max(pressures) - min(pressures)
+
+    def plan_rebalance(self, loads: List[SledLoad], regions: List[PlacedRegion],
+                       threshold: Optional[float] = None, max_moves: int = 10) -> List[RegionMove]:
+        """
+        Plan region moves from hot sleds to cool ones.
+
+        Repeatedly moves a region from the most to the least pressured sled
+        while the imbalance exceeds the threshold and each move strictly
+        lowers the pair's peak pressure. A move never puts two replicas of a
+        volume on one sled or, where avoidable, in one failure domain.
+
+        Args:
+            loads: Current load of every sled (not modified)
+            regions: Movable replica regions
+            threshold: Imbalance that triggers moves (default: engine setting)
+            max_moves: Upper bound on planned moves
+
+        Returns:
+            Planned moves in execution order
+        """
+        threshold = self.rebalance_threshold if threshold is None else threshold
+        sim = {load.ip: SledLoad(**vars(load)) for load in loads if load.online}
+        domains = {load.ip: load.failure_domain for load in loads}
+        placed = [PlacedRegion(**vars(region)) for region in regions]
+        moved: Set[str] = set()  # Each region moves at most once per plan
+        moves: List[RegionMove] = []
+
+        while len(moves) < max_moves and self.imbalance(list(sim.values())) > threshold:
+            hot = max(sim.values(), key=lambda load: load.pressure)
+            move = self._best_move(hot, sim, placed, domains, moved)
+            if move is None:
+                break
+
+            region = move[0]
+            target = sim[move[1]]
+            reason = (
+                f"pressure {hot.pressure:.2f} on {hot.ip} vs {target.pressure:.2f} on {target.ip}"
+            )
+            self._apply(region, hot, target)
+            moved.add(region.region_id)
+            moves.append(RegionMove(
+                volume_id=region.volume_id,
+                region_id=region.region_id,
+                source_ip=hot.ip,
+                target_ip=target.ip,
+                allocated_bytes=region.allocated_bytes,
+                reason=reason
+            ))
+
+        return moves
+
+    def _score(self, load: SledLoad, candidates: List[SledLoad], size_bytes: int) -> PlacementDecision:
+        """Score one sled against the other candidates (higher is better)."""
+        busiest_regions = max(c.region_count for c in candidates) + 1
+        busiest_iops = max(c.recent_iops for c in candidates)
+        latencies = [c.latency_ms for c in candidates if c.latency_ms is not None]
+        slowest = max(latencies) if latencies else 0.0
+
+        free_after = max(load.free_bytes - size_bytes, 0)
+        components = {
+            "capacity": free_after / load.total_bytes if load.total_bytes else 0.0,
+            "regions": 1 - load.region_count / busiest_regions,
+            "iops": 1 - load.recent_iops / busiest_iops if busiest_iops else 1.0,
+            "latency": 1 - (load.latency_ms or 0.0) / slowest if slowest else 1.0,
+        }
+
+        weights = vars(self.weights)
+        score = sum(weights[name] * value for name, value in components.items()) / sum(weights.values())
+
+        reasons = [
+            f"{free_after / 1024**3:.1f} GiB free after placement",
+            f"{load.region_count} regions (limit {load.max_regions})",
+            f"{load.recent_iops:.1f} IOPS",
+        ]
+        if load.latency_ms is not None:
+            reasons.append(f"{load.latency_ms:.2f} ms latency")
+        if load.free_bytes < size_bytes:
+            score *= 0.5
+            reasons.append("thin: provisioned size exceeds free space")
+        if load.max_regions and load.region_count >= load.max_regions:
+            score *= 0.5
+            reasons.append("at region limit")
+
+        return PlacementDecision(
+            sled_ip=load.ip,
+            failure_domain=load.failure_domain,
+            score=score,
+            components=components,
+            reasons=reasons
+        )
+
+    def _best_move(self, hot: SledLoad, sim: Dict[str, SledLoad], placed: List[PlacedRegion],
+                   domains: Dict[str, str], moved: Set[str]) -> Optional[Tuple[PlacedRegion, str]]:
+        """Pick the region and target that most reduce the hot sled's pressure."""
+        by_volume: Dict[str, List[PlacedRegion]] = {}
+        for region in placed:
+            by_volume.setdefault(region.volume_id, []).append(region)
+
+        best = None
+        best_peak = hot.pressure
+        for region in (r for r in placed if r.sled_ip == hot.ip and r.region_id not in moved):
+            peers = [r for r in by_volume[region.volume_id] if r is not region]
+            peer_ips = {r.sled_ip for r in peers}
+            peer_domains = {domains[ip] for ip in peer_ips if ip in domains}
+
+            for target in sim.values():
+                if target.ip == hot.ip or target.ip in peer_ips:
+                    continue
+                if target.failure_domain in peer_domains and hot.failure_domain not in peer_domains:
+                    continue
+                if target.free_bytes < region.allocated_bytes:
+                    continue
+
+                source_after, target_after = self._pressures_after(region, hot, target)
+                peak = max(source_after, target_after)
+                if peak < best_peak:
+                    best_peak = peak
+                    best = (region, target.ip)
+
+        return best
+
+    @staticmethod
+    def _pressures_after(region: PlacedRegion, source: SledLoad, target: SledLoad) -> Tuple[float, float]:
+        """Pressures of source and target if region moved between them."""
+        source_after = SledLoad(**vars(source))
+        target_after = SledLoad(**vars(target))
+        PlacementEngine._apply(PlacedRegion(**vars(region)), source_after, target_after)
+        return source_after.pressure, target_after.pressure
+
+    @staticmethod
+    def _apply(region: PlacedRegion, source: SledLoad, target: SledLoad) -> None:
+        """Move a region between two simulated sleds."""
+        source.used_bytes -= region.allocated_bytes
+        source.region_count -= 1
+        target.used_bytes += region.allocated_bytes
+        target.region_count += 1
+        region.sled_ip = target.ip
@@ -8,12 +8,17 @@ import logging
 import os
 import sys
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
 import paramiko
+import yaml
 
 from homelab.config import Config
 from homelab.crucible_config import CrucibleConfig
+from homelab.crucible_metadata import StoreBackedDict
 from homelab.oxide_storage_api import (
     DiskCreate,
     DiskSource,
@@ -26,6 +31,116 @@ from homelab.resource_manager import ResourceManager
 
 logger = logging.getLogger(__name__)
 
+# VMIDs handed out to Crucible VMs
+VMID_RANGE_START = 200
+VMID_RANGE_END = 9999
+
+
+@dataclass
+class VMSpec:
+    """One VM to create with a Crucible boot disk."""
+    name: str
+    node: str
+    disk_size_gb: int = 50
+    memory_mb: int = 4096
+    cpu_cores: int = 2
+    disk_source: DiskSource = DiskSource.BLANK
+    snapshot_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None) -> "VMSpec":
+        """Build a spec from a mapping, filling unset fields from defaults."""
+        merged = {**(defaults or {}), **data}
+        unknown = set(merged) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown VM spec fields: {', '.join(sorted(unknown))}")
+        if "disk_source" in merged:
+            merged["disk_source"] = DiskSource(merged["disk_source"])
+        return cls(**merged)
+
+    def numbered(self, count: int) -> List["VMSpec"]:
+        """count copies of this spec named <name>-01, <name>-02, ..."""
+        width = max(2, len(str(count)))
+        return [replace(self, name=f"{self.name}-{i:0{width}d}") for i in range(1, count + 1)]
+
+
+def load_vm_specs(path: Path) -> List[VMSpec]:
+    """
+    Load VM specs from a YAML or JSON file.
+
+    The file holds either a list of VM mappings, or a mapping with optional
+    "defaults" and a "vms" list. An entry with "count" expands into that
+    many numbered VMs.
+    """
+    with open(path) as f:
+        document = yaml.safe_load(f)
+
+    if isinstance(document, list):
+        defaults, entries = {}, document
+    elif isinstance(document, dict) and isinstance(document.get("vms"), list):
+        defaults, entries = document.get("defaults") or {}, document["vms"]
+    else:
+        raise ValueError(f"{path}: expected a list of VMs or a mapping with a 'vms' list")
+
+    specs: List[VMSpec] = []
+    for entry in entries:
+        entry = dict(entry)
+        count = int(entry.pop("count", 1))
+        spec = VMSpec.from_dict(entry, defaults)
+        specs.extend(spec.numbered(count) if count > 1 else [spec])
+    return specs
+
+
+class VMIDAllocator:
+    """Reserves unused VMIDs for concurrent creates without collisions."""
+
+    def __init__(self, start: int = VMID_RANGE_START, end: int = VMID_RANGE_END):
+        self.start = start
+        self.end = end
+        self._lock = asyncio.Lock()
+        self._used: Optional[Set[int]] = None
+
+    async def reserve(self, proxmox: Any, list_used: Callable[[Any], Set[int]]) -> int:
+        """Reserve the lowest free VMID; the cluster is queried once per allocator."""
+        async with self._lock:
+            if self._used is None:
+                self._used = await asyncio.to_thread(list_used, proxmox)
+            for candidate in range(self.start, self.end):
+                if candidate not in self._used:
+                    self._used.add(candidate)
+                    return candidate
+        raise RuntimeError("No available VMIDs found")
+
+    def release(self, vmid: int) -> None:
+        """Return a VMID whose VM was rolled back."""
+        if self._used is not None:
+            self._used.discard(vmid)
+
+
+class VMTimeline:
+    """Per-VM record of when each creation step ran and how long it took."""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.steps: List[Dict[str, Any]] = []
+
+    @asynccontextmanager
+    async def step(self, name: str) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            self.steps.append({
+                "step": name,
+                "start_sec": round(started - self.origin, 3),
+                "elapsed_sec": round(time.perf_counter() - started, 3),
+                "status": status
+            })
+
 
 class CrucibleVMManager:
     """
@@ -38,8 +153,12 @@ class CrucibleVMManager:
         self.storage_api = create_storage_api(project_id, enable_mocking=enable_mocking)
         self.crucible_config = self.storage_api.config
         
-        # VM configuration
-        self.vm_configs: Dict[str, Dict[str, Any]] = {}
+        # VM configuration, persisted alongside the disks it references
+        self.vm_configs: StoreBackedDict = StoreBackedDict(
+            self.storage_api.metadata, "vm", project_id,
+            index=lambda vm: {"name": vm["name"], "state": vm["status"],
+                              "owner": vm["disk_id"], "created": str(vm["created_at"])}
+        )
         
         logger.info(f"Initialized CrucibleVMManager for project {project_id}")
     
@@ -70,38 +189,157 @@ class CrucibleVMManager:
         Returns:
             Dict containing VM and disk information
         """
-        logger.info(f"🚀 Creating VM '{vm_name}' on node '{node_name}' with {disk_size_gb}GB Crucible storage")
+        spec = VMSpec(
+            name=vm_name,
+            node=node_name,
+            disk_size_gb=disk_size_gb,
+            memory_mb=memory_mb,
+            cpu_cores=cpu_cores,
+            disk_source=disk_source,
+            snapshot_id=snapshot_id
+        )
+        vm_config, disk = await self._provision_vm(spec, VMIDAllocator(), VMTimeline())
+
+        return {
+            "vm": vm_config,
+            "disk": disk,
+            "status": "success"
+        }
+
+    async def create_vms_with_storage(
+        self,
+        specs: List[VMSpec],
+        max_parallel: int = 4,
+        rollback_all_on_failure: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create many VMs with Crucible storage concurrently.
+
+        Each VM runs the same pipeline as create_vm_with_storage (disk,
+        VMID, VM shell, attach, configure), with at most max_parallel VMs in
+        flight. VMIDs are reserved from one shared allocator so concurrent
+        creates never collide. A VM that fails part-way has its own disk and
+        shell removed; with rollback_all_on_failure the VMs that did succeed
+        are deleted too.
+
+        Args:
+            specs: VMs to create
+            max_parallel: Maximum VMs created at once
+            rollback_all_on_failure: Delete the whole batch if any VM fails
+
+        Returns:
+            Dict with overall status, counts, elapsed time and per-VM
+            results including a timeline of each step
+        """
+        if max_parallel < 1:
+            raise ValueError(f"Invalid max_parallel {max_parallel}")
+
+        names = [spec.name for spec in specs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate VM names in batch: {', '.join(duplicates)}")
+        existing = sorted(name for name in names if name in self.vm_configs)
+        if existing:
+            raise ValueError(f"VMs already exist: {', '.join(existing)}")
+
+        logger.info(f"🚀 Creating {len(specs)} VMs with Crucible storage ({max_parallel} at a time)")
+
+        allocator = VMIDAllocator()
+        semaphore = asyncio.Semaphore(max_parallel)
+        origin = time.perf_counter()
+
+        async def create(spec: VMSpec) -> Dict[str, Any]:
+            timeline = VMTimeline(origin)
+            async with timeline.step("queued"):
+                await semaphore.acquire()
+            try:
+                vm_config, disk = await self._provision_vm(spec, allocator, timeline)
+                return {"name": spec.name, "status": "success", "vm": vm_config,
+                        "disk_id": disk["id"], "timeline": timeline.steps}
+            except Exception as e:
+                return {"name": spec.name, "status": "failed", "error": str(e),
+                        "timeline": timeline.steps}
+            finally:
+                semaphore.release()
+
+        results = list(await asyncio.gather(*(create(spec) for spec in specs)))
+        failed = [result for result in results if result["status"] == "failed"]
+
+        if failed and rollback_all_on_failure:
+            for result in results:
+                if result["status"] != "success":
+                    continue
+                try:
+                    await self.delete_vm_with_storage(result["name"])
+                    result["status"] = "rolled_back"
+                except Exception as e:
+                    logger.error(f"❌ Failed to roll back VM {result['name']}: {e}")
+
+        created = sum(1 for result in results if result["status"] == "success")
+        if not failed:
+            status = "success"
+        elif created:
+            status = "partial"
+        else:
+            status = "failed"
+
+        elapsed = time.perf_counter() - origin
+        logger.info(f"🎉 Batch finished: {created} created, {len(failed)} failed in {elapsed:.1f}s")
+
+        return {
+            "status": status,
+            "created": created,
+            "failed": len(failed),
+            "elapsed_sec": round(elapsed, 3),
+            "vms": results
+        }
+
+    async def _provision_vm(
+        self,
+        spec: VMSpec,
+        allocator: VMIDAllocator,
+        timeline: VMTimeline
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Create one VM's disk and shell, attach and configure; undo it all on failure."""
+        logger.info(f"🚀 Creating VM '{spec.name}' on node '{spec.node}' with {spec.disk_size_gb}GB Crucible storage")
+
+        disk_id = None
+        vmid = None
+        proxmox = None
+        shell_created = False
+        attached = False
         
         try:
             # 1. Create Crucible storage disk
-            disk_name = f"{vm_name}-boot-disk"
+            disk_name = f"{spec.name}-boot-disk"
             disk_create = DiskCreate(
                 name=disk_name,
-                description=f"Boot disk for VM {vm_name}",
-                size=disk_size_gb * 1024**3,  # Convert GB to bytes
-                disk_source=disk_source,
+                description=f"Boot disk for VM {spec.name}",
+                size=spec.disk_size_gb * 1024**3,  # Convert GB to bytes
+                disk_source=spec.disk_source,
                 block_size=self.crucible_config.default_block_size,
-                snapshot_id=snapshot_id
+                snapshot_id=spec.snapshot_id
             )
             
-            disk = await self.storage_api.disk_create(disk_create)
+            async with timeline.step("disk_create"):
+                disk = await self.storage_api.disk_create(disk_create)
             disk_id = disk["id"]
             
             logger.info(f"✅ Created Crucible disk {disk_name} ({disk_id})")
             
-            # 2. Create VM shell in Proxmox
-            proxmox_client = ProxmoxClient(node_name)
+            # 2. Create VM shell in Proxmox (proxmoxer is blocking, so run it off the loop)
+            async with timeline.step("proxmox_connect"):
+                proxmox_client = await asyncio.to_thread(ProxmoxClient, spec.node)
             proxmox = proxmox_client.proxmox
             
-            # Find next available VMID
-            vmid = self._get_next_available_vmid(proxmox)
+            async with timeline.step("vmid_reserve"):
+                vmid = await allocator.reserve(proxmox, self._get_used_vmids)
             
-            # Create basic VM
             create_args = {
                 "vmid": vmid,
-                "name": vm_name,
-                "cores": cpu_cores,
-                "memory": memory_mb,
+                "name": spec.name,
+                "cores": spec.cpu_cores,
+                "memory": spec.memory_mb,
                 "scsihw": "virtio-scsi-pci",
                 "boot": "c",
                 "bootdisk": "scsi0",
@@ -109,54 +347,65 @@ class CrucibleVMManager:
             }
             
             # Add network interfaces
-            bridges = self._get_network_bridges_for_node(node_name)
+            bridges = self._get_network_bridges_for_node(spec.node)
             for net_idx, bridge in enumerate(bridges):
                 create_args[f"net{net_idx}"] = f"virtio,bridge={bridge}"
             
-            proxmox.nodes(node_name).qemu.create(**create_args)
-            logger.info(f"✅ Created VM shell {vm_name} (VMID: {vmid})")
+            async with timeline.step("vm_shell"):
+                await asyncio.to_thread(proxmox.nodes(spec.node).qemu.create, **create_args)
+            shell_created = True
+            logger.info(f"✅ Created VM shell {spec.name} (VMID: {vmid})")
             
             # 3. Attach Crucible disk to VM
-            await self.storage_api.disk_attach(disk_id, str(vmid), "scsi0")
+            async with timeline.step("disk_attach"):
+                await self.storage_api.disk_attach(disk_id, str(vmid), "scsi0")
+            attached = True
             
             # 4. Configure VM with Crucible storage
-            await self._configure_vm_crucible_storage(
-                proxmox, node_name, vmid, disk_id
-            )
+            async with timeline.step("configure"):
+                await self._configure_vm_crucible_storage(proxmox, spec.node, vmid, disk_id)
             
             # 5. Store VM configuration
             vm_config = {
                 "vmid": vmid,
-                "name": vm_name,
-                "node": node_name,
+                "name": spec.name,
+                "node": spec.node,
                 "disk_id": disk_id,
-                "disk_size_gb": disk_size_gb,
-                "memory_mb": memory_mb,
-                "cpu_cores": cpu_cores,
+                "disk_size_gb": spec.disk_size_gb,
+                "memory_mb": spec.memory_mb,
+                "cpu_cores": spec.cpu_cores,
                 "created_at": time.time(),
                 "status": "created"
             }
             
-            self.vm_configs[vm_name] = vm_config
+            self.vm_configs[spec.name] = vm_config
             
-            logger.info(f"🎉 Successfully created VM {vm_name} with Crucible storage")
-            
-            return {
-                "vm": vm_config,
-                "disk": disk,
-                "status": "success"
-            }
+            logger.info(f"🎉 Successfully created VM {spec.name} with Crucible storage")
+            return vm_config, disk
             
         except Exception as e:
-            logger.error(f"❌ Failed to create VM {vm_name}: {e}")
-            # Cleanup on failure
-            try:
-                if 'disk_id' in locals():
-                    await self.storage_api.disk_delete(disk_id)
-                if 'vmid' in locals():
-                    proxmox.nodes(node_name).qemu(vmid).delete()
-            except Exception as cleanup_error:
-                logger.error(f"❌ Cleanup failed: {cleanup_error}")
+            logger.error(f"❌ Failed to create VM {spec.name}: {e}")
+            # Cleanup on failure; every step runs even if an earlier one failed
+            async with timeline.step("rollback"):
+                if attached:
+                    try:
+                        await self.storage_api.disk_detach(disk_id)
+                    except Exception as cleanup_error:
+                        logger.error(f"❌ Cleanup failed to detach disk {disk_id}: {cleanup_error}")
+                if shell_created:
+                    try:
+                        await asyncio.to_thread(proxmox.nodes(spec.node).qemu(vmid).delete)
+                        shell_created = False
+                    except Exception as cleanup_error:
+                        logger.error(f"❌ Cleanup failed to delete VM shell {vmid}: {cleanup_error}")
+                # A VMID whose shell still exists stays reserved so it is not handed out again
+                if vmid is not None and not shell_created:
+                    allocator.release(vmid)
+                if disk_id:
+                    try:
+                        await self.storage_api.disk_delete(disk_id)
+                    except Exception as cleanup_error:
+                        logger.error(f"❌ Cleanup failed to delete disk {disk_id}: {cleanup_error}")
             raise
     
     async def clone_vm_from_snapshot(
@@ -445,6 +694,17 @@ class CrucibleVMManager:
     
     def _get_next_available_vmid(self, proxmox: Any) -> int:
         """Find next available VMID across all nodes."""
+        used = self._get_used_vmids(proxmox)
+
+        # Find first available ID
+        for candidate in range(VMID_RANGE_START, VMID_RANGE_END):
+            if candidate not in used:
+                return candidate
+
+        raise RuntimeError("No available VMIDs found")
+
+    def _get_used_vmids(self, proxmox: Any) -> Set[int]:
+        """Collect VM and container IDs in use on every node."""
         used = set()
         
         for node_info in proxmox.nodes.get():
@@ -458,12 +718,7 @@ class CrucibleVMManager:
             for ct in proxmox.nodes(node_name).lxc.get():
                 used.add(int(ct["vmid"]))
         
-        # Find first available ID
-        for candidate in range(200, 9999):  # Start at 200 for Crucible VMs
-            if candidate not in used:
-                return candidate
-        
-        raise RuntimeError("No available VMIDs found")
+        return used
     
     def _get_network_bridges_for_node(self, node_name: str) -> List[str]:
         """Get network bridge configuration for a node."""
@@ -499,7 +754,8 @@ class CrucibleVMManager:
             
             # Configure VM storage
             # Note: In a real implementation, this would set up Crucible upstairs connection
-            proxmox.nodes(node_name).qemu(vmid).config.post(
+            await asyncio.to_thread(
+                proxmox.nodes(node_name).qemu(vmid).config.post,
                 scsi0=f"crucible:{disk_id},size={disk_info['size'] // 1024**3}G",
                 ide2="local:cloudinit"
             )
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+src/homelab/exporter_rollout.py
+
+Fleet rollout helpers shared by the node_exporter and zfs_exporter managers.
+
+rollout() deploys to one canary host first and, if it comes up serving
+/metrics, to the remaining hosts in parallel. Each host result carries its
+wall-clock time. sync_file_command() builds a remote command that rewrites
+a config file only when its checksum differs, so unchanged hosts skip the
+daemon-reload and service restart. A rewrite leaves a marker under /run
+until clear_pending_command() confirms the service restarted with it, so a
+run that wrote the file but failed to reload or restart is retried.
+
+Settings come from cluster.yaml, per exporter or shared:
+
+    monitoring:
+      rollout:
+        max_parallel: 4
+        canary: true
+      zfs_exporter:
+        rollout:
+          max_parallel: 2
+"""
+
+import hashlib
+import logging
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Without rollout settings, hosts are deployed one at a time with no canary
+DEFAULT_MAX_PARALLEL = 1
+DEFAULT_CANARY = False
+
+# Markers for written but not yet applied files; /run is emptied on boot,
+# when systemd loads every unit file anyway
+PENDING_DIR = "/run/homelab-rollout"
+
+
+def get_rollout_settings(
+    monitoring: Dict[str, Any],
+    exporter: str,
+    max_parallel: Optional[int] = None,
+    canary: Optional[bool] = None,
+) -> Tuple[int, bool]:
+    """
+    Resolve rollout settings: explicit arguments, then per-exporter, then shared config.
+
+    Args:
+        monitoring: The monitoring section of cluster.yaml
+        exporter: Exporter key, e.g. 'node_exporter'
+        max_parallel: Override for the maximum concurrent deploys
+        canary: Override for canary-first ordering
+
+    Returns:
+        (max_parallel, canary)
+    """
+    settings = dict(monitoring.get("rollout", {}))
+    settings.update(monitoring.get(exporter, {}).get("rollout", {}))
+
+    if max_parallel is None:
+        max_parallel = settings.get("max_parallel", DEFAULT_MAX_PARALLEL)
+    if canary is None:
+        canary = settings.get("canary", DEFAULT_CANARY)
+
+    if int(max_parallel) < 1:
+        raise ValueError(f"Invalid max_parallel {max_parallel}")
+    return int(max_parallel), bool(canary)
+
+
+def rollout(
+    hosts: List[str],
+    deploy: Callable[[str], Dict[str, Any]],
+    max_parallel: int = DEFAULT_MAX_PARALLEL,
+    canary: bool = DEFAULT_CANARY,
+) -> List[Dict[str, Any]]:
+    """
+    Deploy to every host, optionally canary-first, with bounded concurrency.
+
+    A deploy counts as healthy when it returns status 'success', which the
+    managers only report once the service is running and /metrics answers.
+    If the canary is not healthy the remaining hosts are skipped.
+
+    Args:
+        hosts: Hostnames in rollout order; the first is the canary
+        deploy: Deploys to one host and returns its result dict
+        max_parallel: Maximum concurrent deploys after the canary
+        canary: Deploy and verify the first host before the rest
+
+    Returns:
+        One result per host, in host order, each with 'elapsed_sec'
+    """
+    def timed_deploy(hostname: str) -> Dict[str, Any]:
+        start = time.monotonic()
+        try:
+            result = deploy(hostname)
+        except Exception as e:
+            logger.error(f"Failed to deploy to {hostname}: {e}")
+            result = {"hostname": hostname, "status": "failed", "error": str(e)}
+        result["elapsed_sec"] = round(time.monotonic() - start, 2)
+        return result
+
+    results: List[Dict[str, Any]] = []
+    remaining = list(hosts)
+
+    if canary and len(remaining) > 1:
+        canary_host = remaining.pop(0)
+        logger.info(f"Deploying to canary host {canary_host}")
+        canary_result = timed_deploy(canary_host)
+        results.append(canary_result)
+
+        if canary_result.get("status") != "success":
+            logger.error(
+                f"Canary {canary_host} finished with status {canary_result.get('status')}; "
+                f"skipping {len(remaining)} remaining hosts"
+            )
+            return results + [
+                {
+                    "hostname": hostname,
+                    "status": "skipped",
+                    "reason": f"canary {canary_host} failed",
+                    "elapsed_sec": 0.0,
+                }
+                for hostname in remaining
+            ]
+
+    if remaining:
+        workers = max(1, min(max_parallel, len(remaining)))
+        logger.info(f"Deploying to {len(remaining)} hosts, {workers} at a time")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results.extend(executor.map(timed_deploy, remaining))
+
+    return results
+
+
+def pending_marker(path: str, pending_dir: str = PENDING_DIR) -> str:
+    """Marker file recording that path was written but not yet applied."""
+    return f"{pending_dir}/{path.strip('/').replace('/', '_')}.pending"
+
+
+def sync_file_command(path: str, content: str, pending_dir: str = PENDING_DIR) -> str:
+    """
+    Remote command that writes content to path only if it differs.
+
+    The command prints 'written' after rewriting the file, 'pending' when
+    the file already matches but an earlier write was never applied (its
+    marker is still present), and 'unchanged' otherwise. Callers treat
+    'pending' like 'written' and clear the marker once the service runs
+    with the new file.
+    """
+    # printf '%s\n' appends exactly one newline to the content
+    digest = hashlib.sha256((content + "\n").encode()).hexdigest()
+    quoted_path = shlex.quote(path)
+    marker = shlex.quote(pending_marker(path, pending_dir))
+    return (
+        f"if [ \"$(sha256sum < {quoted_path} 2>/dev/null | cut -d' ' -f1)\" = '{digest}' ]; "
+        f"then if [ -e {marker} ]; then echo pending; else echo unchanged; fi; "
+        f"else mkdir -p {shlex.quote(pending_dir)} && touch {marker} && "
+        f"printf '%s\\n' {shlex.quote(content)} > {quoted_path} && echo written; fi"
+    )
+
+
+def clear_pending_command(path: str, pending_dir: str = PENDING_DIR) -> str:
+    """Remote command that marks a file written by sync_file_command() as applied."""
+    return f"rm -f {shlex.quote(pending_marker(path, pending_dir))}"
+
+
+def print_rollout_report(results: List[Dict[str, Any]]) -> None:
+    """Print per-host rollout status, timing and actions."""
+    print(f"\n{'Host':<20} {'Result':<10} {'Time':>8}  {'Actions'}")
+    print("-" * 80)
+
+    for r in results:
+        hostname = r.get("hostname", "unknown")
+        detail = ", ".join(r.get("actions", [])) or r.get("error") or r.get("reason") or "-"
+        print(f"{hostname:<20} {r.get('status', '?'):<10} {r.get('elapsed_sec', 0.0):>7.1f}s  {detail}")
+
+    total = max((r.get("elapsed_sec", 0.0) for r in results), default=0.0)
+    print("-" * 80)
+    print(f"Slowest host: {total:.1f}s")
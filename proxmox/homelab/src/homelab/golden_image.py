@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+src/homelab/golden_image.py
+
+Content-addressed golden image cache for VM boot disks on ZFS storage.
+
+Each cloud image is imported once per host and disk size into a sparse
+zvol named after the image's SHA-256 (golden-<digest>-<size>) and frozen as
+a @base snapshot. New VM boot disks are `zfs clone`s of that snapshot,
+named like Proxmox's own volumes (vm-<vmid>-disk-<n>), so they are instant
+and cost no space until the guest writes. Goldens that no VM disk clones
+any more are garbage-collected after an idle period.
+
+Usage:
+    from homelab.golden_image import GoldenImageCache
+
+    with GoldenImageCache("pve", storage="local-zfs") as cache:
+        golden = cache.ensure("/var/lib/vz/template/iso/noble.img", "200G")
+        volume = cache.clone(golden, vmid=120)   # "local-zfs:vm-120-disk-0"
+        cache.gc(max_idle_days=14)
+"""
+
+import logging
+import os
+import re
+import shlex
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATASET = "rpool/data"  # Backing dataset of Proxmox's default local-zfs storage
+GOLDEN_PREFIX = "golden-"
+BASE_SNAPSHOT = "base"
+
+# ZFS user properties recorded on each golden zvol
+PROP_DIGEST = "homelab:digest"
+PROP_SOURCE = "homelab:source"
+PROP_LAST_USED = "homelab:last-used"
+
+_SIZE_RE = re.compile(r"^(\d+)([KMGT]?)$", re.IGNORECASE)
+
+
+@dataclass
+class GoldenImage:
+    """One cached base volume on a host."""
+    dataset: str
+    digest: str
+    size: str
+    source: str = ""
+    last_used: int = 0
+    clones: int = 0
+    used_bytes: int = 0
+
+    @property
+    def snapshot(self) -> str:
+        return f"{self.dataset}@{BASE_SNAPSHOT}"
+
+
+class GoldenImageCache:
+    """Builds, clones and garbage-collects golden zvols on one Proxmox host."""
+
+    def __init__(self, hostname: str, storage: str = "local-zfs", dataset: Optional[str] = None) -> None:
+        self.hostname = hostname
+        self.storage = storage
+        self.dataset = dataset or os.getenv("GOLDEN_IMAGE_DATASET", DEFAULT_DATASET)
+        self.ssh_client: Optional[paramiko.SSHClient] = None
+
+    def __enter__(self) -> "GoldenImageCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cleanup()
+
+    # -- SSH helpers (same pattern as zfs_mirror_manager.py) --
+
+    def _get_ssh_client(self) -> paramiko.SSHClient:
+        """Get or create an SSH connection to the host."""
+        if not self.ssh_client:
+            ssh_user = os.getenv("SSH_USER", "root")
+            ssh_key = os.path.expanduser(os.getenv("SSH_KEY_PATH", "~/.ssh/id_rsa"))
+
+            self.ssh_client = paramiko.SSHClient()
+            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            self.ssh_client.connect(hostname=self.hostname, username=ssh_user, key_filename=ssh_key, timeout=10)
+
+        return self.ssh_client
+
+    def _ssh_exec(self, cmd: str) -> Tuple[str, str, int]:
+        """Execute a command via SSH. Returns (stdout, stderr, exit_code)."""
+        ssh = self._get_ssh_client()
+        stdin, stdout, stderr = ssh.exec_command(cmd)
+        exit_code = stdout.channel.recv_exit_status()
+        return (
+            stdout.read().decode().strip(),
+            stderr.read().decode().strip(),
+            exit_code,
+        )
+
+    def _run(self, cmd: str) -> str:
+        """Execute a command and raise on a non-zero exit."""
+        stdout, stderr, code = self._ssh_exec(cmd)
+        if code != 0:
+            raise RuntimeError(f"{self.hostname}: '{cmd}' failed ({code}): {stderr}")
+        return stdout
+
+    def cleanup(self) -> None:
+        """Close SSH connection."""
+        if self.ssh_client:
+            self.ssh_client.close()
+            self.ssh_client = None
+
+    # -- public API --
+
+    def list_images(self) -> List[GoldenImage]:
+        """All golden images under the dataset, with clone counts, in one zfs call each."""
+        stdout, _, code = self._ssh_exec(
+            f"zfs list -H -p -t volume -d 1 -o name,used,{PROP_DIGEST},{PROP_SOURCE},{PROP_LAST_USED} "
+            f"{shlex.quote(self.dataset)}"
+        )
+        if code != 0:
+            return []
+
+        goldens: Dict[str, GoldenImage] = {}
+        for line in stdout.splitlines():
+            name, used, digest, source, last_used = (line.split("\t") + ["-"] * 5)[:5]
+            leaf = name.rsplit("/", 1)[-1]
+            if not leaf.startswith(GOLDEN_PREFIX) or leaf.endswith("-partial") or digest == "-":
+                continue
+            goldens[name] = GoldenImage(
+                dataset=name,
+                digest=digest,
+                size=leaf.rsplit("-", 1)[-1],
+                source="" if source == "-" else source,
+                last_used=int(last_used) if last_used.isdigit() else 0,
+                used_bytes=int(used) if used.isdigit() else 0,
+            )
+
+        if goldens:
+            # Clones of every @base snapshot in one call
+            stdout, _, _ = self._ssh_exec(
+                "zfs get -H -o name,value clones " + " ".join(shlex.quote(g.snapshot) for g in goldens.values())
+            )
+            for line in stdout.splitlines():
+                snapshot, _, clones = line.partition("\t")
+                golden = goldens.get(snapshot.split("@", 1)[0])
+                if golden and clones not in ("", "-"):
+                    golden.clones = len(clones.split(","))
+
+        return list(goldens.values())
+
+    def ensure(self, image_path: str, size: str) -> GoldenImage:
+        """
+        Return the golden image for image_path at size, importing it if needed.
+
+        The image is hashed once; later calls find the golden by its source
+        key (path, size in bytes, mtime) without re-reading the image.
+
+        Args:
+            image_path: Cloud image on the host (qcow2 or raw)
+            size: Boot disk size, e.g. "200G"
+
+        Returns:
+            The cached golden image
+        """
+        size = _normalize_size(size)
+        stat = self._run(f"stat -c '%s %Y' {shlex.quote(image_path)}")
+        source_key = f"{image_path}:{stat.replace(' ', ':')}"
+
+        existing = self.list_images()
+        for golden in existing:
+            if golden.source == source_key and golden.size == size:
+                logger.info(f"Golden image for {image_path} ({size}) already cached as {golden.dataset}")
+                return golden
+
+        digest = self._run(f"sha256sum {shlex.quote(image_path)}").split()[0]
+        name = f"{self.dataset}/{GOLDEN_PREFIX}{digest[:16]}-{size}"
+        for golden in existing:
+            if golden.dataset == name:
+                # Same content under another path or mtime: remember the new key
+                self._run(f"zfs set {PROP_SOURCE}={shlex.quote(source_key)} {shlex.quote(name)}")
+                golden.source = source_key
+                return golden
+
+        self._build(image_path, name, size, digest, source_key)
+        return GoldenImage(dataset=name, digest=digest, size=size, source=source_key, last_used=int(time.time()))
+
+    def clone(self, golden: GoldenImage, vmid: int, disk_index: int = 0) -> str:
+        """
+        Create a VM boot disk as a linked clone of a golden image.
+
+        Returns:
+            Proxmox volume ID, e.g. "local-zfs:vm-120-disk-0"
+        """
+        volume = f"vm-{vmid}-disk-{disk_index}"
+        target = f"{self.dataset}/{volume}"
+        now = int(time.time())
+
+        logger.info(f"Cloning {golden.snapshot} -> {target}")
+        self._run(
+            f"zfs clone {shlex.quote(golden.snapshot)} {shlex.quote(target)} && "
+            f"zfs set {PROP_LAST_USED}={now} {shlex.quote(golden.dataset)}"
+        )
+        golden.last_used = now
+        golden.clones += 1
+        return f"{self.storage}:{volume}"
+
+    def gc(self, max_idle_days: float = 14.0, dry_run: bool = False) -> List[GoldenImage]:
+        """
+        Destroy golden images no VM disk clones and nobody used recently.
+
+        Args:
+            max_idle_days: Keep goldens used within this many days
+            dry_run: Only report what would be destroyed
+
+        Returns:
+            The goldens destroyed (or that would be)
+        """
+        cutoff = time.time() - max_idle_days * 86400
+        victims = [g for g in self.list_images() if g.clones == 0 and g.last_used < cutoff]
+
+        for golden in victims:
+            if dry_run:
+                logger.info(f"[dry-run] Would destroy unused golden image {golden.dataset}")
+                continue
+            logger.info(f"Destroying unused golden image {golden.dataset} ({golden.used_bytes} bytes)")
+            self._run(f"zfs destroy -r {shlex.quote(golden.dataset)}")
+
+        return victims
+
+    # -- internals --
+
+    def _build(self, image_path: str, name: str, size: str, digest: str, source_key: str) -> None:
+        """Import an image into a new sparse zvol and snapshot it, atomically."""
+        staging = f"{name}-partial"
+        now = int(time.time())
+        logger.info(f"Importing {image_path} into golden image {name}")
+
+        self._ssh_exec(f"zfs destroy -r {shlex.quote(staging)} 2>/dev/null")
+        try:
+            self._run(
+                f"zfs create -s -V {size} "
+                f"-o {PROP_DIGEST}={digest} -o {PROP_SOURCE}={shlex.quote(source_key)} "
+                f"-o {PROP_LAST_USED}={now} {shlex.quote(staging)}"
+            )
+            self._run(f"udevadm settle && qemu-img convert -n -O raw {shlex.quote(image_path)} "
+                      f"/dev/zvol/{shlex.quote(staging)}")
+            self._run(f"zfs snapshot {shlex.quote(staging)}@{BASE_SNAPSHOT} && "
+                      f"zfs rename {shlex.quote(staging)} {shlex.quote(name)}")
+        except Exception:
+            self._ssh_exec(f"zfs destroy -r {shlex.quote(staging)}")
+            raise
+
+
+def _normalize_size(size: str) -> str:
+    """Canonical zvol size string, e.g. '200g' -> '200G'."""
+    match = _SIZE_RE.match(size.strip())
+    if not match:
+        raise ValueError(f"Invalid disk size '{size}', expected e.g. 200G")
+    return f"{int(match.group(1))}{match.group(2).upper()}"
@@ -10,10 +10,14 @@ Like Terraform/Pulumi but for your homelab:
 All infrastructure defined in single config file: config/homelab.yaml
 """
 
+import asyncio
+import json
 import logging
 import sys
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 from rich.console import Console
@@ -21,7 +25,8 @@ from rich.table import Table
 
 from homelab.config import Config
 from homelab.proxmox_api import ProxmoxClient
-from homelab.unified_infrastructure_manager import UnifiedInfrastructureManager
+from homelab.unified_infrastructure_manager import DEFAULT_APPLY_WORKERS, UnifiedInfrastructureManager
+from homelab.exporter_rollout import print_rollout_report
 from homelab.node_exporter_manager import (
     apply_from_config as apply_node_exporter,
     get_status_from_config as get_node_exporter_status,
@@ -83,12 +88,17 @@ def apply_infrastructure(
     dry_run: bool = typer.Option(
         False,
         "--dry-run",
-        help="Show what would be changed without making changes"
+        help="Show the plan without making changes"
     ),
     skip_validation: bool = typer.Option(
         False,
         "--skip-validation",
         help="Skip pre-flight validation checks"
+    ),
+    parallel: int = typer.Option(
+        DEFAULT_APPLY_WORKERS,
+        "--parallel", "-p",
+        help="Maximum resources applied concurrently"
     )
 ) -> None:
     """
@@ -102,7 +112,8 @@ def apply_infrastructure(
     - Containers
     - Networks
 
-    Changes are applied in dependency order to ensure correctness.
+    Current state is read once, the plan is printed, and changes are then
+    applied in dependency order, independent resources concurrently.
     """
     console.print(f"🚀 Applying infrastructure from: {config_file}")
 
@@ -116,27 +127,44 @@ def apply_infrastructure(
     try:
         manager = get_manager()
 
-        # Apply infrastructure
-        result = manager.apply(
-            str(config_file),
-            skip_validation=skip_validation,
-            dry_run=dry_run
-        )
+        config = manager.load_config(str(config_file))
+        plan = manager.plan(config, skip_validation=skip_validation or dry_run)
+
+        # Display plan
+        console.print(f"[bold]Plan[/bold] (inventory read in {plan.inventory_sec:.2f}s):")
+        for line in plan.render():
+            console.print(f"  {line}", markup=False)
+
+        if plan.validation and not plan.validation["valid"]:
+            console.print("\n[bold red]Validation errors:[/bold red]")
+            for error in plan.validation["errors"]:
+                console.print(f"  ❌ {error}")
+            console.print("\n❌ Infrastructure validation failed. Fix errors before applying.")
+            raise typer.Exit(1)
+
+        if dry_run:
+            console.print("\n✅ Dry run complete - no changes made")
+            return
+
+        results = manager.apply_plan(plan, max_workers=parallel)
+        summary = manager.summarize(results)
 
         # Display results table
-        if result["results"]:
+        if results:
             table = Table(title="Infrastructure Changes")
             table.add_column("Resource Type", style="cyan")
             table.add_column("Resource Name", style="blue")
             table.add_column("Action", style="yellow")
+            table.add_column("Time", justify="right")
             table.add_column("Status", style="bold")
 
-            for res in result["results"]:
+            for res in results:
                 status = "✅" if res.success else "❌"
                 table.add_row(
                     res.resource_type,
                     res.resource_name,
                     res.action,
+                    f"{res.elapsed_sec:.2f}s",
                     status
                 )
 
@@ -145,7 +173,6 @@ def apply_infrastructure(
         # Display summary
         console.print("\n" + "=" * 70)
         console.print("[bold]Summary:[/bold]")
-        summary = result["summary"]
 
         console.print(f"  Total resources: {summary['total']}")
         console.print(f"  ✅ Success: {summary['success']}")
@@ -158,15 +185,14 @@ def apply_infrastructure(
 
         console.print("=" * 70)
 
-        if not result["success"]:
+        if summary["failed"]:
             console.print("\n❌ Infrastructure apply completed with errors")
             raise typer.Exit(1)
 
-        if dry_run:
-            console.print("\n✅ Dry run complete - no changes made")
-        else:
-            console.print("\n✅ Infrastructure apply complete!")
+        console.print("\n✅ Infrastructure apply complete!")
 
+    except typer.Exit:
+        raise
     except Exception as e:
         console.print(f"\n❌ Failed to apply infrastructure: {e}")
         logger.exception("Apply error")
@@ -323,7 +349,17 @@ def monitoring_apply(
         None,
         "--host", "-H",
         help="Deploy to specific host only"
-    )
+    ),
+    parallel: Optional[int] = typer.Option(
+        None,
+        "--parallel", "-p",
+        help="Hosts deployed concurrently after the canary (default: monitoring.rollout)"
+    ),
+    canary: Optional[bool] = typer.Option(
+        None,
+        "--canary/--no-canary",
+        help="Deploy and verify one host before the rest (default: monitoring.rollout)"
+    ),
 ) -> None:
     """
     Apply monitoring components to Proxmox hosts.
@@ -351,14 +387,18 @@ def monitoring_apply(
             if result.get("error"):
                 console.print(f"   Error: {result['error']}")
         else:
-            results = apply_node_exporter(config_file)
-            print_status_table(results)
+            results = apply_node_exporter(config_file, max_parallel=parallel, canary=canary)
+            print_rollout_report(results)
 
             success = sum(1 for r in results if r.get("status") == "success")
             failed = sum(1 for r in results if r.get("status") == "failed")
+            skipped = sum(1 for r in results if r.get("status") == "skipped")
             already = sum(1 for r in results if "already_installed" in r.get("actions", []))
 
-            console.print(f"\n✅ {success} deployed, {already} already installed, {failed} failed")
+            console.print(
+                f"\n✅ {success} deployed, {already} already installed, {failed} failed"
+                + (f", {skipped} skipped after canary failure" if skipped else "")
+            )
 
     except Exception as e:
         console.print(f"❌ Failed: {e}")
@@ -414,7 +454,9 @@ def monitoring_generate_targets(
             namespace=namespace,
         )
 
-        if result["success"]:
+        if result["success"] and result.get("unchanged"):
+            console.print(f"ConfigMap unchanged ({result['targets_count']} target groups)")
+        elif result["success"]:
             console.print(f"ConfigMap applied with {result['targets_count']} target groups")
             if result.get("output"):
                 console.print(f"  {result['output']}")
@@ -428,6 +470,51 @@ def monitoring_generate_targets(
         raise typer.Exit(1)
 
 
+@monitoring_app.command("serve-targets")
+def monitoring_serve_targets(
+    config_file: Path = typer.Option(
+        "config/cluster.yaml",
+        "--config", "-c",
+        help="Cluster configuration file"
+    ),
+    host: str = typer.Option(
+        "0.0.0.0",
+        "--host",
+        help="Address to listen on"
+    ),
+    port: int = typer.Option(
+        8765,
+        "--port", "-p",
+        help="Port to listen on"
+    ),
+    liveness: bool = typer.Option(
+        False,
+        "--liveness",
+        help="TCP-probe targets and label them __meta_homelab_reachable"
+    ),
+) -> None:
+    """
+    Serve scrape targets from cluster.yaml as a Prometheus http_sd endpoint.
+
+    Targets are rebuilt whenever cluster.yaml changes on disk; point
+    http_sd_configs at http://<host>:<port>/targets?job=<job>.
+    """
+    if not config_file.exists():
+        console.print(f"Config file not found: {config_file}")
+        raise typer.Exit(1)
+
+    from homelab.prometheus_sd import TargetSet, make_server
+
+    server = make_server(TargetSet(config_file, liveness=liveness), host=host, port=port)
+    console.print(f"Serving http_sd targets on http://{host}:{port}/targets")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 @monitoring_app.command("status")
 def monitoring_status(
     config_file: Path = typer.Option(
@@ -479,6 +566,16 @@ def zfs_exporter_apply(
         "--host", "-H",
         help="Deploy to specific host only"
     ),
+    parallel: Optional[int] = typer.Option(
+        None,
+        "--parallel", "-p",
+        help="Hosts deployed concurrently after the canary (default: monitoring.rollout)"
+    ),
+    canary: Optional[bool] = typer.Option(
+        None,
+        "--canary/--no-canary",
+        help="Deploy and verify one host before the rest (default: monitoring.rollout)"
+    ),
 ) -> None:
     """
     Deploy zfs_exporter to Proxmox hosts.
@@ -506,14 +603,18 @@ def zfs_exporter_apply(
             if result.get("error"):
                 console.print(f"   Error: {result['error']}")
         else:
-            results = apply_zfs_exporter(config_file)
-            print_zfs_status_table(results)
+            results = apply_zfs_exporter(config_file, max_parallel=parallel, canary=canary)
+            print_rollout_report(results)
 
             success = sum(1 for r in results if r.get("status") == "success")
             failed = sum(1 for r in results if r.get("status") == "failed")
+            skipped = sum(1 for r in results if r.get("status") == "skipped")
             already = sum(1 for r in results if "already_installed" in r.get("actions", []))
 
-            console.print(f"\n{success} deployed, {already} already installed, {failed} failed")
+            console.print(
+                f"\n{success} deployed, {already} already installed, {failed} failed"
+                + (f", {skipped} skipped after canary failure" if skipped else "")
+            )
 
     except Exception as e:
         console.print(f"Failed: {e}")
@@ -570,28 +671,54 @@ def mirror_apply(
         "--config", "-c",
         help="Cluster configuration file"
     ),
-    host: str = typer.Option(
-        ...,
+    host: Optional[str] = typer.Option(
+        None,
         "--host", "-H",
         help="Proxmox host to configure mirror on"
     ),
+    all_hosts: bool = typer.Option(
+        False,
+        "--all",
+        help="Configure mirrors on every host with zfs_mirrors"
+    ),
     dry_run: bool = typer.Option(
         False,
         "--dry-run",
         help="Show what would be done without making changes"
     ),
+    max_parallel: int = typer.Option(
+        4,
+        "--max-parallel", "-p",
+        help="With --all, hosts attaching mirrors at once"
+    ),
+    wait_resilver: bool = typer.Option(
+        False,
+        "--wait-resilver",
+        help="With --all, keep each host's slot until its resilver finishes"
+    ),
 ) -> None:
     """
-    Apply ZFS mirror configuration to a Proxmox host.
+    Apply ZFS mirror configuration to a Proxmox host, or to every host.
 
     Reads zfs_mirrors from cluster.yaml and performs idempotent
     mirror setup: partition cloning, GUID randomization, boot config,
     mirror attach, and resilver verification.
+    With --all, pre-flights all hosts concurrently, then attaches on
+    up to --max-parallel hosts at once (one pool per host at a time) and
+    prints a per-host timeline.
     """
     if not config_file.exists():
         console.print(f"Config file not found: {config_file}")
         raise typer.Exit(1)
 
+    if all_hosts == (host is not None):
+        console.print("Specify either --host or --all")
+        raise typer.Exit(1)
+
+    if all_hosts:
+        _mirror_apply_fleet(config_file, dry_run, max_parallel, wait_resilver)
+        return
+
     mode = "DRY RUN" if dry_run else "APPLY"
     console.print(f"[bold]ZFS Mirror {mode}[/bold] on {host}")
 
@@ -646,6 +773,36 @@ def mirror_apply(
         raise typer.Exit(1)
 
 
+def _mirror_apply_fleet(config_file: Path, dry_run: bool, max_parallel: int, wait_resilver: bool) -> None:
+    """Apply zfs_mirrors on every configured host and report per-host timelines."""
+    from homelab.zfs_mirror_manager import apply_fleet, print_fleet_timeline
+
+    mode = "DRY RUN" if dry_run else "APPLY"
+    console.print(f"[bold]ZFS Mirror {mode}[/bold] on all hosts (max {max_parallel} at once)")
+
+    try:
+        result = apply_fleet(
+            config_file, dry_run=dry_run, max_parallel=max_parallel, wait_for_resilver=wait_resilver
+        )
+    except Exception as e:
+        console.print(f"Failed: {e}")
+        logger.exception("Mirror fleet apply error")
+        raise typer.Exit(1)
+
+    if not result["hosts"]:
+        console.print("No zfs_mirrors configured")
+        raise typer.Exit(0)
+
+    print_rollout_report(result["hosts"])
+    print_fleet_timeline(result)
+
+    if result["success"]:
+        console.print("\n[green]Mirror operation completed successfully[/green]")
+    else:
+        console.print("\n[red]Mirror operation had failures[/red]")
+        raise typer.Exit(1)
+
+
 @mirror_app.command("status")
 def mirror_status(
     config_file: Path = typer.Option(
@@ -658,11 +815,23 @@ def mirror_status(
         "--host", "-H",
         help="Specific host (default: all hosts with mirrors)"
     ),
+    watch: bool = typer.Option(
+        False,
+        "--watch", "-w",
+        help="Follow resilver/scrub progress (throughput, ETA) until it finishes"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="With --watch, write progress metrics here (node_exporter textfile collector)"
+    ),
 ) -> None:
     """
     Show ZFS mirror status for Proxmox hosts.
 
     Displays mirror topology, resilver progress, and disk status.
+    With --watch, samples scan progress on an adaptive interval and
+    reports smoothed throughput, ETA and throttling.
     """
     if not config_file.exists():
         console.print(f"Config file not found: {config_file}")
@@ -688,6 +857,10 @@ def mirror_status(
             console.print(msg)
             raise typer.Exit(0)
 
+        if watch:
+            _watch_mirrors(config, targets, metrics_file)
+            return
+
         table = Table(title="ZFS Mirror Status")
         table.add_column("Host", style="cyan")
         table.add_column("Pool", style="blue")
@@ -704,6 +877,9 @@ def mirror_status(
                         mirror_icon = "[green]Yes[/green]" if m["is_mirror"] else "[red]No[/red]"
                         disk_count = str(len(m["vdev_disks"]))
                         scan = m["scan"][:50] if m["scan"] else "n/a"
+                        progress = m.get("progress") or {}
+                        if progress.get("state") == "scanning" and progress.get("percent_done") is not None:
+                            scan = f"{progress['function']} {progress['percent_done']:.1f}% done"
                         table.add_row(
                             hostname,
                             m["pool"],
@@ -723,6 +899,229 @@ def mirror_status(
         raise typer.Exit(1)
 
 
+def _watch_mirrors(config: dict, targets: List[str], metrics_file: Optional[Path]) -> None:
+    """Follow scan progress of every configured mirror pool on the targets."""
+    from contextlib import ExitStack
+
+    from homelab.resilver_monitor import (
+        format_bytes, format_duration, format_metrics, watch, write_metrics,
+    )
+    from homelab.zfs_mirror_manager import ZfsMirrorManager
+
+    with ExitStack() as stack:
+        monitors = []
+        mirrors = {node["name"]: node.get("zfs_mirrors", []) for node in config.get("nodes", [])}
+        for hostname in targets:
+            mgr = stack.enter_context(ZfsMirrorManager(hostname, config=config))
+            for pool in dict.fromkeys(m["pool"] for m in mirrors[hostname]):
+                monitors.append((hostname, mgr.resilver_monitor(pool)))
+
+        def report(results: list) -> None:
+            stamp = time.strftime("%H:%M:%S")
+            for (hostname, _), p in zip(monitors, results):
+                if not p.active:
+                    console.print(
+                        f"{stamp} {hostname}/{p.pool}: no scan running ({p.function.lower()} {p.state.lower()})"
+                    )
+                    continue
+                percent = f"{p.percent_done:.1f}%" if p.percent_done is not None else "?"
+                rate = f"{format_bytes(p.issue_rate)}/s" if p.issue_rate is not None else "measuring"
+                throttled = "  [yellow]throttled[/yellow]" if p.throttled else ""
+                console.print(
+                    f"{stamp} {hostname}/{p.pool}: {p.function.lower()} {percent} "
+                    f"({format_bytes(p.issued)} / {format_bytes(p.to_examine)}), "
+                    f"{rate}, ETA {format_duration(p.eta_seconds)}{throttled}"
+                )
+            if metrics_file:
+                write_metrics(metrics_file, format_metrics(
+                    [(hostname, p) for (hostname, _), p in zip(monitors, results)]
+                ))
+
+        try:
+            watch([monitor for _, monitor in monitors], report)
+        except KeyboardInterrupt:
+            console.print("Stopped watching")
+
+
+golden_app = typer.Typer(help="Golden image cache for VM boot disks")
+storage_app.add_typer(golden_app, name="golden")
+
+
+@golden_app.command("list")
+def golden_list(
+    host: str = typer.Option(..., "--host", "-H", help="Proxmox host"),
+    dataset: Optional[str] = typer.Option(None, help="ZFS dataset holding VM disks (default: rpool/data)"),
+) -> None:
+    """List cached golden images and how many VM disks clone each."""
+    from homelab.golden_image import GoldenImageCache
+
+    try:
+        with GoldenImageCache(host, dataset=dataset) as cache:
+            goldens = cache.list_images()
+    except Exception as e:
+        console.print(f"Failed: {e}")
+        raise typer.Exit(1)
+
+    if not goldens:
+        console.print(f"No golden images on {host}")
+        return
+
+    table = Table(title=f"Golden Images on {host}")
+    table.add_column("Dataset", style="cyan")
+    table.add_column("Digest", style="blue")
+    table.add_column("Size")
+    table.add_column("Clones", justify="right")
+    table.add_column("Used", justify="right")
+    table.add_column("Last Used")
+    for golden in goldens:
+        table.add_row(
+            golden.dataset,
+            golden.digest[:12],
+            golden.size,
+            str(golden.clones),
+            f"{golden.used_bytes / 1024**3:.1f} GiB",
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(golden.last_used)) if golden.last_used else "never",
+        )
+    console.print(table)
+
+
+@golden_app.command("gc")
+def golden_gc(
+    host: str = typer.Option(..., "--host", "-H", help="Proxmox host"),
+    max_idle_days: float = typer.Option(14.0, help="Keep goldens used within this many days"),
+    dataset: Optional[str] = typer.Option(None, help="ZFS dataset holding VM disks (default: rpool/data)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show what would be destroyed"),
+) -> None:
+    """Destroy golden images no VM disk clones any more."""
+    from homelab.golden_image import GoldenImageCache
+
+    try:
+        with GoldenImageCache(host, dataset=dataset) as cache:
+            removed = cache.gc(max_idle_days=max_idle_days, dry_run=dry_run)
+    except Exception as e:
+        console.print(f"Failed: {e}")
+        raise typer.Exit(1)
+
+    verb = "Would destroy" if dry_run else "Destroyed"
+    for golden in removed:
+        console.print(f"{verb} {golden.dataset} ({golden.used_bytes / 1024**3:.1f} GiB)")
+    console.print(f"{verb} {len(removed)} golden image(s) on {host}")
+
+
+@storage_app.command("bench")
+def storage_bench(
+    profiles: List[str] = typer.Option(
+        ["read", "write", "randread", "randwrite", "randrw"],
+        "--profile", "-p",
+        help="Workload profile (repeatable): read, write, randread, randwrite, randrw, randread-qd32"
+    ),
+    block_size: Optional[int] = typer.Option(None, "--bs", help="I/O size in bytes (overrides profile)"),
+    queue_depth: Optional[int] = typer.Option(None, "--iodepth", help="Concurrent I/Os (overrides profile)"),
+    read_ratio: Optional[float] = typer.Option(None, "--rwmixread", help="Read fraction 0.0-1.0 (overrides profile)"),
+    duration: float = typer.Option(5.0, "--runtime", help="Seconds per profile"),
+    max_ops: Optional[int] = typer.Option(None, "--ops", help="Stop each profile after this many I/Os"),
+    working_set_mb: int = typer.Option(64, "--size-mb", help="Benchmark disk size in MiB"),
+    replication_factor: Optional[int] = typer.Option(None, "--replication-factor", help="Crucible replicas per volume"),
+    disk_block_size: Optional[int] = typer.Option(
+        None, "--disk-block-size", help="Crucible block size (512/2048/4096)"
+    ),
+    mock_latency_ms: Optional[float] = typer.Option(None, "--mock-latency-ms", help="Simulated sled latency"),
+    mock_failure_rate: Optional[float] = typer.Option(None, "--mock-failure-rate", help="Simulated I/O failure rate"),
+    data_dir: Optional[Path] = typer.Option(None, "--data-dir", help="Use data-bearing sleds backed by this directory"),
+    json_output: Optional[Path] = typer.Option(None, "--json", help="Write results as JSON to this file"),
+    compare: Optional[Path] = typer.Option(None, "--compare", help="Earlier --json output to compare against"),
+) -> None:
+    """
+    Benchmark Crucible storage with fio-style workloads.
+
+    Runs each profile against a fresh disk on the mock Crucible backend and
+    reports IOPS, throughput and p50/p99/p99.9 latency.
+    """
+    from homelab.crucible_bench import (
+        PROFILES,
+        StorageBenchmark,
+        compare_results,
+        create_bench_api,
+        results_to_json,
+    )
+
+    unknown = [name for name in profiles if name not in PROFILES]
+    if unknown:
+        console.print(f"Unknown profile(s): {', '.join(unknown)}")
+        raise typer.Exit(1)
+
+    overrides = {"block_size": block_size, "queue_depth": queue_depth, "read_ratio": read_ratio}
+    workloads = [
+        replace(
+            PROFILES[name],
+            duration_sec=duration,
+            max_ops=max_ops,
+            working_set_bytes=working_set_mb * 1024**2,
+            **{key: value for key, value in overrides.items() if value is not None}
+        )
+        for name in profiles
+    ]
+
+    try:
+        storage_api = create_bench_api(
+            replication_factor=replication_factor,
+            default_block_size=disk_block_size,
+            mock_latency_ms=mock_latency_ms,
+            mock_failure_rate=mock_failure_rate,
+            mock_data_dir=str(data_dir) if data_dir else None,
+        )
+        results = asyncio.run(StorageBenchmark(storage_api).run_suite(workloads))
+    except ValueError as e:
+        console.print(f"Configuration error: {e}")
+        raise typer.Exit(1)
+
+    table = Table(title="Crucible Storage Benchmark")
+    table.add_column("Profile", style="cyan")
+    table.add_column("BS", justify="right")
+    table.add_column("QD", justify="right")
+    table.add_column("IOPS", justify="right", style="green")
+    table.add_column("MiB/s", justify="right", style="green")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right", style="yellow")
+    table.add_column("p99.9 ms", justify="right", style="yellow")
+    table.add_column("Errors", justify="right")
+
+    for result in results:
+        table.add_row(
+            result.profile["name"],
+            str(result.profile["block_size"]),
+            str(result.profile["queue_depth"]),
+            f"{result.iops:.0f}",
+            f"{result.throughput_mib_s:.1f}",
+            f"{result.latency['p50_ms']:.3f}",
+            f"{result.latency['p99_ms']:.3f}",
+            f"{result.latency['p999_ms']:.3f}",
+            str(result.errors),
+        )
+    console.print(table)
+
+    document = results_to_json(results)
+    if json_output:
+        json_output.write_text(json.dumps(document, indent=2))
+        console.print(f"Results written to {json_output}")
+
+    if compare:
+        baseline = json.loads(compare.read_text())
+        diff_table = Table(title=f"Change vs {compare.name}")
+        diff_table.add_column("Profile", style="cyan")
+        diff_table.add_column("IOPS %", justify="right")
+        diff_table.add_column("MiB/s %", justify="right")
+        diff_table.add_column("p99 %", justify="right")
+        diff_table.add_column("p99.9 %", justify="right")
+        for row in compare_results(baseline, document):
+            diff_table.add_row(
+                row["profile"],
+                *(f"{row[key]:+.1f}" if row[key] is not None else "n/a"
+                  for key in ("iops_change_pct", "throughput_change_pct", "p99_change_pct", "p999_change_pct"))
+            )
+        console.print(diff_table)
+
+
 @app.callback()
 def main(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose logging"),
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+src/homelab/host_probe.py
+
+Single-round-trip fact collection over SSH.
+
+A probe is an ordered set of named shell commands. They are folded into one
+composite script that runs every command on the host and prints a single
+JSON document: {"<name>": {"rc": <exit code>, "out": "<base64 stdout>"}}.
+Base64 keeps the document valid JSON with nothing but coreutils on the
+remote side. One exec per host replaces one exec per fact, and
+probe_hosts() runs the per-host probes concurrently.
+
+Usage:
+    from homelab.host_probe import run_probe
+
+    facts = run_probe(manager._execute_command, {
+        "active": "systemctl is-active prometheus-node-exporter",
+        "metrics": "curl -s -o /dev/null -w '%{http_code}' http://localhost:9100/metrics",
+    })
+    stdout, exit_code = facts["active"]
+"""
+
+import base64
+import json
+import logging
+import re
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_WORKERS = 16
+
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# (stdout, stderr, exit_code), as returned by the managers' _execute_command
+Executor = Callable[[str], Tuple[str, str, int]]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def build_probe_script(checks: Dict[str, str]) -> str:
+    """
+    Fold named commands into one shell command that prints a JSON document.
+
+    Args:
+        checks: Fact name -> shell command, in execution order
+
+    Returns:
+        Command line to pass to a single SSH exec
+    """
+    parts = ["printf '{'"]
+    for index, (name, command) in enumerate(checks.items()):
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid probe fact name '{name}'")
+        separator = "," if index else ""
+        parts.append(
+            f"out=$( {{ {command} ; }} 2>/dev/null ); rc=$?; "
+            f"printf '{separator}\"{name}\":{{\"rc\":%d,\"out\":\"%s\"}}' "
+            f"\"$rc\" \"$(printf '%s' \"$out\" | base64 | tr -d '\\n')\""
+        )
+    parts.append("printf '}'")
+    return "sh -c " + shlex.quote("\n".join(parts))
+
+
+def parse_probe_output(stdout: str) -> Dict[str, Tuple[str, int]]:
+    """
+    Decode a probe document into {name: (stdout, exit_code)}.
+
+    Raises:
+        ValueError: If the output is not a probe document
+    """
+    try:
+        document = json.loads(stdout)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Malformed probe output: {e}") from e
+
+    return {
+        name: (base64.b64decode(fact["out"]).decode(errors="replace").strip(), fact["rc"])
+        for name, fact in document.items()
+    }
+
+
+def run_probe(execute: Executor, checks: Dict[str, str]) -> Dict[str, Tuple[str, int]]:
+    """
+    Run all checks on a host in one round trip.
+
+    Args:
+        execute: Function running one command on the host
+        checks: Fact name -> shell command
+
+    Returns:
+        Fact name -> (stdout, exit_code)
+    """
+    stdout, stderr, exit_code = execute(build_probe_script(checks))
+    if exit_code != 0 and not stdout:
+        raise RuntimeError(f"Probe failed ({exit_code}): {stderr}")
+    return parse_probe_output(stdout)
+
+
+def probe_hosts(
+    items: Sequence[T],
+    probe: Callable[[T], R],
+    max_workers: int = DEFAULT_PROBE_WORKERS,
+) -> List[R]:
+    """
+    Run probe(item) for every item concurrently, preserving order.
+
+    Args:
+        items: Hosts (or anything identifying one)
+        probe: Per-host function; should handle its own errors
+        max_workers: Maximum concurrent probes
+
+    Returns:
+        Results in the same order as items
+    """
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(probe, items))
@@ -0,0 +1,109 @@
+"""
+Compact set of half-open byte ranges.
+
+Used to track which parts of a disk an import has covered without keeping
+one entry per written chunk: adjacent and overlapping ranges are merged, so
+a sequential multi-GB import collapses to a single interval.
+"""
+
+import bisect
+from typing import Iterator, List, Optional, Tuple
+
+
+class IntervalSet:
+    """Sorted, non-overlapping set of [start, end) integer ranges."""
+
+    def __init__(self, intervals: Optional[List[Tuple[int, int]]] = None):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in intervals or []:
+            self.add(start, end)
+
+    def add(self, start: int, end: int) -> None:
+        """Add [start, end), merging with any touching or overlapping ranges."""
+        if end <= start:
+            return
+
+        # First interval whose end reaches start, last whose start is within end
+        lo = bisect.bisect_left(self._ends, start)
+        hi = bisect.bisect_right(self._starts, end)
+
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def remove(self, start: int, end: int) -> None:
+        """Remove [start, end), splitting any range that straddles it."""
+        if end <= start:
+            return
+
+        # Intervals that overlap (not merely touch) the removed range
+        lo = bisect.bisect_right(self._ends, start)
+        hi = bisect.bisect_left(self._starts, end)
+        if lo >= hi:
+            return
+
+        kept = []
+        if self._starts[lo] < start:
+            kept.append((self._starts[lo], start))
+        if self._ends[hi - 1] > end:
+            kept.append((end, self._ends[hi - 1]))
+
+        self._starts[lo:hi] = [s for s, _ in kept]
+        self._ends[lo:hi] = [e for _, e in kept]
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if any part of [start, end) is covered."""
+        if end <= start:
+            return False
+        index = bisect.bisect_right(self._ends, start)
+        return index < len(self._starts) and self._starts[index] < end
+
+    def covered_bytes(self) -> int:
+        """Total number of bytes covered."""
+        return sum(end - start for start, end in self)
+
+    def contains(self, start: int, end: int) -> bool:
+        """True if [start, end) is fully covered."""
+        if end <= start:
+            return True
+        index = bisect.bisect_right(self._starts, start) - 1
+        return index >= 0 and self._ends[index] >= end
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Return the uncovered gaps within [start, end)."""
+        gaps = []
+        position = start
+        index = max(bisect.bisect_right(self._starts, start) - 1, 0)
+
+        for interval_start, interval_end in zip(self._starts[index:], self._ends[index:]):
+            if interval_start >= end:
+                break
+            if interval_end <= position:
+                continue
+            if interval_start > position:
+                gaps.append((position, interval_start))
+            position = max(position, interval_end)
+
+        if position < end:
+            gaps.append((position, end))
+        return gaps
+
+    def to_list(self) -> List[Tuple[int, int]]:
+        """Return the intervals as a list of (start, end) tuples."""
+        return list(zip(self._starts, self._ends))
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IntervalSet) and self.to_list() == other.to_list()
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self.to_list()})"
@@ -5,12 +5,15 @@ import logging
 import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+from homelab.kube_client import KubeClient, KubeClientError, get_kube_client
+
 logger = logging.getLogger(__name__)
 
 # Default config path relative to homelab package
@@ -114,6 +117,28 @@ class K3sClusterConfig:
         return self.control_plane_nodes[0] if self.control_plane_nodes else None
 
 
+@dataclass
+class NodeStatus:
+    """Point-in-time status of a single control plane node."""
+    name: str
+    current_tls_san: List[str]
+    k3s_version: str
+    latency_seconds: float
+    error: Optional[str] = None
+
+
+@dataclass
+class ClusterStatusSnapshot:
+    """Consolidated status collected from all control plane nodes."""
+    nodes: Dict[str, NodeStatus]
+    collected_at: float
+    duration_seconds: float
+
+    def get(self, name: str) -> Optional[NodeStatus]:
+        """Get status for a node by name."""
+        return self.nodes.get(name)
+
+
 class K3sManager:
     """
     Config-driven K3s cluster manager.
@@ -129,6 +154,9 @@ class K3sManager:
         config_path: Optional[Path] = None,
         ssh_user: str = "root",
         ssh_timeout: int = 60,
+        max_workers: int = 8,
+        kubeconfig: Optional[Path] = None,
+        kube_client: Optional[KubeClient] = None,
     ):
         """
         Initialize K3s manager.
@@ -137,11 +165,25 @@ class K3sManager:
             config_path: Path to k3s.yaml config file
             ssh_user: SSH user for connecting to Proxmox hosts
             ssh_timeout: SSH command timeout in seconds
+            max_workers: Maximum number of nodes queried concurrently
+            kubeconfig: Path to kubeconfig for cluster API access
+            kube_client: Pre-built Kubernetes client (defaults to the shared one)
         """
         self.config_path = config_path or DEFAULT_K3S_CONFIG_PATH
         self.ssh_user = ssh_user
         self.ssh_timeout = ssh_timeout
+        self.max_workers = max_workers
         self._config: Optional[K3sClusterConfig] = None
+        self._status_snapshot: Optional[ClusterStatusSnapshot] = None
+        self.kubeconfig = kubeconfig or Path.home() / "kubeconfig"
+        self._kube = kube_client
+
+    @property
+    def kube(self) -> KubeClient:
+        """Shared in-process Kubernetes API client."""
+        if self._kube is None:
+            self._kube = get_kube_client(self.kubeconfig)
+        return self._kube
 
     @property
     def config(self) -> K3sClusterConfig:
@@ -153,6 +195,65 @@ class K3sManager:
     def reload_config(self) -> None:
         """Force reload of configuration."""
         self._config = K3sClusterConfig.from_yaml(self.config_path)
+        self._status_snapshot = None
+
+    def _collect_node_status(self, node: ControlPlaneNode) -> NodeStatus:
+        """Query TLS-SAN and K3s version from one node, timing the round trips."""
+        start = time.monotonic()
+        try:
+            current_san = self.get_current_tls_san(node)
+            version = self.get_node_k3s_version(node)
+            error = None
+        except Exception as e:
+            current_san, version, error = [], "", str(e)
+
+        return NodeStatus(
+            name=node.name,
+            current_tls_san=current_san,
+            k3s_version=version,
+            latency_seconds=time.monotonic() - start,
+            error=error,
+        )
+
+    def collect_status(self, refresh: bool = False) -> ClusterStatusSnapshot:
+        """
+        Collect status from all control plane nodes concurrently.
+
+        The snapshot is cached on the manager so later steps in the same
+        invocation reuse it instead of re-querying every node.
+
+        Args:
+            refresh: If True, ignore any cached snapshot and query nodes again
+
+        Returns:
+            ClusterStatusSnapshot with per-node TLS-SAN, version and latency
+        """
+        if self._status_snapshot is not None and not refresh:
+            return self._status_snapshot
+
+        nodes = self.config.control_plane_nodes
+        start = time.monotonic()
+        collected: List[NodeStatus] = []
+
+        if nodes:
+            workers = max(1, min(self.max_workers, len(nodes)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                collected = list(executor.map(self._collect_node_status, nodes))
+
+        self._status_snapshot = ClusterStatusSnapshot(
+            nodes={node_status.name: node_status for node_status in collected},
+            collected_at=time.time(),
+            duration_seconds=time.monotonic() - start,
+        )
+        logger.debug(
+            f"Collected status from {len(collected)} nodes in "
+            f"{self._status_snapshot.duration_seconds:.2f}s"
+        )
+        return self._status_snapshot
+
+    def invalidate_status_cache(self) -> None:
+        """Drop the cached status snapshot after a change to node state."""
+        self._status_snapshot = None
 
     def _run_qm_exec(
         self, proxmox_host: str, vmid: str, command: str, check: bool = True
@@ -254,32 +355,18 @@ class K3sManager:
             True if node exists in cluster
         """
         try:
-            result = subprocess.run(
-                ["kubectl", "get", "nodes", "-o", "json"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                logger.error(f"kubectl error: {result.stderr}")
-                return False
-
-            nodes_data = json.loads(result.stdout)
-            node_names = [n["metadata"]["name"] for n in nodes_data.get("items", [])]
-
-            exists = node_name in node_names
-            if exists:
-                logger.info(f"Node {node_name} in cluster")
-            else:
-                logger.info(f"Node {node_name} not in cluster")
-
-            return exists
-
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, KeyError) as e:
+            exists = node_name in self.kube.list_node_names()
+        except Exception as e:
             logger.error(f"Error checking cluster: {e}")
             return False
 
+        if exists:
+            logger.info(f"Node {node_name} in cluster")
+        else:
+            logger.info(f"Node {node_name} not in cluster")
+
+        return exists
+
     def install_k3s(self, vm_hostname: str, token: str, server_url: str) -> bool:
         """
         Install k3s on VM and join to cluster.
@@ -381,13 +468,20 @@ class K3sManager:
         if self.config.server_config.get("write_kubeconfig_mode"):
             desired_config["write-kubeconfig-mode"] = self.config.server_config["write_kubeconfig_mode"]
 
+        # A single node is only queried itself (reusing a cached snapshot if any)
+        snapshot = self._status_snapshot if node_name else self.collect_status()
+        changed = False
+
         for node in nodes_to_configure:
             if node is None:
                 continue
 
             logger.info(f"Configuring TLS-SAN on {node.name}")
 
-            current_san = self.get_current_tls_san(node)
+            node_status = snapshot.get(node.name) if snapshot else None
+            current_san = (
+                node_status.current_tls_san if node_status else self.get_current_tls_san(node)
+            )
             # Only update if VIP is missing - don't re-rotate for other SAN differences
             vip_in_current = self.config.control_plane_vip in current_san
             needs_update = not vip_in_current
@@ -428,6 +522,7 @@ class K3sManager:
                     logger.info(f"  {node.name}: TLS-SAN configured")
                     node_result["action"] = "updated"
                     node_result["requires_restart"] = True
+                    changed = True
 
                 except K3sOperationError as e:
                     logger.error(f"  {node.name}: Failed to configure TLS-SAN: {e}")
@@ -437,6 +532,9 @@ class K3sManager:
 
             results["nodes"][node.name] = node_result
 
+        if changed:
+            self.invalidate_status_cache()
+
         return results
 
     def rotate_api_certificates(
@@ -494,6 +592,7 @@ class K3sManager:
                     )
                     logger.info(f"  {node.name}: Certificate rotated, waiting for K3s...")
                     node_result["action"] = "rotated"
+                    self.invalidate_status_cache()
 
                     # Wait for K3s to come back up
                     import time
@@ -703,6 +802,9 @@ class K3sManager:
         """
         Drain a K3s node before upgrade.
 
+        Cordons the node and evicts pods through the Eviction API, skipping
+        DaemonSet and static pods.
+
         Args:
             node_name: K3s node name
             timeout: Drain timeout in seconds
@@ -710,29 +812,14 @@ class K3sManager:
         Returns:
             True if drain succeeded
         """
-        cmd = [
-            "kubectl",
-            "--kubeconfig", str(Path.home() / "kubeconfig"),
-            "drain", node_name,
-            "--ignore-daemonsets",
-            "--delete-emptydir-data",
-            f"--timeout={timeout}s",
-        ]
-
         logger.info(f"Draining node {node_name}...")
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout + 30,
-            )
-            if result.returncode != 0:
-                logger.error(f"Drain failed: {result.stderr}")
+            if not self.kube.drain_node(node_name, timeout=timeout):
+                logger.error(f"Drain timeout for {node_name}")
                 return False
             return True
-        except subprocess.TimeoutExpired:
-            logger.error(f"Drain timeout for {node_name}")
+        except KubeClientError as e:
+            logger.error(f"Drain failed: {e}")
             return False
 
     def uncordon_node(self, node_name: str) -> bool:
@@ -745,61 +832,35 @@ class K3sManager:
         Returns:
             True if uncordon succeeded
         """
-        cmd = [
-            "kubectl",
-            "--kubeconfig", str(Path.home() / "kubeconfig"),
-            "uncordon", node_name,
-        ]
-
         logger.info(f"Uncordoning node {node_name}...")
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode != 0:
-                logger.error(f"Uncordon failed: {result.stderr}")
-                return False
+            self.kube.set_unschedulable(node_name, False)
             return True
-        except subprocess.TimeoutExpired:
-            logger.error(f"Uncordon timeout for {node_name}")
+        except KubeClientError as e:
+            logger.error(f"Uncordon failed: {e}")
             return False
 
-    def wait_for_node_ready(
-        self, node_name: str, timeout: int = 120, interval: int = 10
-    ) -> bool:
+    def wait_for_node_ready(self, node_name: str, timeout: int = 120) -> bool:
         """
         Wait for a node to become Ready.
 
+        Blocks on node watch events rather than polling.
+
         Args:
             node_name: K3s node name
             timeout: Maximum wait time in seconds
-            interval: Check interval in seconds
 
         Returns:
             True if node became Ready within timeout
         """
         logger.info(f"Waiting for {node_name} to become Ready...")
-        start = time.time()
-
-        while time.time() - start < timeout:
-            try:
-                result = subprocess.run(
-                    [
-                        "kubectl",
-                        "--kubeconfig", str(Path.home() / "kubeconfig"),
-                        "get", "node", node_name,
-                        "-o", "jsonpath={.status.conditions[?(@.type=='Ready')].status}",
-                    ],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                )
-                if result.stdout.strip() == "True":
-                    logger.info(f"  {node_name} is Ready")
-                    return True
-            except subprocess.TimeoutExpired:
-                pass
-
-            logger.info(f"  Waiting... ({int(time.time() - start)}s)")
-            time.sleep(interval)
+        try:
+            if self.kube.wait_for_node_ready(node_name, timeout=timeout):
+                logger.info(f"  {node_name} is Ready")
+                return True
+        except KubeClientError as e:
+            logger.error(f"Error watching {node_name}: {e}")
+            return False
 
         logger.error(f"Timeout waiting for {node_name} to become Ready")
         return False
@@ -883,6 +944,9 @@ class K3sManager:
             self.uncordon_node(node.name)
             return result
 
+        # The node's version changes from here on, whatever the outcome
+        self.invalidate_status_cache()
+
         # 2b. Poll for upgrade completion (check version every 10s for up to 2 minutes)
         logger.info(f"  {node.name}: Waiting for upgrade to complete...")
         upgrade_timeout = 120
@@ -998,14 +1062,17 @@ class K3sManager:
 
         return results
 
-    def status(self) -> Dict[str, Any]:
+    def status(self, refresh: bool = False) -> Dict[str, Any]:
         """Get current K3s cluster and kube-vip readiness status."""
+        snapshot = self.collect_status(refresh=refresh)
+
         status = {
             "config": {
                 "control_plane_vip": self.config.control_plane_vip,
                 "kube_vip_enabled": self.config.kube_vip.enabled,
                 "tls_san": self.config.tls_san,
             },
+            "collection_seconds": round(snapshot.duration_seconds, 3),
             "nodes": {},
         }
 
@@ -1017,10 +1084,14 @@ class K3sManager:
                 "is_primary": node.is_primary,
             }
 
-            # Check current TLS-SAN
-            current_san = self.get_current_tls_san(node)
+            collected = snapshot.get(node.name)
+            current_san = collected.current_tls_san if collected else []
             node_status["current_tls_san"] = current_san
             node_status["vip_in_san"] = self.config.control_plane_vip in current_san
+            node_status["k3s_version"] = collected.k3s_version if collected else ""
+            node_status["latency_seconds"] = round(collected.latency_seconds, 3) if collected else None
+            if collected and collected.error:
+                node_status["error"] = collected.error
 
             status["nodes"][node.name] = node_status
 
@@ -1059,13 +1130,12 @@ def main() -> None:
         print("\nNodes:")
         for name, info in status["nodes"].items():
             vip_status = "YES" if info["vip_in_san"] else "NO"
-            # Get live version from node
-            node = manager.config.get_node(name)
-            live_version = manager.get_node_k3s_version(node) if node else "unknown"
             print(f"  {name}:")
             print(f"    IP: {info['ip']}")
-            print(f"    K3s Version: {live_version}")
+            print(f"    K3s Version: {info['k3s_version'] or 'unknown'}")
             print(f"    VIP in cert: {vip_status}")
+            print(f"    Query latency: {info['latency_seconds']}s")
+        print(f"\nCollected in {status['collection_seconds']}s")
 
     elif command == "configure-tls-san":
         result = manager.configure_tls_san(dry_run=dry_run)
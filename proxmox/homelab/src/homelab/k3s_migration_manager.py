@@ -12,30 +12,49 @@ Handles:
 All operations are idempotent and safe to re-run.
 """
 
-import json
 import logging
 import subprocess
 import time
+from pathlib import Path
 from typing import Dict, List, Optional
 
+from homelab.kube_client import KubeClient, KubeClientError, get_kube_client, node_is_ready
+
 logger = logging.getLogger(__name__)
 
 
 class K3sMigrationManager:
     """Manages K3s cluster node operations and migrations."""
 
-    def __init__(self, vm_hostname: str, existing_node_ip: str):
+    def __init__(
+        self,
+        vm_hostname: str,
+        existing_node_ip: str,
+        kubeconfig: Optional[Path] = None,
+        kube_client: Optional[KubeClient] = None,
+    ):
         """
         Initialize K3s migration manager.
 
         Args:
             vm_hostname: Hostname of new VM (e.g., 'k3s-vm-pumped-piglet')
             existing_node_ip: IP of existing K3s node for join token
+            kubeconfig: Path to kubeconfig, or None for the default loading rules
+            kube_client: Pre-built Kubernetes client (defaults to the shared one)
         """
         self.vm_hostname = vm_hostname
         self.existing_node_ip = existing_node_ip
+        self.kubeconfig = kubeconfig
+        self._kube = kube_client
         self.logger = logger
 
+    @property
+    def kube(self) -> KubeClient:
+        """Shared in-process Kubernetes API client."""
+        if self._kube is None:
+            self._kube = get_kube_client(self.kubeconfig)
+        return self._kube
+
     def node_in_cluster(self, node_name: str) -> bool:
         """
         Check if node is already in K3s cluster.
@@ -47,32 +66,18 @@ class K3sMigrationManager:
             True if node is in cluster
         """
         try:
-            result = subprocess.run(
-                ["kubectl", "get", "nodes", "-o", "json"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-
-            if result.returncode != 0:
-                self.logger.error(f"kubectl error: {result.stderr}")
-                return False
-
-            nodes_data = json.loads(result.stdout)
-            node_names = [n["metadata"]["name"] for n in nodes_data.get("items", [])]
-
-            exists = node_name in node_names
-            if exists:
-                self.logger.info(f"✅ Node {node_name} already in cluster")
-            else:
-                self.logger.info(f"Node {node_name} not in cluster")
-
-            return exists
-
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, KeyError) as e:
+            exists = node_name in self.kube.list_node_names()
+        except Exception as e:
             self.logger.error(f"Error checking cluster membership: {e}")
             return False
 
+        if exists:
+            self.logger.info(f"✅ Node {node_name} already in cluster")
+        else:
+            self.logger.info(f"Node {node_name} not in cluster")
+
+        return exists
+
     def get_node_status(self, node_name: str) -> Optional[Dict[str, str]]:
         """
         Get K3s node status.
@@ -84,37 +89,26 @@ class K3sMigrationManager:
             Dictionary with node status or None
         """
         try:
-            result = subprocess.run(
-                ["kubectl", "get", "node", node_name, "-o", "json"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-
-            if result.returncode != 0:
-                return None
+            node_data = self.kube.get_node(node_name)
+        except Exception as e:
+            self.logger.error(f"Error getting node status: {e}")
+            return None
 
-            node_data = json.loads(result.stdout)
-            conditions = node_data.get("status", {}).get("conditions", [])
+        if node_data is None:
+            return None
 
-            # Find Ready condition
-            ready_condition = next(
-                (c for c in conditions if c["type"] == "Ready"), None
-            )
+        labels = node_data["metadata"].get("labels", {})
+        roles = [
+            key.split("/", 1)[1] for key in labels
+            if key.startswith("node-role.kubernetes.io/")
+        ]
 
-            return {
-                "name": node_data["metadata"]["name"],
-                "status": ready_condition["status"] if ready_condition else "Unknown",
-                "roles": ",".join(
-                    node_data["metadata"].get("labels", {}).get(
-                        "node-role.kubernetes.io", ""
-                    ).split(",")
-                ),
-            }
-
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, KeyError) as e:
-            self.logger.error(f"Error getting node status: {e}")
-            return None
+        return {
+            "name": node_data["metadata"]["name"],
+            "status": "True" if node_is_ready(node_data) else "False",
+            "roles": ",".join(roles),
+            "unschedulable": "true" if node_data.get("spec", {}).get("unschedulable") else "false",
+        }
 
     def get_join_token(self) -> str:
         """
@@ -303,24 +297,12 @@ class K3sMigrationManager:
             node_name: K3s node name
             labels: Dictionary of labels to apply
         """
-        for key, value in labels.items():
-            try:
-                subprocess.run(
-                    [
-                        "kubectl",
-                        "label",
-                        "node",
-                        node_name,
-                        f"{key}={value}",
-                        "--overwrite",
-                    ],
-                    check=True,
-                    capture_output=True,
-                    timeout=30,
-                )
+        try:
+            self.kube.label_node(node_name, labels)
+            for key, value in labels.items():
                 self.logger.info(f"✅ Applied label {key}={value} to {node_name}")
-            except subprocess.CalledProcessError as e:
-                self.logger.error(f"Error applying label {key}={value}: {e.stderr}")
+        except KubeClientError as e:
+            self.logger.error(f"Error applying labels {labels}: {e}")
 
     def taint_node(
         self, node_name: str, key: str, value: str, effect: str = "NoSchedule"
@@ -336,19 +318,12 @@ class K3sMigrationManager:
         """
         taint_str = f"{key}={value}:{effect}"
         try:
-            subprocess.run(
-                ["kubectl", "taint", "node", node_name, taint_str, "--overwrite"],
-                check=True,
-                capture_output=True,
-                timeout=30,
-            )
-            self.logger.info(f"✅ Applied taint {taint_str} to {node_name}")
-        except subprocess.CalledProcessError as e:
-            # Ignore error if taint already exists
-            if "already has" in e.stderr.decode():
-                self.logger.info(f"✅ Taint {taint_str} already exists on {node_name}")
+            if self.kube.taint_node(node_name, key, value, effect):
+                self.logger.info(f"✅ Applied taint {taint_str} to {node_name}")
             else:
-                self.logger.error(f"Error applying taint: {e.stderr}")
+                self.logger.info(f"✅ Taint {taint_str} already exists on {node_name}")
+        except KubeClientError as e:
+            self.logger.error(f"Error applying taint: {e}")
 
     def cordon_node(self, node_name: str) -> bool:
         """
@@ -361,42 +336,16 @@ class K3sMigrationManager:
             True if node was cordoned, False if already cordoned
         """
         try:
-            # Check if already cordoned
-            node_status = self.get_node_status(node_name)
-            if node_status:
-                # Check if node has unschedulable spec
-                result = subprocess.run(
-                    [
-                        "kubectl",
-                        "get",
-                        "node",
-                        node_name,
-                        "-o",
-                        "jsonpath={.spec.unschedulable}",
-                    ],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                )
-
-                if result.stdout.strip() == "true":
-                    self.logger.info(f"✅ Node {node_name} already cordoned")
-                    return False
-
-            # Cordon the node
-            subprocess.run(
-                ["kubectl", "cordon", node_name],
-                check=True,
-                capture_output=True,
-                timeout=30,
-            )
-            self.logger.info(f"✅ Cordoned node {node_name}")
-            return True
-
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Error cordoning node: {e.stderr}")
+            if not self.kube.set_unschedulable(node_name, True):
+                self.logger.info(f"✅ Node {node_name} already cordoned")
+                return False
+        except KubeClientError as e:
+            self.logger.error(f"Error cordoning node: {e}")
             raise
 
+        self.logger.info(f"✅ Cordoned node {node_name}")
+        return True
+
     def delete_stuck_pods(self, node_name: str) -> List[str]:
         """
         Delete pods stuck in Terminating or Pending state on a node.
@@ -408,54 +357,28 @@ class K3sMigrationManager:
             List of deleted pod names
         """
         try:
-            # Get all pods on the node
-            result = subprocess.run(
-                [
-                    "kubectl",
-                    "get",
-                    "pods",
-                    "-A",
-                    "--field-selector",
-                    f"spec.nodeName={node_name}",
-                    "-o",
-                    "json",
-                ],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30,
-            )
-
-            pods_data = json.loads(result.stdout)
-            deleted_pods = []
-
-            for pod in pods_data.get("items", []):
-                namespace = pod["metadata"]["namespace"]
-                name = pod["metadata"]["name"]
-                phase = pod["status"].get("phase", "Unknown")
-
-                # Delete if Terminating or Pending
-                if phase in ["Terminating", "Pending", "Unknown"]:
-                    self.logger.info(f"Deleting stuck pod {namespace}/{name} ({phase})")
-                    subprocess.run(
-                        [
-                            "kubectl",
-                            "delete",
-                            "pod",
-                            "-n",
-                            namespace,
-                            name,
-                            "--force",
-                            "--grace-period=0",
-                        ],
-                        capture_output=True,
-                        timeout=60,
-                    )
-                    deleted_pods.append(f"{namespace}/{name}")
-
-            self.logger.info(f"✅ Deleted {len(deleted_pods)} stuck pods from {node_name}")
-            return deleted_pods
-
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+            pods = self.kube.list_pods_on_node(node_name, include_finished=False)
+        except KubeClientError as e:
             self.logger.error(f"Error deleting stuck pods: {e}")
             return []
+
+        deleted_pods = []
+        for pod in pods:
+            namespace = pod["metadata"]["namespace"]
+            name = pod["metadata"]["name"]
+            phase = pod.get("status", {}).get("phase", "Unknown")
+            terminating = pod["metadata"].get("deletionTimestamp") is not None
+
+            # Terminating is not a phase; it shows up as a deletionTimestamp
+            if terminating or phase in ["Pending", "Unknown"]:
+                state = "Terminating" if terminating else phase
+                self.logger.info(f"Deleting stuck pod {namespace}/{name} ({state})")
+                try:
+                    self.kube.delete_pod(namespace, name, grace_period=0)
+                except KubeClientError as e:
+                    self.logger.error(f"Error deleting pod {namespace}/{name}: {e}")
+                    continue
+                deleted_pods.append(f"{namespace}/{name}")
+
+        self.logger.info(f"✅ Deleted {len(deleted_pods)} stuck pods from {node_name}")
+        return deleted_pods
@@ -0,0 +1,499 @@
+"""
+Shared in-process Kubernetes API client for K3s managers.
+
+Replaces per-call kubectl subprocesses with a single CoreV1Api client:
+- Watch-backed node cache (one list, then incremental watch events)
+- Server-side field selectors for pod lookups
+- Eviction API for node drains
+- Event-driven waits instead of sleep loops
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from kubernetes import client as k8s_client
+from kubernetes import config as k8s_config
+from kubernetes import watch as k8s_watch
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+# Phases that no longer occupy a node and never need eviction
+_FINISHED_POD_PHASES = ("Succeeded", "Failed")
+
+
+class KubeClientError(Exception):
+    """Raised when a Kubernetes API operation fails."""
+    pass
+
+
+def _object_key(obj: Dict[str, Any]) -> str:
+    """Build a namespace/name cache key for a raw Kubernetes object."""
+    metadata = obj.get("metadata", {})
+    namespace = metadata.get("namespace")
+    name = metadata.get("name", "")
+    return f"{namespace}/{name}" if namespace else name
+
+
+def node_is_ready(node: Dict[str, Any]) -> bool:
+    """Return True if the node's Ready condition is True."""
+    conditions = node.get("status", {}).get("conditions", [])
+    ready = next((c for c in conditions if c.get("type") == "Ready"), None)
+    return bool(ready and ready.get("status") == "True")
+
+
+class ResourceCache:
+    """
+    Watch-backed cache of raw Kubernetes objects.
+
+    Performs one full list to seed the cache and then applies watch events
+    from a background thread. Waiters block on a condition variable and are
+    woken on every change, so no caller has to poll the API server.
+    """
+
+    def __init__(
+        self,
+        list_func: Callable[..., Any],
+        watch_factory: Callable[[], Any],
+        watch_timeout: int = 300,
+        **list_kwargs: Any,
+    ):
+        """
+        Initialize resource cache.
+
+        Args:
+            list_func: CoreV1Api list method (e.g. list_node)
+            watch_factory: Callable returning a kubernetes Watch object
+            watch_timeout: Server-side timeout for each watch request in seconds
+            list_kwargs: Extra arguments for list_func (e.g. field_selector)
+        """
+        self._list_func = list_func
+        self._watch_factory = watch_factory
+        self._watch_timeout = watch_timeout
+        self._list_kwargs = list_kwargs
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        self._resource_version: Optional[str] = None
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watcher: Any = None
+
+    def _relist(self) -> None:
+        """Replace the cache contents with a fresh list from the API server."""
+        response = self._list_func(_preload_content=False, **self._list_kwargs)
+        data = json.loads(response.data)
+        with self._cond:
+            self._objects = {_object_key(item): item for item in data.get("items", [])}
+            self._resource_version = data.get("metadata", {}).get("resourceVersion")
+            self._cond.notify_all()
+
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        """Apply a single watch event to the cache."""
+        obj = event.get("raw_object") or {}
+        event_type = event.get("type")
+
+        with self._cond:
+            if event_type == "BOOKMARK" or obj.get("kind") == "Status":
+                pass
+            elif event_type == "DELETED":
+                self._objects.pop(_object_key(obj), None)
+            elif event_type in ("ADDED", "MODIFIED"):
+                self._objects[_object_key(obj)] = obj
+
+            version = obj.get("metadata", {}).get("resourceVersion")
+            if version and obj.get("kind") != "Status":
+                self._resource_version = version
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """Watch loop; relists when the stored resourceVersion has expired."""
+        while not self._stop.is_set():
+            self._watcher = self._watch_factory()
+            try:
+                for event in self._watcher.stream(
+                    self._list_func,
+                    resource_version=self._resource_version,
+                    timeout_seconds=self._watch_timeout,
+                    **self._list_kwargs,
+                ):
+                    if self._stop.is_set():
+                        return
+                    if event.get("raw_object", {}).get("code") == 410:
+                        self._relist()
+                        break
+                    self._apply_event(event)
+            except ApiException as e:
+                if self._stop.is_set():
+                    return
+                if e.status == 410:
+                    self._relist()
+                else:
+                    logger.warning(f"Watch error, retrying: {e}")
+                    self._stop.wait(1)
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                logger.warning(f"Watch stream failed, relisting: {e}")
+                self._stop.wait(1)
+                try:
+                    self._relist()
+                except Exception as relist_error:
+                    logger.debug(f"Relist failed: {relist_error}")
+
+    def start(self) -> "ResourceCache":
+        """Seed the cache and start the background watch thread."""
+        if self._thread is None:
+            self._relist()
+            self._thread = threading.Thread(target=self._run, name="kube-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background watch thread."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.stop()
+        with self._cond:
+            self._cond.notify_all()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached object by namespace/name (or name for cluster-scoped)."""
+        with self._cond:
+            return self._objects.get(key)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Return a snapshot of all cached objects."""
+        with self._cond:
+            return list(self._objects.values())
+
+    def wait_for(self, predicate: Callable[["ResourceCache"], bool], timeout: float) -> bool:
+        """
+        Block until predicate(cache) is True or the timeout expires.
+
+        Args:
+            predicate: Called with the cache each time a watch event arrives
+            timeout: Maximum wait time in seconds
+
+        Returns:
+            True if the predicate was satisfied within timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                # Predicate reads through get()/items(), which re-acquire the lock
+                if predicate(self):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return False
+                self._cond.wait(remaining)
+
+
+class KubeClient:
+    """
+    In-process Kubernetes client shared by K3s managers.
+
+    Loads kubeconfig once and keeps a watch-backed node cache, so repeated
+    node lookups are served from memory instead of re-fetching the node list.
+    """
+
+    def __init__(
+        self,
+        kubeconfig: Optional[Path] = None,
+        core_api: Any = None,
+        watch_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Initialize Kubernetes client.
+
+        Args:
+            kubeconfig: Path to kubeconfig, or None for the default loading rules
+            core_api: Pre-built CoreV1Api (mainly for testing)
+            watch_factory: Callable returning a Watch object (mainly for testing)
+        """
+        self.kubeconfig = kubeconfig
+        self._core = core_api
+        self._watch_factory = watch_factory or k8s_watch.Watch
+        self._node_cache: Optional[ResourceCache] = None
+        self._lock = threading.Lock()
+
+    @property
+    def core(self) -> Any:
+        """Lazy-load CoreV1Api from kubeconfig (or in-cluster config)."""
+        if self._core is None:
+            with self._lock:
+                if self._core is None:
+                    try:
+                        if self.kubeconfig and Path(self.kubeconfig).exists():
+                            k8s_config.load_kube_config(config_file=str(self.kubeconfig))
+                        else:
+                            try:
+                                k8s_config.load_kube_config()
+                            except k8s_config.ConfigException:
+                                k8s_config.load_incluster_config()
+                    except k8s_config.ConfigException as e:
+                        raise KubeClientError(f"Could not load Kubernetes config: {e}")
+                    self._core = k8s_client.CoreV1Api()
+        return self._core
+
+    @property
+    def nodes(self) -> ResourceCache:
+        """Watch-backed node cache, started on first use."""
+        if self._node_cache is None:
+            with self._lock:
+                if self._node_cache is None:
+                    self._node_cache = ResourceCache(
+                        self.core.list_node, self._watch_factory
+                    ).start()
+        return self._node_cache
+
+    def close(self) -> None:
+        """Stop background watches."""
+        if self._node_cache is not None:
+            self._node_cache.stop()
+            self._node_cache = None
+
+    # =========================================================================
+    # Nodes
+    # =========================================================================
+
+    def list_node_names(self) -> List[str]:
+        """Return names of all nodes in the cluster."""
+        return [node["metadata"]["name"] for node in self.nodes.items()]
+
+    def get_node(self, node_name: str) -> Optional[Dict[str, Any]]:
+        """Return the raw node object from cache, or None if absent."""
+        return self.nodes.get(node_name)
+
+    def wait_for_node_ready(self, node_name: str, timeout: float = 120) -> bool:
+        """
+        Wait for a node to report Ready, driven by watch events.
+
+        Args:
+            node_name: K3s node name
+            timeout: Maximum wait time in seconds
+
+        Returns:
+            True if node became Ready within timeout
+        """
+        def ready(cache: ResourceCache) -> bool:
+            node = cache.get(node_name)
+            return node is not None and node_is_ready(node)
+
+        return self.nodes.wait_for(ready, timeout)
+
+    def set_unschedulable(self, node_name: str, unschedulable: bool) -> bool:
+        """
+        Cordon or uncordon a node.
+
+        Args:
+            node_name: K3s node name
+            unschedulable: True to cordon, False to uncordon
+
+        Returns:
+            True if the node was changed, False if already in that state
+        """
+        node = self.get_node(node_name)
+        if node is not None and bool(node.get("spec", {}).get("unschedulable")) == unschedulable:
+            return False
+
+        try:
+            self.core.patch_node(node_name, {"spec": {"unschedulable": unschedulable or None}})
+        except ApiException as e:
+            raise KubeClientError(f"Failed to patch node {node_name}: {e.reason}")
+        return True
+
+    def label_node(self, node_name: str, labels: Dict[str, str]) -> None:
+        """Apply labels to a node in a single patch (overwrites existing values)."""
+        try:
+            self.core.patch_node(node_name, {"metadata": {"labels": labels}})
+        except ApiException as e:
+            raise KubeClientError(f"Failed to label node {node_name}: {e.reason}")
+
+    def taint_node(self, node_name: str, key: str, value: str, effect: str) -> bool:
+        """
+        Add or replace a taint on a node.
+
+        Returns:
+            True if the node was changed, False if the taint already existed
+        """
+        node = self.get_node(node_name)
+        if node is None:
+            raise KubeClientError(f"Node {node_name} not found")
+
+        taint = {"key": key, "value": value, "effect": effect}
+        existing = node.get("spec", {}).get("taints") or []
+        if taint in existing:
+            return False
+
+        # Same key+effect is replaced, matching kubectl taint --overwrite
+        taints = [t for t in existing if (t.get("key"), t.get("effect")) != (key, effect)]
+        taints.append(taint)
+        try:
+            self.core.patch_node(node_name, {"spec": {"taints": taints}})
+        except ApiException as e:
+            raise KubeClientError(f"Failed to taint node {node_name}: {e.reason}")
+        return True
+
+    # =========================================================================
+    # Pods
+    # =========================================================================
+
+    def list_pods_on_node(self, node_name: str, include_finished: bool = True) -> List[Dict[str, Any]]:
+        """
+        List pods scheduled on a node using a server-side field selector.
+
+        Args:
+            node_name: K3s node name
+            include_finished: If False, exclude Succeeded/Failed pods server-side
+
+        Returns:
+            List of raw pod objects
+        """
+        selector = f"spec.nodeName={node_name}"
+        if not include_finished:
+            selector += "".join(f",status.phase!={phase}" for phase in _FINISHED_POD_PHASES)
+
+        try:
+            response = self.core.list_pod_for_all_namespaces(
+                field_selector=selector, _preload_content=False
+            )
+        except ApiException as e:
+            raise KubeClientError(f"Failed to list pods on {node_name}: {e.reason}")
+        return json.loads(response.data).get("items", [])
+
+    def delete_pod(self, namespace: str, name: str, grace_period: int = 0) -> bool:
+        """
+        Delete a pod.
+
+        Returns:
+            True if deleted, False if it was already gone
+        """
+        try:
+            self.core.delete_namespaced_pod(name, namespace, grace_period_seconds=grace_period)
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                return False
+            raise KubeClientError(f"Failed to delete pod {namespace}/{name}: {e.reason}")
+
+    def evict_pod(self, namespace: str, name: str) -> bool:
+        """
+        Evict a pod through the Eviction API (honors PodDisruptionBudgets).
+
+        Returns:
+            True if evicted or already gone, False if blocked by a disruption budget
+        """
+        body = {
+            "apiVersion": "policy/v1",
+            "kind": "Eviction",
+            "metadata": {"name": name, "namespace": namespace},
+        }
+        try:
+            self.core.create_namespaced_pod_eviction(name, namespace, body)
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                return True
+            if e.status == 429:
+                return False
+            raise KubeClientError(f"Failed to evict pod {namespace}/{name}: {e.reason}")
+
+    @staticmethod
+    def _is_drainable(pod: Dict[str, Any]) -> bool:
+        """Skip DaemonSet-managed and static (mirror) pods, like kubectl drain."""
+        metadata = pod.get("metadata", {})
+        if "kubernetes.io/config.mirror" in (metadata.get("annotations") or {}):
+            return False
+        owners = metadata.get("ownerReferences") or []
+        return not any(owner.get("kind") == "DaemonSet" for owner in owners)
+
+    def _wait_for_pods_gone(self, node_name: str, pending: set, timeout: float) -> bool:
+        """Watch pods on a node until every key in pending has been deleted."""
+        if not pending:
+            return True
+
+        deadline = time.monotonic() + timeout
+        watcher = self._watch_factory()
+        selector = f"spec.nodeName={node_name}"
+
+        while pending and time.monotonic() < deadline:
+            # Re-check current state so deletions before the watch started are seen
+            current = {_object_key(p) for p in self.list_pods_on_node(node_name)}
+            pending &= current
+            if not pending:
+                break
+            for event in watcher.stream(
+                self.core.list_pod_for_all_namespaces,
+                field_selector=selector,
+                timeout_seconds=max(1, int(deadline - time.monotonic())),
+            ):
+                if event.get("type") == "DELETED":
+                    pending.discard(_object_key(event.get("raw_object") or {}))
+                if not pending or time.monotonic() >= deadline:
+                    watcher.stop()
+                    break
+
+        return not pending
+
+    def drain_node(self, node_name: str, timeout: float = 120) -> bool:
+        """
+        Cordon a node and evict its pods, waiting for them to terminate.
+
+        Equivalent to kubectl drain --ignore-daemonsets --delete-emptydir-data.
+
+        Args:
+            node_name: K3s node name
+            timeout: Overall drain timeout in seconds
+
+        Returns:
+            True if all evictable pods left the node within timeout
+        """
+        deadline = time.monotonic() + timeout
+        self.set_unschedulable(node_name, True)
+
+        pods = [
+            p for p in self.list_pods_on_node(node_name, include_finished=False)
+            if self._is_drainable(p)
+        ]
+        remaining = {
+            _object_key(p): (p["metadata"]["namespace"], p["metadata"]["name"]) for p in pods
+        }
+        evicted: set = set()
+
+        # Retry evictions blocked by PodDisruptionBudgets until the deadline
+        while remaining and time.monotonic() < deadline:
+            for key, (namespace, name) in list(remaining.items()):
+                if self.evict_pod(namespace, name):
+                    evicted.add(key)
+                    del remaining[key]
+            if remaining:
+                time.sleep(min(5, max(0, deadline - time.monotonic())))
+
+        if remaining:
+            logger.error(f"Eviction blocked for {len(remaining)} pods on {node_name}")
+            return False
+
+        return self._wait_for_pods_gone(node_name, evicted, deadline - time.monotonic())
+
+
+_clients: Dict[str, KubeClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_kube_client(kubeconfig: Optional[Path] = None) -> KubeClient:
+    """
+    Get the shared KubeClient for a kubeconfig path.
+
+    One client (and one node watch) is kept per kubeconfig for the life of
+    the process, so every manager reuses the same connection pool and cache.
+    """
+    key = str(kubeconfig) if kubeconfig else ""
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = KubeClient(kubeconfig=kubeconfig)
+        return _clients[key]
@@ -4,6 +4,10 @@ src/homelab/monitoring_manager.py
 
 Declarative management of monitoring infrastructure including Uptime Kuma deployments.
 Ensures idempotent operations - running multiple times won't create duplicate instances.
+
+Each node's LXC inventory (status, hostname, whether Docker is installed) is
+collected in a single SSH round trip and cached on the manager, and the
+fleet functions visit all nodes concurrently.
 """
 
 import json
@@ -17,10 +21,48 @@ import paramiko
 import requests
 
 from homelab.config import Config
+from homelab.host_probe import DEFAULT_PROBE_WORKERS, probe_hosts, run_probe
 from homelab.proxmox_api import ProxmoxClient
 
 logger = logging.getLogger(__name__)
 
+# Known Docker LXC containers based on homelab setup
+KNOWN_DOCKER_LXCS = {
+    "pve": 100,
+    "fun-bedbug": 112,
+}
+
+# One line per container: "<vmid> <status> <hostname> <docker yes|no>". Hostnames
+# come from /etc/pve/lxc/*.conf and Docker is looked up in a running
+# container's rootfs from the host, so no per-container pct exec is needed.
+CONTAINER_INVENTORY_COMMAND = (
+    "pct list | awk 'NR > 1 {print $1, $2}' | while read vmid status; do "
+    "hostname=$(awk '/^hostname:/ {print $2}' /etc/pve/lxc/$vmid.conf 2>/dev/null); "
+    "docker=no; "
+    "if [ \"$status\" = running ]; then "
+    "pid=$(lxc-info -n $vmid -p -H 2>/dev/null); "
+    "for bin in /usr/bin/docker /usr/local/bin/docker; do "
+    "[ -n \"$pid\" ] && [ -x /proc/$pid/root$bin ] && docker=yes; "
+    "done; fi; "
+    "echo \"$vmid $status ${hostname:--} $docker\"; done"
+)
+
+
+def parse_container_inventory(output: str) -> List[Dict[str, Any]]:
+    """Parse CONTAINER_INVENTORY_COMMAND output into container dicts."""
+    containers = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) != 4 or not parts[0].isdigit():
+            continue
+        containers.append({
+            "vmid": int(parts[0]),
+            "status": parts[1],
+            "hostname": "" if parts[2] == "-" else parts[2],
+            "docker": parts[3] == "yes",
+        })
+    return containers
+
 
 def check_network_connectivity() -> bool:
     """
@@ -153,6 +195,7 @@ systemctl start docker
         self.node_name = node_name
         self.client = ProxmoxClient(node_name)
         self.ssh_client: Optional[paramiko.SSHClient] = None
+        self._inventory: Optional[List[Dict[str, Any]]] = None
 
     def _get_ssh_client(self) -> paramiko.SSHClient:
         """Get SSH client connection to the Proxmox node."""
@@ -202,52 +245,46 @@ systemctl start docker
         exit_code = stdout.channel.recv_exit_status()
         return stdout.read().decode().strip(), stderr.read().decode().strip(), exit_code
 
-    def _find_docker_lxc(self) -> Optional[int]:
-        """Find existing Docker LXC container on the node using direct SSH approach."""
-        return self._find_docker_lxc_ssh_simple()
+    def collect_inventory(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        List this node's LXC containers in one SSH round trip (cached).
 
-    def _find_docker_lxc_ssh(self) -> Optional[int]:
-        """Find Docker LXC container using SSH commands as fallback."""
-        try:
-            # First ensure we have a working SSH connection
-            ssh_client = self._get_ssh_client()
+        Args:
+            refresh: Re-read the inventory instead of using the cached copy
 
-            # Get list of all LXC containers
-            stdout, stderr, exit_code = self._execute_command("pct list | grep -v VMID | awk '{print $1, $4}'")
+        Returns:
+            Dicts with vmid, status, hostname and docker (bool)
+        """
+        if self._inventory is None or refresh:
+            facts = run_probe(self._execute_command, {"containers": CONTAINER_INVENTORY_COMMAND})
+            stdout, exit_code = facts["containers"]
             if exit_code != 0:
-                logger.warning(f"Failed to list LXC containers via SSH: {stderr}")
-                return None
-
-            # Check each running container for Docker
-            for line in stdout.split("\n"):
-                if not line.strip():
-                    continue
-
-                parts = line.split()
-                if len(parts) >= 2:
-                    vmid = parts[0]
-                    status = parts[1] if len(parts) > 1 else ""
-
-                    # Only check running containers
-                    if status == "running":
-                        # Check if Docker is installed
-                        docker_stdout, docker_stderr, docker_exit = self._execute_command(
-                            f"pct exec {vmid} -- which docker 2>/dev/null"
-                        )
-                        if docker_exit == 0:
-                            logger.info(f"Found Docker in LXC container {vmid}")
-                            return int(vmid)
-
-                        # Also check for docker in container name/hostname
-                        name_stdout, name_stderr, name_exit = self._execute_command(
-                            f"pct config {vmid} | grep hostname | cut -d: -f2 | tr -d ' '"
-                        )
-                        if name_exit == 0 and "docker" in name_stdout.lower():
-                            logger.info(f"Found Docker LXC by hostname: {vmid}")
-                            return int(vmid)
+                raise RuntimeError(f"Failed to list LXC containers on {self.node_name}")
+            self._inventory = parse_container_inventory(stdout)
+        return self._inventory
 
+    def _find_docker_lxc(self) -> Optional[int]:
+        """Find the Docker LXC container on the node from the cached inventory."""
+        try:
+            running = [ct for ct in self.collect_inventory() if ct["status"] == "running"]
         except Exception as e:
-            logger.warning(f"SSH-based Docker LXC search failed: {e}")
+            logger.warning(f"Docker LXC search on {self.node_name} failed: {e}")
+            return None
+
+        # Prefer the known container, then any with Docker, then a docker-* hostname
+        expected_vmid = KNOWN_DOCKER_LXCS.get(self.node_name)
+        for container in running:
+            if container["vmid"] == expected_vmid and container["docker"]:
+                logger.info(f"Confirmed Docker LXC {expected_vmid} on {self.node_name}")
+                return expected_vmid
+        for container in running:
+            if container["docker"]:
+                logger.info(f"Found Docker in LXC container {container['vmid']}")
+                return container["vmid"]
+        for container in running:
+            if "docker" in container["hostname"].lower():
+                logger.info(f"Found Docker LXC by hostname: {container['vmid']}")
+                return container["vmid"]
 
         return None
 
@@ -434,36 +471,6 @@ systemctl start docker
             "url": f"http://{ip}:{config['port']}" if ip else None,
         }
 
-    def _find_docker_lxc_ssh_simple(self) -> Optional[int]:
-        """Simplified SSH-based Docker LXC discovery using known container IDs."""
-        # Known Docker LXC containers based on homelab setup
-        known_docker_containers = {
-            "pve": 100,
-            "fun-bedbug": 112,
-        }
-
-        if self.node_name in known_docker_containers:
-            expected_vmid = known_docker_containers[self.node_name]
-            logger.info(f"Checking expected Docker LXC {expected_vmid} on {self.node_name}")
-
-            try:
-                # Check if the container exists and has Docker
-                stdout, stderr, exit_code = self._execute_command(f"pct status {expected_vmid}")
-                if exit_code == 0 and "running" in stdout:
-                    # Verify Docker is installed
-                    docker_stdout, docker_stderr, docker_exit = self._execute_command(
-                        f"pct exec {expected_vmid} -- which docker 2>/dev/null"
-                    )
-                    if docker_exit == 0:
-                        logger.info(f"Confirmed Docker LXC {expected_vmid} on {self.node_name}")
-                        return expected_vmid
-
-            except Exception as e:
-                logger.warning(f"Failed to verify expected Docker LXC {expected_vmid}: {e}")
-
-        # Fallback to general discovery if known container not found
-        return self._find_docker_lxc_ssh()
-
     def _wait_for_uptime_kuma_ready(self, vmid: int, port: int, timeout: int = 120) -> None:
         """Wait for Uptime Kuma to be ready to accept connections."""
         deadline = time.time() + timeout
@@ -536,95 +543,82 @@ systemctl start docker
         self.cleanup()
 
 
-def deploy_monitoring_to_all_nodes() -> List[Dict[str, Any]]:
-    """Deploy monitoring infrastructure to all configured nodes."""
-    # Check network prerequisites first
-    validate_network_prerequisites()
-
-    results = []
-
-    for node_config in Config.get_nodes():
-        node_name = node_config["name"]
-        logger.info(f"Deploying monitoring to {node_name}")
+def _deploy_node(node_name: str) -> Dict[str, Any]:
+    """Deploy Uptime Kuma to one node, returning a failure dict on error."""
+    logger.info(f"Deploying monitoring to {node_name}")
+    try:
+        with MonitoringManager(node_name) as manager:
+            result = manager.deploy_uptime_kuma()
+            result["node"] = node_name
+            logger.info(f"Successfully deployed to {node_name}: {result['status']}")
+            return result
+    except Exception as e:
+        logger.error(f"Failed to deploy monitoring to {node_name}: {e}")
+        return {
+            "node": node_name,
+            "status": "failed",
+            "error": str(e),
+        }
 
-        try:
-            with MonitoringManager(node_name) as manager:
-                result = manager.deploy_uptime_kuma()
-                result["node"] = node_name
-                results.append(result)
-                logger.info(f"Successfully deployed to {node_name}: {result['status']}")
-        except Exception as e:
-            logger.error(f"Failed to deploy monitoring to {node_name}: {e}")
-            results.append(
-                {
-                    "node": node_name,
-                    "status": "failed",
-                    "error": str(e),
-                }
-            )
 
-    return results
+def _node_status(node_name: str) -> Dict[str, Any]:
+    """Monitoring status of one node, returning an error dict on failure."""
+    try:
+        with MonitoringManager(node_name) as manager:
+            return manager.get_monitoring_status()
+    except Exception as e:
+        logger.error(f"Failed to get status from {node_name}: {e}")
+        return {
+            "node": node_name,
+            "error": str(e),
+        }
 
 
-def deploy_monitoring_to_docker_nodes() -> List[Dict[str, Any]]:
-    """Deploy monitoring infrastructure specifically to nodes with Docker LXC containers."""
+def deploy_monitoring_to_all_nodes(max_workers: int = DEFAULT_PROBE_WORKERS) -> List[Dict[str, Any]]:
+    """Deploy monitoring infrastructure to all configured nodes concurrently."""
     # Check network prerequisites first
     validate_network_prerequisites()
 
-    results = []
-
-    # Known Docker LXC deployments based on homelab setup
-    docker_nodes = [
-        {"name": "pve", "expected_lxc": 100},
-        {"name": "fun-bedbug", "expected_lxc": 112},
-    ]
+    node_names = [node_config["name"] for node_config in Config.get_nodes()]
+    return probe_hosts(node_names, _deploy_node, max_workers=max_workers)
 
-    for node_config in docker_nodes:
-        node_name = node_config["name"]
-        logger.info(f"Deploying monitoring to Docker node {node_name}")
 
-        try:
-            with MonitoringManager(node_name) as manager:
-                result = manager.deploy_uptime_kuma()
-                result["node"] = node_name
-                result["expected_lxc"] = node_config["expected_lxc"]
-                results.append(result)
-                logger.info(f"Successfully deployed to {node_name}: {result['status']}")
-        except Exception as e:
-            logger.error(f"Failed to deploy monitoring to {node_name}: {e}")
-            results.append(
-                {
-                    "node": node_name,
-                    "status": "failed",
-                    "error": str(e),
-                    "expected_lxc": node_config["expected_lxc"],
-                }
-            )
+def deploy_monitoring_to_docker_nodes(max_workers: int = DEFAULT_PROBE_WORKERS) -> List[Dict[str, Any]]:
+    """Deploy monitoring infrastructure concurrently to nodes with Docker LXC containers."""
+    # Check network prerequisites first
+    validate_network_prerequisites()
 
+    results = probe_hosts(list(KNOWN_DOCKER_LXCS), _deploy_node, max_workers=max_workers)
+    for result in results:
+        result["expected_lxc"] = KNOWN_DOCKER_LXCS[result["node"]]
     return results
 
 
-def get_monitoring_status_all_nodes() -> List[Dict[str, Any]]:
-    """Get monitoring status from all configured nodes."""
-    results = []
+def get_monitoring_status_all_nodes(max_workers: int = DEFAULT_PROBE_WORKERS) -> List[Dict[str, Any]]:
+    """Get monitoring status from all configured nodes concurrently."""
+    node_names = [node_config["name"] for node_config in Config.get_nodes()]
+    return probe_hosts(node_names, _node_status, max_workers=max_workers)
+
 
-    for node_config in Config.get_nodes():
-        node_name = node_config["name"]
+def get_fleet_inventory(max_workers: int = DEFAULT_PROBE_WORKERS) -> Dict[str, Any]:
+    """
+    LXC inventory of every configured node, one SSH round trip per node.
 
+    Returns:
+        Node name -> list of container dicts (see collect_inventory), or
+        {"error": ...} for nodes that could not be reached
+    """
+
+    def inventory(node_name: str) -> Any:
         try:
             with MonitoringManager(node_name) as manager:
-                status = manager.get_monitoring_status()
-                results.append(status)
+                return manager.collect_inventory()
         except Exception as e:
-            logger.error(f"Failed to get status from {node_name}: {e}")
-            results.append(
-                {
-                    "node": node_name,
-                    "error": str(e),
-                }
-            )
+            logger.error(f"Failed to list containers on {node_name}: {e}")
+            return {"error": str(e)}
 
-    return results
+    node_names = [node_config["name"] for node_config in Config.get_nodes()]
+    return dict(zip(node_names, probe_hosts(node_names, inventory, max_workers=max_workers)))
 
 
 if __name__ == "__main__":
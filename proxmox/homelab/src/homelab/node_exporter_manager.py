@@ -28,6 +28,9 @@ from typing import Any, Dict, List, Optional, Tuple
 import paramiko
 import yaml
 
+from homelab.exporter_rollout import clear_pending_command, get_rollout_settings, rollout, sync_file_command
+from homelab.host_probe import DEFAULT_PROBE_WORKERS, probe_hosts, run_probe
+
 logger = logging.getLogger(__name__)
 
 # Default config path relative to package
@@ -89,6 +92,8 @@ class NodeExporterManager:
         self.service = ne_config.get("service", "prometheus-node-exporter")
         self.port = ne_config.get("port", 9100)
         self.collectors = ne_config.get("collectors", ["hwmon", "thermal_zone"])
+        self.override_dir = "/etc/systemd/system/prometheus-node-exporter.service.d"
+        self.override_path = f"{self.override_dir}/override.conf"
 
         # Get expected sensors for this specific host
         host_sensors = ne_config.get("host_sensors", {})
@@ -181,8 +186,19 @@ class NodeExporterManager:
         )
         return stdout if exit_code == 0 and stdout else None
 
+    def status_checks(self) -> Dict[str, str]:
+        """Shell commands for every status fact, run together by get_status."""
+        return {
+            "installed": f"dpkg -l | grep -q {self.package} && echo 'installed'",
+            "version": f"dpkg -l {self.package} 2>/dev/null | grep -E '^ii' | awk '{{print $3}}'",
+            "active": f"systemctl is-active {self.service}",
+            "enabled": f"systemctl is-enabled {self.service}",
+            "metrics": f"curl -s -o /dev/null -w '%{{http_code}}' http://localhost:{self.port}/metrics",
+            "hwmon": "cat /sys/class/hwmon/hwmon*/name 2>/dev/null | sort -u",
+        }
+
     def get_status(self) -> Dict[str, Any]:
-        """Get comprehensive status of node-exporter on this host."""
+        """Get comprehensive status of node-exporter on this host (one SSH round trip)."""
         status = {
             "hostname": self.hostname,
             "ip": self.ip,
@@ -197,23 +213,20 @@ class NodeExporterManager:
         }
 
         try:
-            status["installed"] = self.is_installed()
+            facts = run_probe(self._execute_command, self.status_checks())
+            status["installed"] = "installed" in facts["installed"][0]
 
             if status["installed"]:
-                status["version"] = self.get_version()
-                status["running"] = self.is_running()
-                status["enabled"] = self.is_enabled()
+                stdout, exit_code = facts["version"]
+                status["version"] = stdout if exit_code == 0 and stdout else None
+                status["running"] = facts["active"][0] == "active"
+                status["enabled"] = "enabled" in facts["enabled"][0]
 
                 # Check if metrics endpoint is responding
-                stdout, stderr, exit_code = self._execute_command(
-                    f"curl -s -o /dev/null -w '%{{http_code}}' http://localhost:{status['port']}/metrics"
-                )
-                status["metrics_available"] = stdout == "200"
+                status["metrics_available"] = facts["metrics"][0] == "200"
 
                 # Get hwmon sensors available
-                stdout, stderr, exit_code = self._execute_command(
-                    "cat /sys/class/hwmon/hwmon*/name 2>/dev/null | sort -u"
-                )
+                stdout, exit_code = facts["hwmon"]
                 if exit_code == 0 and stdout:
                     status["hwmon_sensors"] = [s for s in stdout.split("\n") if s]
 
@@ -250,14 +263,9 @@ class NodeExporterManager:
         return {"status": "installed", "output": stdout}
 
     def configure(self) -> Dict[str, Any]:
-        """Configure node-exporter with optimal settings for Proxmox."""
+        """Configure node-exporter with optimal settings for Proxmox (skipped if unchanged)."""
         logger.info(f"Configuring node-exporter on {self.hostname}")
 
-        # Create systemd override directory
-        stdout, stderr, exit_code = self._execute_command(
-            "mkdir -p /etc/systemd/system/prometheus-node-exporter.service.d"
-        )
-
         # Create override config to enable extra collectors
         # Particularly hwmon for temperature sensors
         override_content = """[Service]
@@ -268,13 +276,18 @@ ExecStart=/usr/bin/prometheus-node-exporter \\
     --web.listen-address=:9100
 """
 
-        # Write override file
-        escaped_content = override_content.replace("'", "'\\''")
+        # Write override file, unless it already has this content
         stdout, stderr, exit_code = self._execute_command(
-            f"echo '{escaped_content}' > /etc/systemd/system/prometheus-node-exporter.service.d/override.conf"
+            f"mkdir -p {self.override_dir} && "
+            + sync_file_command(self.override_path, override_content)
         )
         if exit_code != 0:
             return {"status": "failed", "error": f"Failed to write override: {stderr}"}
+        if stdout == "unchanged":
+            logger.info(f"node-exporter override on {self.hostname} already up to date")
+            return {"status": "unchanged"}
+        if stdout == "pending":
+            logger.info(f"node-exporter override on {self.hostname} was written but never applied")
 
         # Reload systemd
         stdout, stderr, exit_code = self._execute_command("systemctl daemon-reload")
@@ -284,8 +297,28 @@ ExecStart=/usr/bin/prometheus-node-exporter \\
         logger.info(f"Successfully configured node-exporter on {self.hostname}")
         return {"status": "configured"}
 
-    def enable_and_start(self) -> Dict[str, Any]:
-        """Enable and start node-exporter service."""
+    def enable_and_start(self, restart: bool = True) -> Dict[str, Any]:
+        """
+        Enable and start node-exporter service.
+
+        Args:
+            restart: Restart the service to pick up changes; when False it
+                is only started if not already running
+
+        Returns:
+            Dict with status 'started', 'running' or 'failed'
+        """
+        if not restart:
+            stdout, stderr, exit_code = self._execute_command(
+                f"systemctl enable {self.service} >/dev/null 2>&1 && "
+                f"if systemctl is-active --quiet {self.service}; then echo running; "
+                f"else systemctl start {self.service} && echo started; fi"
+            )
+            if exit_code != 0:
+                return {"status": "failed", "error": f"systemctl enable/start failed: {stderr}"}
+            logger.info(f"node-exporter on {self.hostname} is {stdout or 'started'}")
+            return {"status": stdout or "started"}
+
         logger.info(f"Enabling and starting node-exporter on {self.hostname}")
 
         # Enable service
@@ -322,6 +355,7 @@ ExecStart=/usr/bin/prometheus-node-exporter \\
 
         try:
             # Check current state
+            changed = False
             if self.is_installed():
                 result["actions"].append("already_installed")
                 logger.info(f"node-exporter already installed on {self.hostname}")
@@ -333,6 +367,7 @@ ExecStart=/usr/bin/prometheus-node-exporter \\
                     result["error"] = install_result["error"]
                     return result
                 result["actions"].append("installed")
+                changed = True
 
             # Configure
             config_result = self.configure()
@@ -340,15 +375,25 @@ ExecStart=/usr/bin/prometheus-node-exporter \\
                 result["status"] = "failed"
                 result["error"] = config_result["error"]
                 return result
-            result["actions"].append("configured")
+            if config_result["status"] == "unchanged":
+                result["actions"].append("config_unchanged")
+            else:
+                result["actions"].append("configured")
+                changed = True
 
-            # Enable and start
-            start_result = self.enable_and_start()
+            # Enable and start; restart only when something changed
+            start_result = self.enable_and_start(restart=changed)
             if start_result["status"] == "failed":
                 result["status"] = "failed"
                 result["error"] = start_result["error"]
                 return result
-            result["actions"].append("enabled_and_started")
+            if start_result["status"] == "running":
+                result["actions"].append("already_running")
+            else:
+                result["actions"].append("enabled_and_started")
+            if config_result["status"] != "unchanged":
+                # Restarted with the new override; later runs may skip it
+                self._execute_command(clear_pending_command(self.override_path))
 
             # Verify deployment
             status = self.get_status()
@@ -385,17 +430,25 @@ ExecStart=/usr/bin/prometheus-node-exporter \\
         self.cleanup()
 
 
-def apply_from_config(config_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+def apply_from_config(
+    config_path: Optional[Path] = None,
+    max_parallel: Optional[int] = None,
+    canary: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
     """
     Deploy node-exporter to all enabled hosts from cluster.yaml config.
 
     This is the main idempotent entry point - safe to run multiple times.
+    With canary enabled the first host is deployed and verified before the
+    rest, which then deploy max_parallel at a time.
 
     Args:
         config_path: Optional path to cluster.yaml
+        max_parallel: Maximum concurrent deploys (default: monitoring.rollout)
+        canary: Deploy to the first host first (default: monitoring.rollout)
 
     Returns:
-        List of deployment results per host
+        List of deployment results per host, each with elapsed_sec
     """
     config = load_cluster_config(config_path)
     monitoring = get_monitoring_config(config)
@@ -407,57 +460,49 @@ def apply_from_config(config_path: Optional[Path] = None) -> List[Dict[str, Any]
         return [{"status": "skipped", "reason": "disabled in config"}]
 
     # Get enabled hosts
-    hosts = get_enabled_hosts(config)
-    results = []
+    hosts = [host["name"] for host in get_enabled_hosts(config)]
+    max_parallel, canary = get_rollout_settings(monitoring, "node_exporter", max_parallel, canary)
 
-    for host in hosts:
-        hostname = host["name"]
+    def deploy_host(hostname: str) -> Dict[str, Any]:
         logger.info(f"Applying node-exporter to {hostname}")
+        with NodeExporterManager(hostname, config=config) as manager:
+            return manager.deploy()
 
-        try:
-            with NodeExporterManager(hostname, config=config) as manager:
-                result = manager.deploy()
-                results.append(result)
-        except Exception as e:
-            logger.error(f"Failed to deploy to {hostname}: {e}")
-            results.append({
-                "hostname": hostname,
-                "status": "failed",
-                "error": str(e)
-            })
-
-    return results
+    return rollout(hosts, deploy_host, max_parallel=max_parallel, canary=canary)
 
 
-def get_status_from_config(config_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+def get_status_from_config(
+    config_path: Optional[Path] = None, max_workers: int = DEFAULT_PROBE_WORKERS
+) -> List[Dict[str, Any]]:
     """
     Get node-exporter status from all enabled hosts in config.
 
+    Hosts are probed concurrently, one SSH round trip each.
+
     Args:
         config_path: Optional path to cluster.yaml
+        max_workers: Maximum hosts probed at once
 
     Returns:
         List of status dicts per host
     """
     config = load_cluster_config(config_path)
     hosts = get_enabled_hosts(config)
-    results = []
 
-    for host in hosts:
+    def host_status(host: Dict[str, Any]) -> Dict[str, Any]:
         hostname = host["name"]
         try:
             with NodeExporterManager(hostname, config=config) as manager:
-                status = manager.get_status()
-                results.append(status)
+                return manager.get_status()
         except Exception as e:
             logger.error(f"Failed to get status from {hostname}: {e}")
-            results.append({
+            return {
                 "hostname": hostname,
                 "ip": host.get("ip"),
                 "error": str(e)
-            })
+            }
 
-    return results
+    return probe_hosts(hosts, host_status, max_workers=max_workers)
 
 
 def print_status_table(results: List[Dict[str, Any]]) -> None:
@@ -5,6 +5,8 @@ Provides production-ready disk and snapshot management with full type safety.
 
 import asyncio
 import base64
+import hashlib
+import inspect
 import json
 import logging
 import uuid
@@ -12,14 +14,22 @@ from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, Iterable, List, Optional, Union
 
 from homelab.crucible_config import CrucibleConfig
+from homelab.crucible_metadata import MetadataStore, StoreBackedDict
 from homelab.crucible_mock import MockCrucibleManager
+from homelab.interval_set import IntervalSet
 from homelab.proxmox_api import ProxmoxClient
 
 logger = logging.getLogger(__name__)
 
+# Default write size for streaming imports; must be a multiple of the disk block size
+DEFAULT_IMPORT_CHUNK_SIZE = 1024**2
+
+# Anything accepted by disk_bulk_write_import_stream
+ImportSource = Union[bytes, bytearray, memoryview, BinaryIO, AsyncIterator[bytes], Iterable[bytes]]
+
 
 class DiskState(Enum):
     """Disk state enum matching Oxide's API."""
@@ -96,6 +106,34 @@ class Snapshot:
     project_id: str
 
 
+# States a disk cannot still be in after a restart
+_INTERRUPTED_STATES = (
+    DiskState.CREATING,
+    DiskState.ATTACHING,
+    DiskState.DETACHING,
+    DiskState.FINALIZING,
+)
+
+
+def _disk_to_record(disk: Disk) -> Dict[str, Any]:
+    """Disk in its API form, as stored in the metadata store."""
+    record = asdict(disk)
+    record["state"] = disk.state.value
+    return record
+
+
+def _disk_from_record(record: Dict[str, Any]) -> Disk:
+    return Disk(**{**record, "state": DiskState(record["state"])})
+
+
+def _session_to_record(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {**session, "coverage": session["coverage"].to_list()}
+
+
+def _session_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {**record, "coverage": IntervalSet([tuple(interval) for interval in record["coverage"]])}
+
+
 class OxideStorageAPI:
     """
     Production-ready storage API emulating Oxide's customer interface.
@@ -116,10 +154,27 @@ class OxideStorageAPI:
             logger.warning("Real Crucible backend not yet implemented, using mock")
             self.storage_backend = MockCrucibleManager(self.config)
         
-        # State management
-        self._disks: Dict[str, Disk] = {}
-        self._snapshots: Dict[str, Snapshot] = {}
-        self._import_sessions: Dict[str, Dict[str, Any]] = {}
+        # State management: write-through views over the metadata store,
+        # loaded lazily so startup does not read every record
+        self.metadata = MetadataStore(self.config.metadata_path)
+        self._disks: StoreBackedDict = StoreBackedDict(
+            self.metadata, "disk", project_id,
+            encode=_disk_to_record, decode=_disk_from_record,
+            index=lambda d: {"name": d.name, "state": d.state.value,
+                             "owner": d.attached_vm_id, "created": d.time_created}
+        )
+        self._snapshots: StoreBackedDict = StoreBackedDict(
+            self.metadata, "snapshot", project_id,
+            encode=asdict, decode=lambda data: Snapshot(**data),
+            index=lambda s: {"name": s.name, "state": s.state,
+                             "owner": s.disk_id, "created": s.time_created}
+        )
+        self._import_sessions: StoreBackedDict = StoreBackedDict(
+            self.metadata, "import_session", project_id,
+            encode=_session_to_record, decode=_session_from_record,
+            index=lambda session: {"created": session["started_at"]}
+        )
+        self._state_synced = False
         
         # Proxmox integration
         self._proxmox_clients: Dict[str, ProxmoxClient] = {}
@@ -151,22 +206,55 @@ class OxideStorageAPI:
     
     # === DISK OPERATIONS ===
     
-    async def disk_list(self) -> List[Dict[str, Any]]:
+    async def disk_list(self, state: Optional[DiskState] = None,
+                        attached_vm_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """GET /v1/disks - List all disks in the project."""
         logger.info("📋 Listing project disks")
         
-        # Sync with backend
-        await self._sync_disk_state()
-        
-        result = []
-        for disk in self._disks.values():
-            disk_dict = asdict(disk)
-            disk_dict["state"] = disk.state.value
-            result.append(disk_dict)
+        result: List[Dict[str, Any]] = []
+        page_token = None
+        while True:
+            page = await self.disk_list_page(
+                page_token=page_token, state=state, attached_vm_id=attached_vm_id
+            )
+            result.extend(page["items"])
+            page_token = page["next_page"]
+            if not page_token:
+                break
         
         logger.info(f"📋 Found {len(result)} disks in project {self.project_id}")
         return result
     
+    async def disk_list_page(self, limit: int = 100, page_token: Optional[str] = None,
+                             state: Optional[DiskState] = None,
+                             attached_vm_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        GET /v1/disks?limit=&page_token= - List one page of disks, oldest first.
+
+        Args:
+            limit: Maximum disks per page
+            page_token: next_page from a previous call
+            state: Only disks in this state
+            attached_vm_id: Only disks attached to this VM
+
+        Returns:
+            Dict with "items" and "next_page" (None on the last page)
+        """
+        if limit < 1:
+            raise ValueError(f"Invalid page limit {limit}")
+
+        # Sync with backend
+        await self._sync_disk_state()
+
+        items, next_page = self.metadata.find(
+            "disk", self.project_id,
+            state=state.value if state else None,
+            owner=attached_vm_id,
+            limit=limit,
+            page_token=page_token
+        )
+        return {"items": items, "next_page": next_page}
+
     async def disk_create(self, request: DiskCreate) -> Dict[str, Any]:
         """POST /v1/disks - Create a new disk."""
         disk_id = str(uuid.uuid4())
@@ -175,6 +263,7 @@ class OxideStorageAPI:
         logger.info(f"💽 Creating disk '{request.name}' ({request.size} bytes, source: {request.disk_source.value})")
         
         # Validate request
+        await self._sync_disk_state()
         await self._validate_disk_create(request)
         
         # Create disk object
@@ -211,12 +300,14 @@ class OxideStorageAPI:
             disk.state = DiskState.DETACHED if request.disk_source != DiskSource.IMPORTING_BLOCKS else DiskState.IMPORT_READY
             disk.volume_id = volume_id
             disk.time_modified = datetime.now(timezone.utc).isoformat()
+            self._save_disk(disk)
             
             logger.info(f"✅ Created disk {disk.name} ({disk_id})")
             
         except Exception as e:
             disk.state = DiskState.FAULTED
             disk.time_modified = datetime.now(timezone.utc).isoformat()
+            self._save_disk(disk)
             logger.error(f"❌ Failed to create disk {disk.name}: {e}")
             raise
         
@@ -228,6 +319,7 @@ class OxideStorageAPI:
         """GET /v1/disks/{disk} - Fetch details of a specific disk."""
         logger.debug(f"🔍 Viewing disk {disk_id}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -238,10 +330,25 @@ class OxideStorageAPI:
         result["state"] = disk.state.value
         return result
     
+    async def disk_space_usage(self, disk_id: str) -> Dict[str, Any]:
+        """Report bytes a disk owns vs. shares with the snapshot it was cloned from."""
+        await self._sync_disk_state()
+        if disk_id not in self._disks:
+            raise ValueError(f"Disk {disk_id} not found")
+
+        disk = self._disks[disk_id]
+        if not disk.volume_id:
+            raise ValueError(f"Disk {disk_id} has no backing volume")
+
+        usage = await self.storage_backend.get_volume_space_usage(disk.volume_id)
+        usage["disk_id"] = disk_id
+        return usage
+
     async def disk_delete(self, disk_id: str) -> None:
         """DELETE /v1/disks/{disk} - Delete a disk."""
         logger.info(f"🗑️ Deleting disk {disk_id}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -269,6 +376,7 @@ class OxideStorageAPI:
         """Attach disk to a Proxmox VM."""
         logger.info(f"🔗 Attaching disk {disk_id} to VM {vm_id}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -279,6 +387,7 @@ class OxideStorageAPI:
         
         try:
             disk.state = DiskState.ATTACHING
+            self._save_disk(disk)
             
             # Attach via Proxmox API if integration enabled
             if self.config.proxmox_integration:
@@ -288,6 +397,7 @@ class OxideStorageAPI:
             disk.attached_vm_id = vm_id
             disk.device_path = f"/dev/{device_name}"
             disk.time_modified = datetime.now(timezone.utc).isoformat()
+            self._save_disk(disk)
             
             logger.info(f"✅ Attached disk {disk.name} to VM {vm_id}")
             
@@ -297,6 +407,7 @@ class OxideStorageAPI:
             
         except Exception as e:
             disk.state = DiskState.FAULTED
+            self._save_disk(disk)
             logger.error(f"❌ Failed to attach disk {disk.name}: {e}")
             raise
     
@@ -304,6 +415,7 @@ class OxideStorageAPI:
         """Detach disk from VM."""
         logger.info(f"🔓 Detaching disk {disk_id}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -314,6 +426,7 @@ class OxideStorageAPI:
         
         try:
             disk.state = DiskState.DETACHING
+            self._save_disk(disk)
             
             # Detach via Proxmox API if integration enabled
             if self.config.proxmox_integration and disk.attached_vm_id:
@@ -323,6 +436,7 @@ class OxideStorageAPI:
             disk.attached_vm_id = None
             disk.device_path = None
             disk.time_modified = datetime.now(timezone.utc).isoformat()
+            self._save_disk(disk)
             
             logger.info(f"✅ Detached disk {disk.name}")
             
@@ -332,15 +446,27 @@ class OxideStorageAPI:
             
         except Exception as e:
             disk.state = DiskState.FAULTED
+            self._save_disk(disk)
             logger.error(f"❌ Failed to detach disk {disk.name}: {e}")
             raise
     
     # === BULK IMPORT OPERATIONS ===
     
-    async def disk_bulk_write_import_start(self, disk_id: str) -> Dict[str, str]:
-        """Start bulk write import for a disk."""
+    async def disk_bulk_write_import_start(self, disk_id: str,
+                                           expected_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Start bulk write import for a disk, resuming a stopped session.
+
+        Args:
+            disk_id: Disk in import_ready state
+            expected_size: Image size in bytes; finalize requires [0, size) to be written
+
+        Returns:
+            Dict with status (import_started or import_resumed) and bytes already covered
+        """
         logger.info(f"📤 Starting bulk import for disk {disk_id}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -349,22 +475,50 @@ class OxideStorageAPI:
         if disk.state != DiskState.IMPORT_READY:
             raise ValueError(f"Disk must be in import_ready state, currently {disk.state.value}")
         
-        # Initialize import session
-        self._import_sessions[disk_id] = {
-            "started_at": datetime.now(timezone.utc).isoformat(),
-            "bytes_imported": 0,
-            "chunks": {}
-        }
+        if expected_size is not None and not 0 < expected_size <= disk.size:
+            raise ValueError(f"Expected size {expected_size} must be between 1 and disk size {disk.size}")
+
+        # Keep the coverage of a stopped session so the client can resume
+        resumed = disk_id in self._import_sessions
+        if resumed:
+            session = self._import_sessions[disk_id]
+            if expected_size is not None:
+                session["expected_size"] = expected_size
+            self._import_sessions.save(disk_id)
+        else:
+            session = {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "bytes_imported": 0,
+                "expected_size": expected_size,
+                "coverage": IntervalSet()
+            }
+            self._import_sessions[disk_id] = session
         
         disk.state = DiskState.IMPORTING_FROM_BULK_WRITES
         disk.time_modified = datetime.now(timezone.utc).isoformat()
+        self._save_disk(disk)
         
-        return {"status": "import_started", "session_id": disk_id}
+        if resumed:
+            covered = session["coverage"].covered_bytes()
+            logger.info(f"📤 Resumed import for disk {disk_id}: {covered} bytes already written")
+
+        return {
+            "status": "import_resumed" if resumed else "import_started",
+            "session_id": disk_id,
+            "covered_bytes": session["coverage"].covered_bytes()
+        }
     
-    async def disk_bulk_write_import(self, disk_id: str, data: str, offset: int = 0) -> Dict[str, Any]:
-        """Import base64-encoded data chunk to disk."""
-        logger.debug(f"📤 Importing {len(data)} bytes to disk {disk_id} at offset {offset}")
+    async def disk_bulk_write_import_status(self, disk_id: str) -> Dict[str, Any]:
+        """
+        Report import progress and the byte ranges still to be written.
         
+        Available while importing and after a stop, so an interrupted client
+        can upload only what is missing.
+
+        Returns:
+            Dict with covered bytes, the target size and missing [start, end) ranges
+        """
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -372,26 +526,39 @@ class OxideStorageAPI:
             raise ValueError(f"No import session for disk {disk_id}")
         
         disk = self._disks[disk_id]
+        session = self._import_sessions[disk_id]
+        target = session.get("expected_size") or disk.size
+        missing = session["coverage"].missing(0, target)
         
-        if disk.state != DiskState.IMPORTING_FROM_BULK_WRITES:
-            raise ValueError(f"Disk not in importing state, currently {disk.state.value}")
+        return {
+            "disk_id": disk_id,
+            "state": disk.state.value,
+            "expected_size": session.get("expected_size"),
+            "bytes_imported": session["bytes_imported"],
+            "covered_bytes": session["coverage"].covered_bytes(),
+            "missing": [list(gap) for gap in missing],
+            "complete": not missing
+        }
+
+    async def disk_bulk_write_import(self, disk_id: str, data: Union[str, bytes, bytearray, memoryview],
+                                     offset: int = 0) -> Dict[str, Any]:
+        """Import one data chunk to disk (base64 string or raw bytes-like)."""
+        logger.debug(f"📤 Importing {len(data)} bytes to disk {disk_id} at offset {offset}")
+
+        await self._sync_disk_state()
+        disk = self._get_importing_disk(disk_id)
         
         try:
-            # Decode base64 data
-            binary_data = base64.b64decode(data)
-            
-            # Write to storage backend
-            if disk.volume_id:
-                await self.storage_backend.write_volume(disk.volume_id, offset, binary_data)
+            # Base64 is kept for API compatibility; raw buffers skip the decode copy
+            binary_data = base64.b64decode(data) if isinstance(data, str) else data
+            view = memoryview(binary_data).cast("B")
             
-            # Update import session
+            await self._import_chunk(disk, offset, view)
             session = self._import_sessions[disk_id]
-            session["bytes_imported"] += len(binary_data)
-            session["chunks"][offset] = len(binary_data)
             
             return {
                 "status": "data_written",
-                "bytes_written": len(binary_data),
+                "bytes_written": len(view),
                 "total_bytes_imported": session["bytes_imported"]
             }
             
@@ -399,28 +566,133 @@ class OxideStorageAPI:
             logger.error(f"❌ Failed to import data to disk {disk_id}: {e}")
             raise
     
-    async def disk_bulk_write_import_stop(self, disk_id: str) -> Dict[str, str]:
-        """Stop bulk write import (without finalizing)."""
+    async def disk_bulk_write_import_stream(self, disk_id: str, source: ImportSource, offset: int = 0,
+                                            chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Stream raw binary data into an importing disk.
+
+        Accepts a bytes-like object, a sync or async binary file object, or a
+        sync/async iterator of bytes-like chunks. Bytes-like sources are
+        written through memoryview slices without copying; file objects are
+        read into one reusable buffer (sync files from a worker thread), so
+        memory use stays constant regardless of image size.
+
+        Args:
+            disk_id: Disk in importing_from_bulk_writes state
+            source: Data to import
+            offset: Disk byte offset where the stream starts
+            chunk_size: Maximum bytes per backend write
+
+        Returns:
+            Dict with bytes written by this call and total import coverage
+        """
+        await self._sync_disk_state()
+        disk = self._get_importing_disk(disk_id)
+        if chunk_size <= 0 or chunk_size % disk.block_size:
+            raise ValueError(f"chunk_size must be a positive multiple of block size {disk.block_size}")
+
+        logger.info(f"📤 Streaming import to disk {disk_id} at offset {offset}")
+        position = offset
+
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                position = await self._import_chunked(disk, position, source, chunk_size)
+
+            elif hasattr(source, "readinto") and inspect.iscoroutinefunction(source.readinto):
+                position = await self._import_readinto(disk, position, source.readinto, chunk_size)
+
+            elif hasattr(source, "read") and inspect.iscoroutinefunction(source.read):
+                while True:
+                    chunk = await source.read(chunk_size)
+                    if not chunk:
+                        break
+                    await self._import_chunk(disk, position, memoryview(chunk).cast("B"))
+                    position += len(chunk)
+
+            elif hasattr(source, "readinto"):
+                # Blocking file reads run in a worker thread, off the event loop
+                async def readinto(buffer: bytearray) -> Optional[int]:
+                    return await asyncio.to_thread(source.readinto, buffer)
+
+                position = await self._import_readinto(disk, position, readinto, chunk_size)
+
+            elif hasattr(source, "__aiter__"):
+                async for chunk in source:
+                    position = await self._import_chunked(disk, position, chunk, chunk_size)
+
+            else:
+                for chunk in source:
+                    position = await self._import_chunked(disk, position, chunk, chunk_size)
+
+        except Exception as e:
+            logger.error(f"❌ Streaming import to disk {disk_id} failed at offset {position}: {e}")
+            raise
+
+        session = self._import_sessions[disk_id]
+        return {
+            "status": "data_written",
+            "bytes_written": position - offset,
+            "total_bytes_imported": session["bytes_imported"],
+            "covered_bytes": session["coverage"].covered_bytes()
+        }
+
+    async def _import_readinto(self, disk: Disk, position: int,
+                               readinto: Callable[[bytearray], Awaitable[Optional[int]]],
+                               chunk_size: int) -> int:
+        """Import a file through one reusable buffer; return the end position."""
+        buffer = bytearray(chunk_size)
+        buffer_view = memoryview(buffer)
+        while True:
+            count = await readinto(buffer)
+            if not count:
+                return position
+            await self._import_chunk(disk, position, buffer_view[:count])
+            position += count
+
+    async def disk_bulk_write_import_stop(self, disk_id: str, discard: bool = False) -> Dict[str, str]:
+        """
+        Stop bulk write import (without finalizing).
+
+        The session and its coverage are kept so a later start resumes where
+        this one left off, unless discard is set.
+        """
         logger.info(f"⏹️ Stopping bulk import for disk {disk_id}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
         disk = self._disks[disk_id]
         
-        # Clean up import session
-        if disk_id in self._import_sessions:
+        if discard and disk_id in self._import_sessions:
             del self._import_sessions[disk_id]
         
         disk.state = DiskState.IMPORT_READY
         disk.time_modified = datetime.now(timezone.utc).isoformat()
+        self._save_disk(disk)
         
         return {"status": "import_stopped"}
     
-    async def disk_finalize_import(self, disk_id: str, create_snapshot: bool = False) -> Dict[str, Any]:
-        """Finalize disk import and optionally create snapshot."""
+    async def disk_finalize_import(self, disk_id: str, create_snapshot: bool = False,
+                                   expected_sha256: Optional[str] = None,
+                                   image_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Finalize disk import and optionally create snapshot.
+
+        When an image size is known (passed here or at import start) every
+        byte of [0, image_size) must have been written. With expected_sha256
+        the imported bytes are read back and hashed. A failed check leaves
+        the import open so the client can upload the missing ranges.
+
+        Args:
+            disk_id: Disk in importing_from_bulk_writes state
+            create_snapshot: Snapshot the disk after finalizing
+            expected_sha256: Hex SHA-256 of the image
+            image_size: Image size in bytes (defaults to the session's expected size)
+        """
         logger.info(f"✅ Finalizing import for disk {disk_id}, snapshot={create_snapshot}")
         
+        await self._sync_disk_state()
         if disk_id not in self._disks:
             raise ValueError(f"Disk {disk_id} not found")
         
@@ -429,11 +701,28 @@ class OxideStorageAPI:
         if disk.state != DiskState.IMPORTING_FROM_BULK_WRITES:
             raise ValueError(f"Disk not in importing state, currently {disk.state.value}")
         
+        session = self._import_sessions.get(disk_id) or {}
+        image_size = image_size or session.get("expected_size")
+        coverage = session.get("coverage", IntervalSet())
+        checked_size = image_size or (disk.size if expected_sha256 else None)
+
+        if checked_size:
+            missing = coverage.missing(0, checked_size)
+            if missing:
+                missing_bytes = sum(end - start for start, end in missing)
+                raise ValueError(
+                    f"Import incomplete: {missing_bytes} bytes missing in {len(missing)} ranges, "
+                    f"first at {missing[0][0]}"
+                )
+
+        checksum_verified = False
+        if expected_sha256:
+            checksum_verified = await self._verify_import_checksum(disk, checked_size, expected_sha256)
+
         try:
             disk.state = DiskState.FINALIZING
+            self._save_disk(disk)
             
-            # Finalize import session
-            session = self._import_sessions.get(disk_id, {})
             logger.info(f"Import completed: {session.get('bytes_imported', 0)} bytes")
             
             # Clean up session
@@ -442,8 +731,9 @@ class OxideStorageAPI:
             
             disk.state = DiskState.DETACHED
             disk.time_modified = datetime.now(timezone.utc).isoformat()
+            self._save_disk(disk)
             
-            result = {"status": "finalized", "disk": asdict(disk)}
+            result = {"status": "finalized", "disk": asdict(disk), "checksum_verified": checksum_verified}
             result["disk"]["state"] = disk.state.value
             
             # Optionally create snapshot
@@ -462,6 +752,7 @@ class OxideStorageAPI:
             
         except Exception as e:
             disk.state = DiskState.FAULTED
+            self._save_disk(disk)
             logger.error(f"❌ Failed to finalize import for disk {disk_id}: {e}")
             raise
     
@@ -471,7 +762,8 @@ class OxideStorageAPI:
         """GET /v1/snapshots - List all snapshots."""
         logger.debug("📸 Listing project snapshots")
         
-        result = [asdict(snapshot) for snapshot in self._snapshots.values()]
+        await self._sync_disk_state()
+        result, _ = self.metadata.find("snapshot", self.project_id)
         logger.debug(f"📸 Found {len(result)} snapshots in project {self.project_id}")
         return result
     
@@ -483,6 +775,7 @@ class OxideStorageAPI:
         logger.info(f"📸 Creating snapshot '{request.name}' from disk {request.disk}")
         
         # Validate source disk exists
+        await self._sync_disk_state()
         if request.disk not in self._disks:
             raise ValueError(f"Source disk {request.disk} not found")
         
@@ -510,11 +803,13 @@ class OxideStorageAPI:
             
             snapshot.state = "ready"
             snapshot.time_modified = datetime.now(timezone.utc).isoformat()
+            self._snapshots.save(snapshot_id)
             
             logger.info(f"✅ Created snapshot {snapshot.name} ({snapshot_id})")
             
         except Exception as e:
             snapshot.state = "failed"
+            self._snapshots.save(snapshot_id)
             logger.error(f"❌ Failed to create snapshot {snapshot.name}: {e}")
             raise
         
@@ -524,6 +819,7 @@ class OxideStorageAPI:
         """GET /v1/snapshots/{snapshot} - View snapshot details."""
         logger.debug(f"🔍 Viewing snapshot {snapshot_id}")
         
+        await self._sync_disk_state()
         if snapshot_id not in self._snapshots:
             raise ValueError(f"Snapshot {snapshot_id} not found")
         
@@ -533,6 +829,7 @@ class OxideStorageAPI:
         """DELETE /v1/snapshots/{snapshot} - Delete a snapshot."""
         logger.info(f"🗑️ Deleting snapshot {snapshot_id}")
         
+        await self._sync_disk_state()
         if snapshot_id not in self._snapshots:
             raise ValueError(f"Snapshot {snapshot_id} not found")
         
@@ -566,6 +863,63 @@ class OxideStorageAPI:
     
     # === PRIVATE IMPLEMENTATION METHODS ===
     
+    def _save_disk(self, disk: Disk) -> None:
+        """Persist a disk after an in-place change."""
+        self._disks.save(disk.id)
+
+    def _get_importing_disk(self, disk_id: str) -> Disk:
+        """Return a disk that has an active import session."""
+        if disk_id not in self._disks:
+            raise ValueError(f"Disk {disk_id} not found")
+
+        if disk_id not in self._import_sessions:
+            raise ValueError(f"No import session for disk {disk_id}")
+
+        disk = self._disks[disk_id]
+
+        if disk.state != DiskState.IMPORTING_FROM_BULK_WRITES:
+            raise ValueError(f"Disk not in importing state, currently {disk.state.value}")
+
+        return disk
+
+    async def _import_chunk(self, disk: Disk, offset: int, view: memoryview) -> None:
+        """Write one chunk to the backend and record its coverage."""
+        length = len(view)
+        if offset < 0 or offset + length > disk.size:
+            raise ValueError(f"Import range {offset}+{length} exceeds disk size {disk.size}")
+
+        if disk.volume_id and length:
+            await self.storage_backend.write_volume(disk.volume_id, offset, view)
+
+        session = self._import_sessions[disk.id]
+        session["bytes_imported"] += length
+        session["coverage"].add(offset, offset + length)
+        self._import_sessions.save(disk.id)
+
+    async def _verify_import_checksum(self, disk: Disk, size: int, expected_sha256: str) -> bool:
+        """Hash [0, size) of the disk's volume; return False if the backend holds no data."""
+        if self.config.enable_mocking and not self.config.mock_data_dir:
+            logger.warning(f"⚠️  Skipping checksum for disk {disk.name}: mock backend stores no data")
+            return False
+
+        digest = hashlib.sha256()
+        for offset in range(0, size, DEFAULT_IMPORT_CHUNK_SIZE):
+            length = min(DEFAULT_IMPORT_CHUNK_SIZE, size - offset)
+            digest.update(await self.storage_backend.read_volume(disk.volume_id, offset, length))
+
+        if digest.hexdigest() != expected_sha256.lower():
+            raise ValueError(f"Import checksum mismatch: expected {expected_sha256}, got {digest.hexdigest()}")
+        return True
+
+    async def _import_chunked(self, disk: Disk, offset: int, data: Any, chunk_size: int) -> int:
+        """Write an arbitrary-size buffer in chunk_size slices; return the next offset."""
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), chunk_size):
+            chunk = view[start:start + chunk_size]
+            await self._import_chunk(disk, offset, chunk)
+            offset += len(chunk)
+        return offset
+
     async def _validate_disk_create(self, request: DiskCreate) -> None:
         """Validate disk creation request."""
         # Size limits
@@ -578,9 +932,9 @@ class OxideStorageAPI:
             raise ValueError(f"Invalid block size {request.block_size}")
         
         # Name uniqueness
-        for disk in self._disks.values():
-            if disk.name == request.name:
-                raise ValueError(f"Disk name '{request.name}' already exists")
+        existing, _ = self.metadata.find("disk", self.project_id, name=request.name, limit=1)
+        if existing:
+            raise ValueError(f"Disk name '{request.name}' already exists")
         
         # Snapshot validation
         if request.disk_source == DiskSource.SNAPSHOT:
@@ -598,8 +952,9 @@ class OxideStorageAPI:
         if not snapshot_id:
             raise ValueError("snapshot_id required")
         
-        # TODO: Implement snapshot cloning
-        await self.storage_backend.create_volume(volume_id, disk.size, disk.replica_count)
+        await self.storage_backend.create_volume_from_snapshot(
+            volume_id, snapshot_id, disk.size, disk.replica_count
+        )
     
     async def _create_from_image(self, disk: Disk, volume_id: str, image_id: Optional[str]) -> None:
         """Create disk from image."""
@@ -614,9 +969,70 @@ class OxideStorageAPI:
         await self.storage_backend.create_volume(volume_id, disk.size, disk.replica_count)
     
     async def _sync_disk_state(self) -> None:
-        """Synchronize disk state with storage backend."""
-        # TODO: Query actual storage state and update disk objects
-        pass
+        """
+        Reconcile persisted disks with the storage backend, once per process.
+
+        Disks left mid-operation by a restart are marked faulted, as are disks
+        whose volume no longer exists on a persistent backend. A backend that
+        does not persist volumes (the mock) starts empty after a restart, so
+        its volumes are reopened and its snapshots re-created instead; disks
+        whose data cannot be brought back are faulted rather than zeroed.
+        """
+        if self._state_synced:
+            return
+        self._state_synced = True
+
+        volumes = getattr(self.storage_backend, "volumes", None)
+        persistent = getattr(self.storage_backend, "persistent", True)
+        for disk_id in list(self._disks):
+            disk = self._disks[disk_id]
+            missing = volumes is not None and disk.volume_id is not None and disk.volume_id not in volumes
+            if missing and not persistent:
+                missing = not await self._restore_volume(disk)
+            if disk.state not in _INTERRUPTED_STATES and not missing:
+                continue
+
+            reason = "volume missing from backend" if missing else f"interrupted while {disk.state.value}"
+            logger.warning(f"⚠️  Disk {disk.name} faulted on startup: {reason}")
+            disk.state = DiskState.FAULTED
+            disk.time_modified = datetime.now(timezone.utc).isoformat()
+            self._save_disk(disk)
+
+        if not persistent:
+            await self._restore_snapshots()
+
+    async def _restore_volume(self, disk: Disk) -> bool:
+        """Reopen a disk's volume on a non-persistent backend; return success."""
+        try:
+            await self.storage_backend.reopen_volume(disk.volume_id, disk.size, disk.replica_count)
+        except Exception as e:
+            logger.error(f"❌ Failed to restore volume for disk {disk.name}: {e}")
+            return False
+
+        logger.info(f"♻️  Restored volume {disk.volume_id} for disk {disk.name}")
+        return True
+
+    async def _restore_snapshots(self) -> None:
+        """Re-create ready snapshots a non-persistent backend lost across a restart."""
+        backend_snapshots = getattr(self.storage_backend, "snapshots", {})
+        for snapshot_id in list(self._snapshots):
+            snapshot = self._snapshots[snapshot_id]
+            if snapshot.state != "ready" or snapshot_id in backend_snapshots:
+                continue
+
+            source = self._disks.get(snapshot.disk_id)
+            try:
+                if source is None or not source.volume_id:
+                    raise ValueError(f"source disk {snapshot.disk_id} no longer exists")
+                if self.config.mock_data_dir:
+                    # Snapshotting now would capture today's bytes, not the point in time
+                    raise ValueError("snapshot contents did not survive the restart")
+                await self.storage_backend.create_snapshot(snapshot_id, source.volume_id)
+            except Exception as e:
+                logger.warning(f"⚠️  Snapshot {snapshot.name} failed on startup: {e}")
+                snapshot.state = "failed"
+                snapshot.time_modified = datetime.now(timezone.utc).isoformat()
+                self._snapshots.save(snapshot_id)
     
     async def _refresh_disk_state(self, disk: Disk) -> None:
         """Refresh state of a specific disk."""
@@ -94,6 +94,9 @@ def validate_config(
         all_valid = True
         results = []
 
+        # Probe every distinct server concurrently; validation reads the cache
+        manager.probe_connectivity([config.server for config in configs if config.enabled])
+
         for config in configs:
             validation = manager.validate_storage_config(config)
             results.append((config, validation))
@@ -107,6 +110,7 @@ def validate_config(
         table.add_column("Status", style="bold")
         table.add_column("DNS", style="green")
         table.add_column("Port 8007", style="green")
+        table.add_column("TLS", style="green")
         table.add_column("Issues", style="yellow")
 
         for config, validation in results:
@@ -116,6 +120,11 @@ def validate_config(
             status = "✅ Valid" if validation["valid"] else "❌ Invalid"
             dns_status = "✅" if connectivity.get("dns_resolved") else "❌"
             port_status = "✅" if connectivity.get("port_open") else "❌"
+            tls_status = (
+                f"✅ {connectivity['tls_handshake_ms']:.0f}ms"
+                if connectivity.get("ssl_valid") and connectivity.get("tls_handshake_ms") is not None
+                else "❌"
+            )
 
             issues = len(validation["errors"]) + len(validation["warnings"])
             issues_str = f"{len(validation['errors'])} errors, {len(validation['warnings'])} warnings"
@@ -125,6 +134,7 @@ def validate_config(
                 status,
                 dns_status,
                 port_status,
+                tls_status,
                 issues_str if issues > 0 else "-"
             )
 
@@ -196,6 +206,9 @@ def apply_config(
         configs = manager.load_config(str(config_file))
         console.print(f"📋 Loaded {len(configs)} storage configurations\n")
 
+        if not skip_validation:
+            manager.probe_connectivity([config.server for config in configs if config.enabled])
+
         # Reconcile each storage entry
         results = []
         for config in configs:
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Concurrent, cached connectivity probing for PBS servers.
+
+Each (server, port) target is probed at most once per run: DNS lookup, one
+TCP connection, and a TLS handshake on that same connection. The probe
+records the server's certificate fingerprint (in the colon-separated
+SHA-256 form Proxmox storage configs use) and connect/handshake latency.
+Targets are probed concurrently; the blocking socket calls run in worker
+threads.
+
+Usage:
+    from homelab.pbs_connectivity import ConnectivityProber
+
+    prober = ConnectivityProber(timeout=5)
+    results = prober.probe_all([("pbs.maas", 8007), ("pbs2.maas", 8007)])
+    results[("pbs.maas", 8007)]["fingerprint"]
+"""
+
+import asyncio
+import hashlib
+import logging
+import socket
+import ssl
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PBS_PORT = 8007
+DEFAULT_PROBE_TIMEOUT = 5.0
+DEFAULT_PROBE_CONCURRENCY = 32
+
+Target = Tuple[str, int]
+
+
+def format_fingerprint(der_cert: bytes) -> str:
+    """SHA-256 fingerprint of a DER certificate as 'AB:CD:...'."""
+    digest = hashlib.sha256(der_cert).hexdigest().upper()
+    return ":".join(digest[i:i + 2] for i in range(0, len(digest), 2))
+
+
+def probe_target(server: str, port: int, timeout: float) -> Dict[str, Any]:
+    """
+    Probe one target with a single connection (blocking).
+
+    Args:
+        server: Hostname or IP
+        port: TCP port
+        timeout: Timeout in seconds for each step
+
+    Returns:
+        Dictionary with connectivity check results:
+        {
+            'reachable': bool,
+            'ip': str,
+            'dns_resolved': bool,
+            'port_open': bool,
+            'ssl_valid': bool,
+            'fingerprint': str,
+            'connect_ms': float,
+            'tls_handshake_ms': float,
+            'error': str (if any)
+        }
+    """
+    result: Dict[str, Any] = {
+        "reachable": False,
+        "ip": None,
+        "dns_resolved": False,
+        "port_open": False,
+        "ssl_valid": False,
+        "fingerprint": None,
+        "connect_ms": None,
+        "tls_handshake_ms": None,
+        "error": None,
+    }
+
+    # Step 1: DNS resolution
+    try:
+        ip = socket.gethostbyname(server)
+    except (socket.gaierror, UnicodeError) as e:
+        result["error"] = f"DNS resolution failed for {server}: {e}"
+        return result
+
+    result["dns_resolved"] = True
+    result["ip"] = ip
+
+    # Step 2: TCP connect
+    start = time.perf_counter()
+    try:
+        sock = socket.create_connection((ip, port), timeout=timeout)
+    except (socket.timeout, ConnectionRefusedError, OSError) as e:
+        result["error"] = f"Port {port} not reachable on {ip}: {e}"
+        return result
+
+    result["port_open"] = True
+    result["connect_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    # Step 3: TLS handshake on the same connection (PBS uses HTTPS with
+    # self-signed certificates, so the fingerprint is what gets verified)
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+
+    start = time.perf_counter()
+    try:
+        with context.wrap_socket(sock, server_hostname=server) as ssock:
+            result["tls_handshake_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            der_cert = ssock.getpeercert(binary_form=True)
+            if isinstance(der_cert, bytes):
+                result["fingerprint"] = format_fingerprint(der_cert)
+            result["ssl_valid"] = True
+            result["reachable"] = True
+    except ssl.SSLError as e:
+        result["error"] = f"SSL handshake failed: {e}"
+    except Exception as e:
+        result["error"] = f"Connectivity check failed: {e}"
+    finally:
+        sock.close()
+
+    return result
+
+
+class ConnectivityProber:
+    """Probes (server, port) targets concurrently and caches results for the run."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_PROBE_TIMEOUT,
+        max_concurrency: int = DEFAULT_PROBE_CONCURRENCY,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError(f"Invalid probe concurrency {max_concurrency}")
+
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._results: Dict[Target, Dict[str, Any]] = {}
+
+    def cached(self, server: str, port: int = DEFAULT_PBS_PORT) -> Optional[Dict[str, Any]]:
+        """Cached result for a target, if it was probed this run."""
+        return self._results.get((server, port))
+
+    def clear(self) -> None:
+        """Forget all cached results."""
+        self._results.clear()
+
+    def check(
+        self, server: str, port: int = DEFAULT_PBS_PORT, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Probe a single target in the calling thread, using the cache."""
+        key = (server, port)
+        if key not in self._results:
+            self._results[key] = probe_target(server, port, timeout or self.timeout)
+        return self._results[key]
+
+    async def probe_many(self, targets: Iterable[Target]) -> Dict[Target, Dict[str, Any]]:
+        """
+        Probe every distinct target concurrently.
+
+        Args:
+            targets: (server, port) pairs; duplicates and cached targets
+                are not probed again
+
+        Returns:
+            Results keyed by (server, port) for every requested target
+        """
+        wanted = list(dict.fromkeys(targets))
+        missing = [target for target in wanted if target not in self._results]
+
+        if missing:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def probe(target: Target) -> Dict[str, Any]:
+                async with semaphore:
+                    return await asyncio.to_thread(probe_target, target[0], target[1], self.timeout)
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(probe(target) for target in missing))
+            self._results.update(zip(missing, results))
+            logger.debug(
+                f"Probed {len(missing)} targets in {time.perf_counter() - start:.2f}s"
+            )
+
+        return {target: self._results[target] for target in wanted}
+
+    def probe_all(self, targets: Iterable[Target]) -> Dict[Target, Dict[str, Any]]:
+        """Synchronous wrapper around probe_many for CLI and manager code."""
+        return asyncio.run(self.probe_many(targets))
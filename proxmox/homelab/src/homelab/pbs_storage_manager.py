@@ -14,13 +14,14 @@ Usage:
 
 import logging
 import socket
-import ssl
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 
 import yaml
 
+from homelab.pbs_connectivity import DEFAULT_PBS_PORT, ConnectivityProber
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,6 +88,8 @@ class PBSStorageManager:
         """
         self.proxmox = proxmox_client
         self.logger = logger
+        # Connectivity results are cached for the lifetime of the manager
+        self.prober = ConnectivityProber()
 
     def resolve_hostname(self, hostname: str) -> Optional[str]:
         """
@@ -107,11 +110,14 @@ class PBSStorageManager:
             return None
 
     def check_pbs_connectivity(
-        self, server: str, port: int = 8007, timeout: int = 5
+        self, server: str, port: int = DEFAULT_PBS_PORT, timeout: int = 5
     ) -> Dict[str, Any]:
         """
         Check connectivity to PBS server.
 
+        DNS, TCP and TLS are checked over a single connection, and the
+        result is cached so storages sharing a server are probed once.
+
         Args:
             server: PBS server hostname or IP
             port: PBS API port (default: 8007)
@@ -125,57 +131,32 @@ class PBSStorageManager:
                 'dns_resolved': bool,
                 'port_open': bool,
                 'ssl_valid': bool,
+                'fingerprint': str (SHA-256 of the server certificate),
+                'connect_ms': float,
+                'tls_handshake_ms': float,
                 'error': str (if any)
             }
         """
-        result = {
-            "reachable": False,
-            "ip": None,
-            "dns_resolved": False,
-            "port_open": False,
-            "ssl_valid": False,
-            "error": None,
-        }
+        return self.prober.check(server, port, timeout)
 
-        # Step 1: DNS resolution
-        ip = self.resolve_hostname(server)
-        if not ip:
-            result["error"] = f"DNS resolution failed for {server}"
-            return result
-
-        result["dns_resolved"] = True
-        result["ip"] = ip
+    def probe_connectivity(
+        self, servers: List[str], port: int = DEFAULT_PBS_PORT
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Check connectivity to many PBS servers concurrently.
 
-        # Step 2: TCP connectivity check
-        try:
-            sock = socket.create_connection((ip, port), timeout=timeout)
-            result["port_open"] = True
-            sock.close()
-        except (socket.timeout, ConnectionRefusedError, OSError) as e:
-            result["error"] = f"Port {port} not reachable on {ip}: {e}"
-            return result
-
-        # Step 3: SSL/TLS check (PBS uses HTTPS)
-        try:
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-
-            with socket.create_connection((ip, port), timeout=timeout) as sock:
-                with context.wrap_socket(sock, server_hostname=server) as ssock:
-                    result["ssl_valid"] = True
-                    result["reachable"] = True
-        except ssl.SSLError as e:
-            result["error"] = f"SSL handshake failed: {e}"
-            return result
-        except Exception as e:
-            result["error"] = f"Connectivity check failed: {e}"
-            return result
+        Args:
+            servers: PBS server hostnames (duplicates are probed once)
+            port: PBS API port (default: 8007)
 
-        return result
+        Returns:
+            Connectivity check results keyed by server
+        """
+        results = self.prober.probe_all((server, port) for server in servers)
+        return {server: result for (server, _), result in results.items()}
 
     def validate_storage_config(
-        self, config: PBSStorageConfig
+        self, config: PBSStorageConfig, connectivity: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Validate PBS storage configuration before reconciliation.
@@ -185,9 +166,12 @@ class PBSStorageManager:
         - PBS server connectivity
         - Port accessibility
         - SSL/TLS availability
+        - Server certificate matches the configured fingerprint
 
         Args:
             config: PBS storage configuration to validate
+            connectivity: Result of check_pbs_connectivity for config.server,
+                when the caller has already probed it
 
         Returns:
             Dictionary with validation results:
@@ -205,7 +189,8 @@ class PBSStorageManager:
         self.logger.info(f"🔍 Validating configuration for {config.name}")
 
         # Check 1: DNS resolution
-        connectivity = self.check_pbs_connectivity(config.server)
+        if connectivity is None:
+            connectivity = self.check_pbs_connectivity(config.server)
         checks["connectivity"] = connectivity
 
         if not connectivity["dns_resolved"]:
@@ -226,7 +211,14 @@ class PBSStorageManager:
                 f"This may be normal for self-signed certificates."
             )
 
-        # Check 2: Datastore name validation
+        # Check 2: Server certificate matches the pinned fingerprint
+        presented = connectivity.get("fingerprint")
+        if presented and config.fingerprint and presented.upper() != config.fingerprint.upper():
+            errors.append(
+                f"Fingerprint mismatch for {config.server}: server presents {presented}"
+            )
+
+        # Check 3: Datastore name validation
         if not config.datastore:
             errors.append("Datastore name is required")
 
@@ -235,7 +227,7 @@ class PBSStorageManager:
                 f"Datastore name '{config.datastore}' is longer than 32 characters"
             )
 
-        # Check 3: Fingerprint format validation
+        # Check 4: Fingerprint format validation
         if config.fingerprint:
             expected_format = "XX:XX:XX:..."
             if ":" not in config.fingerprint or len(config.fingerprint) < 47:
@@ -279,6 +271,19 @@ class PBSStorageManager:
         except Exception:
             return None
 
+    def list_storages(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get every storage entry from Proxmox in one API call.
+
+        Returns:
+            Dictionary of storage configurations keyed by storage identifier
+        """
+        return {
+            storage["storage"]: storage
+            for storage in self.proxmox.storage.get() or []
+            if "storage" in storage
+        }
+
     def storage_exists(self, name: str) -> bool:
         """
         Check if storage exists in Proxmox.
@@ -319,29 +324,22 @@ class PBSStorageManager:
             self.logger.error(f"❌ Error creating storage {config.name}: {e}")
             raise
 
-    def update_storage(
+    def diff_storage(
         self, config: PBSStorageConfig, existing: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Update existing PBS storage entry to match desired config.
+        Compare desired config with an existing storage entry.
 
         Args:
             config: Desired PBS storage configuration
             existing: Current storage configuration from Proxmox
 
         Returns:
-            Dictionary with operation result:
-            {
-                'action': 'updated' | 'no_change',
-                'name': str,
-                'changes': dict
-            }
+            Dictionary of changed parameters: {key: {'from': ..., 'to': ...}}
         """
         changes = {}
-        params = config.to_proxmox_params()
 
-        # Check for differences
-        for key, desired_value in params.items():
+        for key, desired_value in config.to_proxmox_params().items():
             # Skip 'type' field as it can't be updated
             if key == "type":
                 continue
@@ -355,6 +353,29 @@ class PBSStorageManager:
             elif desired_value != current_value:
                 changes[key] = {"from": current_value, "to": desired_value}
 
+        return changes
+
+    def update_storage(
+        self, config: PBSStorageConfig, existing: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Update existing PBS storage entry to match desired config.
+
+        Args:
+            config: Desired PBS storage configuration
+            existing: Current storage configuration from Proxmox
+
+        Returns:
+            Dictionary with operation result:
+            {
+                'action': 'updated' | 'no_change',
+                'name': str,
+                'changes': dict
+            }
+        """
+        changes = self.diff_storage(config, existing)
+        params = config.to_proxmox_params()
+
         if not changes:
             self.logger.info(f"✅ Storage {config.name} already matches desired state")
             return {"action": "no_change", "name": config.name, "changes": {}}
@@ -372,12 +393,15 @@ class PBSStorageManager:
             self.logger.error(f"❌ Error updating storage {config.name}: {e}")
             raise
 
-    def disable_storage(self, name: str) -> Dict[str, Any]:
+    def disable_storage(
+        self, name: str, existing: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Disable PBS storage entry in Proxmox.
 
         Args:
             name: Storage identifier
+            existing: Current storage configuration, if already fetched
 
         Returns:
             Dictionary with operation result:
@@ -386,7 +410,8 @@ class PBSStorageManager:
                 'name': str
             }
         """
-        existing = self.get_storage(name)
+        if existing is None:
+            existing = self.get_storage(name)
         if not existing:
             self.logger.warning(f"⚠️  Storage {name} not found, skipping disable")
             return {"action": "not_found", "name": name}
@@ -405,12 +430,15 @@ class PBSStorageManager:
             self.logger.error(f"❌ Error disabling storage {name}: {e}")
             raise
 
-    def enable_storage(self, name: str) -> Dict[str, Any]:
+    def enable_storage(
+        self, name: str, existing: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Enable PBS storage entry in Proxmox.
 
         Args:
             name: Storage identifier
+            existing: Current storage configuration, if already fetched
 
         Returns:
             Dictionary with operation result:
@@ -419,7 +447,8 @@ class PBSStorageManager:
                 'name': str
             }
         """
-        existing = self.get_storage(name)
+        if existing is None:
+            existing = self.get_storage(name)
         if not existing:
             self.logger.warning(f"⚠️  Storage {name} not found, cannot enable")
             return {"action": "not_found", "name": name}
@@ -0,0 +1,213 @@
+"""Serve Prometheus scrape targets over HTTP service discovery.
+
+Keeps the target groups produced by :mod:`homelab.prometheus_targets` in
+memory and serves them as a Prometheus ``http_sd_configs`` endpoint.  The
+set is rebuilt only when ``cluster.yaml`` changes on disk (checked with a
+``stat`` per request), and only the target groups that were added or
+removed are replaced, so unchanged groups keep their identity.
+
+With ``liveness`` enabled, every target is TCP-probed concurrently (at
+most once per ``liveness_interval``) and labelled
+``__meta_homelab_reachable="true"|"false"``.  Targets are labelled rather
+than dropped so that ``up == 0`` alerts keep firing; a job that prefers
+to skip dead targets can drop them with relabelling::
+
+    - job_name: proxmox-node-exporter
+      http_sd_configs:
+        - url: http://homelab-sd:8765/targets?job=proxmox-node-exporter
+      relabel_configs:
+        - source_labels: [__meta_homelab_reachable]
+          regex: "false"
+          action: drop
+
+Usage (library)::
+
+    from homelab.prometheus_sd import TargetSet, make_server
+    server = make_server(TargetSet("config/cluster.yaml"), port=8765)
+    server.serve_forever()
+
+Usage (CLI)::
+
+    poetry run homelab monitoring serve-targets --port 8765 --liveness
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from homelab.host_probe import DEFAULT_PROBE_WORKERS, probe_hosts
+from homelab.prometheus_targets import generate_targets, load_cluster_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SD_PORT = 8765
+DEFAULT_LIVENESS_TIMEOUT = 1.0
+DEFAULT_LIVENESS_INTERVAL = 30.0
+REACHABLE_LABEL = "__meta_homelab_reachable"
+
+
+def _group_key(group: dict[str, Any]) -> str:
+    """Identity of a target group: its addresses and labels."""
+    return json.dumps(group, sort_keys=True)
+
+
+def check_target(address: str, timeout: float = DEFAULT_LIVENESS_TIMEOUT) -> bool:
+    """Return True if ``host:port`` accepts a TCP connection."""
+    host, _, port = address.rpartition(":")
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+class TargetSet:
+    """In-memory target groups that follow ``cluster.yaml`` on disk."""
+
+    def __init__(
+        self,
+        config_path: Path | str,
+        liveness: bool = False,
+        liveness_timeout: float = DEFAULT_LIVENESS_TIMEOUT,
+        liveness_interval: float = DEFAULT_LIVENESS_INTERVAL,
+        max_workers: int = DEFAULT_PROBE_WORKERS,
+    ) -> None:
+        self.config_path = Path(config_path)
+        self.liveness = liveness
+        self.liveness_timeout = liveness_timeout
+        self.liveness_interval = liveness_interval
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._stamp: tuple[int, int] | None = None
+        self._groups: dict[str, dict[str, Any]] = {}
+        self._reachable: dict[str, bool] = {}
+        self._checked_at = 0.0
+
+    def refresh(self) -> bool:
+        """Rebuild the target set if ``cluster.yaml`` changed on disk.
+
+        Returns True if any target group was added or removed.  A config
+        that fails to load is logged and the previous targets are kept.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.config_path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if stamp == self._stamp:
+                    return False
+                self._stamp = stamp
+                desired = {_group_key(g): g for g in generate_targets(load_cluster_config(self.config_path))}
+            except Exception as exc:
+                logger.error("Keeping previous targets, failed to load %s: %s", self.config_path, exc)
+                return False
+
+            added = desired.keys() - self._groups.keys()
+            removed = self._groups.keys() - desired.keys()
+
+            # Keep config order; untouched groups stay the same objects
+            self._groups = {key: self._groups.get(key, group) for key, group in desired.items()}
+            if added or removed:
+                logger.info("Targets updated: %d added, %d removed", len(added), len(removed))
+                self._checked_at = 0.0
+            return bool(added or removed)
+
+    def check_liveness(self, force: bool = False) -> None:
+        """Probe every target concurrently unless probed within the interval."""
+        with self._lock:
+            if not force and time.monotonic() - self._checked_at < self.liveness_interval:
+                return
+            addresses = sorted({t for g in self._groups.values() for t in g["targets"]})
+
+        results = probe_hosts(
+            addresses,
+            lambda address: check_target(address, self.liveness_timeout),
+            max_workers=self.max_workers,
+        )
+
+        with self._lock:
+            self._reachable = dict(zip(addresses, results))
+            self._checked_at = time.monotonic()
+
+        down = [a for a, up in self._reachable.items() if not up]
+        if down:
+            logger.warning("Unreachable targets: %s", ", ".join(down))
+
+    def groups(self, job: str | None = None) -> list[dict[str, Any]]:
+        """Current target groups, optionally for a single job.
+
+        Refreshes from disk (and re-probes, with liveness enabled) first.
+        """
+        self.refresh()
+        if self.liveness:
+            self.check_liveness()
+
+        with self._lock:
+            selected = [
+                g for g in self._groups.values()
+                if job is None or g["labels"].get("job") == job
+            ]
+            if not self.liveness:
+                return selected
+            return [
+                {
+                    "targets": g["targets"],
+                    "labels": {
+                        **g["labels"],
+                        REACHABLE_LABEL: str(all(self._reachable.get(t, False) for t in g["targets"])).lower(),
+                    },
+                }
+                for g in selected
+            ]
+
+
+class _SDHandler(BaseHTTPRequestHandler):
+    """Serves ``/targets`` (optionally ``?job=``) and ``/healthz``."""
+
+    target_set: TargetSet
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url = urlparse(self.path)
+        if url.path == "/healthz":
+            self._send(200, b"ok\n", "text/plain")
+        elif url.path in ("/", "/targets"):
+            job = parse_qs(url.query).get("job", [None])[0]
+            try:
+                body = json.dumps(self.target_set.groups(job)).encode()
+            except Exception as exc:
+                logger.error("Failed to build targets: %s", exc)
+                self._send(500, f"{exc}\n".encode(), "text/plain")
+                return
+            self._send(200, body, "application/json")
+        else:
+            self._send(404, b"not found\n", "text/plain")
+
+    def _send(self, code: int, body: bytes, content_type: str) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(
+    target_set: TargetSet,
+    host: str = "0.0.0.0",
+    port: int = DEFAULT_SD_PORT,
+) -> ThreadingHTTPServer:
+    """Build (but do not start) the HTTP SD server for ``target_set``."""
+    handler = type("SDHandler", (_SDHandler,), {"target_set": target_set})
+    target_set.refresh()
+    return ThreadingHTTPServer((host, port), handler)
@@ -13,10 +13,13 @@ Usage (library)::
 Usage (CLI)::
 
     poetry run homelab monitoring generate-targets
+
+For live discovery without a ConfigMap, see :mod:`homelab.prometheus_sd`.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import subprocess
@@ -27,6 +30,10 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+CONFIGMAP_NAME = "prometheus-scrape-targets"
+# Annotation holding the sha256 of targets.json, compared before applying
+HASH_ANNOTATION = "homelab-targets-sha256"
+
 
 def load_cluster_config(config_path: Path | str) -> dict[str, Any]:
     """Load and return the parsed cluster.yaml."""
@@ -117,6 +124,46 @@ def generate_targets_json(config_path: Path | str) -> str:
     return json.dumps(targets, indent=2)
 
 
+def _kubectl(args: list[str], kubeconfig: str | None) -> list[str]:
+    """Build a kubectl command line, adding --kubeconfig if given."""
+    cmd = ["kubectl", *args]
+    if kubeconfig:
+        cmd.extend(["--kubeconfig", kubeconfig])
+    return cmd
+
+
+def _current_targets_hash(kubeconfig: str | None, namespace: str) -> str | None:
+    """Return the targets hash annotated on the live ConfigMap, if any.
+
+    Raises ``subprocess.CalledProcessError`` for errors other than the
+    ConfigMap not existing yet.
+    """
+    cmd = _kubectl([
+        "get", "configmap", CONFIGMAP_NAME,
+        f"--namespace={namespace}",
+        "--ignore-not-found",
+        "-o", f"jsonpath={{.metadata.annotations.{HASH_ANNOTATION}}}",
+    ], kubeconfig)
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return proc.stdout.strip() or None
+
+
+def build_configmap(targets_json: str, namespace: str) -> dict[str, Any]:
+    """Render the ConfigMap manifest, annotated with the targets hash."""
+    return {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {
+            "name": CONFIGMAP_NAME,
+            "namespace": namespace,
+            "annotations": {
+                HASH_ANNOTATION: hashlib.sha256(targets_json.encode()).hexdigest(),
+            },
+        },
+        "data": {"targets.json": targets_json},
+    }
+
+
 def apply_targets_configmap(
     config_path: Path | str,
     kubeconfig: str | None = None,
@@ -126,10 +173,12 @@ def apply_targets_configmap(
     """Generate targets and apply as a Kubernetes ConfigMap.
 
     Creates/updates ``prometheus-scrape-targets`` ConfigMap in the
-    given namespace containing ``targets.json``.
+    given namespace containing ``targets.json``.  The ConfigMap carries
+    a sha256 annotation of its content; when the live annotation already
+    matches, nothing is applied.
 
-    Returns a dict with ``success``, ``targets_count``, and optionally
-    ``error``.
+    Returns a dict with ``success``, ``targets_count``, ``unchanged``
+    and optionally ``error``.
     """
     targets_json = generate_targets_json(config_path)
     targets = json.loads(targets_json)
@@ -142,32 +191,27 @@ def apply_targets_configmap(
             "dry_run": True,
         }
 
-    # Build kubectl command: create configmap --dry-run=client | kubectl apply
-    create_cmd = [
-        "kubectl", "create", "configmap", "prometheus-scrape-targets",
-        f"--from-literal=targets.json={targets_json}",
-        f"--namespace={namespace}",
-        "--dry-run=client",
-        "-o", "yaml",
-    ]
-    apply_cmd = ["kubectl", "apply", "-f", "-"]
-
-    if kubeconfig:
-        create_cmd.extend(["--kubeconfig", kubeconfig])
-        apply_cmd.extend(["--kubeconfig", kubeconfig])
+    manifest = build_configmap(targets_json, namespace)
+    targets_hash = manifest["metadata"]["annotations"][HASH_ANNOTATION]
 
     try:
-        create_proc = subprocess.run(
-            create_cmd, capture_output=True, text=True, check=True,
-        )
+        if _current_targets_hash(kubeconfig, namespace) == targets_hash:
+            logger.info("ConfigMap %s already up to date", CONFIGMAP_NAME)
+            return {
+                "success": True,
+                "targets_count": len(targets),
+                "unchanged": True,
+            }
+
         apply_proc = subprocess.run(
-            apply_cmd, input=create_proc.stdout,
+            _kubectl(["apply", "-f", "-"], kubeconfig), input=json.dumps(manifest),
             capture_output=True, text=True, check=True,
         )
         logger.info("ConfigMap applied: %s", apply_proc.stdout.strip())
         return {
             "success": True,
             "targets_count": len(targets),
+            "unchanged": False,
             "output": apply_proc.stdout.strip(),
         }
     except subprocess.CalledProcessError as exc:
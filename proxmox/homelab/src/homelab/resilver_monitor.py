@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+src/homelab/resilver_monitor.py
+
+Resilver and scrub progress tracking for ZFS pools.
+
+A ResilverMonitor samples ``zpool status`` (one SSH exec per sample) on an
+adaptive interval: quickly while the ETA is short, up to once a minute for
+day-long scans. It keeps a small time series of bytes examined and issued,
+and derives an exponentially smoothed issue rate, the ETA, and whether the
+scan is throttled (the recent rate has dropped well below the best rate
+seen in the window, e.g. because the pool is busy with other I/O).
+
+Progress can be rendered as Prometheus metrics for the node_exporter
+textfile collector.
+
+Usage:
+    with ZfsMirrorManager("still-fawn") as mgr:
+        monitor = mgr.resilver_monitor("rpool")
+        progress = monitor.poll()
+        print(progress.percent_done, progress.eta_seconds)
+
+CLI:
+    poetry run homelab storage mirror status --host still-fawn --watch
+"""
+
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from homelab.zfs_facts import parse_size, parse_zpool_status, zpool_status_command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = 60
+DEFAULT_SMOOTHING = 0.3
+MIN_INTERVAL = 5.0
+MAX_INTERVAL = 60.0
+
+# Smoothed rate below this fraction of the window's best rate counts as throttled
+THROTTLE_RATIO = 0.5
+THROTTLE_MIN_SAMPLES = 4
+
+METRIC_PREFIX = "homelab_zfs_scan"
+
+
+@dataclass
+class ScanSample:
+    """One observation of a pool's scan."""
+
+    timestamp: float
+    function: str  # RESILVER, SCRUB or NONE
+    state: str  # SCANNING, FINISHED, CANCELED or NONE
+    examined: int = 0
+    issued: int = 0
+    to_examine: int = 0
+    processed: int = 0
+
+    @property
+    def active(self) -> bool:
+        return self.state == "SCANNING"
+
+
+@dataclass
+class ScanProgress:
+    """Derived progress of the current scan."""
+
+    pool: str
+    function: str
+    state: str
+    examined: int = 0
+    issued: int = 0
+    to_examine: int = 0
+    processed: int = 0
+    issue_rate: Optional[float] = None  # bytes/s, smoothed
+    peak_rate: Optional[float] = None  # best smoothed rate in the window
+    eta_seconds: Optional[float] = None
+    throttled: bool = False
+    samples: int = 0
+
+    @property
+    def active(self) -> bool:
+        return self.state == "SCANNING"
+
+    @property
+    def percent_done(self) -> Optional[float]:
+        if not self.to_examine:
+            return None
+        return min(100.0, 100.0 * self.issued / self.to_examine)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "function": self.function.lower(),
+            "state": self.state.lower(),
+            "percent_done": self.percent_done,
+            "issued": self.issued,
+            "to_examine": self.to_examine,
+            "issue_rate": self.issue_rate,
+            "eta_seconds": self.eta_seconds,
+            "throttled": self.throttled,
+        }
+
+
+def sample_from_stats(stats: Dict[str, Any], timestamp: float) -> ScanSample:
+    """Build a sample from a pool's scan_stats (JSON or parsed text)."""
+    return ScanSample(
+        timestamp=timestamp,
+        function=str(stats.get("function") or "NONE").upper(),
+        state=str(stats.get("state") or "NONE").upper(),
+        examined=parse_size(stats.get("examined", 0)),
+        issued=parse_size(stats.get("issued", 0)),
+        to_examine=parse_size(stats.get("to_examine", 0)),
+        processed=parse_size(stats.get("processed", 0)),
+    )
+
+
+class ScanTracker:
+    """Time series of samples for one pool, with smoothed rate and ETA."""
+
+    def __init__(
+        self,
+        pool: str,
+        history: int = DEFAULT_HISTORY,
+        smoothing: float = DEFAULT_SMOOTHING,
+    ) -> None:
+        self.pool = pool
+        self.smoothing = smoothing
+        self.samples: Deque[ScanSample] = deque(maxlen=history)
+        self._rates: Deque[float] = deque(maxlen=history)
+        self._rate: Optional[float] = None
+
+    def _reset(self) -> None:
+        self.samples.clear()
+        self._rates.clear()
+        self._rate = None
+
+    def add(self, sample: ScanSample) -> ScanProgress:
+        """Record a sample and return the updated progress."""
+        last = self.samples[-1] if self.samples else None
+
+        # A different or restarted scan starts a new series
+        if last and (sample.function != last.function or sample.issued < last.issued):
+            self._reset()
+            last = None
+
+        if last and sample.active and sample.timestamp > last.timestamp:
+            instant = (sample.issued - last.issued) / (sample.timestamp - last.timestamp)
+            if self._rate is None:
+                self._rate = instant
+            else:
+                self._rate = self.smoothing * instant + (1 - self.smoothing) * self._rate
+            self._rates.append(self._rate)
+
+        self.samples.append(sample)
+        return self.progress()
+
+    def progress(self) -> ScanProgress:
+        """Progress as of the latest sample."""
+        if not self.samples:
+            return ScanProgress(self.pool, "NONE", "NONE")
+
+        sample = self.samples[-1]
+        progress = ScanProgress(
+            pool=self.pool,
+            function=sample.function,
+            state=sample.state,
+            examined=sample.examined,
+            issued=sample.issued,
+            to_examine=sample.to_examine,
+            processed=sample.processed,
+            samples=len(self.samples),
+        )
+        if not sample.active or self._rate is None:
+            return progress
+
+        progress.issue_rate = self._rate
+        progress.peak_rate = max(self._rates)
+        if self._rate > 0 and sample.to_examine:
+            progress.eta_seconds = max(0, sample.to_examine - sample.issued) / self._rate
+        progress.throttled = (
+            len(self._rates) >= THROTTLE_MIN_SAMPLES
+            and self._rate < THROTTLE_RATIO * progress.peak_rate
+        )
+        return progress
+
+
+def next_interval(
+    progress: ScanProgress,
+    min_interval: float = MIN_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> float:
+    """Sampling interval: fast while warming up or close to done, slow otherwise."""
+    if not progress.active:
+        return max_interval
+    if progress.eta_seconds is None:
+        return min_interval
+    return max(min_interval, min(max_interval, progress.eta_seconds / 30))
+
+
+class ResilverMonitor:
+    """Samples one pool's scan progress over SSH."""
+
+    def __init__(
+        self,
+        execute: Callable[[str], Tuple[str, str, int]],
+        pool: str,
+        history: int = DEFAULT_HISTORY,
+        smoothing: float = DEFAULT_SMOOTHING,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.execute = execute
+        self.pool = pool
+        self.clock = clock
+        self.tracker = ScanTracker(pool, history=history, smoothing=smoothing)
+
+    def sample(self) -> ScanSample:
+        """Read the pool's scan stats in one exec."""
+        stdout, stderr, rc = self.execute(zpool_status_command(self.pool))
+        if rc != 0:
+            raise RuntimeError(f"zpool status {self.pool} failed: {stderr or stdout}")
+        pool = parse_zpool_status(stdout).get(self.pool)
+        if pool is None:
+            raise RuntimeError(f"Pool {self.pool} not found in zpool status")
+        return sample_from_stats(pool.scan_stats, self.clock())
+
+    def poll(self) -> ScanProgress:
+        """Take a sample and return the updated progress."""
+        return self.tracker.add(self.sample())
+
+
+def watch(
+    monitors: List[ResilverMonitor],
+    callback: Callable[[List[ScanProgress]], None],
+    min_interval: float = MIN_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+    until_idle: bool = True,
+    timeout: Optional[float] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> List[ScanProgress]:
+    """
+    Poll monitors on an adaptive interval until no scan is running.
+
+    Args:
+        monitors: One monitor per pool
+        callback: Called with every round of progress
+        min_interval: Shortest sampling interval (seconds)
+        max_interval: Longest sampling interval (seconds)
+        until_idle: Stop once no pool is scanning (otherwise run until interrupted)
+        timeout: Give up after this many seconds, even if scans are running
+        sleep: Sleep function (for tests)
+        clock: Monotonic clock for the timeout (for tests)
+
+    Returns:
+        The last round of progress
+    """
+    deadline = clock() + timeout if timeout is not None else None
+    while True:
+        results = []
+        for monitor in monitors:
+            try:
+                results.append(monitor.poll())
+            except Exception as e:
+                logger.warning(f"Failed to sample {monitor.pool}: {e}")
+                results.append(monitor.tracker.progress())
+        callback(results)
+
+        active = [p for p in results if p.active]
+        if until_idle and not active:
+            return results
+        interval = min(
+            (next_interval(p, min_interval, max_interval) for p in active),
+            default=max_interval,
+        )
+        if deadline is not None:
+            if clock() >= deadline:
+                return results
+            interval = min(interval, max(0.0, deadline - clock()))
+        sleep(interval)
+
+
+# -- presentation --
+
+def format_bytes(value: Optional[float]) -> str:
+    """Human-readable binary size, e.g. '1.8 TiB'."""
+    if value is None:
+        return "n/a"
+    if abs(value) < 1024:
+        return f"{value:.0f} B"
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        value /= 1024
+        if abs(value) < 1024 or unit == "TiB":
+            break
+    return f"{value:.1f} {unit}"
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Compact duration, e.g. '2d 3h', '1h 20m', '45s'."""
+    if seconds is None:
+        return "n/a"
+    seconds = int(seconds)
+    days, rem = divmod(seconds, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, secs = divmod(rem, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {secs}s"
+    return f"{secs}s"
+
+
+def format_metrics(progress: List[Tuple[str, ScanProgress]]) -> str:
+    """
+    Render progress as Prometheus text exposition format.
+
+    Args:
+        progress: (hostname, progress) per pool
+
+    Returns:
+        Metrics text for the node_exporter textfile collector
+    """
+    metrics = [
+        ("active", "gauge", "1 if a resilver or scrub is running", lambda p: int(p.active)),
+        ("issued_bytes", "gauge", "Bytes issued by the current scan", lambda p: p.issued),
+        ("examined_bytes", "gauge", "Bytes examined by the current scan", lambda p: p.examined),
+        ("total_bytes", "gauge", "Bytes the current scan has to examine", lambda p: p.to_examine),
+        ("progress_ratio", "gauge", "Issued fraction of the scan (0-1)",
+         lambda p: None if p.percent_done is None else p.percent_done / 100),
+        ("issue_rate_bytes_per_second", "gauge", "Smoothed issue throughput", lambda p: p.issue_rate),
+        ("eta_seconds", "gauge", "Estimated seconds until the scan completes", lambda p: p.eta_seconds),
+        ("throttled", "gauge", "1 if the issue rate dropped well below its recent peak",
+         lambda p: int(p.throttled)),
+    ]
+
+    lines = []
+    for name, kind, help_text, value_of in metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+        for hostname, p in progress:
+            value = value_of(p)
+            if value is None:
+                continue
+            labels = f'host="{hostname}",pool="{p.pool}",function="{p.function.lower()}"'
+            # Byte counts stay exact; rates, ratios and ETAs are rounded
+            text = str(value) if isinstance(value, int) else repr(round(value, 4))
+            lines.append(f"{METRIC_PREFIX}_{name}{{{labels}}} {text}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Path, text: str) -> None:
+    """Atomically replace a textfile-collector file (never read half-written)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -10,14 +10,25 @@ Single command to reconcile ALL infrastructure components:
 - Containers
 - Networks
 
+Reconciliation works like 'terraform plan' + 'terraform apply': current
+state for every resource type is read in one batched inventory pass, diffed
+against the config into a typed Plan, and the plan's changes are applied
+concurrently within each dependency stage.
+
 Usage:
     from homelab.unified_infrastructure_manager import UnifiedInfrastructureManager
 
-    manager = UnifiedInfrastructureManager()
-    results = manager.apply("config/homelab.yaml")
+    manager = UnifiedInfrastructureManager(proxmox)
+    plan = manager.plan(manager.load_config("config/homelab.yaml"))
+    print("\n".join(plan.render()))
+    results = manager.apply_plan(plan)
 """
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -27,6 +38,8 @@ from homelab.pbs_storage_manager import PBSStorageConfig, PBSStorageManager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_APPLY_WORKERS = 8
+
 
 class InfrastructureConfig:
     """Model for complete infrastructure configuration."""
@@ -68,6 +81,7 @@ class ResourceResult:
         success: bool,
         message: str = "",
         details: Optional[Dict[str, Any]] = None,
+        elapsed_sec: float = 0.0,
     ):
         """
         Initialize resource result.
@@ -79,6 +93,7 @@ class ResourceResult:
             success: Whether the operation succeeded
             message: Human-readable message
             details: Additional details about the operation
+            elapsed_sec: Wall-clock time spent applying the resource
         """
         self.resource_type = resource_type
         self.resource_name = resource_name
@@ -86,6 +101,7 @@ class ResourceResult:
         self.success = success
         self.message = message
         self.details = details or {}
+        self.elapsed_sec = elapsed_sec
 
     def __repr__(self) -> str:
         """String representation."""
@@ -93,6 +109,82 @@ class ResourceResult:
         return f"{status} {self.resource_type}/{self.resource_name}: {self.action}"
 
 
+class ChangeAction(Enum):
+    """Planned change for a single resource."""
+    CREATE = "create"
+    UPDATE = "update"
+    ENABLE = "enable"  # Re-enable, plus any config updates
+    DISABLE = "disable"
+    NO_CHANGE = "no_change"
+    SKIP = "skip"  # Resource type not reconciled yet
+
+    @property
+    def symbol(self) -> str:
+        """Terraform-style plan marker."""
+        return {"create": "+", "update": "~", "enable": "~", "disable": "-"}.get(self.value, " ")
+
+
+@dataclass
+class ResourceChange:
+    """Diff between desired and current state of one resource."""
+    resource_type: str
+    resource_name: str
+    action: ChangeAction
+    changes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    desired: Any = None
+    current: Optional[Dict[str, Any]] = None
+    reason: str = ""
+    validation: Optional[Dict[str, Any]] = None  # Pre-flight result for this resource
+
+    @property
+    def pending(self) -> bool:
+        """Whether applying this change calls the API."""
+        return self.action not in (ChangeAction.NO_CHANGE, ChangeAction.SKIP)
+
+
+@dataclass
+class Plan:
+    """Ordered set of resource changes computed from one inventory pass."""
+    changes: List[ResourceChange] = field(default_factory=list)
+    validation: Optional[Dict[str, Any]] = None
+    inventory_sec: float = 0.0
+
+    @property
+    def pending(self) -> List[ResourceChange]:
+        """Changes that will call the API when applied."""
+        return [change for change in self.changes if change.pending]
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether applying the plan would change anything."""
+        return bool(self.pending)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of resources per planned action."""
+        counts: Dict[str, int] = {}
+        for change in self.changes:
+            counts[change.action.value] = counts.get(change.action.value, 0) + 1
+        return counts
+
+    def render(self) -> List[str]:
+        """Human-readable plan, one line per resource plus one per changed field."""
+        lines = []
+        for change in self.changes:
+            lines.append(
+                f"{change.action.symbol} {change.resource_type}/{change.resource_name}: "
+                f"{change.action.value}"
+                + (f" ({change.reason})" if change.reason else "")
+            )
+            for key, diff in change.changes.items():
+                lines.append(f"    {key}: {diff['from']!r} -> {diff['to']!r}")
+
+        pending = len(self.pending)
+        lines.append(
+            f"Plan: {pending} to change, {len(self.changes) - pending} unchanged."
+        )
+        return lines
+
+
 class UnifiedInfrastructureManager:
     """Unified infrastructure manager - orchestrates all components."""
 
@@ -153,14 +245,30 @@ class UnifiedInfrastructureManager:
 
         return config
 
+    def probe_servers(self, servers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Check connectivity to each distinct PBS server once, concurrently.
+
+        Args:
+            servers: PBS server hostnames (duplicates are probed once)
+
+        Returns:
+            Connectivity check results keyed by server
+        """
+        return self.pbs_manager.probe_connectivity(servers)
+
     def validate_config(
-        self, config: InfrastructureConfig
+        self,
+        config: InfrastructureConfig,
+        connectivity: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
         """
         Validate complete infrastructure configuration.
 
         Args:
             config: Infrastructure configuration to validate
+            connectivity: Connectivity results keyed by server, from
+                probe_servers; servers missing from it are probed here
 
         Returns:
             Dictionary with validation results
@@ -176,16 +284,25 @@ class UnifiedInfrastructureManager:
             pbs_errors = []
             pbs_warnings = []
 
-            for storage_data in config.pbs_storages:
-                storage_config = PBSStorageConfig(storage_data)
-
-                # Skip validation for disabled storages
-                if not storage_config.enabled:
-                    continue
+            # Skip validation for disabled storages
+            storage_configs = [
+                storage_config
+                for storage_config in map(PBSStorageConfig, config.pbs_storages)
+                if storage_config.enabled
+            ]
+            by_storage: Dict[str, Dict[str, Any]] = {}
+            connectivity = dict(connectivity or {})
+            connectivity.update(
+                self.probe_servers(
+                    [c.server for c in storage_configs if c.server not in connectivity]
+                )
+            )
 
+            for storage_config in storage_configs:
                 validation = self.pbs_manager.validate_storage_config(
-                    storage_config
+                    storage_config, connectivity=connectivity[storage_config.server]
                 )
+                by_storage[storage_config.name] = validation
 
                 if not validation["valid"]:
                     pbs_errors.extend(validation["errors"])
@@ -194,9 +311,11 @@ class UnifiedInfrastructureManager:
 
             if pbs_errors:
                 errors.append(f"PBS storage validation failed: {len(pbs_errors)} errors")
-                checks["pbs_storages"] = {"valid": False, "errors": pbs_errors}
+                checks["pbs_storages"] = {"valid": False, "errors": pbs_errors, "storages": by_storage}
             else:
-                checks["pbs_storages"] = {"valid": True, "count": len(config.pbs_storages)}
+                checks["pbs_storages"] = {
+                    "valid": True, "count": len(config.pbs_storages), "storages": by_storage
+                }
 
             if pbs_warnings:
                 warnings.extend(pbs_warnings)
@@ -326,11 +445,255 @@ class UnifiedInfrastructureManager:
 
         return results
 
+    def read_inventory(self, config: InfrastructureConfig) -> Dict[str, Any]:
+        """
+        Read current state of every configured resource type in one pass.
+
+        Each resource type is fetched with a single list call rather than
+        one read per resource, so the cost does not grow with the config.
+
+        Args:
+            config: Infrastructure configuration
+
+        Returns:
+            Current state keyed by resource type
+        """
+        inventory: Dict[str, Any] = {}
+
+        if config.pbs_storages:
+            inventory["pbs_storages"] = self.pbs_manager.list_storages()
+
+        return inventory
+
+    def plan(
+        self, config: InfrastructureConfig, skip_validation: bool = False
+    ) -> Plan:
+        """
+        Compute the changes needed to reach the desired state (like 'terraform plan').
+
+        Args:
+            config: Infrastructure configuration
+            skip_validation: Skip pre-flight connectivity validation
+
+        Returns:
+            Plan with one ResourceChange per configured resource, in
+            dependency order; each validated change carries its own result
+        """
+        start = time.monotonic()
+        inventory = self.read_inventory(config)
+        plan = Plan()
+
+        for resource in config.dns_resources:
+            plan.changes.append(
+                ResourceChange(
+                    resource_type="dns",
+                    resource_name=resource.get("name", "unknown"),
+                    action=ChangeAction.SKIP,
+                    desired=resource,
+                    reason="DNS reconciliation not yet implemented",
+                )
+            )
+
+        existing_storages = inventory.get("pbs_storages", {})
+        for storage_data in config.pbs_storages:
+            storage_config = PBSStorageConfig(storage_data)
+            plan.changes.append(
+                self._plan_pbs_storage(
+                    storage_config, existing_storages.get(storage_config.name)
+                )
+            )
+
+        if not skip_validation and config.pbs_storages:
+            # One concurrent probe per distinct server, shared by all its storages
+            connectivity = self.probe_servers(
+                [c.desired.server for c in plan.changes
+                 if c.resource_type == "pbs_storage" and c.desired.enabled]
+            )
+            plan.validation = self.validate_config(config, connectivity=connectivity)
+            by_storage = plan.validation["checks"]["pbs_storages"]["storages"]
+            for change in plan.changes:
+                if change.resource_type == "pbs_storage":
+                    change.validation = by_storage.get(change.resource_name)
+
+        plan.inventory_sec = time.monotonic() - start
+        self.logger.info(
+            f"📋 Planned {len(plan.changes)} resources in {plan.inventory_sec:.2f}s: "
+            f"{plan.counts()}"
+        )
+        return plan
+
+    def _plan_pbs_storage(
+        self, config: PBSStorageConfig, existing: Optional[Dict[str, Any]]
+    ) -> ResourceChange:
+        """Diff one PBS storage entry against its inventory record."""
+        change = ResourceChange(
+            resource_type="pbs_storage",
+            resource_name=config.name,
+            action=ChangeAction.NO_CHANGE,
+            desired=config,
+            current=existing,
+        )
+
+        if not existing:
+            if config.enabled:
+                change.action = ChangeAction.CREATE
+            return change
+
+        if not config.enabled:
+            if existing.get("disable") != 1:
+                change.action = ChangeAction.DISABLE
+                change.changes = {"disable": {"from": existing.get("disable"), "to": 1}}
+            return change
+
+        change.changes = self.pbs_manager.diff_storage(config, existing)
+        if existing.get("disable") == 1:
+            change.action = ChangeAction.ENABLE
+        elif change.changes:
+            change.action = ChangeAction.UPDATE
+        return change
+
+    def apply_plan(
+        self, plan: Plan, max_workers: int = DEFAULT_APPLY_WORKERS
+    ) -> List[ResourceResult]:
+        """
+        Apply a plan (like 'terraform apply').
+
+        Resource types are applied in dependency order (self.resource_order);
+        resources of the same type are independent and are applied
+        concurrently by a pool of max_workers threads. Changes whose own
+        pre-flight validation failed are reported as validation_failed
+        without calling the API.
+
+        Args:
+            plan: Plan from plan()
+            max_workers: Maximum concurrent API operations
+
+        Returns:
+            One result per planned resource, in plan order
+        """
+        type_order = {"dns": "dns_resources", "pbs_storage": "pbs_storages"}
+        results: Dict[int, ResourceResult] = {}
+
+        for stage in self.resource_order:
+            indexed = [
+                (index, change)
+                for index, change in enumerate(plan.changes)
+                if type_order.get(change.resource_type) == stage
+            ]
+            if not indexed:
+                continue
+
+            for index, change in indexed:
+                if not change.pending:
+                    results[index] = self._unchanged_result(change)
+                elif change.validation and not change.validation["valid"]:
+                    results[index] = self._validation_failed_result(change)
+            pending = [(i, c) for i, c in indexed if i not in results]
+
+            if pending:
+                self.logger.info(f"🔄 Applying {len(pending)} {stage} changes...")
+                workers = max(1, min(max_workers, len(pending)))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    applied = executor.map(self._apply_change, [c for _, c in pending])
+                    for (index, _), result in zip(pending, applied):
+                        results[index] = result
+
+        return [results[index] for index in sorted(results)]
+
+    def _unchanged_result(self, change: ResourceChange) -> ResourceResult:
+        """Result for a resource that needs no API call."""
+        if change.action == ChangeAction.SKIP:
+            self.logger.info(
+                f"  ℹ️  {change.resource_type} '{change.resource_name}': {change.reason}"
+            )
+            return ResourceResult(
+                resource_type=change.resource_type,
+                resource_name=change.resource_name,
+                action="skipped",
+                success=True,
+                message=change.reason,
+            )
+
+        return ResourceResult(
+            resource_type=change.resource_type,
+            resource_name=change.resource_name,
+            action="no_change",
+            success=True,
+            message=f"{change.resource_type} {change.resource_name}: no_change",
+        )
+
+    def _validation_failed_result(self, change: ResourceChange) -> ResourceResult:
+        """Result for a pending change held back by its own failed validation."""
+        self.logger.warning(
+            f"  ⚠️  {change.resource_type} '{change.resource_name}': validation failed, not applied"
+        )
+        return ResourceResult(
+            resource_type=change.resource_type,
+            resource_name=change.resource_name,
+            action="validation_failed",
+            success=False,
+            message="; ".join(change.validation["errors"]),
+            details={"validation": change.validation},
+        )
+
+    def _apply_change(self, change: ResourceChange) -> ResourceResult:
+        """Apply one planned change and time it (runs in a worker thread)."""
+        start = time.monotonic()
+
+        try:
+            result = self._apply_pbs_storage(change)
+            action = result["action"]
+            return ResourceResult(
+                resource_type=change.resource_type,
+                resource_name=change.resource_name,
+                action=action,
+                success=action not in ["error", "validation_failed", "not_found"],
+                message=f"PBS storage {change.resource_name}: {action}",
+                details=result,
+                elapsed_sec=time.monotonic() - start,
+            )
+
+        except Exception as e:
+            self.logger.error(
+                f"❌ Failed to apply {change.resource_type} {change.resource_name}: {e}",
+                exc_info=True,
+            )
+            return ResourceResult(
+                resource_type=change.resource_type,
+                resource_name=change.resource_name,
+                action="error",
+                success=False,
+                message=str(e),
+                elapsed_sec=time.monotonic() - start,
+            )
+
+    def _apply_pbs_storage(self, change: ResourceChange) -> Dict[str, Any]:
+        """Apply a planned PBS storage change using the inventory record."""
+        config = change.desired
+
+        if change.action == ChangeAction.CREATE:
+            return self.pbs_manager.create_storage(config)
+
+        if change.action == ChangeAction.DISABLE:
+            return self.pbs_manager.disable_storage(config.name, existing=change.current)
+
+        if change.action == ChangeAction.ENABLE:
+            self.pbs_manager.enable_storage(config.name, existing=change.current)
+            update_result = self.pbs_manager.update_storage(config, change.current)
+            return {
+                "action": "enabled_and_updated",
+                "name": config.name,
+                "changes": update_result.get("changes", {}),
+            }
+
+        return self.pbs_manager.update_storage(config, change.current)
+
     def reconcile_infrastructure(
         self,
         config: InfrastructureConfig,
         skip_validation: bool = False,
         dry_run: bool = False,
+        max_workers: int = DEFAULT_APPLY_WORKERS,
     ) -> List[ResourceResult]:
         """
         Reconcile complete infrastructure to match desired state.
@@ -347,6 +710,7 @@ class UnifiedInfrastructureManager:
             config: Infrastructure configuration
             skip_validation: Skip pre-flight validation
             dry_run: Show what would be done without making changes
+            max_workers: Maximum concurrent API operations
 
         Returns:
             List of all resource results
@@ -354,82 +718,37 @@ class UnifiedInfrastructureManager:
         self.logger.info("🔄 Starting infrastructure reconciliation...")
         self.logger.info(f"  Infrastructure: {config.name} v{config.version}")
 
+        # A dry run only diffs; connectivity is probed when changes are applied
+        plan = self.plan(config, skip_validation=skip_validation or dry_run)
+        self.log_plan(plan)
+
         if dry_run:
             self.logger.info("  Mode: DRY RUN (no changes will be made)")
+            return []
 
-        all_results = []
-
-        # Apply resources in dependency order
-        for resource_type in self.resource_order:
-            if resource_type == "dns_resources" and config.dns_resources:
-                if not dry_run:
-                    results = self.reconcile_dns_resources(config.dns_resources)
-                    all_results.extend(results)
-
-            elif resource_type == "pbs_storages" and config.pbs_storages:
-                if not dry_run:
-                    results = self.reconcile_pbs_storages(
-                        config.pbs_storages, skip_validation=skip_validation
-                    )
-                    all_results.extend(results)
-                else:
-                    # Dry run - just log what would happen
-                    self.logger.info(
-                        f"  [DRY RUN] Would reconcile {len(config.pbs_storages)} PBS storages"
-                    )
+        # Resources that failed validation are held back individually
+        return self.apply_plan(plan, max_workers=max_workers)
 
-            # TODO: Add other resource types
-            # elif resource_type == "storage_pools" and config.storage_pools:
-            #     results = self.reconcile_storage_pools(config.storage_pools)
-            #     all_results.extend(results)
+    def log_plan(self, plan: Plan) -> None:
+        """Log the plan, one line per resource."""
+        for line in plan.render():
+            self.logger.info(f"  {line}")
 
-        return all_results
-
-    def apply(
-        self,
-        config_path: str,
-        skip_validation: bool = False,
-        dry_run: bool = False,
-    ) -> Dict[str, Any]:
+    def summarize(self, results: List[ResourceResult]) -> Dict[str, Any]:
         """
-        Apply complete infrastructure configuration (like 'terraform apply').
+        Summarize apply results by action and resource type.
 
         Args:
-            config_path: Path to unified configuration file
-            skip_validation: Skip pre-flight validation
-            dry_run: Show what would be done without making changes
+            results: Results from apply_plan
 
         Returns:
-            Dictionary with apply results and summary
+            Summary dictionary with totals, per-action and per-type counts
         """
-        # Load configuration
-        config = self.load_config(config_path)
-
-        # Validate (unless skipped)
-        if not skip_validation and not dry_run:
-            validation = self.validate_config(config)
-
-            if not validation["valid"]:
-                self.logger.error(
-                    "❌ Infrastructure validation failed. Fix errors before applying."
-                )
-                return {
-                    "success": False,
-                    "validation": validation,
-                    "results": [],
-                    "summary": {"total": 0, "success": 0, "failed": 0},
-                }
-
-        # Reconcile infrastructure
-        results = self.reconcile_infrastructure(
-            config, skip_validation=skip_validation, dry_run=dry_run
-        )
-
-        # Generate summary
         summary = {
             "total": len(results),
             "success": sum(1 for r in results if r.success),
             "failed": sum(1 for r in results if not r.success),
+            "elapsed_sec": sum(r.elapsed_sec for r in results),
             "by_action": {},
             "by_type": {},
         }
@@ -445,6 +764,58 @@ class UnifiedInfrastructureManager:
                 summary["by_type"].get(result.resource_type, 0) + 1
             )
 
+        return summary
+
+    def apply(
+        self,
+        config_path: str,
+        skip_validation: bool = False,
+        dry_run: bool = False,
+        max_workers: int = DEFAULT_APPLY_WORKERS,
+    ) -> Dict[str, Any]:
+        """
+        Apply complete infrastructure configuration (like 'terraform apply').
+
+        Args:
+            config_path: Path to unified configuration file
+            skip_validation: Skip pre-flight validation
+            dry_run: Plan only; show what would be done without making changes
+            max_workers: Maximum concurrent API operations
+
+        Returns:
+            Dictionary with the plan, apply results and summary
+        """
+        # Load configuration
+        config = self.load_config(config_path)
+
+        # Inventory, diff and validate (a dry run does not probe connectivity)
+        plan = self.plan(config, skip_validation=skip_validation or dry_run)
+        self.log_plan(plan)
+
+        if plan.validation and not plan.validation["valid"]:
+            self.logger.error(
+                "❌ Infrastructure validation failed. Fix errors before applying."
+            )
+            return {
+                "success": False,
+                "plan": plan,
+                "validation": plan.validation,
+                "results": [],
+                "summary": self.summarize([]),
+            }
+
+        if dry_run:
+            self.logger.info("✅ Dry run complete - no changes made")
+            return {
+                "success": True,
+                "plan": plan,
+                "results": [],
+                "summary": self.summarize([]),
+            }
+
+        results = self.apply_plan(plan, max_workers=max_workers)
+        summary = self.summarize(results)
+
         # Log summary
         self.logger.info("=" * 70)
         self.logger.info("📊 Infrastructure Reconciliation Summary:")
@@ -459,9 +830,7 @@ class UnifiedInfrastructureManager:
 
         self.logger.info("=" * 70)
 
-        if dry_run:
-            self.logger.info("✅ Dry run complete - no changes made")
-        elif summary["failed"] == 0:
+        if summary["failed"] == 0:
             self.logger.info("✅ Infrastructure reconciliation complete!")
         else:
             self.logger.warning(
@@ -470,6 +839,7 @@ class UnifiedInfrastructureManager:
 
         return {
             "success": summary["failed"] == 0,
+            "plan": plan,
             "results": results,
             "summary": summary,
         }
@@ -9,10 +9,14 @@ and MetalLB LoadBalancer services.
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List
 
 from dotenv import load_dotenv
-from uptime_kuma_api import MonitorType, UptimeKumaApi  # type: ignore
+from uptime_kuma_api import UptimeKumaApi  # type: ignore
+
+from homelab.uptime_kuma_monitors import generate_monitors
+from homelab.uptime_kuma_sync import DEFAULT_BATCH_SIZE, sync_monitors
 
 # Load environment variables (look for .env in parent directories)
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
@@ -20,6 +24,22 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", "..", ".en
 logger = logging.getLogger(__name__)
 
 
+def homelab_monitors(is_secondary_instance: bool = False) -> List[Dict[str, Any]]:
+    """
+    Desired monitors for homelab infrastructure.
+    Generated from config/cluster.yaml nodes and the GitOps Traefik ingress
+    and MetalLB services (see homelab.uptime_kuma_monitors).
+
+    Args:
+        is_secondary_instance: If True, adds 10-minute delay to all monitors
+                             for secondary alerting (prevents alert storms)
+
+    Returns:
+        List of monitor configs, each with a unique name
+    """
+    return generate_monitors(is_secondary_instance=is_secondary_instance)
+
+
 class UptimeKumaClient:
     """Client for managing Uptime Kuma monitors using the official API library."""
 
@@ -132,249 +152,36 @@ class UptimeKumaClient:
             logger.error(f"Error updating monitor {monitor_id}: {e}")
             return False
 
-    def create_homelab_monitors(self, is_secondary_instance: bool = False) -> List[Dict[str, Any]]:
+    def create_homelab_monitors(
+        self,
+        is_secondary_instance: bool = False,
+        prune: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> List[Dict[str, Any]]:
         """
-        Create comprehensive monitoring setup for homelab infrastructure.
-        Based on actual Traefik ingress and MetalLB services from GitOps config.
+        Create or update the homelab monitors in one declarative sync.
+
+        The monitor list is fetched once and only changed monitors are sent.
 
         Args:
             is_secondary_instance: If True, adds 10-minute delay to all monitors
                                  for secondary alerting (prevents alert storms)
+            prune: Delete monitors on this instance that are not in the homelab list
+            batch_size: Maximum API calls in flight
 
         Returns:
-            List of created monitor results
+            List of per-monitor results
         """
         if not self.authenticated:
             logger.error("Not authenticated to Uptime Kuma")
             return []
 
-        results = []
-
-        # Secondary instance settings (10-minute delay for redundant alerting)
-        base_interval_multiplier = 2 if is_secondary_instance else 1
-        base_retry_delay = 600 if is_secondary_instance else 60  # 10 minutes vs 1 minute
-        instance_suffix = " (Secondary)" if is_secondary_instance else ""
-
-        # Define homelab monitors based on actual services
-        monitors_config = [
-            # Core Infrastructure
-            {
-                "name": f"OPNsense Gateway{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "192.168.4.1",
-                "interval": 60 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "OPNsense firewall/router gateway connectivity",
-            },
-            {
-                "name": f"MAAS Server{instance_suffix}",
-                "type": MonitorType.HTTP,
-                "url": "http://192.168.4.53:5240/MAAS/",
-                "method": "GET",
-                "interval": 300 * base_interval_multiplier,
-                "maxretries": 2,
-                "retryInterval": base_retry_delay * 2,
-                "description": "MAAS bare metal provisioning server",
-            },
-            # Proxmox Nodes
-            {
-                "name": f"Proxmox pve Node{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "192.168.4.122",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "Proxmox pve node connectivity",
-            },
-            {
-                "name": f"Proxmox still-fawn Node{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "still-fawn.maas",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "Proxmox still-fawn node connectivity",
-            },
-            {
-                "name": f"Proxmox fun-bedbug Node{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "fun-bedbug.maas",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "Proxmox fun-bedbug node connectivity",
-            },
-            {
-                "name": f"Proxmox chief-horse Node{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "chief-horse.maas",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "Proxmox chief-horse node connectivity",
-            },
-            # Kubernetes Services via Traefik Ingress (from actual ingress configs)
-            {
-                "name": f"Ollama GPU Server{instance_suffix}",
-                "type": MonitorType.HTTP,
-                "url": "http://ollama.app.homelab",
-                "method": "GET",
-                "interval": 300 * base_interval_multiplier,
-                "maxretries": 2,
-                "retryInterval": base_retry_delay * 2,
-                "description": "Ollama AI model server via Traefik ingress",
-            },
-            {
-                "name": f"Stable Diffusion WebUI{instance_suffix}",
-                "type": MonitorType.HTTP,
-                "url": "http://stable-diffusion.app.homelab",
-                "method": "GET",
-                "interval": 300 * base_interval_multiplier,
-                "maxretries": 2,
-                "retryInterval": base_retry_delay * 2,
-                "description": "Stable Diffusion WebUI via Traefik ingress",
-            },
-            # MetalLB LoadBalancer Services (based on actual service configs)
-            {
-                "name": f"Samba File Server{instance_suffix}",
-                "type": MonitorType.PORT,
-                "hostname": "192.168.4.120",  # Fixed IP from metallb annotation
-                "port": 445,
-                "interval": 300 * base_interval_multiplier,
-                "maxretries": 2,
-                "retryInterval": base_retry_delay * 2,
-                "description": "Samba SMB file server via MetalLB LoadBalancer",
-            },
-            # K3s VM Health
-            {
-                "name": f"K3s VM - pve{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "k3s-vm-pve",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "K3s VM on pve node",
-            },
-            {
-                "name": f"K3s VM - still-fawn{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "k3s-vm-still-fawn",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "K3s VM on still-fawn node",
-            },
-            {
-                "name": f"K3s VM - chief-horse{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "k3s-vm-chief-horse",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "K3s VM on chief-horse node",
-            },
-            # External Connectivity
-            {
-                "name": f"Internet - Google DNS{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "8.8.8.8",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "Internet connectivity via Google DNS",
-            },
-            {
-                "name": f"Internet - Cloudflare DNS{instance_suffix}",
-                "type": MonitorType.PING,
-                "hostname": "1.1.1.1",
-                "interval": 120 * base_interval_multiplier,
-                "maxretries": 3,
-                "retryInterval": base_retry_delay,
-                "description": "Internet connectivity via Cloudflare DNS",
-            },
-            {
-                "name": f"DNS Resolution Test{instance_suffix}",
-                "type": MonitorType.DNS,
-                "hostname": "google.com",
-                "dns_resolve_server": "8.8.8.8",
-                "interval": 300 * base_interval_multiplier,
-                "maxretries": 2,
-                "retryInterval": base_retry_delay * 2,
-                "description": "External DNS resolution capability",
-            },
-        ]
-
-        # Create or update monitors (idempotent)
-        for monitor_config in monitors_config:
-            monitor_name = monitor_config["name"]
-            
-            # Check if monitor already exists
-            existing_monitor = self.get_monitor_by_name(monitor_name)
-            
-            if existing_monitor:
-                # Monitor exists, check if update is needed
-                monitor_id = existing_monitor.get("id")
-                needs_update = False
-                
-                # Compare key configuration fields
-                config_fields = ["hostname", "url", "port", "interval", "maxretries", "retryInterval", "type", "method", "description"]
-                for field in config_fields:
-                    if field in monitor_config:
-                        existing_value = existing_monitor.get(field)
-                        new_value = monitor_config[field]
-                        
-                        # Special handling for MonitorType enum
-                        if field == "type" and hasattr(new_value, 'value'):
-                            new_value = new_value.value
-                            
-                        if existing_value != new_value:
-                            logger.info(f"Monitor '{monitor_name}' field '{field}' differs: {existing_value} -> {new_value}")
-                            needs_update = True
-                            break
-                
-                if needs_update:
-                    logger.info(f"Updating monitor: {monitor_name}")
-                    try:
-                        # Remove 'name' from config since it's not needed for update
-                        config = monitor_config.copy()
-                        config.pop("name")
-                        
-                        if self.update_monitor(monitor_id, **config):
-                            logger.info(f"✅ Successfully updated monitor '{monitor_name}' (ID: {monitor_id})")
-                            results.append({"name": monitor_name, "status": "updated", "monitor_id": monitor_id})
-                        else:
-                            logger.error(f"❌ Failed to update monitor '{monitor_name}'")
-                            results.append({"name": monitor_name, "status": "update_failed", "monitor_id": monitor_id})
-                    except Exception as e:
-                        logger.error(f"❌ Error updating monitor '{monitor_name}': {e}")
-                        results.append({"name": monitor_name, "status": "update_failed", "monitor_id": monitor_id})
-                else:
-                    logger.info(f"Monitor '{monitor_name}' is up to date")
-                    results.append({"name": monitor_name, "status": "up_to_date", "monitor_id": monitor_id})
-            else:
-                # Monitor doesn't exist, create it
-                logger.info(f"Creating monitor: {monitor_name}")
-                try:
-                    # Remove 'name' from config since it's passed separately
-                    config = monitor_config.copy()
-                    config.pop("name")
-
-                    result = self.api.add_monitor(name=monitor_name, **config)
-
-                    if result and result.get("monitorID"):
-                        monitor_id = result["monitorID"]
-                        logger.info(f"✅ Successfully created monitor '{monitor_name}' with ID {monitor_id}")
-                        results.append({"name": monitor_name, "status": "created", "monitor_id": monitor_id})
-                    else:
-                        logger.error(f"❌ Failed to create monitor '{monitor_name}': {result}")
-                        results.append({"name": monitor_name, "status": "failed", "monitor_id": None})
-
-                except Exception as e:
-                    logger.error(f"❌ Error creating monitor '{monitor_name}': {e}")
-                    results.append({"name": monitor_name, "status": "failed", "monitor_id": None})
-
-        return results
+        return sync_monitors(
+            self.api,
+            homelab_monitors(is_secondary_instance),
+            prune=prune,
+            batch_size=batch_size,
+        )
 
     def __enter__(self) -> "UptimeKumaClient":
         """Context manager entry."""
@@ -407,11 +214,13 @@ def setup_monitoring_for_instance(uptime_kuma_url: str, is_secondary: bool = Fal
 
             # Summary
             created_count = len([r for r in results if r["status"] == "created"])
-            existing_count = len([r for r in results if r["status"] == "already_exists"])
-            failed_count = len([r for r in results if r["status"] == "failed"])
+            updated_count = len([r for r in results if r["status"] == "updated"])
+            existing_count = len([r for r in results if r["status"] == "up_to_date"])
+            failed_count = len([r for r in results if r["status"].endswith("failed")])
 
             logger.info(
-                f"Monitor setup complete: {created_count} created, {existing_count} existing, {failed_count} failed"
+                f"Monitor setup complete: {created_count} created, {updated_count} updated, "
+                f"{existing_count} up to date, {failed_count} failed"
             )
 
             return results
@@ -425,6 +234,8 @@ def setup_monitoring_for_all_instances() -> Dict[str, List[Dict[str, Any]]]:
     """
     Set up monitoring for all Uptime Kuma instances from environment.
 
+    The primary and secondary instances are synced concurrently.
+
     Returns:
         Dictionary of instance name to monitor creation results
     """
@@ -445,17 +256,18 @@ def setup_monitoring_for_all_instances() -> Dict[str, List[Dict[str, Any]]]:
 
     logger.info(f"Found {len(instances)} Uptime Kuma instances in environment")
 
-    results = {}
-    for instance in instances:
+    def setup_instance(instance: Dict[str, Any]) -> List[Dict[str, Any]]:
         logger.info(f"Setting up monitors for {instance['name']} at {instance['url']}")
         try:
-            instance_results = setup_monitoring_for_instance(str(instance["url"]), bool(instance["is_secondary"]))
-            results[str(instance["name"])] = instance_results
+            return setup_monitoring_for_instance(str(instance["url"]), bool(instance["is_secondary"]))
         except Exception as e:
             logger.error(f"Failed to setup monitoring for {instance['name']}: {e}")
-            results[str(instance["name"])] = []
+            return []
+
+    with ThreadPoolExecutor(max_workers=len(instances)) as executor:
+        instance_results = list(executor.map(setup_instance, instances))
 
-    return results
+    return {str(instance["name"]): result for instance, result in zip(instances, instance_results)}
 
 
 if __name__ == "__main__":
@@ -498,15 +310,16 @@ if __name__ == "__main__":
         print(f"\n{instance_name.upper()}:")
         for result in results:
             status_icon = (
-                "✅" if result["status"] == "created" else ("ℹ️" if result["status"] == "already_exists" else "❌")
+                "✅" if result["status"] in ("created", "updated")
+                else ("ℹ️" if result["status"] == "up_to_date" else "❌")
             )
             print(f"  {status_icon} {result['name']}: {result['status']}")
 
             if result["status"] == "created":
                 total_created += 1
-            elif result["status"] == "already_exists":
+            elif result["status"] == "up_to_date":
                 total_existing += 1
-            elif result["status"] == "failed":
+            elif result["status"].endswith("failed"):
                 total_failed += 1
 
     print(f"\n🎉 Monitor configuration complete!")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+src/homelab/uptime_kuma_monitors.py
+
+Generate the desired Uptime Kuma monitors from cluster.yaml and GitOps.
+
+Monitors are derived from:
+- cluster.yaml nodes: a PING monitor per enabled Proxmox node
+- gitops/ Ingress and Traefik IngressRoute resources: an HTTP(S) monitor
+  for the first host of each
+- gitops/ MetalLB LoadBalancer services: a PORT monitor on the first TCP
+  port of the assigned IP
+- monitoring.uptime_kuma.monitors in cluster.yaml: everything that cannot
+  be derived (gateway, MAAS, internet reachability, VMs)
+
+Adding a service to GitOps therefore adds its monitor on the next sync.
+A resource is left out by annotating it with ``homelab/uptime-kuma: "false"``,
+and ``homelab/uptime-kuma-name`` replaces the generated monitor name (used
+to keep the names of monitors that existed before they were generated).
+Parsed manifests are cached by file mtime, so repeated generation only
+re-reads files that changed.
+
+Usage:
+    from homelab.uptime_kuma_monitors import generate_monitors
+    from homelab.uptime_kuma_sync import sync_monitors
+
+    sync_monitors(api, generate_monitors(is_secondary_instance=False))
+"""
+
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from uptime_kuma_api import MonitorType  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Default config path relative to package
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "cluster.yaml"
+
+# gitops/ location relative to cluster.yaml (override with monitoring.uptime_kuma.gitops_path)
+DEFAULT_GITOPS_PATH = "../../../gitops"
+
+SKIP_ANNOTATION = "homelab/uptime-kuma"
+NAME_ANNOTATION = "homelab/uptime-kuma-name"
+METALLB_IPS_ANNOTATION = "metallb.universe.tf/loadBalancerIPs"
+
+# Base interval and retry count per monitor type (seconds)
+TYPE_DEFAULTS = {
+    MonitorType.PING: {"interval": 120, "maxretries": 3},
+    MonitorType.HTTP: {"interval": 300, "maxretries": 2},
+    MonitorType.PORT: {"interval": 300, "maxretries": 2},
+    MonitorType.DNS: {"interval": 300, "maxretries": 2},
+}
+
+_HOST_RULE_RE = re.compile(r"Host\(([^)]*)\)")
+_BACKTICK_RE = re.compile(r"`([^`]+)`")
+
+
+class ManifestCache:
+    """
+    Parsed YAML documents per file, re-read only when the file's mtime changes.
+
+    Safe to share between threads (the primary and secondary instance syncs
+    run concurrently).
+    """
+
+    def __init__(self) -> None:
+        self._files: Dict[Path, Tuple[int, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path) -> List[Dict[str, Any]]:
+        """Return the mapping documents in a YAML file."""
+        with self._lock:
+            return self._load(path)
+
+    def _load(self, path: Path) -> List[Dict[str, Any]]:
+        mtime = path.stat().st_mtime_ns
+        cached = self._files.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            documents = [d for d in yaml.safe_load_all(path.read_text()) if isinstance(d, dict)]
+        except yaml.YAMLError as e:
+            logger.warning(f"Skipping unparseable manifest {path}: {e}")
+            documents = []
+
+        self._files[path] = (mtime, documents)
+        return documents
+
+    def documents(self, root: Path) -> List[Tuple[Path, Dict[str, Any]]]:
+        """Return (path, document) for every manifest under root, in path order."""
+        paths = sorted(p for pattern in ("*.yaml", "*.yml") for p in root.rglob(pattern))
+
+        with self._lock:
+            # Forget files that were deleted since the last walk
+            for stale in self._files.keys() - set(paths):
+                del self._files[stale]
+
+            return [(path, document) for path in paths for document in self._load(path)]
+
+
+# Shared across calls so the CLI and sync runs in one process reuse parses
+_MANIFEST_CACHE = ManifestCache()
+
+
+def _annotations(document: Dict[str, Any]) -> Dict[str, Any]:
+    return (document.get("metadata") or {}).get("annotations") or {}
+
+
+def _skipped(document: Dict[str, Any]) -> bool:
+    return str(_annotations(document).get(SKIP_ANNOTATION, "")).lower() == "false"
+
+
+def _name(document: Dict[str, Any], generated: str) -> str:
+    return str(_annotations(document).get(NAME_ANNOTATION) or generated)
+
+
+def node_monitors(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """PING monitors for enabled Proxmox nodes in cluster.yaml."""
+    return [
+        {
+            "name": f"Proxmox {node['name']} Node",
+            "type": MonitorType.PING,
+            "hostname": node.get("ip") or node.get("fqdn") or node["name"],
+            "description": f"Proxmox {node['name']} node connectivity",
+        }
+        for node in config.get("nodes", [])
+        if node.get("enabled", True)
+    ]
+
+
+def ingress_monitor(document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """HTTP monitor for the first host of an Ingress or Traefik IngressRoute."""
+    metadata = document.get("metadata") or {}
+    spec = document.get("spec") or {}
+
+    if document.get("kind") == "Ingress":
+        hosts = [rule["host"] for rule in spec.get("rules", []) if rule.get("host")]
+        scheme = "https" if spec.get("tls") else "http"
+    else:
+        hosts = [
+            host
+            for route in spec.get("routes", [])
+            for rule in _HOST_RULE_RE.findall(route.get("match", ""))
+            for host in _BACKTICK_RE.findall(rule)
+        ]
+        secure = spec.get("tls") or "websecure" in spec.get("entryPoints", [])
+        scheme = "https" if secure else "http"
+
+    if not hosts:
+        return None
+
+    return {
+        "name": _name(document, f"Ingress {hosts[0]}"),
+        "type": MonitorType.HTTP,
+        "url": f"{scheme}://{hosts[0]}",
+        "method": "GET",
+        "description": f"{metadata.get('namespace', 'default')}/{metadata.get('name')} via Traefik",
+    }
+
+
+def loadbalancer_monitor(document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """PORT monitor for a MetalLB LoadBalancer service's IP and first TCP port."""
+    metadata = document.get("metadata") or {}
+    spec = document.get("spec") or {}
+    if spec.get("type") != "LoadBalancer":
+        return None
+
+    ips = str(_annotations(document).get(METALLB_IPS_ANNOTATION) or spec.get("loadBalancerIP") or "")
+    ip = ips.split(",")[0].strip()
+    tcp_ports = [p["port"] for p in spec.get("ports", []) if p.get("protocol", "TCP") == "TCP"]
+    if not ip or not tcp_ports:
+        return None
+
+    name = f"{metadata.get('namespace', 'default')}/{metadata.get('name')}"
+    return {
+        "name": _name(document, f"LoadBalancer {name}"),
+        "type": MonitorType.PORT,
+        "hostname": ip,
+        "port": tcp_ports[0],
+        "description": f"{name} via MetalLB LoadBalancer",
+    }
+
+
+def gitops_monitors(root: Path, cache: Optional[ManifestCache] = None) -> List[Dict[str, Any]]:
+    """Monitors for every Ingress, IngressRoute and LoadBalancer service under root."""
+    cache = cache or _MANIFEST_CACHE
+    monitors = []
+
+    for path, document in cache.documents(root):
+        if _skipped(document):
+            continue
+        kind = document.get("kind")
+        if kind in ("Ingress", "IngressRoute"):
+            monitor = ingress_monitor(document)
+        elif kind == "Service":
+            monitor = loadbalancer_monitor(document)
+        else:
+            continue
+        if monitor:
+            monitors.append(monitor)
+
+    return monitors
+
+
+def _with_timing(monitor: Dict[str, Any], is_secondary_instance: bool) -> Dict[str, Any]:
+    """Fill in interval/retries, slowed down for the secondary instance."""
+    monitor = dict(monitor)
+    monitor["type"] = MonitorType(getattr(monitor["type"], "value", monitor["type"]))
+    defaults = TYPE_DEFAULTS.get(monitor["type"], TYPE_DEFAULTS[MonitorType.HTTP])
+
+    # Secondary instance settings (10-minute delay for redundant alerting)
+    retry_delay = 600 if is_secondary_instance else 60
+    if monitor["type"] != MonitorType.PING:
+        retry_delay *= 2
+
+    monitor["interval"] = monitor.get("interval", defaults["interval"]) * (2 if is_secondary_instance else 1)
+    monitor.setdefault("maxretries", defaults["maxretries"])
+    monitor.setdefault("retryInterval", retry_delay)
+    if is_secondary_instance:
+        monitor["name"] = f"{monitor['name']} (Secondary)"
+    return monitor
+
+
+def generate_monitors(
+    config_path: Optional[Path] = None,
+    is_secondary_instance: bool = False,
+    cache: Optional[ManifestCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build the desired monitor set for one Uptime Kuma instance.
+
+    Args:
+        config_path: Path to cluster.yaml
+        is_secondary_instance: Double intervals, use 10-minute retries and
+            add a ' (Secondary)' suffix (prevents alert storms)
+        cache: Manifest cache (default: shared per process)
+
+    Returns:
+        Monitor configs with unique names, ready for sync_monitors()
+    """
+    path = Path(config_path or DEFAULT_CONFIG_PATH)
+    with open(path) as f:
+        config = yaml.safe_load(f)
+
+    kuma_config = config.get("monitoring", {}).get("uptime_kuma", {})
+    gitops_root = (path.parent / kuma_config.get("gitops_path", DEFAULT_GITOPS_PATH)).resolve()
+
+    monitors = list(kuma_config.get("monitors", [])) + node_monitors(config)
+    if gitops_root.is_dir():
+        monitors += gitops_monitors(gitops_root, cache)
+    else:
+        logger.warning(f"GitOps directory {gitops_root} not found, skipping ingress/service monitors")
+
+    # First definition wins, so cluster.yaml entries can override generated ones
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for monitor in monitors:
+        by_name.setdefault(monitor["name"], monitor)
+
+    return [_with_timing(monitor, is_secondary_instance) for monitor in by_name.values()]
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+src/homelab/uptime_kuma_sync.py
+
+Declarative bulk sync of Uptime Kuma monitors.
+
+The monitor list is fetched once and indexed by name; the desired monitors
+are diffed against it into create/update/delete changes, which are then
+sent with a bounded number of calls in flight over the client's single
+socket.io connection. Previously every desired monitor reloaded the whole
+monitor list (up to three times) before doing anything.
+
+Usage:
+    from homelab.uptime_kuma_sync import sync_monitors
+
+    with UptimeKumaClient(url) as client:
+        results = sync_monitors(client.api, desired_monitors)
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Maximum Uptime Kuma API calls in flight per instance
+DEFAULT_BATCH_SIZE = 8
+
+# Monitor fields compared to decide whether an update is needed
+COMPARED_FIELDS = [
+    "hostname", "url", "port", "interval", "maxretries", "retryInterval",
+    "type", "method", "description",
+]
+
+
+@dataclass
+class MonitorChange:
+    """One planned change to an Uptime Kuma monitor."""
+
+    name: str
+    action: str  # create, update, delete or unchanged
+    config: Dict[str, Any] = field(default_factory=dict)
+    monitor_id: Optional[int] = None
+    diff: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)
+
+
+def _plain(value: Any) -> Any:
+    """Compare enums (MonitorType etc.) by their value."""
+    return getattr(value, "value", value)
+
+
+def diff_monitor(desired: Dict[str, Any], existing: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """Fields whose existing value differs from the desired one, as (old, new)."""
+    return {
+        name: (existing.get(name), desired[name])
+        for name in COMPARED_FIELDS
+        if name in desired and _plain(existing.get(name)) != _plain(desired[name])
+    }
+
+
+def plan_sync(
+    desired: List[Dict[str, Any]],
+    existing: List[Dict[str, Any]],
+    prune: bool = False,
+) -> List[MonitorChange]:
+    """
+    Diff desired monitors against the instance's monitor list.
+
+    Args:
+        desired: Monitor configs, each with a unique 'name'
+        existing: Result of a single get_monitors() call
+        prune: Also delete monitors that are not desired (only for
+            instances whose monitors are all managed from here)
+
+    Returns:
+        Changes in desired order, followed by any deletions
+    """
+    index = {monitor.get("name"): monitor for monitor in existing}
+    changes: List[MonitorChange] = []
+
+    for monitor in desired:
+        config = {k: v for k, v in monitor.items() if k != "name"}
+        current = index.get(monitor["name"])
+        if current is None:
+            changes.append(MonitorChange(monitor["name"], "create", config))
+            continue
+
+        diff = diff_monitor(monitor, current)
+        changes.append(MonitorChange(
+            monitor["name"], "update" if diff else "unchanged", config, current.get("id"), diff,
+        ))
+
+    if prune:
+        wanted = {monitor["name"] for monitor in desired}
+        changes.extend(
+            MonitorChange(name, "delete", monitor_id=monitor.get("id"))
+            for name, monitor in index.items()
+            if name not in wanted
+        )
+
+    return changes
+
+
+def _apply_change(api: Any, change: MonitorChange) -> Dict[str, Any]:
+    """Send one change to Uptime Kuma and report its result."""
+    result: Dict[str, Any] = {"name": change.name, "monitor_id": change.monitor_id}
+
+    try:
+        if change.action == "create":
+            response = api.add_monitor(name=change.name, **change.config)
+            if response and response.get("monitorID"):
+                result.update(status="created", monitor_id=response["monitorID"])
+                logger.info(f"✅ Created monitor '{change.name}' with ID {response['monitorID']}")
+            else:
+                result["status"] = "failed"
+                logger.error(f"❌ Failed to create monitor '{change.name}': {response}")
+
+        elif change.action == "update":
+            for name, (old, new) in change.diff.items():
+                logger.info(f"Monitor '{change.name}' field '{name}' differs: {old} -> {_plain(new)}")
+            api.edit_monitor(change.monitor_id, **change.config)
+            result["status"] = "updated"
+            logger.info(f"✅ Updated monitor '{change.name}' (ID: {change.monitor_id})")
+
+        elif change.action == "delete":
+            api.delete_monitor(change.monitor_id)
+            result["status"] = "deleted"
+            logger.info(f"🗑️ Deleted monitor '{change.name}' (ID: {change.monitor_id})")
+
+    except Exception as e:
+        logger.error(f"❌ Error applying {change.action} to monitor '{change.name}': {e}")
+        result["status"] = {"create": "failed", "update": "update_failed"}.get(change.action, "delete_failed")
+
+    return result
+
+
+def apply_sync(
+    api: Any,
+    changes: List[MonitorChange],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Apply planned changes with up to batch_size calls in flight.
+
+    Returns:
+        One result per change, in plan order, with status 'created',
+        'updated', 'deleted', 'up_to_date' or a failure status
+    """
+    pending = [change for change in changes if change.action != "unchanged"]
+    applied: Dict[int, Dict[str, Any]] = {}
+
+    if pending:
+        workers = max(1, min(batch_size, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for change, result in zip(pending, executor.map(lambda c: _apply_change(api, c), pending)):
+                applied[id(change)] = result
+
+    return [
+        applied.get(id(change)) or {
+            "name": change.name, "status": "up_to_date", "monitor_id": change.monitor_id,
+        }
+        for change in changes
+    ]
+
+
+def sync_monitors(
+    api: Any,
+    desired: List[Dict[str, Any]],
+    prune: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Make an Uptime Kuma instance's monitors match the desired list.
+
+    Args:
+        api: Authenticated UptimeKumaApi
+        desired: Monitor configs, each with a unique 'name'
+        prune: Delete monitors that are not in desired
+        batch_size: Maximum API calls in flight
+
+    Returns:
+        Per-monitor results (see apply_sync)
+    """
+    start = time.monotonic()
+    changes = plan_sync(desired, api.get_monitors(), prune=prune)
+
+    counts: Dict[str, int] = {}
+    for change in changes:
+        counts[change.action] = counts.get(change.action, 0) + 1
+    logger.info(
+        "Monitor sync plan: " + ", ".join(f"{n} {action}" for action, n in sorted(counts.items()))
+    )
+
+    results = apply_sync(api, changes, batch_size=batch_size)
+    logger.info(f"Monitor sync finished in {time.monotonic() - start:.1f}s")
+    return results
@@ -13,6 +13,7 @@ from typing import Any, Optional
 import paramiko
 
 from homelab.config import Config
+from homelab.golden_image import GoldenImageCache
 from homelab.health_checker import VMHealthChecker
 from homelab.proxmox_api import ProxmoxClient
 from homelab.resource_manager import ResourceManager
@@ -152,6 +153,20 @@ class VMManager:
 
         ssh.close()
 
+    @staticmethod
+    def _zfs_dataset_for(proxmox: Any, storage: str) -> Optional[str]:
+        """
+        Return the ZFS dataset backing a Proxmox storage, or None if it is not ZFS.
+        """
+        try:
+            config = proxmox.storage(storage).get()
+        except Exception as e:
+            print(f"⚠️  Could not read storage {storage!r} config ({type(e).__name__})")
+            return None
+        if not isinstance(config, dict) or config.get("type") != "zfspool":
+            return None
+        return config.get("pool")
+
     @staticmethod
     def create_or_update_vm() -> None:
         """
@@ -236,21 +251,37 @@ class VMManager:
             # Create the VM shell
             proxmox.nodes(name).qemu.create(**create_args)
 
-            # 5) Import the raw .img via CLI on the Proxmox host
+            # 5) Boot disk: linked clone of a cached golden image, or import the raw .img via CLI
             img_path = f"/var/lib/vz/template/iso/{Config.ISO_NAME}"
-            VMManager._import_disk_via_cli(host=name, vmid=vmid, img_path=img_path, storage=storage)
+            disk_size = os.getenv("VM_DISK_SIZE", "200G")
+            use_golden = os.getenv("GOLDEN_IMAGE_CACHE", "false").lower() in ("1", "true", "yes")
+            dataset = VMManager._zfs_dataset_for(proxmox, storage) if use_golden else None
+            if use_golden and not dataset:
+                # Golden images are zvols; other storage types import the image directly
+                print(f"⚠️  Storage {storage!r} is not ZFS; skipping the golden image cache")
+                use_golden = False
+            if use_golden:
+                with GoldenImageCache(name, storage=storage, dataset=dataset) as cache:
+                    golden = cache.ensure(img_path, disk_size)
+                    boot_volume = cache.clone(golden, vmid)
+                print(f"💿 Cloned boot disk {boot_volume} from golden image {golden.digest[:12]}")
+            else:
+                VMManager._import_disk_via_cli(host=name, vmid=vmid, img_path=img_path, storage=storage)
+                boot_volume = f"{storage}:vm-{vmid}-disk-0"
 
-            # 6) Attach imported disk, cloud-init drive, enable guest agent
+            # 6) Attach boot disk, cloud-init drive, enable guest agent
             proxmox.nodes(name).qemu(vmid).config.post(
                 scsihw="virtio-scsi-pci",
-                scsi0=f"{storage}:vm-{vmid}-disk-0",
+                scsi0=boot_volume,
                 ide2=f"{storage}:cloudinit",
                 boot="c",
                 bootdisk="scsi0",
                 agent=1,
             )
 
-            VMManager._resize_disk_via_cli(host=name, vmid=vmid, disk="scsi0", size=os.getenv("VM_DISK_SIZE", "200G"))
+            # Golden images are already the full disk size
+            if not use_golden:
+                VMManager._resize_disk_via_cli(host=name, vmid=vmid, disk="scsi0", size=disk_size)
 
             cloud_cfg = "user=local:snippets/install-k3sup-qemu-agent.yaml"
 
@@ -18,19 +18,32 @@ Usage:
     # All hosts from config (idempotent)
     results = apply_from_config()
 
+With monitoring.zfs_exporter.distribution set to 'controller', the release
+tarball is downloaded once on the controller, verified against its published
+(or pinned) SHA-256, cached locally, and the binary is pushed to each host
+over SFTP. Hosts whose installed binary already has the same hash are
+skipped, and the hosts themselves need no outbound internet access. The
+default, 'host', has every host download the release with curl.
+
 CLI:
     poetry run homelab monitoring zfs-exporter apply
     poetry run homelab monitoring zfs-exporter status
 """
 
 import logging
+import shlex
 import socket
+import threading
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import paramiko
 import yaml
 
+from homelab.artifact_cache import ArtifactCache, sha256_file
+from homelab.exporter_rollout import clear_pending_command, get_rollout_settings, rollout, sync_file_command
+from homelab.host_probe import DEFAULT_PROBE_WORKERS, probe_hosts, run_probe
+
 logger = logging.getLogger(__name__)
 
 # Default config path relative to package
@@ -41,6 +54,12 @@ GITHUB_RELEASE_URL = (
     "https://github.com/pdf/zfs_exporter/releases/download/"
     "v{version}/zfs_exporter-{version}.linux-amd64.tar.gz"
 )
+GITHUB_CHECKSUMS_URL = (
+    "https://github.com/pdf/zfs_exporter/releases/download/v{version}/sha256sums.txt"
+)
+
+# Where the binary comes from: 'host' (curl on each host) or 'controller'
+DISTRIBUTIONS = ("host", "controller")
 
 SYSTEMD_UNIT = """\
 [Unit]
@@ -81,6 +100,48 @@ def get_zfs_exporter_hosts(config: Dict[str, Any]) -> List[str]:
     return ze_config.get("hosts", [])
 
 
+class ReleaseBinary:
+    """
+    zfs_exporter binary fetched once on the controller and shared by all hosts.
+
+    The download happens on the first get() call. The tarball's digest
+    comes from the pinned sha256, then the digest recorded in the artifact
+    cache, and only then from the release's checksums file, so once the
+    tarball is cached a rollout makes no GitHub requests.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        sha256: Optional[str] = None,
+        cache: Optional[ArtifactCache] = None,
+    ) -> None:
+        self.version = version
+        self.sha256 = sha256
+        self.cache = cache or ArtifactCache()
+        self._lock = threading.Lock()
+        self._binary: Optional[Tuple[Path, str]] = None
+
+    def get(self) -> Tuple[Path, str]:
+        """
+        Return the local binary path and its SHA-256, downloading if needed.
+
+        Raises:
+            ValueError: If the tarball does not match its checksum
+        """
+        with self._lock:
+            if self._binary is None:
+                url = GITHUB_RELEASE_URL.format(version=self.version)
+                tar_name = url.rsplit("/", 1)[-1]
+                sha256 = self.sha256 or self.cache.cached_checksum(url) or self.cache.fetch_checksum(
+                    GITHUB_CHECKSUMS_URL.format(version=self.version), tar_name
+                )
+                tarball = self.cache.fetch(url, sha256=sha256)
+                binary = self.cache.extract(tarball, "zfs_exporter", archive_sha256=sha256)
+                self._binary = (binary, sha256_file(binary))
+            return self._binary
+
+
 class ZfsExporterManager:
     """Manages pdf/zfs_exporter deployment on Proxmox hosts."""
 
@@ -89,6 +150,7 @@ class ZfsExporterManager:
         hostname: str,
         config: Optional[Dict[str, Any]] = None,
         config_path: Optional[Path] = None,
+        release: Optional[ReleaseBinary] = None,
     ) -> None:
         self.hostname = hostname
         self.ssh_client: Optional[paramiko.SSHClient] = None
@@ -107,6 +169,12 @@ class ZfsExporterManager:
         self.port = ze_config.get("port", 9134)
         self.binary_path = ze_config.get("binary_path", "/usr/local/bin/zfs_exporter")
         self.service = ze_config.get("service", "zfs-exporter")
+        self.unit_path = f"/etc/systemd/system/{self.service}.service"
+
+        self.distribution = ze_config.get("distribution", "host")
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Invalid zfs_exporter distribution '{self.distribution}'")
+        self.release = release or ReleaseBinary(self.version, ze_config.get("sha256"))
 
         # Get host IP from nodes config
         self.ip = None
@@ -193,15 +261,23 @@ class ZfsExporterManager:
         stdout, stderr, exit_code = self._execute_command(
             f"{self.binary_path} --version 2>&1 | head -1"
         )
-        if exit_code == 0 and stdout:
-            # Output format: "zfs_exporter version 2.3.11 ..."
-            for part in stdout.split():
-                if part and part[0].isdigit():
-                    return part
-        return None
+        return _parse_version(stdout) if exit_code == 0 else None
+
+    def status_checks(self) -> Dict[str, str]:
+        """Shell commands for every status fact, run together by get_status."""
+        metrics_url = f"http://localhost:{self.port}/metrics"
+        return {
+            "installed": f"test -f {self.binary_path} && echo 'installed'",
+            "version": f"{self.binary_path} --version 2>&1 | head -1",
+            "active": f"systemctl is-active {self.service}",
+            "enabled": f"systemctl is-enabled {self.service}",
+            "metrics": f"curl -s -o /dev/null -w '%{{http_code}}' {metrics_url}",
+            "pools": "zpool list -H -o name 2>/dev/null",
+            "pool_health": f"curl -s {metrics_url} | grep '^zfs_pool_health'",
+        }
 
     def get_status(self) -> Dict[str, Any]:
-        """Get comprehensive status of zfs_exporter on this host."""
+        """Get comprehensive status of zfs_exporter on this host (one SSH round trip)."""
         status: Dict[str, Any] = {
             "hostname": self.hostname,
             "ip": self.ip,
@@ -215,34 +291,27 @@ class ZfsExporterManager:
         }
 
         try:
-            status["installed"] = self.is_installed()
+            facts = run_probe(self._execute_command, self.status_checks())
+            status["installed"] = "installed" in facts["installed"][0]
 
             if status["installed"]:
-                status["version"] = self.get_version()
-                status["running"] = self.is_running()
-                status["enabled"] = self.is_enabled()
+                stdout, exit_code = facts["version"]
+                status["version"] = _parse_version(stdout) if exit_code == 0 else None
+                status["running"] = facts["active"][0] == "active"
+                status["enabled"] = "enabled" in facts["enabled"][0]
 
                 # Check if metrics endpoint is responding
-                stdout, stderr, exit_code = self._execute_command(
-                    f"curl -s -o /dev/null -w '%{{http_code}}' http://localhost:{self.port}/metrics"
-                )
-                status["metrics_available"] = stdout == "200"
+                status["metrics_available"] = facts["metrics"][0] == "200"
 
                 # Get ZFS pool names
-                stdout, stderr, exit_code = self._execute_command(
-                    "zpool list -H -o name 2>/dev/null"
-                )
+                stdout, exit_code = facts["pools"]
                 if exit_code == 0 and stdout:
                     status["pools"] = [p for p in stdout.split("\n") if p]
 
                 # Get pool health if metrics are available
-                if status["metrics_available"]:
-                    stdout, stderr, exit_code = self._execute_command(
-                        f"curl -s http://localhost:{self.port}/metrics"
-                        " | grep '^zfs_pool_health'"
-                    )
-                    if exit_code == 0 and stdout:
-                        status["pool_health_raw"] = stdout
+                stdout, exit_code = facts["pool_health"]
+                if status["metrics_available"] and exit_code == 0 and stdout:
+                    status["pool_health_raw"] = stdout
 
         except Exception as e:
             logger.error(f"Failed to get status from {self.hostname}: {e}")
@@ -250,8 +319,49 @@ class ZfsExporterManager:
 
         return status
 
+    def installed_sha256(self) -> Optional[str]:
+        """SHA-256 of the installed binary, or None if it is missing."""
+        stdout, stderr, exit_code = self._execute_command(
+            f"sha256sum {self.binary_path} 2>/dev/null"
+        )
+        return stdout.split()[0] if exit_code == 0 and stdout else None
+
+    def push_binary(self) -> Dict[str, Any]:
+        """
+        Copy the controller's cached release binary to the host over SFTP.
+
+        Returns:
+            Dict with status 'unchanged' if the host already has the same
+            binary, otherwise 'installed' or 'failed'
+        """
+        local_path, sha256 = self.release.get()
+        if self.installed_sha256() == sha256:
+            logger.info(f"zfs_exporter binary on {self.hostname} already matches {sha256[:12]}")
+            return {"status": "unchanged"}
+
+        logger.info(f"Pushing zfs_exporter {self.version} to {self.hostname}")
+        partial = f"{self.binary_path}.partial"
+        sftp = self._get_ssh_client().open_sftp()
+        try:
+            sftp.put(str(local_path), partial)
+        finally:
+            sftp.close()
+
+        # Rename into place so a running exporter never sees a half-written file
+        stdout, stderr, exit_code = self._execute_command(
+            f"chmod 755 {shlex.quote(partial)} && mv -f {shlex.quote(partial)} {self.binary_path}"
+        )
+        if exit_code != 0:
+            return {"status": "failed", "error": f"Install failed: {stderr}"}
+
+        logger.info(f"Successfully installed zfs_exporter on {self.hostname}")
+        return {"status": "installed"}
+
     def install(self) -> Dict[str, Any]:
-        """Download and install zfs_exporter binary."""
+        """Install the zfs_exporter binary (pushed from the controller or downloaded on the host)."""
+        if self.distribution == "controller":
+            return self.push_binary()
+
         logger.info(f"Installing zfs_exporter {self.version} on {self.hostname}")
 
         url = GITHUB_RELEASE_URL.format(version=self.version)
@@ -286,7 +396,7 @@ class ZfsExporterManager:
         return {"status": "installed"}
 
     def configure(self) -> Dict[str, Any]:
-        """Create systemd service unit for zfs_exporter."""
+        """Create systemd service unit for zfs_exporter (skipped if unchanged)."""
         logger.info(f"Configuring zfs_exporter on {self.hostname}")
 
         unit_content = SYSTEMD_UNIT.format(
@@ -294,13 +404,17 @@ class ZfsExporterManager:
             port=self.port,
         )
 
-        # Write systemd unit file
-        escaped_content = unit_content.replace("'", "'\\''")
+        # Write systemd unit file, unless it already has this content
         stdout, stderr, exit_code = self._execute_command(
-            f"echo '{escaped_content}' > /etc/systemd/system/{self.service}.service"
+            sync_file_command(self.unit_path, unit_content)
         )
         if exit_code != 0:
             return {"status": "failed", "error": f"Failed to write unit file: {stderr}"}
+        if stdout == "unchanged":
+            logger.info(f"zfs_exporter unit on {self.hostname} already up to date")
+            return {"status": "unchanged"}
+        if stdout == "pending":
+            logger.info(f"zfs_exporter unit on {self.hostname} was written but never applied")
 
         # Reload systemd
         stdout, stderr, exit_code = self._execute_command("systemctl daemon-reload")
@@ -310,8 +424,28 @@ class ZfsExporterManager:
         logger.info(f"Successfully configured zfs_exporter on {self.hostname}")
         return {"status": "configured"}
 
-    def enable_and_start(self) -> Dict[str, Any]:
-        """Enable and start zfs-exporter service."""
+    def enable_and_start(self, restart: bool = True) -> Dict[str, Any]:
+        """
+        Enable and start zfs-exporter service.
+
+        Args:
+            restart: Restart the service to pick up changes; when False it
+                is only started if not already running
+
+        Returns:
+            Dict with status 'started', 'running' or 'failed'
+        """
+        if not restart:
+            stdout, stderr, exit_code = self._execute_command(
+                f"systemctl enable {self.service} >/dev/null 2>&1 && "
+                f"if systemctl is-active --quiet {self.service}; then echo running; "
+                f"else systemctl start {self.service} && echo started; fi"
+            )
+            if exit_code != 0:
+                return {"status": "failed", "error": f"systemctl enable/start failed: {stderr}"}
+            logger.info(f"zfs_exporter on {self.hostname} is {stdout or 'started'}")
+            return {"status": stdout or "started"}
+
         logger.info(f"Enabling and starting zfs_exporter on {self.hostname}")
 
         # Enable service
@@ -348,7 +482,20 @@ class ZfsExporterManager:
 
         try:
             # Check current state
-            if self.is_installed():
+            changed = False
+            if self.distribution == "controller":
+                # Push the cached binary unless the host's copy already matches
+                install_result = self.install()
+                if install_result["status"] == "failed":
+                    result["status"] = "failed"
+                    result["error"] = install_result["error"]
+                    return result
+                if install_result["status"] == "unchanged":
+                    result["actions"].append("already_installed")
+                else:
+                    result["actions"].append("installed")
+                    changed = True
+            elif self.is_installed():
                 result["actions"].append("already_installed")
                 logger.info(f"zfs_exporter already installed on {self.hostname}")
             else:
@@ -359,6 +506,7 @@ class ZfsExporterManager:
                     result["error"] = install_result["error"]
                     return result
                 result["actions"].append("installed")
+                changed = True
 
             # Configure
             config_result = self.configure()
@@ -366,15 +514,25 @@ class ZfsExporterManager:
                 result["status"] = "failed"
                 result["error"] = config_result["error"]
                 return result
-            result["actions"].append("configured")
+            if config_result["status"] == "unchanged":
+                result["actions"].append("config_unchanged")
+            else:
+                result["actions"].append("configured")
+                changed = True
 
-            # Enable and start
-            start_result = self.enable_and_start()
+            # Enable and start; restart only when something changed
+            start_result = self.enable_and_start(restart=changed)
             if start_result["status"] == "failed":
                 result["status"] = "failed"
                 result["error"] = start_result["error"]
                 return result
-            result["actions"].append("enabled_and_started")
+            if start_result["status"] == "running":
+                result["actions"].append("already_running")
+            else:
+                result["actions"].append("enabled_and_started")
+            if config_result["status"] != "unchanged":
+                # Restarted with the new unit; later runs may skip it
+                self._execute_command(clear_pending_command(self.unit_path))
 
             # Verify deployment
             status = self.get_status()
@@ -411,17 +569,26 @@ class ZfsExporterManager:
         self.cleanup()
 
 
-def apply_from_config(config_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+def apply_from_config(
+    config_path: Optional[Path] = None,
+    max_parallel: Optional[int] = None,
+    canary: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
     """
     Deploy zfs_exporter to all configured hosts from cluster.yaml.
 
     This is the main idempotent entry point - safe to run multiple times.
+    With canary enabled the first host is deployed and verified before the
+    rest, which then deploy max_parallel at a time. In controller
+    distribution mode all hosts share one download of the release.
 
     Args:
         config_path: Optional path to cluster.yaml
+        max_parallel: Maximum concurrent deploys (default: monitoring.rollout)
+        canary: Deploy to the first host first (default: monitoring.rollout)
 
     Returns:
-        List of deployment results per host
+        List of deployment results per host, each with elapsed_sec
     """
     config = load_cluster_config(config_path)
     monitoring = get_monitoring_config(config)
@@ -438,45 +605,39 @@ def apply_from_config(config_path: Optional[Path] = None) -> List[Dict[str, Any]
         logger.info("No hosts configured for zfs_exporter")
         return [{"status": "skipped", "reason": "no hosts configured"}]
 
-    results = []
+    max_parallel, canary = get_rollout_settings(monitoring, "zfs_exporter", max_parallel, canary)
+    release = ReleaseBinary(ze_config.get("version", "2.3.11"), ze_config.get("sha256"))
 
-    for hostname in hosts:
+    def deploy_host(hostname: str) -> Dict[str, Any]:
         logger.info(f"Applying zfs_exporter to {hostname}")
+        with ZfsExporterManager(hostname, config=config, release=release) as manager:
+            return manager.deploy()
 
-        try:
-            with ZfsExporterManager(hostname, config=config) as manager:
-                result = manager.deploy()
-                results.append(result)
-        except Exception as e:
-            logger.error(f"Failed to deploy to {hostname}: {e}")
-            results.append({
-                "hostname": hostname,
-                "status": "failed",
-                "error": str(e),
-            })
-
-    return results
+    return rollout(hosts, deploy_host, max_parallel=max_parallel, canary=canary)
 
 
-def get_status_from_config(config_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+def get_status_from_config(
+    config_path: Optional[Path] = None, max_workers: int = DEFAULT_PROBE_WORKERS
+) -> List[Dict[str, Any]]:
     """
     Get zfs_exporter status from all configured hosts.
 
+    Hosts are probed concurrently, one SSH round trip each.
+
     Args:
         config_path: Optional path to cluster.yaml
+        max_workers: Maximum hosts probed at once
 
     Returns:
         List of status dicts per host
     """
     config = load_cluster_config(config_path)
     hosts = get_zfs_exporter_hosts(config)
-    results = []
 
-    for hostname in hosts:
+    def host_status(hostname: str) -> Dict[str, Any]:
         try:
             with ZfsExporterManager(hostname, config=config) as manager:
-                status = manager.get_status()
-                results.append(status)
+                return manager.get_status()
         except Exception as e:
             logger.error(f"Failed to get status from {hostname}: {e}")
             # Look up IP from config
@@ -485,13 +646,21 @@ def get_status_from_config(config_path: Optional[Path] = None) -> List[Dict[str,
                 if node.get("name") == hostname:
                     ip = node.get("ip")
                     break
-            results.append({
+            return {
                 "hostname": hostname,
                 "ip": ip,
                 "error": str(e),
-            })
+            }
+
+    return probe_hosts(hosts, host_status, max_workers=max_workers)
+
 
-    return results
+def _parse_version(output: str) -> Optional[str]:
+    """Extract the version from 'zfs_exporter version 2.3.11 ...' output."""
+    for part in output.split():
+        if part and part[0].isdigit():
+            return part
+    return None
 
 
 def print_status_table(results: List[Dict[str, Any]]) -> None:
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+src/homelab/zfs_facts.py
+
+Batched ZFS pool and disk facts for a Proxmox host.
+
+Everything the mirror pre-flight needs - ``zpool status -P -j`` (falling back
+to the text output on OpenZFS < 2.3), ``lsblk -J``, ``sgdisk -p`` per disk,
+``blkid`` ZFS labels, the by-id symlink targets, required tools and
+``proxmox-boot-tool status`` - is collected in one SSH round trip and indexed
+into pools, vdevs and disks. Every check then reads the same snapshot, so
+pre-flight is consistent and costs a single exec instead of a dozen.
+
+Usage:
+    from homelab.zfs_facts import collect_zfs_facts
+
+    facts = collect_zfs_facts(mgr._ssh_exec, [existing_disk, new_disk])
+    facts.pool_topology("rpool")["is_mirror"]
+    facts.disk_in_any_pool(new_disk)
+"""
+
+import json
+import logging
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from homelab.host_probe import run_probe
+
+logger = logging.getLogger(__name__)
+
+BY_ID_DIR = "/dev/disk/by-id"
+REQUIRED_TOOLS = ("sgdisk", "proxmox-boot-tool", "zpool")
+
+# get_pool_topology() result for a pool that is not imported
+MISSING_TOPOLOGY: Dict[str, Any] = {"state": "MISSING", "is_mirror": False, "vdev_disks": [], "scan": ""}
+
+_GROUP_VDEV_RE = re.compile(r"^(mirror|raidz\d?|draid\S*?)-\d+$")
+_SIZE = r"([\d.]+[KMGTPE]?B?)"
+_SIZE_UNITS = "KMGTPE"
+
+
+@dataclass
+class Vdev:
+    """One node of a pool's vdev tree."""
+
+    name: str
+    vdev_type: str  # root, mirror, raidz1, disk, logs, ...
+    state: str = ""
+    path: Optional[str] = None
+    children: List["Vdev"] = field(default_factory=list)
+
+    def leaves(self) -> Iterator["Vdev"]:
+        """Leaf (device) vdevs under this one."""
+        if not self.children:
+            yield self
+        for child in self.children:
+            yield from child.leaves()
+
+
+@dataclass
+class Pool:
+    """An imported pool: state, scan status and top-level vdevs."""
+
+    name: str
+    state: str
+    scan: str = ""
+    scan_stats: Dict[str, Any] = field(default_factory=dict)
+    vdevs: List[Vdev] = field(default_factory=list)
+
+    @property
+    def is_mirror(self) -> bool:
+        return any(vdev.vdev_type == "mirror" for vdev in self.vdevs)
+
+    def leaf_paths(self) -> List[str]:
+        """Device path (or name) of every leaf vdev."""
+        return [leaf.path or leaf.name for vdev in self.vdevs for leaf in vdev.leaves()]
+
+    def topology(self) -> Dict[str, Any]:
+        """Same shape as ZfsMirrorManager.get_pool_topology()."""
+        return {
+            "state": self.state,
+            "is_mirror": self.is_mirror,
+            "vdev_disks": [os.path.basename(path) for path in self.leaf_paths()],
+            "scan": self.scan,
+        }
+
+
+@dataclass
+class Disk:
+    """A configured disk, addressed by its /dev/disk/by-id name."""
+
+    disk_id: str
+    device: Optional[str] = None  # resolved kernel device, None if absent
+    size_bytes: Optional[int] = None
+    partition_table: str = ""  # sgdisk -p output
+    partitions: List[str] = field(default_factory=list)  # kernel partition paths
+
+    @property
+    def exists(self) -> bool:
+        return self.device is not None
+
+    @property
+    def guid(self) -> Optional[str]:
+        return disk_guid(self.partition_table)
+
+
+@dataclass
+class ZfsFacts:
+    """Indexed snapshot of a host's pools and disks."""
+
+    pools: Dict[str, Pool] = field(default_factory=dict)
+    disks: Dict[str, Disk] = field(default_factory=dict)
+    tools: Dict[str, bool] = field(default_factory=dict)
+    zfs_labelled: Set[str] = field(default_factory=set)  # devices with a ZFS label
+    boot_status: Optional[str] = None  # proxmox-boot-tool status, None if it failed
+
+    def disk(self, disk_id: str) -> Disk:
+        return self.disks.get(disk_id) or Disk(disk_id)
+
+    def pool_topology(self, pool: str) -> Dict[str, Any]:
+        if pool not in self.pools:
+            return dict(MISSING_TOPOLOGY)
+        return self.pools[pool].topology()
+
+    def _disk_devices(self, disk_id: str) -> Set[str]:
+        disk = self.disk(disk_id)
+        return {d for d in [disk.device, *disk.partitions] if d}
+
+    def disk_in_pool(self, disk_id: str, pool: str) -> bool:
+        """True if the disk or one of its partitions is a vdev of the given pool."""
+        if pool not in self.pools:
+            return False
+        devices = self._disk_devices(disk_id)
+        return any(disk_id in path or path in devices for path in self.pools[pool].leaf_paths())
+
+    def disk_in_any_pool(self, disk_id: str) -> bool:
+        """True if the disk or one of its partitions is a vdev of an imported pool."""
+        return any(self.disk_in_pool(disk_id, pool) for pool in self.pools)
+
+    def disk_has_zfs_label(self, disk_id: str) -> bool:
+        """True if blkid found a ZFS label on the disk (e.g. an exported pool)."""
+        return bool(self._disk_devices(disk_id) & self.zfs_labelled)
+
+    def partitions_match(self, src_id: str, dst_id: str) -> bool:
+        src_parts = partition_lines(self.disk(src_id).partition_table)
+        return len(src_parts) > 0 and src_parts == partition_lines(self.disk(dst_id).partition_table)
+
+    def guids_differ(self, src_id: str, dst_id: str) -> bool:
+        src_guid, dst_guid = self.disk(src_id).guid, self.disk(dst_id).guid
+        return src_guid is not None and dst_guid is not None and src_guid != dst_guid
+
+    def boot_configured(self, part_path: str) -> bool:
+        return self.boot_status is not None and part_path in self.boot_status
+
+
+# -- sgdisk --
+
+def partition_lines(sgdisk_output: str) -> List[str]:
+    """Partition rows of ``sgdisk -p`` output (lines starting with a number)."""
+    return [
+        line.strip()
+        for line in sgdisk_output.splitlines()
+        if line.strip() and line.strip()[0].isdigit()
+    ]
+
+
+def disk_guid(sgdisk_output: str) -> Optional[str]:
+    """Disk GUID from ``sgdisk -p`` output."""
+    for line in sgdisk_output.splitlines():
+        if "Disk identifier (GUID)" in line:
+            return line.split(":")[-1].strip()
+    return None
+
+
+# -- zpool status --
+
+def zpool_status_command(pool: Optional[str] = None) -> str:
+    """``zpool status`` with exact byte counts, as JSON on OpenZFS 2.3+ and text before."""
+    target = f" {shlex.quote(pool)}" if pool else ""
+    return f"zpool status -P -j --json-int{target} 2>/dev/null || zpool status -P -p{target}"
+
+
+def parse_size(value: Any) -> int:
+    """Bytes from an exact count or a ZFS human-readable size such as '1.80T'."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().rstrip("B")
+    multiplier = 1
+    if text and text[-1].upper() in _SIZE_UNITS:
+        multiplier = 1024 ** (_SIZE_UNITS.index(text[-1].upper()) + 1)
+        text = text[:-1]
+    try:
+        return int(float(text or 0) * multiplier)
+    except ValueError:
+        return 0
+
+
+def parse_scan_text(lines: List[str]) -> Dict[str, Any]:
+    """Scan stats from the text ``scan:`` section, keyed like the JSON scan_stats.
+
+    Handles the in-progress forms of OpenZFS 0.8 through 2.2, e.g.::
+
+        resilver in progress since Fri Jan 31 10:00:00 2026
+        1.20T / 1.80T scanned at 250M/s, 900G / 1.80T issued at 190M/s
+        850G resilvered, 50.00% done, 01:20:00 to go
+    """
+    first = lines[0] if lines else ""
+    text = " ".join(lines)
+    word = first.split()[0] if first.split() else ""
+    function = "resilver" if word.startswith("resilver") else word
+    if function not in ("resilver", "scrub"):
+        return {"function": "NONE", "state": "NONE"}
+
+    if "in progress" in first:
+        state = "SCANNING"
+    elif "canceled" in first:
+        state = "CANCELED"
+    else:
+        state = "FINISHED"
+    stats: Dict[str, Any] = {"function": function.upper(), "state": state}
+
+    match = re.search(rf"{_SIZE} (?:/ {_SIZE} )?scanned", text)
+    if match:
+        stats["examined"] = parse_size(match.group(1))
+        if match.group(2):
+            stats["to_examine"] = parse_size(match.group(2))
+    match = re.search(rf"{_SIZE} (?:/ {_SIZE} )?issued", text)
+    if match:
+        stats["issued"] = parse_size(match.group(1))
+    match = re.search(rf"{_SIZE} total", text)
+    if match:
+        stats["to_examine"] = parse_size(match.group(1))
+    match = re.search(rf"{_SIZE} (?:resilvered|repaired)", text) or re.search(
+        rf"(?:resilvered|repaired) {_SIZE} in", first
+    )
+    if match:
+        stats["processed"] = parse_size(match.group(1))
+    return stats
+
+
+def _vdev_type(name: str, depth: int, pool: str) -> str:
+    if depth == 0:
+        return "root" if name == pool else name
+    match = _GROUP_VDEV_RE.match(name)
+    return match.group(1) if match else "disk"
+
+
+def parse_zpool_status_text(text: str) -> Dict[str, Pool]:
+    """Parse (possibly multi-pool) ``zpool status -P`` text output."""
+    pools: Dict[str, Pool] = {}
+    pool: Optional[Pool] = None
+    stack: List[Tuple[int, Vdev]] = []
+    scan_lines: List[str] = []
+    in_config = in_scan = False
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if in_scan and stripped and not re.match(r"^\w+:", stripped):
+            scan_lines.append(stripped)
+            pool.scan_stats = parse_scan_text(scan_lines)  # type: ignore[union-attr]
+            continue
+        in_scan = False
+        if stripped.startswith("pool:"):
+            pool = Pool(stripped.split(":", 1)[1].strip(), "UNKNOWN")
+            pools[pool.name] = pool
+            stack, in_config = [], False
+            continue
+        if pool is None:
+            continue
+        if stripped.startswith("state:") and not in_config:
+            pool.state = stripped.split(":", 1)[1].strip()
+        elif stripped.startswith("scan:"):
+            pool.scan = stripped.split(":", 1)[1].strip()
+            scan_lines, in_scan = [pool.scan], True
+            pool.scan_stats = parse_scan_text(scan_lines)
+        elif stripped.startswith("config:"):
+            in_config = True
+        elif stripped.startswith("errors:"):
+            in_config = False
+        elif in_config and stripped and not stripped.startswith("NAME"):
+            # Tree depth is the indent after the leading tab, two spaces per level
+            depth = (len(line.lstrip("\t")) - len(line.lstrip())) // 2
+            tokens = stripped.split()
+            vdev = Vdev(
+                name=tokens[0],
+                vdev_type=_vdev_type(tokens[0], depth, pool.name),
+                state=tokens[1] if len(tokens) > 1 else "",
+                path=tokens[0] if tokens[0].startswith("/") else None,
+            )
+            while stack and stack[-1][0] >= depth:
+                stack.pop()
+            parent = stack[-1][1] if stack else None
+            if parent is not None and parent.vdev_type != "root":
+                parent.children.append(vdev)
+            elif vdev.vdev_type != "root":
+                # Top-level vdevs and the logs/cache/spares sections
+                pool.vdevs.append(vdev)
+            stack.append((depth, vdev))
+
+    return pools
+
+
+def _vdev_from_json(name: str, node: Dict[str, Any]) -> Vdev:
+    return Vdev(
+        name=node.get("name", name),
+        vdev_type=node.get("vdev_type", "disk"),
+        state=node.get("state", ""),
+        path=node.get("path"),
+        children=[_vdev_from_json(k, v) for k, v in (node.get("vdevs") or {}).items()],
+    )
+
+
+def _scan_text(stats: Dict[str, Any]) -> str:
+    """Summarise JSON scan_stats the way the text output's scan: line reads."""
+    function = str(stats.get("function", "")).lower()
+    state = str(stats.get("state", "")).upper()
+    if not function or function == "none":
+        return "none requested"
+    if state == "SCANNING":
+        return f"{function} in progress"
+    if state == "FINISHED":
+        return f"{function} completed"
+    return f"{function} {state.lower()}"
+
+
+def parse_zpool_status_json(document: Dict[str, Any]) -> Dict[str, Pool]:
+    """Parse ``zpool status -P -j`` output (OpenZFS 2.3+)."""
+    pools: Dict[str, Pool] = {}
+    for name, data in (document.get("pools") or {}).items():
+        root = (data.get("vdevs") or {}).get(name) or {}
+        vdevs = [_vdev_from_json(k, v) for k, v in (root.get("vdevs") or {}).items()]
+        for section in ("logs", "l2cache", "spares", "special", "dedup"):
+            if data.get(section):
+                vdevs.append(_vdev_from_json(section, {"vdev_type": section, "vdevs": data[section]}))
+        stats = data.get("scan_stats") or {}
+        pools[name] = Pool(
+            name=name,
+            state=data.get("state", "UNKNOWN"),
+            scan=_scan_text(stats),
+            scan_stats=stats,
+            vdevs=vdevs,
+        )
+    return pools
+
+
+def parse_zpool_status(output: str) -> Dict[str, Pool]:
+    """Parse ``zpool status -P`` output in either JSON or text form."""
+    if output.lstrip().startswith("{"):
+        return parse_zpool_status_json(json.loads(output))
+    return parse_zpool_status_text(output)
+
+
+# -- collection --
+
+def _lsblk_index(output: str) -> Dict[str, Tuple[Optional[int], List[str]]]:
+    """Map device path -> (size in bytes, child device paths) from ``lsblk -J``."""
+    index: Dict[str, Tuple[Optional[int], List[str]]] = {}
+
+    def walk(devices: List[Dict[str, Any]]) -> None:
+        for device in devices:
+            children = device.get("children") or []
+            size = device.get("size")
+            index[device["path"]] = (
+                int(size) if size is not None else None,
+                [child["path"] for child in children],
+            )
+            walk(children)
+
+    try:
+        walk(json.loads(output).get("blockdevices") or [])
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Could not parse lsblk output: {e}")
+    return index
+
+
+def zfs_fact_checks(disk_ids: Sequence[str]) -> Dict[str, str]:
+    """Probe commands (see host_probe) for the given by-id disks."""
+    quoted = " ".join(shlex.quote(disk_id) for disk_id in disk_ids)
+    checks = {
+        "zpool": zpool_status_command(),
+        "lsblk": "lsblk -J -b -o NAME,PATH,SIZE,TYPE",
+        "links": (
+            f"for id in {quoted}; do [ -e {BY_ID_DIR}/$id ] && "
+            f"echo \"$id $(readlink -f {BY_ID_DIR}/$id)\"; done; true"
+        ),
+        "blkid": "blkid -t TYPE=zfs_member -o device",
+        "tools": (
+            f"for t in {' '.join(REQUIRED_TOOLS)}; do "
+            "command -v $t >/dev/null 2>&1 && echo $t; done; true"
+        ),
+        "boot": "proxmox-boot-tool status",
+    }
+    for index, disk_id in enumerate(disk_ids):
+        checks[f"sgdisk_{index}"] = f"sgdisk -p {BY_ID_DIR}/{shlex.quote(disk_id)}"
+    return checks
+
+
+def build_zfs_facts(disk_ids: Sequence[str], results: Dict[str, Tuple[str, int]]) -> ZfsFacts:
+    """Index probe results (from zfs_fact_checks) into a ZfsFacts snapshot."""
+    stdout, rc = results["zpool"]
+    try:
+        pools = parse_zpool_status(stdout) if rc == 0 else {}
+    except ValueError as e:
+        logger.warning(f"Could not parse zpool status: {e}")
+        pools = {}
+
+    links = dict(
+        line.split(None, 1) for line in results["links"][0].splitlines() if len(line.split()) == 2
+    )
+    blocks = _lsblk_index(results["lsblk"][0])
+
+    disks = {}
+    for index, disk_id in enumerate(disk_ids):
+        device = links.get(disk_id)
+        size, partitions = blocks.get(device, (None, [])) if device else (None, [])
+        sgdisk_out, _ = results[f"sgdisk_{index}"]
+        disks[disk_id] = Disk(disk_id, device, size, sgdisk_out if device else "", partitions)
+
+    present = set(results["tools"][0].split())
+    boot_out, boot_rc = results["boot"]
+
+    return ZfsFacts(
+        pools=pools,
+        disks=disks,
+        tools={tool: tool in present for tool in REQUIRED_TOOLS},
+        zfs_labelled=set(results["blkid"][0].split()),
+        boot_status=boot_out if boot_rc == 0 else None,
+    )
+
+
+def collect_zfs_facts(
+    execute: Callable[[str], Tuple[str, str, int]],
+    disk_ids: Sequence[str],
+) -> ZfsFacts:
+    """
+    Collect pool and disk facts for a host in one round trip.
+
+    Args:
+        execute: Function running one command on the host
+        disk_ids: /dev/disk/by-id names of the disks to inspect
+
+    Returns:
+        Indexed snapshot of pools, vdevs, disks and tools
+    """
+    disk_ids = list(dict.fromkeys(disk_ids))
+    return build_zfs_facts(disk_ids, run_probe(execute, zfs_fact_checks(disk_ids)))
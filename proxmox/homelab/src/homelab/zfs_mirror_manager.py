@@ -7,30 +7,72 @@ Reads zfs_mirrors config from config/cluster.yaml and performs idempotent
 mirror operations (partition cloning, GUID randomization, boot setup,
 mirror attach, resilver verification).
 
+Pre-flight and apply read pool and disk state from a single batched fact
+collection per mirror (see zfs_facts.py); every state predicate accepts that
+snapshot via ``facts=`` and otherwise queries the host directly.
+
+apply_fleet() covers every host at once: pre-flight runs concurrently, then
+up to N hosts attach mirrors in parallel, each one pool at a time and only
+once its pools are done resilvering.
+
 Usage:
-    from homelab.zfs_mirror_manager import ZfsMirrorManager
+    from homelab.zfs_mirror_manager import ZfsMirrorManager, apply_fleet
 
     with ZfsMirrorManager("still-fawn") as mgr:
         result = mgr.apply(dry_run=True)
 
+    fleet = apply_fleet(max_parallel=4)
+
 CLI:
     poetry run homelab storage mirror apply --host still-fawn --dry-run
+    poetry run homelab storage mirror apply --max-parallel 4
     poetry run homelab storage mirror status --host still-fawn
 """
 
 import logging
-import re
 import socket
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import paramiko
 import yaml
 
+from homelab.exporter_rollout import rollout
+from homelab.host_probe import DEFAULT_PROBE_WORKERS, probe_hosts
+from homelab.resilver_monitor import (
+    ResilverMonitor,
+    ScanProgress,
+    ScanTracker,
+    sample_from_stats,
+    watch,
+)
+from homelab.zfs_facts import (
+    MISSING_TOPOLOGY,
+    Pool,
+    ZfsFacts,
+    collect_zfs_facts,
+    disk_guid,
+    parse_zpool_status,
+    partition_lines,
+    zpool_status_command,
+)
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "cluster.yaml"
 
+# Per-mirror apply statuses that count as success
+MIRROR_OK_STATUSES = ("success", "already_mirrored", "dry_run")
+
+# Hosts attaching mirrors at once in fleet mode (each host does one pool at a time)
+DEFAULT_FLEET_PARALLEL = 4
+
+# Pre-flight failures fleet mode tolerates: a busy pool is waited on rather
+# than rejected. A disk already in this pool's mirror is classified first, so
+# a failing new_disk_free means another pool owns the disk and blocks it.
+FLEET_SOFT_CHECKS = ("pool_not_busy",)
+
 
 def load_cluster_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
     """Load cluster configuration from YAML file."""
@@ -157,7 +199,26 @@ class ZfsMirrorManager:
 
     # -- state detection --
 
-    def get_pool_topology(self, pool: str) -> Dict[str, Any]:
+    def collect_facts(self, disk_ids: Optional[List[str]] = None) -> ZfsFacts:
+        """Snapshot pools, disks and tools in one SSH round trip.
+
+        Args:
+            disk_ids: Disks to inspect (default: every configured mirror disk)
+        """
+        if disk_ids is None:
+            disk_ids = [m[key] for m in self._mirrors for key in ("existing_disk", "new_disk")]
+        return collect_zfs_facts(self._ssh_exec, disk_ids)
+
+    def get_pool(self, pool: str, facts: Optional[ZfsFacts] = None) -> Optional[Pool]:
+        """Parsed ``zpool status`` of one pool, or None if it is not imported."""
+        if facts:
+            return facts.pools.get(pool)
+        stdout, stderr, rc = self._ssh_exec(zpool_status_command(pool))
+        if rc != 0:
+            return None
+        return parse_zpool_status(stdout).get(pool)
+
+    def get_pool_topology(self, pool: str, facts: Optional[ZfsFacts] = None) -> Dict[str, Any]:
         """Parse ``zpool status`` into a structured dict.
 
         Returns dict with keys:
@@ -166,100 +227,66 @@ class ZfsMirrorManager:
             vdev_disks: list of disk-id strings in the vdev
             scan: the scan/resilver status line (or "")
         """
-        stdout, stderr, rc = self._ssh_exec(f"zpool status {pool}")
-        if rc != 0:
-            return {"state": "MISSING", "is_mirror": False, "vdev_disks": [], "scan": ""}
-
-        result: Dict[str, Any] = {
-            "state": "UNKNOWN",
-            "is_mirror": False,
-            "vdev_disks": [],
-            "scan": "",
-        }
+        found = self.get_pool(pool, facts)
+        return found.topology() if found else dict(MISSING_TOPOLOGY)
 
-        for line in stdout.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("state:"):
-                result["state"] = stripped.split(":", 1)[1].strip()
-            if "mirror-0" in stripped:
-                result["is_mirror"] = True
-            if stripped.startswith("scan:"):
-                result["scan"] = stripped.split(":", 1)[1].strip()
-            # Capture disk-by-id references in vdev listing
-            m = re.search(r"(ata-\S+)", stripped)
-            if m:
-                result["vdev_disks"].append(m.group(1))
-
-        return result
-
-    def is_already_mirror(self, pool: str) -> bool:
+    def is_already_mirror(self, pool: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if the pool already has a mirror vdev."""
-        topo = self.get_pool_topology(pool)
+        topo = self.get_pool_topology(pool, facts)
         return topo["is_mirror"]
 
-    def disk_exists(self, disk_id: str) -> bool:
+    def disk_exists(self, disk_id: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if the disk symlink exists under /dev/disk/by-id/."""
+        if facts:
+            return facts.disk(disk_id).exists
         _, _, rc = self._ssh_exec(f"test -e {self._disk_path(disk_id)}")
         return rc == 0
 
-    def get_partition_table(self, disk_id: str) -> str:
+    def get_partition_table(self, disk_id: str, facts: Optional[ZfsFacts] = None) -> str:
         """Return raw sgdisk -p output for a disk."""
+        if facts:
+            return facts.disk(disk_id).partition_table
         stdout, _, _ = self._ssh_exec(f"sgdisk -p {self._disk_path(disk_id)}")
         return stdout
 
-    def partitions_match(self, src_id: str, dst_id: str) -> bool:
+    def partitions_match(self, src_id: str, dst_id: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if dst has partition count & sizes matching src."""
-        src_table = self.get_partition_table(src_id)
-        dst_table = self.get_partition_table(dst_id)
-
-        def _extract_parts(text: str) -> List[str]:
-            """Extract partition lines (start with a number)."""
-            parts = []
-            for line in text.splitlines():
-                stripped = line.strip()
-                if stripped and stripped[0].isdigit():
-                    parts.append(stripped)
-            return parts
-
-        src_parts = _extract_parts(src_table)
-        dst_parts = _extract_parts(dst_table)
+        src_parts = partition_lines(self.get_partition_table(src_id, facts))
+        dst_parts = partition_lines(self.get_partition_table(dst_id, facts))
         return len(src_parts) > 0 and src_parts == dst_parts
 
-    def guids_differ(self, src_id: str, dst_id: str) -> bool:
+    def guids_differ(self, src_id: str, dst_id: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if the two disks have different disk GUIDs."""
-        def _get_guid(disk_id: str) -> Optional[str]:
-            stdout, _, _ = self._ssh_exec(f"sgdisk -p {self._disk_path(disk_id)}")
-            for line in stdout.splitlines():
-                if "Disk identifier (GUID)" in line:
-                    return line.split(":")[-1].strip()
-            return None
-
-        src_guid = _get_guid(src_id)
-        dst_guid = _get_guid(dst_id)
+        src_guid = disk_guid(self.get_partition_table(src_id, facts))
+        dst_guid = disk_guid(self.get_partition_table(dst_id, facts))
         if src_guid is None or dst_guid is None:
             return False
         return src_guid != dst_guid
 
-    def boot_configured(self, disk_id: str, efi_part: int) -> bool:
+    def boot_configured(self, disk_id: str, efi_part: int, facts: Optional[ZfsFacts] = None) -> bool:
         """True if proxmox-boot-tool status lists the disk's ESP."""
+        if facts:
+            return facts.boot_configured(self._part_path(disk_id, efi_part))
         stdout, _, rc = self._ssh_exec("proxmox-boot-tool status")
         if rc != 0:
             return False
         part_path = self._part_path(disk_id, efi_part)
         return part_path in stdout
 
-    def pool_is_resilvering(self, pool: str) -> bool:
+    def pool_is_resilvering(self, pool: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if the pool is currently resilvering."""
-        topo = self.get_pool_topology(pool)
+        topo = self.get_pool_topology(pool, facts)
         return "resilver in progress" in topo["scan"].lower()
 
-    def pool_is_scrubbing(self, pool: str) -> bool:
+    def pool_is_scrubbing(self, pool: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if the pool is currently scrubbing."""
-        topo = self.get_pool_topology(pool)
+        topo = self.get_pool_topology(pool, facts)
         return "scrub in progress" in topo["scan"].lower()
 
-    def get_disk_size_sectors(self, disk_id: str) -> Optional[int]:
+    def get_disk_size_sectors(self, disk_id: str, facts: Optional[ZfsFacts] = None) -> Optional[int]:
         """Return sector count via lsblk for a disk."""
+        if facts:
+            return facts.disk(disk_id).size_bytes
         stdout, _, rc = self._ssh_exec(
             f"lsblk -bndo SIZE {self._disk_path(disk_id)}"
         )
@@ -270,15 +297,19 @@ class ZfsMirrorManager:
         except ValueError:
             return None
 
-    def disk_in_any_pool(self, disk_id: str) -> bool:
+    def disk_in_any_pool(self, disk_id: str, facts: Optional[ZfsFacts] = None) -> bool:
         """True if any partition on the disk is already part of a zpool."""
+        if facts:
+            return facts.disk_in_any_pool(disk_id)
         stdout, _, rc = self._ssh_exec("zpool status -L")
         if rc != 0:
             return False
         return disk_id in stdout
 
-    def required_tools_present(self) -> Dict[str, bool]:
+    def required_tools_present(self, facts: Optional[ZfsFacts] = None) -> Dict[str, bool]:
         """Check that sgdisk, proxmox-boot-tool, zpool are available."""
+        if facts:
+            return dict(facts.tools)
         tools = {}
         for tool in ("sgdisk", "proxmox-boot-tool", "zpool"):
             _, _, rc = self._ssh_exec(f"which {tool}")
@@ -287,16 +318,24 @@ class ZfsMirrorManager:
 
     # -- pre-flight --
 
-    def preflight(self, mirror_cfg: Dict[str, Any]) -> Dict[str, Any]:
-        """Run pre-flight checks. Returns dict of check_name -> pass/fail + detail."""
+    def preflight(
+        self, mirror_cfg: Dict[str, Any], facts: Optional[ZfsFacts] = None
+    ) -> Dict[str, Any]:
+        """Run pre-flight checks. Returns dict of check_name -> pass/fail + detail.
+
+        All checks read one fact snapshot, collected here unless given.
+        """
         existing = mirror_cfg["existing_disk"]
         new = mirror_cfg["new_disk"]
         pool = mirror_cfg["pool"]
 
+        if facts is None:
+            facts = self.collect_facts([existing, new])
+
         checks: Dict[str, Any] = {}
 
         # 1. Pool exists and is ONLINE
-        topo = self.get_pool_topology(pool)
+        topo = self.get_pool_topology(pool, facts)
         checks["pool_online"] = {
             "passed": topo["state"] == "ONLINE",
             "detail": f"state={topo['state']}",
@@ -304,24 +343,31 @@ class ZfsMirrorManager:
 
         # 2. Both disks present
         checks["existing_disk_present"] = {
-            "passed": self.disk_exists(existing),
+            "passed": self.disk_exists(existing, facts),
             "detail": self._disk_path(existing),
         }
         checks["new_disk_present"] = {
-            "passed": self.disk_exists(new),
+            "passed": self.disk_exists(new, facts),
             "detail": self._disk_path(new),
         }
 
-        # 3. New disk not already in a pool
-        in_pool = self.disk_in_any_pool(new)
+        # 3. New disk not already in a pool (imported, or labelled by an exported one)
+        in_pool = self.disk_in_any_pool(new, facts)
+        labelled = facts.disk_has_zfs_label(new)
+        if in_pool:
+            detail = "already in a pool"
+        elif labelled:
+            detail = "has a ZFS label from another pool"
+        else:
+            detail = "not in any pool"
         checks["new_disk_free"] = {
-            "passed": not in_pool,
-            "detail": "already in a pool" if in_pool else "not in any pool",
+            "passed": not (in_pool or labelled),
+            "detail": detail,
         }
 
         # 4. Disk sizes match
-        src_size = self.get_disk_size_sectors(existing)
-        dst_size = self.get_disk_size_sectors(new)
+        src_size = self.get_disk_size_sectors(existing, facts)
+        dst_size = self.get_disk_size_sectors(new, facts)
         sizes_match = src_size is not None and dst_size is not None and src_size == dst_size
         checks["disk_sizes_match"] = {
             "passed": sizes_match,
@@ -329,7 +375,7 @@ class ZfsMirrorManager:
         }
 
         # 5. Required tools
-        tools = self.required_tools_present()
+        tools = self.required_tools_present(facts)
         all_tools = all(tools.values())
         missing = [t for t, ok in tools.items() if not ok]
         checks["required_tools"] = {
@@ -338,7 +384,7 @@ class ZfsMirrorManager:
         }
 
         # 6. Not resilvering or scrubbing
-        busy = self.pool_is_resilvering(pool) or self.pool_is_scrubbing(pool)
+        busy = self.pool_is_resilvering(pool, facts) or self.pool_is_scrubbing(pool, facts)
         checks["pool_not_busy"] = {
             "passed": not busy,
             "detail": "resilvering or scrubbing" if busy else "idle",
@@ -349,13 +395,16 @@ class ZfsMirrorManager:
     # -- operations (each idempotent) --
 
     def clone_partitions(
-        self, mirror_cfg: Dict[str, Any], dry_run: bool = False
+        self,
+        mirror_cfg: Dict[str, Any],
+        dry_run: bool = False,
+        facts: Optional[ZfsFacts] = None,
     ) -> Dict[str, Any]:
         """Step 1: Clone partition table from existing to new disk."""
         existing = mirror_cfg["existing_disk"]
         new = mirror_cfg["new_disk"]
 
-        if self.partitions_match(existing, new):
+        if self.partitions_match(existing, new, facts):
             return {"step": "clone_partitions", "status": "skipped", "reason": "already match"}
 
         cmd = f"sgdisk -R {self._disk_path(new)} {self._disk_path(existing)}"
@@ -369,13 +418,16 @@ class ZfsMirrorManager:
         return {"step": "clone_partitions", "status": "done", "output": stdout}
 
     def randomize_guids(
-        self, mirror_cfg: Dict[str, Any], dry_run: bool = False
+        self,
+        mirror_cfg: Dict[str, Any],
+        dry_run: bool = False,
+        facts: Optional[ZfsFacts] = None,
     ) -> Dict[str, Any]:
         """Step 2: Randomize GUIDs on the new disk so they differ from source."""
         existing = mirror_cfg["existing_disk"]
         new = mirror_cfg["new_disk"]
 
-        if self.guids_differ(existing, new):
+        if self.guids_differ(existing, new, facts):
             return {"step": "randomize_guids", "status": "skipped", "reason": "already differ"}
 
         cmd = f"sgdisk -G {self._disk_path(new)}"
@@ -389,13 +441,16 @@ class ZfsMirrorManager:
         return {"step": "randomize_guids", "status": "done", "output": stdout}
 
     def setup_boot(
-        self, mirror_cfg: Dict[str, Any], dry_run: bool = False
+        self,
+        mirror_cfg: Dict[str, Any],
+        dry_run: bool = False,
+        facts: Optional[ZfsFacts] = None,
     ) -> Dict[str, Any]:
         """Step 3: Format + init ESP on the new disk for proxmox-boot-tool."""
         new = mirror_cfg["new_disk"]
         efi_part = mirror_cfg.get("efi_partition", 2)
 
-        if self.boot_configured(new, efi_part):
+        if self.boot_configured(new, efi_part, facts):
             return {"step": "setup_boot", "status": "skipped", "reason": "already configured"}
 
         part = self._part_path(new, efi_part)
@@ -422,7 +477,10 @@ class ZfsMirrorManager:
         return {"step": "setup_boot", "status": "done"}
 
     def attach_mirror(
-        self, mirror_cfg: Dict[str, Any], dry_run: bool = False
+        self,
+        mirror_cfg: Dict[str, Any],
+        dry_run: bool = False,
+        facts: Optional[ZfsFacts] = None,
     ) -> Dict[str, Any]:
         """Step 4: Attach new disk partition to pool as mirror."""
         pool = mirror_cfg["pool"]
@@ -430,8 +488,8 @@ class ZfsMirrorManager:
         new = mirror_cfg["new_disk"]
         zfs_part = mirror_cfg.get("zfs_partition", 3)
 
-        if self.is_already_mirror(pool):
-            topo = self.get_pool_topology(pool)
+        if self.is_already_mirror(pool, facts):
+            topo = self.get_pool_topology(pool, facts)
             new_part = self._part_path(new, zfs_part)
             # Check both disks are already in the mirror
             if any(new in d for d in topo["vdev_disks"]):
@@ -450,17 +508,46 @@ class ZfsMirrorManager:
 
         return {"step": "attach_mirror", "status": "done"}
 
+    def _scan_progress(self, pool: str, found: Optional[Pool]) -> Dict[str, Any]:
+        """Single-sample scan progress (percent, bytes) for a pool."""
+        tracker = ScanTracker(pool)
+        if found:
+            tracker.add(sample_from_stats(found.scan_stats, time.time()))
+        return tracker.progress().to_dict()
+
     def check_resilver(self, pool: str) -> Dict[str, Any]:
         """Step 5: Check resilver progress."""
-        topo = self.get_pool_topology(pool)
+        found = self.get_pool(pool)
+        topo = found.topology() if found else dict(MISSING_TOPOLOGY)
         return {
             "step": "check_resilver",
             "is_mirror": topo["is_mirror"],
             "state": topo["state"],
             "scan": topo["scan"],
             "vdev_disks": topo["vdev_disks"],
+            "progress": self._scan_progress(pool, found),
         }
 
+    def resilver_monitor(self, pool: str) -> ResilverMonitor:
+        """Monitor sampling this host's pool scan progress over the SSH connection."""
+        return ResilverMonitor(self._ssh_exec, pool)
+
+    def wait_for_idle(
+        self,
+        pools: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> List[ScanProgress]:
+        """Block until no resilver or scrub runs on the pools (default: all configured).
+
+        Returns:
+            The last progress per pool; any still active means the timeout hit
+        """
+        if pools is None:
+            pools = list(dict.fromkeys(m["pool"] for m in self._mirrors))
+        monitors = [self.resilver_monitor(pool) for pool in pools]
+        return watch(monitors, lambda results: None, timeout=timeout, sleep=sleep)
+
     # -- orchestration --
 
     def status(self) -> Dict[str, Any]:
@@ -468,7 +555,8 @@ class ZfsMirrorManager:
         results = []
         for mcfg in self._mirrors:
             pool = mcfg["pool"]
-            topo = self.get_pool_topology(pool)
+            found = self.get_pool(pool)
+            topo = found.topology() if found else dict(MISSING_TOPOLOGY)
             results.append({
                 "pool": pool,
                 "existing_disk": mcfg["existing_disk"],
@@ -477,84 +565,253 @@ class ZfsMirrorManager:
                 "state": topo["state"],
                 "scan": topo["scan"],
                 "vdev_disks": topo["vdev_disks"],
+                "progress": self._scan_progress(pool, found),
             })
         return {"hostname": self.hostname, "mirrors": results}
 
+    def apply_mirror(self, mcfg: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+        """Pre-flight and run every step for one configured mirror."""
+        pool = mcfg["pool"]
+        mirror_result: Dict[str, Any] = {
+            "pool": pool,
+            "existing_disk": mcfg["existing_disk"],
+            "new_disk": mcfg["new_disk"],
+            "preflight": {},
+            "steps": [],
+            "status": "unknown",
+        }
+
+        # Pre-flight, and the starting state for every step, from one snapshot
+        facts: Optional[ZfsFacts] = self.collect_facts([mcfg["existing_disk"], mcfg["new_disk"]])
+        checks = self.preflight(mcfg, facts)
+        mirror_result["preflight"] = checks
+        failed_checks = [k for k, v in checks.items() if not v["passed"]]
+
+        # If already mirrored with both disks, skip everything
+        if self.is_already_mirror(pool, facts):
+            topo = self.get_pool_topology(pool, facts)
+            if any(mcfg["new_disk"] in d for d in topo["vdev_disks"]):
+                mirror_result["status"] = "already_mirrored"
+                mirror_result["steps"] = []
+                resilver = self.check_resilver(pool)
+                mirror_result["resilver"] = resilver
+                return mirror_result
+
+        if failed_checks and not dry_run:
+            # new_disk_free may only fail because the disk is already in THIS
+            # pool's mirror; any other pool or a stray label blocks the apply
+            in_this_mirror = self.is_already_mirror(pool, facts) and facts.disk_in_pool(mcfg["new_disk"], pool)
+            critical_fails = [c for c in failed_checks if c != "new_disk_free" or not in_this_mirror]
+            if critical_fails:
+                mirror_result["status"] = "preflight_failed"
+                mirror_result["failed_checks"] = failed_checks
+                return mirror_result
+
+        # Execute steps
+        steps = [
+            self.clone_partitions,
+            self.randomize_guids,
+            self.setup_boot,
+            self.attach_mirror,
+        ]
+
+        had_failure = False
+        for step_fn in steps:
+            result = step_fn(mcfg, dry_run=dry_run, facts=facts)
+            mirror_result["steps"].append(result)
+            if result.get("status") == "failed":
+                had_failure = True
+                break
+            # The snapshot no longer describes the disks once a step changed them
+            if result.get("status") == "done":
+                facts = None
+
+        # Resilver check (always runs, not affected by dry_run)
+        if not dry_run and not had_failure:
+            resilver = self.check_resilver(pool)
+            mirror_result["resilver"] = resilver
+
+        if had_failure:
+            mirror_result["status"] = "failed"
+        elif dry_run:
+            mirror_result["status"] = "dry_run"
+        else:
+            mirror_result["status"] = "success"
+
+        return mirror_result
+
     def apply(self, dry_run: bool = False) -> Dict[str, Any]:
         """Run all mirror operations for every configured mirror on this host.
 
         Returns dict with overall success and per-mirror step results.
         """
-        all_results: List[Dict[str, Any]] = []
-
-        for mcfg in self._mirrors:
-            pool = mcfg["pool"]
-            mirror_result: Dict[str, Any] = {
-                "pool": pool,
-                "existing_disk": mcfg["existing_disk"],
-                "new_disk": mcfg["new_disk"],
-                "preflight": {},
-                "steps": [],
-                "status": "unknown",
-            }
+        all_results = [self.apply_mirror(mcfg, dry_run=dry_run) for mcfg in self._mirrors]
 
-            # Pre-flight
-            checks = self.preflight(mcfg)
-            mirror_result["preflight"] = checks
-            failed_checks = [k for k, v in checks.items() if not v["passed"]]
-
-            # If already mirrored with both disks, skip everything
-            if self.is_already_mirror(pool):
-                topo = self.get_pool_topology(pool)
-                if any(mcfg["new_disk"] in d for d in topo["vdev_disks"]):
-                    mirror_result["status"] = "already_mirrored"
-                    mirror_result["steps"] = []
-                    resilver = self.check_resilver(pool)
-                    mirror_result["resilver"] = resilver
-                    all_results.append(mirror_result)
-                    continue
-
-            if failed_checks and not dry_run:
-                # Allow new_disk_free to fail if it's already in THIS pool's mirror
-                critical_fails = [c for c in failed_checks if c != "new_disk_free"]
-                if critical_fails:
-                    mirror_result["status"] = "preflight_failed"
-                    mirror_result["failed_checks"] = failed_checks
-                    all_results.append(mirror_result)
-                    continue
-
-            # Execute steps
-            steps = [
-                self.clone_partitions,
-                self.randomize_guids,
-                self.setup_boot,
-                self.attach_mirror,
-            ]
-
-            had_failure = False
-            for step_fn in steps:
-                result = step_fn(mcfg, dry_run=dry_run)
-                mirror_result["steps"].append(result)
-                if result.get("status") == "failed":
-                    had_failure = True
-                    break
-
-            # Resilver check (always runs, not affected by dry_run)
-            if not dry_run and not had_failure:
-                resilver = self.check_resilver(pool)
-                mirror_result["resilver"] = resilver
+        return {
+            "hostname": self.hostname,
+            "mirrors": all_results,
+            "success": all(m["status"] in MIRROR_OK_STATUSES for m in all_results),
+        }
 
-            if had_failure:
-                mirror_result["status"] = "failed"
-            elif dry_run:
-                mirror_result["status"] = "dry_run"
-            else:
-                mirror_result["status"] = "success"
 
-            all_results.append(mirror_result)
+def _fleet_preflight(mgr: ZfsMirrorManager) -> Dict[str, Any]:
+    """Classify every configured mirror on a host from one fact snapshot."""
+    facts = mgr.collect_facts()
+    mirrors = []
+    for mcfg in mgr._mirrors:
+        checks = mgr.preflight(mcfg, facts)
+        topo = mgr.get_pool_topology(mcfg["pool"], facts)
+        failed = [k for k, v in checks.items() if not v["passed"]]
+        if topo["is_mirror"] and any(mcfg["new_disk"] in d for d in topo["vdev_disks"]):
+            state = "already_mirrored"
+        elif [c for c in failed if c not in FLEET_SOFT_CHECKS]:
+            state = "blocked"
+        elif "pool_not_busy" in failed:
+            state = "busy"
+        else:
+            state = "ready"
+        mirrors.append({"pool": mcfg["pool"], "state": state, "failed_checks": failed})
+    return {"hostname": mgr.hostname, "mirrors": mirrors}
+
+
+def apply_fleet(
+    config_path: Optional[Path] = None,
+    hosts: Optional[List[str]] = None,
+    dry_run: bool = False,
+    max_parallel: int = DEFAULT_FLEET_PARALLEL,
+    wait_for_resilver: bool = False,
+    resilver_timeout: Optional[float] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Apply zfs_mirrors on many hosts: concurrent pre-flight, then bounded parallel attach.
+
+    Pre-flight runs on every host at once. Hosts with a blocking failure
+    (missing disk, size mismatch, missing tools, pool offline) are left
+    untouched. The rest attach mirrors max_parallel hosts at a time, and
+    each host handles one pool at a time: before every pool it waits until
+    none of its pools is resilvering or scrubbing, so a host never runs two
+    resilvers over the same disks.
+
+    Args:
+        config_path: Optional path to cluster.yaml
+        hosts: Hosts to consider (default: every host with zfs_mirrors)
+        dry_run: Report the steps without making changes (no resilver waits)
+        max_parallel: Maximum hosts attaching at once
+        wait_for_resilver: Hold each host's slot until its last resilver finishes
+        resilver_timeout: Give up waiting for a resilver after this many seconds
+        config: Already loaded cluster config (overrides config_path)
+
+    Returns:
+        Dict with per-host results (status, actions, timeline, mirrors),
+        overall success and elapsed_sec
+    """
+    if config is None:
+        config = load_cluster_config(config_path)
+    if max_parallel < 1:
+        raise ValueError(f"Invalid max_parallel {max_parallel}")
+
+    candidates = [
+        node["name"] for node in config.get("nodes", [])
+        if node.get("zfs_mirrors") and (hosts is None or node["name"] in hosts)
+    ]
+    start = time.monotonic()
+    timelines: Dict[str, List[Dict[str, Any]]] = {h: [] for h in candidates}
+
+    def mark(hostname: str, event: str) -> None:
+        timelines[hostname].append({"t": round(time.monotonic() - start, 2), "event": event})
+
+    # Phase 1: pre-flight every host at once
+    def preflight_host(hostname: str) -> Dict[str, Any]:
+        mark(hostname, "preflight started")
+        try:
+            with ZfsMirrorManager(hostname, config=config) as mgr:
+                plan = _fleet_preflight(mgr)
+        except Exception as e:
+            logger.error(f"Pre-flight failed on {hostname}: {e}")
+            plan = {"hostname": hostname, "mirrors": [], "error": str(e)}
+        mark(hostname, "preflight finished")
+        return plan
+
+    plans = {p["hostname"]: p for p in probe_hosts(candidates, preflight_host, DEFAULT_PROBE_WORKERS)}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    eligible = []
+    for hostname in candidates:
+        plan = plans[hostname]
+        blocked = [m for m in plan["mirrors"] if m["state"] == "blocked"]
+        pending = [m for m in plan["mirrors"] if m["state"] != "already_mirrored"]
+        if plan.get("error") or (blocked and not dry_run):
+            reason = plan.get("error") or "; ".join(
+                f"{m['pool']}: {', '.join(m['failed_checks'])}" for m in blocked
+            )
+            results[hostname] = {"hostname": hostname, "status": "preflight_failed", "error": reason}
+        elif not pending:
+            results[hostname] = {
+                "hostname": hostname,
+                "status": "success",
+                "actions": [f"{m['pool']}: already_mirrored" for m in plan["mirrors"]],
+            }
+        else:
+            eligible.append(hostname)
+            mark(hostname, "queued")
+
+    # Phase 2: attach on up to max_parallel hosts, one pool at a time per host
+    def apply_host(hostname: str) -> Dict[str, Any]:
+        mark(hostname, "apply started")
+        mirrors: List[Dict[str, Any]] = []
+        with ZfsMirrorManager(hostname, config=config) as mgr:
+            for mcfg in mgr._mirrors:
+                pool = mcfg["pool"]
+                if not dry_run:
+                    progress = mgr.wait_for_idle(timeout=resilver_timeout)
+                    busy = [p.pool for p in progress if p.active]
+                    if busy:
+                        mark(hostname, f"gave up waiting for scan on {', '.join(busy)}")
+                        mirrors.append({"pool": pool, "status": "deferred"})
+                        continue
+                mark(hostname, f"{pool} started")
+                mirrors.append(mgr.apply_mirror(mcfg, dry_run=dry_run))
+                mark(hostname, f"{pool} {mirrors[-1]['status']}")
+
+            if wait_for_resilver and not dry_run:
+                mark(hostname, "waiting for resilver")
+                progress = mgr.wait_for_idle(timeout=resilver_timeout)
+                if any(p.active for p in progress):
+                    mark(hostname, "resilver still running")
+                else:
+                    mark(hostname, "resilver finished")
 
+        ok = all(m["status"] in MIRROR_OK_STATUSES for m in mirrors)
+        mark(hostname, "apply finished")
         return {
-            "hostname": self.hostname,
-            "mirrors": all_results,
-            "success": all(m["status"] in ("success", "already_mirrored", "dry_run") for m in all_results),
+            "hostname": hostname,
+            "status": ("dry_run" if dry_run else "success") if ok else "failed",
+            "actions": [f"{m['pool']}: {m['status']}" for m in mirrors],
+            "mirrors": mirrors,
         }
+
+    for result in rollout(eligible, apply_host, max_parallel=max_parallel, canary=False):
+        results[result["hostname"]] = result
+
+    host_results = []
+    for hostname in candidates:
+        result = results[hostname]
+        result["preflight"] = plans[hostname]["mirrors"]
+        result["timeline"] = timelines[hostname]
+        host_results.append(result)
+
+    return {
+        "hosts": host_results,
+        "success": all(r["status"] in ("success", "dry_run") for r in host_results),
+        "elapsed_sec": round(time.monotonic() - start, 2),
+    }
+
+
+def print_fleet_timeline(result: Dict[str, Any]) -> None:
+    """Print the per-host event timeline of an apply_fleet() run."""
+    for host in result["hosts"]:
+        print(f"\n{host['hostname']} ({host['status']})")
+        for event in host.get("timeline", []):
+            print(f"  {event['t']:>8.1f}s  {event['event']}")
+    print(f"\nFleet finished in {result['elapsed_sec']:.1f}s")
@@ -0,0 +1,133 @@
+"""Tests for artifact_cache module."""
+
+import hashlib
+import io
+import tarfile
+from unittest import mock
+
+import pytest
+
+from homelab.artifact_cache import ArtifactCache, parse_checksums, sha256_file
+
+URL = "https://example.com/releases/v1.0/tool-1.0.linux-amd64.tar.gz"
+
+
+def _tarball(files):
+    """Build an in-memory tar.gz with the given {name: bytes} members."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _response(content):
+    response = mock.MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [content[:10], content[10:]]
+    response.text = content.decode(errors="replace")
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(tmp_path / "artifacts")
+
+
+def test_fetch_downloads_once_and_reuses_cache(cache):
+    content = b"release tarball contents"
+    digest = hashlib.sha256(content).hexdigest()
+
+    with mock.patch("homelab.artifact_cache.requests.get", return_value=_response(content)) as get:
+        first = cache.fetch(URL, sha256=digest)
+        second = cache.fetch(URL, sha256=digest)
+
+    assert get.call_count == 1
+    assert first == second == cache.cache_dir / "tool-1.0.linux-amd64.tar.gz"
+    assert first.read_bytes() == content
+
+
+def test_fetch_records_verified_checksum(cache):
+    content = b"release tarball contents"
+    digest = hashlib.sha256(content).hexdigest()
+    assert cache.cached_checksum(URL) is None
+
+    with mock.patch("homelab.artifact_cache.requests.get", return_value=_response(content)):
+        cache.fetch(URL, sha256=digest.upper())
+
+    assert cache.cached_checksum(URL) == digest
+    (cache.cache_dir / "tool-1.0.linux-amd64.tar.gz").unlink()
+    assert cache.cached_checksum(URL) is None
+
+
+def test_fetch_checksum_mismatch_keeps_nothing(cache):
+    with mock.patch("homelab.artifact_cache.requests.get", return_value=_response(b"tampered")):
+        with pytest.raises(ValueError, match="Checksum mismatch"):
+            cache.fetch(URL, sha256="0" * 64)
+
+    assert list(cache.cache_dir.iterdir()) == []
+
+
+def test_fetch_replaces_corrupt_cached_file(cache):
+    content = b"good contents"
+    cache.cache_dir.mkdir(parents=True)
+    (cache.cache_dir / "tool-1.0.linux-amd64.tar.gz").write_bytes(b"truncated")
+
+    with mock.patch("homelab.artifact_cache.requests.get", return_value=_response(content)):
+        path = cache.fetch(URL, sha256=hashlib.sha256(content).hexdigest())
+
+    assert path.read_bytes() == content
+
+
+def test_fetch_checksum_from_release(cache):
+    sums = b"aaaa  tool-1.0.darwin-amd64.tar.gz\nBBBB  tool-1.0.linux-amd64.tar.gz\n"
+
+    with mock.patch("homelab.artifact_cache.requests.get", return_value=_response(sums)):
+        assert cache.fetch_checksum("https://example.com/sha256sums.txt", "tool-1.0.linux-amd64.tar.gz") == "bbbb"
+        with pytest.raises(ValueError, match="not listed"):
+            cache.fetch_checksum("https://example.com/sha256sums.txt", "tool-1.0.linux-arm64.tar.gz")
+
+
+def test_parse_checksums_binary_mode_marker():
+    assert parse_checksums("cafe *tool.tar.gz", "tool.tar.gz") == "cafe"
+    assert parse_checksums("", "tool.tar.gz") is None
+
+
+def test_extract_member(cache, tmp_path):
+    archive = tmp_path / "tool-1.0.linux-amd64.tar.gz"
+    archive.write_bytes(_tarball({
+        "tool-1.0.linux-amd64/LICENSE": b"license",
+        "tool-1.0.linux-amd64/tool": b"#!/bin/sh\n",
+    }))
+
+    binary = cache.extract(archive, "tool")
+
+    digest = sha256_file(archive)
+    assert binary == cache.cache_dir / f"tool-1.0.linux-amd64-{digest[:16]}" / "tool"
+    assert binary.read_bytes() == b"#!/bin/sh\n"
+    assert binary.stat().st_mode & 0o111
+    assert sha256_file(binary) == hashlib.sha256(b"#!/bin/sh\n").hexdigest()
+
+
+def test_extract_is_keyed_by_tarball_digest(cache, tmp_path):
+    archive = tmp_path / "tool-1.0.linux-amd64.tar.gz"
+    archive.write_bytes(_tarball({"tool": b"old"}))
+    old = cache.extract(archive, "tool")
+
+    # Same file name, new contents (e.g. a re-published release)
+    archive.write_bytes(_tarball({"tool": b"new"}))
+    new = cache.extract(archive, "tool")
+
+    assert new != old
+    assert (old.read_bytes(), new.read_bytes()) == (b"old", b"new")
+    assert cache.extract(archive, "tool", archive_sha256=sha256_file(archive)) == new
+
+
+def test_extract_missing_member(cache, tmp_path):
+    archive = tmp_path / "tool.tar.gz"
+    archive.write_bytes(_tarball({"README": b"readme"}))
+
+    with pytest.raises(FileNotFoundError, match="tool not found"):
+        cache.extract(archive, "tool")
@@ -5,8 +5,8 @@ from unittest import mock
 
 import pytest
 
-from homelab.coral_detection import CoralDetector
-from homelab.coral_models import CoralMode, DeviceNotFoundError
+from homelab.coral_detection import CoralDetector, SysfsCoralDetector
+from homelab.coral_models import CoralDevice, CoralMode, DeviceNotFoundError
 
 
 class TestCoralDetector:
@@ -248,4 +248,134 @@ class TestCoralDetector:
             
             assert device1.mode == device2.mode == CoralMode.GOOGLE
             assert device1.device_path == device2.device_path
-            assert mock_run.call_count == 2  # Each call runs lsusb
\ No newline at end of file
+            assert mock_run.call_count == 2  # Each call runs lsusb
+
+
+def _add_usb_device(sysfs_root, name, usb_id, busnum, devnum, **attrs):
+    """Create a USB device directory in a fake sysfs tree."""
+    device_dir = sysfs_root / "bus/usb/devices" / name
+    device_dir.mkdir(parents=True)
+    vendor, product = usb_id.split(":")
+    for attr, value in dict(idVendor=vendor, idProduct=product, busnum=busnum, devnum=devnum, **attrs).items():
+        (device_dir / attr).write_text(f"{value}\n")
+    return device_dir
+
+
+class FakeMonitor:
+    """udev monitor stand-in that runs a callback on each poll."""
+
+    def __init__(self, on_poll):
+        self.on_poll = on_poll
+        self.started = False
+        self.polls = []
+
+    def start(self):
+        self.started = True
+
+    def poll(self, timeout=None):
+        self.polls.append(timeout)
+        return self.on_poll()
+
+
+class TestSysfsCoralDetector:
+    """Test cases for SysfsCoralDetector class."""
+
+    @pytest.fixture
+    def sysfs(self, tmp_path):
+        """Fake sysfs tree with a root hub and a Bluetooth adapter."""
+        _add_usb_device(tmp_path, "usb1", "1d6b:0002", "1", "1")
+        _add_usb_device(tmp_path, "1-3", "8087:0aaa", "1", "3")
+        return tmp_path
+
+    def test_detect_google_mode(self, sysfs):
+        """Test detection of Coral in Google mode from sysfs attributes."""
+        _add_usb_device(sysfs, "3-1", "18d1:9302", "3", "4", manufacturer="Google Inc.")
+
+        with mock.patch('subprocess.run') as mock_run:
+            device = SysfsCoralDetector(sysfs_root=sysfs).detect_coral()
+
+        mock_run.assert_not_called()
+        assert device.mode == CoralMode.GOOGLE
+        assert device.bus == "003"
+        assert device.device == "004"
+        assert device.device_path == "/dev/bus/usb/003/004"
+        assert device.description == "Google Inc."
+
+    def test_detect_unichip_mode_and_priority(self, sysfs):
+        """Test Unichip detection, and Google mode winning when both are present."""
+        _add_usb_device(sysfs, "3-1", "1a6e:089a", "3", "3")
+        detector = SysfsCoralDetector(sysfs_root=sysfs)
+
+        device = detector.detect_coral()
+        assert device.mode == CoralMode.UNICHIP
+        assert device.description == "Global Unichip Corp."
+
+        _add_usb_device(sysfs, "3-2", "18d1:9302", "3", "5")
+        assert detector.detect_coral().mode == CoralMode.GOOGLE
+        assert detector.get_last_detection().device == "005"
+
+    def test_detect_not_found_and_unreadable(self, sysfs, tmp_path):
+        """Test no Coral present, and a missing sysfs USB directory."""
+        assert SysfsCoralDetector(sysfs_root=sysfs).detect_coral().mode == CoralMode.NOT_FOUND
+
+        with pytest.raises(DeviceNotFoundError, match="Could not read USB devices"):
+            SysfsCoralDetector(sysfs_root=tmp_path / "missing").detect_coral()
+
+    def test_wait_for_mode_change_wakes_on_udev_event(self, sysfs):
+        """Test the wait re-scans sysfs on each udev event instead of sleeping."""
+        coral = _add_usb_device(sysfs, "3-1", "1a6e:089a", "3", "3")
+
+        def re_enumerate():
+            # The kernel replaces the Unichip device with the Google one
+            for attr in coral.iterdir():
+                attr.unlink()
+            coral.rmdir()
+            _add_usb_device(sysfs, "3-1", "18d1:9302", "3", "4")
+            return mock.MagicMock(action="add", sys_path="/sys/devices/usb3/3-1")
+
+        monitor = FakeMonitor(re_enumerate)
+        detector = SysfsCoralDetector(sysfs_root=sysfs, monitor_factory=lambda: monitor)
+
+        with mock.patch('time.sleep') as mock_sleep:
+            device = detector.wait_for_mode_change(CoralMode.GOOGLE, timeout=30)
+
+        assert device.mode == CoralMode.GOOGLE
+        assert monitor.started is True
+        assert len(monitor.polls) == 1
+        mock_sleep.assert_not_called()
+
+    def test_wait_for_mode_change_timeout(self, sysfs):
+        """Test the wait gives up when no event brings the expected mode."""
+        _add_usb_device(sysfs, "3-1", "1a6e:089a", "3", "3")
+        detector = SysfsCoralDetector(sysfs_root=sysfs, monitor_factory=lambda: FakeMonitor(lambda: None))
+
+        with mock.patch('time.monotonic', side_effect=[0, 1, 31]):
+            with pytest.raises(DeviceNotFoundError, match="did not reach GOOGLE mode within 30 seconds"):
+                detector.wait_for_mode_change(CoralMode.GOOGLE, timeout=30)
+
+    def test_wait_for_mode_change_polls_without_udev(self, sysfs):
+        """Test the sysfs polling fallback when netlink is unavailable."""
+        def no_udev():
+            raise OSError("netlink not permitted")
+
+        def plug_in(seconds):
+            _add_usb_device(sysfs, "3-1", "18d1:9302", "3", "4")
+
+        detector = SysfsCoralDetector(sysfs_root=sysfs, monitor_factory=no_udev)
+        with mock.patch('time.sleep', side_effect=plug_in) as mock_sleep:
+            device = detector.wait_for_mode_change(CoralMode.GOOGLE, timeout=5)
+
+        assert device.mode == CoralMode.GOOGLE
+        mock_sleep.assert_called_once_with(0.1)
+
+    def test_verify_device_accessible(self, tmp_path, coral_device_not_found):
+        """Test accessibility is checked on the device node without running ls."""
+        node = tmp_path / "004"
+        node.write_text("")
+        detector = SysfsCoralDetector(sysfs_root=tmp_path)
+
+        assert detector.verify_device_accessible(CoralDevice(CoralMode.GOOGLE, device_path=str(node))) is True
+        assert detector.verify_device_accessible(
+            CoralDevice(CoralMode.GOOGLE, device_path=str(tmp_path / "missing"))
+        ) is False
+        assert detector.verify_device_accessible(coral_device_not_found) is False
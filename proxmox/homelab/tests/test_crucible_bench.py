@@ -0,0 +1,91 @@
+"""Tests for crucible_bench module."""
+import json
+from dataclasses import replace
+
+import pytest
+
+from homelab.crucible_bench import (
+    PROFILES,
+    LatencyHistogram,
+    StorageBenchmark,
+    WorkloadProfile,
+    compare_results,
+    create_bench_api,
+    results_to_json,
+)
+
+
+@pytest.fixture
+def bench_api():
+    return create_bench_api(mock_latency_ms=0.0)
+
+
+class TestLatencyHistogram:
+    def test_percentiles_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for micros in range(1, 1001):
+            histogram.record(micros / 1e6)
+
+        assert histogram.count == 1000
+        assert histogram.percentile(50) == pytest.approx(500e-6, rel=0.06)
+        assert histogram.percentile(99) == pytest.approx(990e-6, rel=0.06)
+        assert histogram.percentile(99.9) <= histogram.max
+
+    def test_empty_histogram(self):
+        assert LatencyHistogram().to_dict()["p99_ms"] == 0.0
+
+
+class TestStorageBenchmark:
+    @pytest.mark.asyncio
+    async def test_random_mixed_workload(self, bench_api):
+        profile = WorkloadProfile(
+            "mixed", pattern="random", read_ratio=0.5, queue_depth=4,
+            working_set_bytes=1024**2, max_ops=200
+        )
+
+        result = await StorageBenchmark(bench_api).run(profile)
+
+        assert result.ops == 200
+        assert result.errors == 0
+        assert result.read_latency["count"] + result.write_latency["count"] == 200
+        assert 0 < result.read_latency["count"] < 200
+        assert result.bytes_read + result.bytes_written == 200 * 4096
+        assert result.iops > 0
+        assert result.backend["replication_factor"] == 3
+        assert await bench_api.disk_list() == []
+
+    @pytest.mark.asyncio
+    async def test_sequential_write_covers_working_set(self, bench_api):
+        profile = replace(PROFILES["write"], block_size=64 * 1024, working_set_bytes=2 * 1024**2, max_ops=32)
+
+        result = await StorageBenchmark(bench_api).run(profile)
+
+        assert result.bytes_written == 2 * 1024**2
+        assert result.read_latency["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_config_overrides_apply_to_backend(self):
+        api = create_bench_api(replication_factor=2, default_block_size=4096, mock_latency_ms=0.0)
+        profile = WorkloadProfile("randwrite", read_ratio=0.0, working_set_bytes=1024**2, max_ops=10)
+
+        result = await StorageBenchmark(api).run(profile)
+
+        assert result.backend["replication_factor"] == 2
+        assert result.backend["default_block_size"] == 4096
+
+    def test_invalid_profile_rejected(self):
+        with pytest.raises(ValueError, match="Invalid read ratio"):
+            WorkloadProfile("bad", read_ratio=1.5).validate()
+
+    @pytest.mark.asyncio
+    async def test_results_round_trip_and_compare(self, bench_api):
+        profile = WorkloadProfile("randread", working_set_bytes=1024**2, max_ops=50)
+        results = await StorageBenchmark(bench_api).run_suite([profile])
+
+        document = json.loads(json.dumps(results_to_json(results)))
+        faster = json.loads(json.dumps(document))
+        faster["results"][0]["iops"] = document["results"][0]["iops"] * 2
+
+        comparison = compare_results(document, faster)
+        assert comparison[0]["profile"] == "randread"
+        assert comparison[0]["iops_change_pct"] == pytest.approx(100.0)
@@ -0,0 +1,93 @@
+"""Tests for crucible_import module."""
+import hashlib
+import os
+
+import pytest
+
+from homelab.crucible_import import ParallelImageUploader, upload_image
+from homelab.oxide_storage_api import DiskCreate, DiskSource, DiskState, create_storage_api
+
+CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def storage_api(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRUCIBLE_MOCK_DATA_DIR", str(tmp_path / "regions"))
+    monkeypatch.setenv("CRUCIBLE_MOCK_LATENCY_MS", "0")
+    api = create_storage_api("import-client-test", enable_mocking=True)
+    yield api
+    api.storage_backend.close()
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "image.raw"
+    path.write_bytes(os.urandom(CHUNK * 10 + 512))
+    return path
+
+
+async def _import_disk(storage_api, name="upload-disk"):
+    return await storage_api.disk_create(DiskCreate(
+        name=name, description=None, size=1024**2, disk_source=DiskSource.IMPORTING_BLOCKS
+    ))
+
+
+class TestParallelImageUploader:
+    @pytest.mark.asyncio
+    async def test_parallel_upload_verifies_checksum(self, storage_api, image):
+        disk = await _import_disk(storage_api)
+        progress = []
+
+        uploader = ParallelImageUploader(storage_api, streams=4, chunk_size=CHUNK,
+                                         progress=lambda done, total: progress.append((done, total)))
+        result = await uploader.upload(disk["id"], image, create_snapshot=True)
+
+        assert result.bytes_uploaded == image.stat().st_size
+        assert result.chunks == 11
+        assert result.sha256 == hashlib.sha256(image.read_bytes()).hexdigest()
+        assert result.finalized["checksum_verified"] is True
+        assert result.finalized["disk"]["state"] == DiskState.DETACHED.value
+        assert progress[-1] == (image.stat().st_size, image.stat().st_size)
+
+        data = await storage_api.storage_backend.read_volume(disk["volume_id"], 0, image.stat().st_size)
+        assert data == image.read_bytes()
+
+    @pytest.mark.asyncio
+    async def test_resume_uploads_only_missing_ranges(self, storage_api, image):
+        disk = await _import_disk(storage_api)
+        content = image.read_bytes()
+
+        # An earlier run wrote chunks 0 and 3 before being interrupted
+        await storage_api.disk_bulk_write_import_start(disk["id"], expected_size=len(content))
+        await storage_api.disk_bulk_write_import(disk["id"], content[:CHUNK])
+        await storage_api.disk_bulk_write_import(disk["id"], content[3 * CHUNK:4 * CHUNK], offset=3 * CHUNK)
+        await storage_api.disk_bulk_write_import_stop(disk["id"])
+
+        result = await upload_image(storage_api, disk["id"], image, streams=2)
+
+        assert result.bytes_skipped == 2 * CHUNK
+        assert result.bytes_uploaded == len(content) - 2 * CHUNK
+        assert result.finalized["checksum_verified"] is True
+
+    @pytest.mark.asyncio
+    async def test_upload_without_finalize_leaves_import_open(self, storage_api, image):
+        disk = await _import_disk(storage_api)
+
+        await ParallelImageUploader(storage_api, chunk_size=CHUNK).upload(disk["id"], image, finalize=False)
+
+        status = await storage_api.disk_bulk_write_import_status(disk["id"])
+        assert status["complete"] is True
+        assert status["state"] == DiskState.IMPORTING_FROM_BULK_WRITES.value
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_image(self, storage_api, tmp_path):
+        disk = await _import_disk(storage_api)
+        big = tmp_path / "big.raw"
+        big.write_bytes(b"\0" * (1024**2 + 512))
+
+        with pytest.raises(ValueError, match="Image size"):
+            await upload_image(storage_api, disk["id"], big)
+
+    def test_invalid_stream_count(self, storage_api):
+        with pytest.raises(ValueError, match="Invalid stream count"):
+            ParallelImageUploader(storage_api, streams=0)
@@ -3,18 +3,23 @@ Comprehensive test suite for Crucible storage integration.
 Tests all components with both unit and integration scenarios.
 """
 
+import aiofiles
 import asyncio
 import json
 import pytest
+import pytest_asyncio
 import random
 import string
+import threading
+import time
 import uuid
 from typing import Dict, Any, List
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from homelab.crucible_config import CrucibleConfig, CrucibleStorageSled
-from homelab.crucible_mock import MockCrucibleManager
-from homelab.enhanced_vm_manager import CrucibleVMManager
+from homelab.crucible_mock import MockCrucibleManager, MockCrucibleSled
+from homelab.crucible_placement import RegionMove
+from homelab.enhanced_vm_manager import CrucibleVMManager, VMIDAllocator, VMSpec, VMTimeline, load_vm_specs
 from homelab.oxide_storage_api import (
     DiskCreate,
     DiskSource,
@@ -58,6 +63,20 @@ class TestCrucibleConfig:
         with pytest.raises(ValueError, match="Replication factor"):
             config_bad_replication.validate()
     
+    def test_write_quorum_defaults_to_majority(self):
+        """Write quorum should default to a majority and reject impossible values."""
+        config = CrucibleConfig()
+        assert config.effective_write_quorum(3) == 2
+        assert config.effective_write_quorum(1) == 1
+
+        config_bad_quorum = CrucibleConfig(
+            storage_sleds=[CrucibleStorageSled("192.168.4.200", "sled1")],
+            replication_factor=1,
+            write_quorum=2
+        )
+        with pytest.raises(ValueError, match="Write quorum"):
+            config_bad_quorum.validate()
+
     def test_config_serialization(self):
         """Test configuration serialization."""
         config = CrucibleConfig(storage_sleds=[
@@ -167,10 +186,565 @@ class TestMockCrucibleManager:
         assert status["offline_sleds"] == 0
 
 
+class TestDataBearingSled:
+    """Test the sparse, memory-mapped data mode of the mock sleds."""
+
+    @pytest.fixture
+    def data_manager(self, tmp_path):
+        """Create a data-bearing mock manager backed by tmp_path."""
+        config = CrucibleConfig(
+            storage_sleds=[
+                CrucibleStorageSled("192.168.4.200", "sled1"),
+                CrucibleStorageSled("192.168.4.201", "sled2"),
+                CrucibleStorageSled("192.168.4.202", "sled3")
+            ],
+            enable_mocking=True,
+            mock_latency_ms=0,
+            mock_data_dir=str(tmp_path)
+        )
+        manager = MockCrucibleManager(config)
+        yield manager
+        manager.close()
+
+    @pytest.mark.asyncio
+    async def test_written_bytes_round_trip(self, data_manager):
+        """Data written to a volume should be read back from every replica."""
+        volume_id = str(uuid.uuid4())
+        await data_manager.create_volume(volume_id, 16 * 1024**2)
+
+        payload = bytes(range(256)) * 16
+        await data_manager.write_volume(volume_id, 4096, payload)
+
+        assert await data_manager.read_volume(volume_id, 4096, len(payload)) == payload
+        assert await data_manager.read_volume(volume_id, 0, 512) == b"\x00" * 512
+        for replica in data_manager.volumes[volume_id]["replicas"]:
+            sled = data_manager.sleds[replica["sled_ip"]]
+            assert await sled.read_blocks(replica["region_id"], 4096, len(payload)) == payload
+
+    @pytest.mark.asyncio
+    async def test_read_into_caller_buffer(self, data_manager):
+        """read_blocks_into should fill a memoryview without returning bytes."""
+        volume_id = str(uuid.uuid4())
+        volume = await data_manager.create_volume(volume_id, 1024**2, replica_count=1)
+        replica = volume["replicas"][0]
+        sled = data_manager.sleds[replica["sled_ip"]]
+
+        await sled.write_blocks(replica["region_id"], 512, memoryview(b"A" * 1024))
+        buffer = bytearray(2048)
+        read = await sled.read_blocks_into(replica["region_id"], 0, memoryview(buffer))
+
+        assert read == 2048
+        assert buffer[:512] == b"\x00" * 512
+        assert buffer[512:1536] == b"A" * 1024
+
+    @pytest.mark.asyncio
+    async def test_capacity_tracks_allocated_blocks(self, data_manager):
+        """Used capacity should follow real allocation, not provisioned size."""
+        volume_id = str(uuid.uuid4())
+        volume = await data_manager.create_volume(volume_id, 1024**3, replica_count=1)
+        sled = data_manager.sleds[volume["replicas"][0]["sled_ip"]]
+
+        status = await sled.get_sled_status()
+        assert status["data_bearing"] is True
+        assert status["provisioned_bytes"] == 1024**3
+        assert status["used_capacity_bytes"] < 1024**2
+
+        await data_manager.write_volume(volume_id, 0, b"x" * 1024**2)
+        used = (await sled.get_sled_status())["used_capacity_bytes"]
+        assert 1024**2 <= used < 2 * 1024**2
+
+        await data_manager.delete_volume(volume_id)
+        assert (await sled.get_sled_status())["used_capacity_bytes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_out_of_range_io_rejected(self, data_manager):
+        """Writes past the end of a region should fail."""
+        volume_id = str(uuid.uuid4())
+        await data_manager.create_volume(volume_id, 4096)
+
+        with pytest.raises(RuntimeError, match="Write failed"):
+            await data_manager.write_volume(volume_id, 4000, b"x" * 512)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_and_clone_preserve_bytes(self, tmp_path, monkeypatch):
+        """Import, snapshot and clone through OxideStorageAPI with real bytes."""
+        monkeypatch.setenv("CRUCIBLE_MOCK_DATA_DIR", str(tmp_path))
+        storage_api = create_storage_api("data-test", enable_mocking=True)
+        backend = storage_api.storage_backend
+
+        disk = await storage_api.disk_create(DiskCreate(
+            name="data-import-disk",
+            description="Data-bearing import",
+            size=1024**2,
+            disk_source=DiskSource.IMPORTING_BLOCKS
+        ))
+        payload = b"crucible-block-data" * 100
+
+        import base64
+        await storage_api.disk_bulk_write_import_start(disk["id"])
+        await storage_api.disk_bulk_write_import(disk["id"], base64.b64encode(payload).decode())
+        finalized = await storage_api.disk_finalize_import(disk["id"], create_snapshot=True)
+
+        # Writes after the snapshot must not leak into the clone
+        await backend.write_volume(disk["volume_id"], 0, b"\xff" * 64)
+
+        clone = await storage_api.disk_create(DiskCreate(
+            name="data-clone-disk",
+            description="Clone of import snapshot",
+            size=1024**2,
+            disk_source=DiskSource.SNAPSHOT,
+            snapshot_id=finalized["snapshot"]["id"]
+        ))
+        clone_volume = backend.volumes[f"vol-{clone['id']}"]
+        assert await backend.read_volume(clone_volume["id"], 0, len(payload)) == payload
+        backend.close()
+
+    @pytest.mark.asyncio
+    async def test_streaming_import_sources(self, tmp_path, monkeypatch):
+        """Raw bytes, file objects and async iterators should all import without base64."""
+        monkeypatch.setenv("CRUCIBLE_MOCK_DATA_DIR", str(tmp_path / "regions"))
+        monkeypatch.setenv("CRUCIBLE_MOCK_LATENCY_MS", "0")
+        storage_api = create_storage_api("stream-test", enable_mocking=True)
+        backend = storage_api.storage_backend
+
+        disk = await storage_api.disk_create(DiskCreate(
+            name="stream-import-disk",
+            description="Streaming import",
+            size=4 * 1024**2,
+            disk_source=DiskSource.IMPORTING_BLOCKS
+        ))
+        disk_id = disk["id"]
+        await storage_api.disk_bulk_write_import_start(disk_id)
+
+        first = bytes([1]) * 1024**2
+        result = await storage_api.disk_bulk_write_import_stream(disk_id, first, chunk_size=64 * 1024)
+        assert result["bytes_written"] == 1024**2
+
+        image = tmp_path / "image.raw"
+        image.write_bytes(bytes([2]) * 1024**2)
+        with open(image, "rb") as f:
+            await storage_api.disk_bulk_write_import_stream(disk_id, f, offset=1024**2)
+
+        async def chunks():
+            for _ in range(4):
+                yield memoryview(bytes([3]) * 256 * 1024)
+
+        result = await storage_api.disk_bulk_write_import_stream(disk_id, chunks(), offset=2 * 1024**2)
+        assert result["covered_bytes"] == 3 * 1024**2
+
+        # aiofiles files have coroutine readinto/read methods
+        image.write_bytes(bytes([4]) * 512 * 1024)
+        async with aiofiles.open(image, "rb") as f:
+            result = await storage_api.disk_bulk_write_import_stream(disk_id, f, offset=3 * 1024**2)
+        assert result["bytes_written"] == 512 * 1024
+
+        session = storage_api._import_sessions[disk_id]
+        assert session["coverage"].to_list() == [(0, 3 * 1024**2 + 512 * 1024)]
+
+        volume_id = disk["volume_id"]
+        assert await backend.read_volume(volume_id, 1024**2 - 1, 2) == bytes([1, 2])
+        assert await backend.read_volume(volume_id, 3 * 1024**2 - 1, 2) == bytes([3, 4])
+        assert await backend.read_volume(volume_id, 3 * 1024**2 + 512 * 1024 - 1, 2) == bytes([4, 0])
+
+        with pytest.raises(ValueError, match="exceeds disk size"):
+            await storage_api.disk_bulk_write_import_stream(disk_id, b"x" * 1024, offset=4 * 1024**2)
+        with pytest.raises(ValueError, match="multiple of block size"):
+            await storage_api.disk_bulk_write_import_stream(disk_id, b"x", chunk_size=1000)
+        backend.close()
+
+    @pytest.mark.asyncio
+    async def test_write_read_throughput(self, data_manager):
+        """Sequential 1 MiB writes and reads should move real bytes quickly."""
+        volume_id = str(uuid.uuid4())
+        await data_manager.create_volume(volume_id, 32 * 1024**2)
+        chunk = memoryview(bytes(range(256)) * 4096)
+
+        start = time.perf_counter()
+        for i in range(32):
+            await data_manager.write_volume(volume_id, i * len(chunk), chunk)
+        for i in range(32):
+            assert await data_manager.read_volume(volume_id, i * len(chunk), len(chunk)) == chunk
+        elapsed = time.perf_counter() - start
+
+        throughput_mib = 64 / elapsed
+        assert throughput_mib > 10, f"Data-bearing mock throughput too low: {throughput_mib:.1f} MiB/s"
+
+
+class TestCopyOnWriteClones:
+    """Test copy-on-write snapshots and clones."""
+
+    @pytest.fixture(params=["metadata", "data"])
+    def cow_manager(self, request, tmp_path):
+        """Create a mock manager in metadata-only and data-bearing modes."""
+        config = CrucibleConfig(
+            storage_sleds=[
+                CrucibleStorageSled("192.168.4.200", "sled1"),
+                CrucibleStorageSled("192.168.4.201", "sled2"),
+                CrucibleStorageSled("192.168.4.202", "sled3")
+            ],
+            enable_mocking=True,
+            mock_latency_ms=0,
+            mock_data_dir=str(tmp_path) if request.param == "data" else None
+        )
+        manager = MockCrucibleManager(config)
+        yield manager
+        manager.close()
+
+    async def _used(self, manager):
+        return (await manager.get_cluster_status())["used_capacity_bytes"]
+
+    @pytest.mark.asyncio
+    async def test_clone_of_large_disk_is_instant_and_free(self, cow_manager):
+        """Cloning a 50GB boot disk should copy nothing and allocate nothing."""
+        size = 50 * 1024**3
+        await cow_manager.create_volume("boot", size)
+        await cow_manager.write_volume("boot", 0, b"k3s" * 4096)
+        used_before = await self._used(cow_manager)
+
+        start = time.perf_counter()
+        await cow_manager.create_snapshot("boot-snap", "boot")
+        clone = await cow_manager.create_volume_from_snapshot("clone", "boot-snap", size)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 1.0
+        assert await self._used(cow_manager) == used_before
+        assert clone["source_snapshot_id"] == "boot-snap"
+        assert {r["sled_ip"] for r in clone["replicas"]} == {
+            r["sled_ip"] for r in cow_manager.volumes["boot"]["replicas"]
+        }
+
+        usage = await cow_manager.get_volume_space_usage("clone")
+        assert usage["exclusive_bytes"] == 0
+        assert usage["shared_bytes"] == 3 * 4096
+
+    @pytest.mark.asyncio
+    async def test_writes_diverge_only_touched_blocks(self, cow_manager):
+        """A clone should own just the blocks it wrote, and not affect the snapshot."""
+        await cow_manager.create_volume("base", 1024**2)
+        await cow_manager.write_volume("base", 0, b"a" * 8192)
+        await cow_manager.create_snapshot("base-snap", "base")
+        await cow_manager.create_volume_from_snapshot("clone", "base-snap", 1024**2)
+
+        # Partial write inside the second block
+        block_size = cow_manager.sleds["192.168.4.200"].block_size
+        await cow_manager.write_volume("clone", block_size + 100, b"b" * 10)
+
+        usage = await cow_manager.get_volume_space_usage("clone")
+        assert usage["exclusive_bytes"] == block_size
+        assert usage["shared_bytes"] == 8192 - block_size
+
+        if cow_manager.sleds["192.168.4.200"].data_bearing:
+            block = await cow_manager.read_volume("clone", block_size, block_size)
+            assert block == b"a" * 100 + b"b" * 10 + b"a" * (block_size - 110)
+            assert await cow_manager.read_volume("base", block_size, block_size) == b"a" * block_size
+
+    @pytest.mark.asyncio
+    async def test_snapshot_isolated_from_later_writes(self, cow_manager):
+        """Writes to the source volume after a snapshot must not reach its clones."""
+        await cow_manager.create_volume("src", 1024**2)
+        await cow_manager.write_volume("src", 0, b"1" * 4096)
+        await cow_manager.create_snapshot("src-snap", "src")
+        await cow_manager.write_volume("src", 0, b"2" * 4096)
+        await cow_manager.create_volume_from_snapshot("clone", "src-snap", 1024**2)
+
+        source_usage = await cow_manager.get_volume_space_usage("src")
+        assert source_usage["exclusive_bytes"] == 4096
+        assert source_usage["shared_bytes"] == 0
+
+        if cow_manager.sleds["192.168.4.200"].data_bearing:
+            assert await cow_manager.read_volume("clone", 0, 4096) == b"1" * 4096
+            assert await cow_manager.read_volume("src", 0, 4096) == b"2" * 4096
+
+    @pytest.mark.asyncio
+    async def test_shared_blocks_freed_with_last_reference(self, cow_manager):
+        """Snapshot blocks should stay allocated until no clone references them."""
+        await cow_manager.create_volume("src", 1024**2)
+        await cow_manager.write_volume("src", 0, b"z" * 4096)
+        await cow_manager.create_snapshot("src-snap", "src")
+        await cow_manager.create_volume_from_snapshot("clone", "src-snap", 1024**2)
+
+        await cow_manager.delete_volume("src")
+        await cow_manager.delete_snapshot("src-snap")
+        assert await self._used(cow_manager) > 0
+
+        usage = await cow_manager.get_volume_space_usage("clone")
+        assert usage["shared_bytes"] == 4096
+        if cow_manager.sleds["192.168.4.200"].data_bearing:
+            assert await cow_manager.read_volume("clone", 0, 4096) == b"z" * 4096
+
+        await cow_manager.delete_volume("clone")
+        assert await self._used(cow_manager) == 0
+        for sled in cow_manager.sleds.values():
+            assert (await sled.get_sled_status())["layer_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_clone_falls_back_to_copy_when_sled_offline(self, cow_manager):
+        """Replicas that cannot share blocks should be copied to another sled."""
+        await cow_manager.create_volume("src", 1024**2, replica_count=2)
+        await cow_manager.write_volume("src", 0, b"q" * 4096)
+        await cow_manager.create_snapshot("src-snap", "src")
+
+        offline = cow_manager.volumes["src"]["replicas"][0]["sled_ip"]
+        await cow_manager.simulate_sled_failure(offline)
+        clone = await cow_manager.create_volume_from_snapshot("clone", "src-snap", 1024**2, replica_count=2)
+
+        assert offline not in {r["sled_ip"] for r in clone["replicas"]}
+        usage = await cow_manager.get_volume_space_usage("clone")
+        assert sorted(r["exclusive_bytes"] for r in usage["replicas"].values()) == [0, 4096]
+
+
+class TestQuorumReplication:
+    """Test quorum writes, hedged reads and replica repair."""
+
+    @pytest.fixture
+    def quorum_manager(self, tmp_path):
+        """Create a data-bearing manager with small, realistic latency."""
+        config = CrucibleConfig(
+            storage_sleds=[
+                CrucibleStorageSled("192.168.4.200", "sled1"),
+                CrucibleStorageSled("192.168.4.201", "sled2"),
+                CrucibleStorageSled("192.168.4.202", "sled3")
+            ],
+            enable_mocking=True,
+            mock_latency_ms=2,
+            mock_data_dir=str(tmp_path)
+        )
+        manager = MockCrucibleManager(config)
+        yield manager
+        manager.close()
+
+    @pytest.mark.asyncio
+    async def test_write_succeeds_with_quorum_and_repairs(self, quorum_manager):
+        """A write with one sled down should succeed and be repaired on recovery."""
+        await quorum_manager.create_volume("vol", 1024**2)
+        failed_ip = "192.168.4.200"
+        await quorum_manager.simulate_sled_failure(failed_ip)
+
+        await quorum_manager.write_volume("vol", 0, b"q" * 4096)
+        await quorum_manager.wait_for_background_io()
+
+        status = await quorum_manager.get_cluster_status()
+        assert status["stale_replicas"] == 1
+        assert status["io_stats"]["degraded_writes"] == 1
+        assert await quorum_manager.read_volume("vol", 0, 4096) == b"q" * 4096
+
+        await quorum_manager.simulate_sled_recovery(failed_ip)
+        await quorum_manager.wait_for_background_io()
+
+        status = await quorum_manager.get_cluster_status()
+        assert status["stale_replicas"] == 0
+        assert status["io_stats"]["repaired_bytes"] == 4096
+        region_id = f"vol-replica-{failed_ip.split('.')[-1]}"
+        assert await quorum_manager.sleds[failed_ip].read_blocks(region_id, 0, 4096) == b"q" * 4096
+
+    @pytest.mark.asyncio
+    async def test_write_fails_without_quorum(self, quorum_manager):
+        """Losing a majority of replicas should fail the write."""
+        await quorum_manager.create_volume("vol", 1024**2)
+        await quorum_manager.simulate_sled_failure("192.168.4.200")
+        await quorum_manager.simulate_sled_failure("192.168.4.201")
+
+        with pytest.raises(RuntimeError, match="quorum 2"):
+            await quorum_manager.write_volume("vol", 0, b"x" * 512)
+
+    @pytest.mark.asyncio
+    async def test_write_does_not_wait_for_slow_replica(self, quorum_manager):
+        """Quorum writes should return before a straggler replica finishes."""
+        await quorum_manager.create_volume("vol", 1024**2)
+        await quorum_manager.simulate_sled_slowdown("192.168.4.202", 300)
+
+        start = time.perf_counter()
+        await quorum_manager.write_volume("vol", 0, b"s" * 512)
+        assert time.perf_counter() - start < 0.2
+
+        # The straggler's range is in flight, so reads go to current replicas
+        assert await quorum_manager.read_volume("vol", 0, 512) == b"s" * 512
+        await quorum_manager.wait_for_background_io()
+        assert (await quorum_manager.get_cluster_status())["stale_replicas"] == 0
+
+    @pytest.mark.asyncio
+    async def test_read_racing_write_waits_for_first_ack(self, quorum_manager):
+        """A read overlapping a write on every replica should return, not fail."""
+        await quorum_manager.create_volume("vol", 1024**2)
+
+        write = asyncio.ensure_future(quorum_manager.write_volume("vol", 0, b"r" * 4096))
+        await asyncio.sleep(0)  # Write is now in flight on all three replicas
+        assert await quorum_manager.read_volume("vol", 0, 4096) == b"r" * 4096
+        await write
+
+    @pytest.mark.asyncio
+    async def test_snapshot_repairs_or_skips_stale_replicas(self, quorum_manager):
+        """Snapshots should never freeze a replica that missed a write."""
+        await quorum_manager.create_volume("vol", 1024**2)
+        failed_ip = "192.168.4.200"
+        await quorum_manager.simulate_sled_failure(failed_ip)
+        await quorum_manager.write_volume("vol", 0, b"n" * 4096)
+        await quorum_manager.wait_for_background_io()
+
+        # Still offline: the stale replica is left out
+        snapshot = await quorum_manager.create_snapshot("snap-down", "vol")
+        assert failed_ip not in [r["sled_ip"] for r in snapshot["replicas"]]
+
+        # Back online but not yet repaired: repaired before it is frozen
+        quorum_manager.sleds[failed_ip].set_online(True)
+        snapshot = await quorum_manager.create_snapshot("snap-up", "vol")
+        frozen = {r["sled_ip"]: r["region_id"] for r in snapshot["replicas"]}
+        assert failed_ip in frozen
+        assert await quorum_manager.sleds[failed_ip].read_blocks(frozen[failed_ip], 0, 4096) == b"n" * 4096
+
+    @pytest.mark.asyncio
+    async def test_hedged_reads_bound_tail_latency(self, quorum_manager):
+        """A slow or failed sled should barely move read tail latency."""
+        await quorum_manager.create_volume("vol", 1024**2)
+        await quorum_manager.write_volume("vol", 0, b"h" * 4096)
+        await quorum_manager.wait_for_background_io()
+
+        async def read_p95():
+            latencies = []
+            for _ in range(40):
+                start = time.perf_counter()
+                assert await quorum_manager.read_volume("vol", 0, 4096) == b"h" * 4096
+                latencies.append(time.perf_counter() - start)
+            return sorted(latencies)[int(len(latencies) * 0.95)]
+
+        baseline = await read_p95()
+
+        await quorum_manager.simulate_sled_slowdown("192.168.4.200", 200)
+        assert await read_p95() < baseline + 0.05
+
+        await quorum_manager.simulate_sled_slowdown("192.168.4.200", 0)
+        await quorum_manager.simulate_sled_failure("192.168.4.201")
+        assert await read_p95() < baseline + 0.05
+
+        status = await quorum_manager.get_cluster_status()
+        assert status["sled_latency"]["192.168.4.200"]["samples"] > 0
+
+
+class TestReplicaPlacement:
+    """Test capacity- and load-aware placement in MockCrucibleManager."""
+
+    @pytest.fixture
+    def placement_manager(self, tmp_path):
+        """Create a data-bearing manager with four sleds, two on one host."""
+        config = CrucibleConfig(
+            storage_sleds=[
+                CrucibleStorageSled("192.168.4.200", "ma90-1"),
+                CrucibleStorageSled("192.168.4.201", "ma90-2"),
+                CrucibleStorageSled("192.168.4.202", "ma90-3"),
+                CrucibleStorageSled("192.168.4.203", "ma90-3")
+            ],
+            enable_mocking=True,
+            mock_latency_ms=0,
+            replication_factor=2,
+            mock_data_dir=str(tmp_path)
+        )
+        manager = MockCrucibleManager(config)
+        yield manager
+        manager.close()
+
+    @pytest.mark.asyncio
+    async def test_volumes_spread_evenly(self, placement_manager):
+        """Piling up volumes should not hotspot any sled or failure domain."""
+        for i in range(8):
+            volume = await placement_manager.create_volume(f"vol-{i}", 1024**2)
+            domains = {placement_manager.sleds[r["sled_ip"]].config.domain for r in volume["replicas"]}
+            assert len(domains) == 2
+            assert len(volume["placement"]) == 2
+            assert "score" in volume["placement"][0]
+
+        counts = [len(sled.regions) for sled in placement_manager.sleds.values()]
+        assert max(counts) - min(counts) <= 2
+
+    @pytest.mark.asyncio
+    async def test_ports_are_balanced(self, placement_manager):
+        """Regions on a sled should be spread across its downstairs ports."""
+        sled = placement_manager.sleds["192.168.4.200"]
+        ports = [(await sled.create_region(f"r{i}", 4096))["port"] for i in range(3)]
+        assert sorted(ports) == sorted(sled.config.ports)
+
+    @pytest.mark.asyncio
+    async def test_rebalance_moves_replicas_and_keeps_data(self, placement_manager):
+        """Rebalancing should relieve a hot sled without losing bytes."""
+        hot = placement_manager.sleds["192.168.4.200"]
+        cold = placement_manager.sleds["192.168.4.201"]
+        for i in range(6):
+            await hot.create_region(f"vol-{i}-replica-200", 1024**2)
+            await cold.create_region(f"vol-{i}-replica-201", 1024**2)
+            placement_manager.volumes[f"vol-{i}"] = {
+                "id": f"vol-{i}",
+                "size_bytes": 1024**2,
+                "replicas": [
+                    {"sled_ip": "192.168.4.200", "region_id": f"vol-{i}-replica-200", "port": 8001},
+                    {"sled_ip": "192.168.4.201", "region_id": f"vol-{i}-replica-201", "port": 8001}
+                ]
+            }
+            await placement_manager.write_volume(f"vol-{i}", 0, bytes([i]) * 512)
+        await placement_manager.wait_for_background_io()
+
+        moves = await placement_manager.rebalance(threshold=0.5)
+
+        assert moves
+        assert all(move.source_ip in ("192.168.4.200", "192.168.4.201") for move in moves)
+        assert all(move.target_ip in ("192.168.4.202", "192.168.4.203") for move in moves)
+        for i in range(6):
+            replicas = placement_manager.volumes[f"vol-{i}"]["replicas"]
+            assert len({r["sled_ip"] for r in replicas}) == 2
+            for replica in replicas:
+                sled = placement_manager.sleds[replica["sled_ip"]]
+                assert await sled.read_blocks(replica["region_id"], 0, 512) == bytes([i]) * 512
+
+        status = await placement_manager.get_cluster_status()
+        assert status["placement_imbalance"] <= 0.5 + 1 / 3
+
+    @pytest.mark.asyncio
+    async def test_rebalance_revalidates_moves_and_blocks_writes(self, placement_manager):
+        """Stale planned moves are skipped, and writes wait for an in-progress copy."""
+        hot = placement_manager.sleds["192.168.4.200"]
+        for i in range(2):
+            await hot.create_region(f"vol-{i}-replica-200", 1024**2)
+            placement_manager.volumes[f"vol-{i}"] = {
+                "id": f"vol-{i}",
+                "size_bytes": 1024**2,
+                "replicas": [{"sled_ip": "192.168.4.200", "region_id": f"vol-{i}-replica-200", "port": 8001}]
+            }
+        planned = [
+            RegionMove("vol-0", "vol-0-replica-200", "192.168.4.200", "192.168.4.201", 0, "test"),
+            RegionMove("vol-1", "vol-1-replica-200", "192.168.4.200", "192.168.4.202", 0, "test"),
+        ]
+        await placement_manager.simulate_sled_failure("192.168.4.202")
+
+        copying = threading.Event()
+        release = threading.Event()
+        copy_region_to = MockCrucibleSled.copy_region_to
+
+        def slow_copy(sled, *args, **kwargs):
+            copying.set()
+            release.wait(5)
+            return copy_region_to(sled, *args, **kwargs)
+
+        with patch.object(placement_manager, "plan_rebalance", return_value=planned), \
+                patch.object(MockCrucibleSled, "copy_region_to", slow_copy):
+            rebalance = asyncio.ensure_future(placement_manager.rebalance())
+            await asyncio.to_thread(copying.wait, 5)
+
+            # The loop stays free while copying; the write waits for the swap
+            write = asyncio.ensure_future(placement_manager.write_volume("vol-0", 0, b"w" * 512))
+            await asyncio.sleep(0.01)
+            assert not write.done()
+            release.set()
+            moves = await rebalance
+            await write
+
+        assert [m.volume_id for m in moves] == ["vol-0"]
+        assert placement_manager.volumes["vol-0"]["replicas"][0]["sled_ip"] == "192.168.4.201"
+        assert placement_manager.volumes["vol-1"]["replicas"][0]["sled_ip"] == "192.168.4.200"
+        assert await placement_manager.read_volume("vol-0", 0, 512) == b"w" * 512
+
+
 class TestOxideStorageAPI:
     """Test Oxide-style storage API."""
     
-    @pytest.fixture
+    @pytest_asyncio.fixture
     async def storage_api(self):
         """Create storage API with mocking enabled."""
         return create_storage_api("test-project", enable_mocking=True)
@@ -324,11 +898,237 @@ class TestOxideStorageAPI:
         assert "total_sleds" in cluster_status
         assert "online_sleds" in cluster_status
 
+    @pytest.mark.asyncio
+    async def test_import_resume_and_coverage_checks(self, storage_api):
+        """Stopped imports keep their coverage; finalize refuses gaps and bad checksums."""
+        disk = await storage_api.disk_create(DiskCreate(
+            name=f"resume-disk-{self._random_suffix()}",
+            description=None,
+            size=1024**2,
+            disk_source=DiskSource.IMPORTING_BLOCKS
+        ))
+        disk_id = disk["id"]
+
+        await storage_api.disk_bulk_write_import_start(disk_id, expected_size=8192)
+        # Out-of-order chunks from two writers
+        await asyncio.gather(
+            storage_api.disk_bulk_write_import(disk_id, b"\x02" * 2048, offset=6144),
+            storage_api.disk_bulk_write_import(disk_id, b"\x01" * 2048, offset=0),
+        )
+        await storage_api.disk_bulk_write_import_stop(disk_id)
+
+        resumed = await storage_api.disk_bulk_write_import_start(disk_id)
+        assert resumed["status"] == "import_resumed"
+        assert resumed["covered_bytes"] == 4096
+
+        status = await storage_api.disk_bulk_write_import_status(disk_id)
+        assert status["missing"] == [[2048, 6144]]
+
+        with pytest.raises(ValueError, match="Import incomplete: 4096 bytes missing"):
+            await storage_api.disk_finalize_import(disk_id)
+        assert (await storage_api.disk_view(disk_id))["state"] == DiskState.IMPORTING_FROM_BULK_WRITES.value
+
+        await storage_api.disk_bulk_write_import(disk_id, b"\x00" * 4096, offset=2048)
+        assert (await storage_api.disk_bulk_write_import_status(disk_id))["complete"] is True
+
+        finalized = await storage_api.disk_finalize_import(disk_id, expected_sha256="0" * 64)
+        # The metadata-only mock has no bytes to hash
+        assert finalized["checksum_verified"] is False
+
+        await storage_api.disk_delete(disk_id)
+
+    @pytest.mark.asyncio
+    async def test_import_checksum_mismatch(self, tmp_path, monkeypatch):
+        """A wrong checksum leaves the import open."""
+        monkeypatch.setenv("CRUCIBLE_MOCK_DATA_DIR", str(tmp_path))
+        storage_api = create_storage_api("checksum-test", enable_mocking=True)
+        disk = await storage_api.disk_create(DiskCreate(
+            name="checksum-disk", description=None, size=1024**2, disk_source=DiskSource.IMPORTING_BLOCKS
+        ))
+
+        await storage_api.disk_bulk_write_import_start(disk["id"], expected_size=4096)
+        await storage_api.disk_bulk_write_import(disk["id"], b"\x07" * 4096)
+
+        with pytest.raises(ValueError, match="checksum mismatch"):
+            await storage_api.disk_finalize_import(disk["id"], expected_sha256="0" * 64)
+
+        import hashlib
+        finalized = await storage_api.disk_finalize_import(
+            disk["id"], expected_sha256=hashlib.sha256(b"\x07" * 4096).hexdigest()
+        )
+        assert finalized["checksum_verified"] is True
+        storage_api.storage_backend.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_list_pages(self, storage_api):
+        """Disk listing pages through the metadata store in creation order."""
+        names = [f"page-disk-{i}-{self._random_suffix()}" for i in range(5)]
+        for name in names:
+            await storage_api.disk_create(DiskCreate(
+                name=name, description=None, size=1024**2, disk_source=DiskSource.BLANK
+            ))
+
+        first = await storage_api.disk_list_page(limit=2)
+        second = await storage_api.disk_list_page(limit=2, page_token=first["next_page"])
+        third = await storage_api.disk_list_page(limit=2, page_token=second["next_page"])
+
+        listed = [d["name"] for page in (first, second, third) for d in page["items"]]
+        assert listed == names
+        assert third["next_page"] is None
+
+        with pytest.raises(ValueError, match="already exists"):
+            await storage_api.disk_create(DiskCreate(
+                name=names[0], description=None, size=1024**2, disk_source=DiskSource.BLANK
+            ))
+
+    @pytest.mark.asyncio
+    async def test_metadata_survives_restart(self, tmp_path, monkeypatch):
+        """Disks, snapshots, attachments and import progress are reloaded from disk."""
+        monkeypatch.setenv("CRUCIBLE_METADATA_PATH", str(tmp_path / "crucible.db"))
+        api = create_storage_api("test-project", enable_mocking=True)
+
+        attached = await api.disk_create(DiskCreate(
+            name="boot", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        await api.disk_attach(attached["id"], "101")
+        snapshot = await api.snapshot_create(SnapshotCreate(name="boot-snap", description=None, disk=attached["id"]))
+        importing = await api.disk_create(DiskCreate(
+            name="image", description=None, size=1024**2, disk_source=DiskSource.IMPORTING_BLOCKS
+        ))
+        await api.disk_bulk_write_import_start(importing["id"])
+        await api.disk_bulk_write_import(importing["id"], b"\x01" * 4096, offset=8192)
+
+        # Restart the API process with a fresh (empty) mock backend
+        restarted = create_storage_api("test-project", enable_mocking=True)
+
+        attached_disks = await restarted.disk_list(attached_vm_id="101")
+        assert [d["name"] for d in attached_disks] == ["boot"]
+        assert attached_disks[0]["state"] == DiskState.ATTACHED.value
+        assert attached_disks[0]["volume_id"] in restarted.storage_backend.volumes
+        restored = await restarted.snapshot_view(snapshot["id"])
+        assert (restored["name"], restored["state"]) == ("boot-snap", "ready")
+        assert snapshot["id"] in restarted.storage_backend.snapshots
+
+        session = restarted._import_sessions[importing["id"]]
+        assert session["bytes_imported"] == 4096
+        assert session["coverage"].contains(8192, 8192 + 4096)
+
+        status = await restarted.get_system_status()
+        assert status["total_disks"] == 2
+        assert status["active_import_sessions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_interrupted_disks_faulted_on_restart(self, tmp_path, monkeypatch):
+        """Disks left mid-operation become faulted; the mock backend's volumes are re-created."""
+        monkeypatch.setenv("CRUCIBLE_METADATA_PATH", str(tmp_path / "crucible.db"))
+        api = create_storage_api("test-project", enable_mocking=True)
+
+        healthy = await api.disk_create(DiskCreate(
+            name="healthy", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        stuck = await api.disk_create(DiskCreate(
+            name="stuck", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        api._disks[stuck["id"]].state = DiskState.ATTACHING
+        api._disks.save(stuck["id"])
+
+        restarted = create_storage_api("test-project", enable_mocking=True)
+
+        states = {d["name"]: d["state"] for d in await restarted.disk_list()}
+        assert states == {
+            "healthy": DiskState.DETACHED.value,
+            "stuck": DiskState.FAULTED.value,
+        }
+        assert (await restarted.disk_list(state=DiskState.FAULTED))[0]["id"] == stuck["id"]
+        assert healthy["id"] in {d["id"] for d in await restarted.disk_list(state=DiskState.DETACHED)}
+
+        # Faulted disks can still be cleaned up against the restarted backend
+        await restarted.disk_delete(stuck["id"])
+        assert [d["name"] for d in await restarted.disk_list()] == ["healthy"]
+
+    @pytest.mark.asyncio
+    async def test_missing_volume_faulted_on_persistent_backend(self, tmp_path, monkeypatch):
+        """A persistent backend that lost a disk's volume faults the disk."""
+        monkeypatch.setenv("CRUCIBLE_METADATA_PATH", str(tmp_path / "crucible.db"))
+        api = create_storage_api("test-project", enable_mocking=True)
+        # Sleds that keep running across the restart, as a real deployment would
+        backend = api.storage_backend
+        backend.persistent = True
+
+        healthy = await api.disk_create(DiskCreate(
+            name="healthy", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        orphan = await api.disk_create(DiskCreate(
+            name="orphan", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        await backend.delete_volume(orphan["volume_id"])
+
+        restarted = create_storage_api("test-project", enable_mocking=True)
+        restarted.storage_backend = backend
+
+        states = {d["name"]: d["state"] for d in await restarted.disk_list()}
+        assert states == {"healthy": DiskState.DETACHED.value, "orphan": DiskState.FAULTED.value}
+        assert orphan["volume_id"] not in backend.volumes
+        assert healthy["volume_id"] in backend.volumes
+
+    @pytest.mark.asyncio
+    async def test_data_bearing_disk_survives_restart(self, tmp_path, monkeypatch):
+        """Data-bearing sleds reopen region files, so a finalized disk keeps its bytes."""
+        monkeypatch.setenv("CRUCIBLE_METADATA_PATH", str(tmp_path / "crucible.db"))
+        monkeypatch.setenv("CRUCIBLE_MOCK_DATA_DIR", str(tmp_path / "sleds"))
+        api = create_storage_api("test-project", enable_mocking=True)
+        disk = await api.disk_create(DiskCreate(
+            name="image", description=None, size=1024**2, disk_source=DiskSource.IMPORTING_BLOCKS
+        ))
+        await api.disk_bulk_write_import_start(disk["id"], expected_size=8192)
+        await api.disk_bulk_write_import(disk["id"], b"\xab" * 8192)
+        await api.disk_finalize_import(disk["id"])
+        await api.storage_backend.wait_for_background_io()
+        api.storage_backend.close()
+
+        restarted = create_storage_api("test-project", enable_mocking=True)
+
+        restored = await restarted.disk_view(disk["id"])
+        assert restored["state"] == DiskState.DETACHED.value
+        assert await restarted.storage_backend.read_volume(disk["volume_id"], 0, 8192) == b"\xab" * 8192
+        assert await restarted.storage_backend.read_volume(disk["volume_id"], 8192, 512) == bytes(512)
+        restarted.storage_backend.close()
+
+    @pytest.mark.asyncio
+    async def test_data_bearing_disk_faulted_when_bytes_lost(self, tmp_path, monkeypatch):
+        """Disks whose data cannot be trusted after a restart are faulted, never zeroed."""
+        monkeypatch.setenv("CRUCIBLE_METADATA_PATH", str(tmp_path / "crucible.db"))
+        monkeypatch.setenv("CRUCIBLE_MOCK_DATA_DIR", str(tmp_path / "sleds"))
+        api = create_storage_api("test-project", enable_mocking=True)
+        lost = await api.disk_create(DiskCreate(
+            name="lost", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        layered = await api.disk_create(DiskCreate(
+            name="layered", description=None, size=1024**2, disk_source=DiskSource.BLANK
+        ))
+        await api.storage_backend.write_volume(layered["volume_id"], 0, b"\x01" * 4096)
+        snapshot = await api.snapshot_create(SnapshotCreate(name="layered-snap", description=None, disk=layered["id"]))
+        await api.storage_backend.write_volume(layered["volume_id"], 0, b"\x02" * 4096)
+        await api.storage_backend.wait_for_background_io()
+        api.storage_backend.close()
+        region = next((tmp_path / "sleds").rglob(f"{lost['volume_id']}-replica-*.img"))
+        region.unlink()
+
+        restarted = create_storage_api("test-project", enable_mocking=True)
+
+        states = {d["name"]: d["state"] for d in await restarted.disk_list()}
+        assert states == {"lost": DiskState.FAULTED.value, "layered": DiskState.FAULTED.value}
+        assert (await restarted.snapshot_view(snapshot["id"]))["state"] == "failed"
+        assert not restarted.storage_backend.volumes
+        # Refused replicas keep their files for inspection
+        assert list((tmp_path / "sleds").rglob(f"{layered['volume_id']}-replica-*"))
+        restarted.storage_backend.close()
+
 
 class TestCrucibleVMManager:
     """Test enhanced VM manager with Crucible integration."""
     
-    @pytest.fixture
+    @pytest_asyncio.fixture
     async def vm_manager(self):
         """Create VM manager with mocking enabled."""
         return CrucibleVMManager("test-project", enable_mocking=True)
@@ -373,6 +1173,21 @@ class TestCrucibleVMManager:
             disk_info = result["disk"]
             assert disk_info["size"] == 20 * 1024**3  # GB to bytes
             assert disk_info["state"] == DiskState.ATTACHED.value
+
+    @pytest.mark.asyncio
+    async def test_crucible_storage_config_runs_off_event_loop(self, vm_manager, mock_proxmox_client):
+        """The blocking Proxmox config call runs in a worker thread."""
+        disk = await vm_manager.storage_api.disk_create(DiskCreate(
+            name="config-disk", description=None, size=1024**3, disk_source=DiskSource.BLANK
+        ))
+        config = mock_proxmox_client.proxmox.nodes.return_value.qemu.return_value.config
+        threads = []
+        config.post.side_effect = lambda **kwargs: threads.append(threading.get_ident())
+
+        await vm_manager._configure_vm_crucible_storage(mock_proxmox_client.proxmox, "test-node", 101, disk["id"])
+
+        assert config.post.call_args.kwargs["scsi0"] == f"crucible:{disk['id']},size=1G"
+        assert threads and threads[0] != threading.get_ident()
     
     async def test_vm_cloning_from_snapshot(self, vm_manager, mock_proxmox_client):
         """Test VM cloning from storage snapshot."""
@@ -475,6 +1290,99 @@ class TestCrucibleVMManager:
             for name in vm_names:
                 assert name in listed_names
     
+    @pytest.mark.asyncio
+    async def test_batch_vm_creation(self, vm_manager, mock_proxmox_client):
+        """Batch creation runs VMs concurrently with unique VMIDs and per-VM timelines."""
+        mock_proxmox_client.proxmox.nodes.return_value.qemu.get.return_value = [{"vmid": 200}]
+        specs = VMSpec(name="fleet", node="test-node", disk_size_gb=1).numbered(6)
+
+        with patch('homelab.enhanced_vm_manager.ProxmoxClient', return_value=mock_proxmox_client):
+            result = await vm_manager.create_vms_with_storage(specs, max_parallel=3)
+
+        assert result["status"] == "success"
+        assert result["created"] == 6
+        assert [vm["name"] for vm in result["vms"]] == [f"fleet-0{i}" for i in range(1, 7)]
+        vmids = sorted(vm["vm"]["vmid"] for vm in result["vms"])
+        assert vmids == list(range(201, 207))
+
+        steps = [step["step"] for step in result["vms"][0]["timeline"]]
+        assert steps == ["queued", "disk_create", "proxmox_connect", "vmid_reserve",
+                         "vm_shell", "disk_attach", "configure"]
+        # VMIDs were looked up once for the whole batch
+        assert mock_proxmox_client.proxmox.nodes.get.call_count == 1
+        assert len(await vm_manager.storage_api.disk_list(attached_vm_id="201")) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_vm_creation_rolls_back_failures(self, vm_manager, mock_proxmox_client):
+        """A failing VM is cleaned up; rollback_all removes the rest of the batch too."""
+        qemu = mock_proxmox_client.proxmox.nodes.return_value.qemu
+
+        def create_shell(**kwargs):
+            if kwargs["name"] == "batch-02":
+                raise RuntimeError("storage locked")
+        qemu.create.side_effect = create_shell
+        specs = VMSpec(name="batch", node="test-node", disk_size_gb=1).numbered(3)
+
+        with patch('homelab.enhanced_vm_manager.ProxmoxClient', return_value=mock_proxmox_client):
+            partial = await vm_manager.create_vms_with_storage(specs)
+
+            assert partial["status"] == "partial"
+            failed = next(vm for vm in partial["vms"] if vm["status"] == "failed")
+            assert failed["name"] == "batch-02"
+            assert "storage locked" in failed["error"]
+            assert failed["timeline"][-1]["step"] == "rollback"
+            assert {d["name"] for d in await vm_manager.storage_api.disk_list()} == {
+                "batch-01-boot-disk", "batch-03-boot-disk"
+            }
+
+            for name in ("batch-01", "batch-03"):
+                await vm_manager.delete_vm_with_storage(name)
+
+            rolled_back = await vm_manager.create_vms_with_storage(specs, rollback_all_on_failure=True)
+
+        assert rolled_back["status"] == "failed"
+        assert {vm["status"] for vm in rolled_back["vms"]} == {"rolled_back", "failed"}
+        assert await vm_manager.storage_api.disk_list() == []
+        assert len(vm_manager.vm_configs) == 0
+
+    @pytest.mark.asyncio
+    async def test_rollback_continues_past_failed_cleanup_step(self, vm_manager, mock_proxmox_client):
+        """A failing detach does not stop the shell, VMID and disk from being cleaned up."""
+        qemu = mock_proxmox_client.proxmox.nodes.return_value.qemu
+        storage_api = vm_manager.storage_api
+        storage_api.config.proxmox_integration = True
+        allocator = VMIDAllocator()
+        spec = VMSpec(name="rollback", node="test-node", disk_size_gb=1)
+
+        with patch('homelab.enhanced_vm_manager.ProxmoxClient', return_value=mock_proxmox_client), \
+                patch.object(vm_manager, "_configure_vm_crucible_storage",
+                             AsyncMock(side_effect=RuntimeError("config locked"))), \
+                patch.object(storage_api, "_detach_from_proxmox_vm", AsyncMock(side_effect=RuntimeError("timed out"))):
+            with pytest.raises(RuntimeError, match="config locked"):
+                await vm_manager._provision_vm(spec, allocator, VMTimeline())
+
+        qemu.return_value.delete.assert_called_once()
+        assert allocator._used == set()
+        assert await storage_api.disk_list() == []
+
+    def test_vm_spec_file(self, tmp_path):
+        """Spec files expand counts and apply defaults."""
+        spec_file = tmp_path / "fleet.yaml"
+        spec_file.write_text(
+            "defaults:\n  node: pve\n  memory_mb: 1024\n"
+            "vms:\n  - name: web\n    count: 2\n  - name: db\n    node: still-fawn\n    disk_size_gb: 100\n"
+        )
+
+        specs = load_vm_specs(spec_file)
+
+        assert [(s.name, s.node) for s in specs] == [("web-01", "pve"), ("web-02", "pve"), ("db", "still-fawn")]
+        assert specs[2].memory_mb == 1024
+        assert specs[2].disk_size_gb == 100
+
+        spec_file.write_text("- name: x\n  node: pve\n  color: red\n")
+        with pytest.raises(ValueError, match="Unknown VM spec fields: color"):
+            load_vm_specs(spec_file)
+
     async def test_storage_cluster_status(self, vm_manager):
         """Test storage cluster status reporting."""
         status = await vm_manager.get_storage_cluster_status()
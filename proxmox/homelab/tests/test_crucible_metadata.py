@@ -0,0 +1,95 @@
+"""Tests for crucible_metadata module."""
+import pytest
+
+from homelab.crucible_metadata import MetadataStore, StoreBackedDict
+
+
+def _put(store, record_id, created, name=None, state="ok", owner=None, project_id="p"):
+    store.put("disk", record_id, {"id": record_id, "name": name or record_id}, project_id,
+              name=name or record_id, state=state, owner=owner, created=created)
+
+
+class TestMetadataStore:
+    def test_put_get_delete(self):
+        store = MetadataStore()
+        _put(store, "d1", "2026-01-01")
+
+        assert store.get("disk", "d1") == {"id": "d1", "name": "d1"}
+        assert store.delete("disk", "d1") is True
+        assert store.get("disk", "d1") is None
+        assert store.delete("disk", "d1") is False
+
+    def test_indexed_lookups(self):
+        store = MetadataStore()
+        _put(store, "d1", "1", state="attached", owner="vm-100")
+        _put(store, "d2", "2", state="detached")
+        _put(store, "d3", "3", state="attached", owner="vm-100", project_id="other")
+
+        assert [r["id"] for r in store.find("disk", "p", state="attached")[0]] == ["d1"]
+        assert [r["id"] for r in store.find("disk", owner="vm-100")[0]] == ["d1", "d3"]
+        assert [r["id"] for r in store.find("disk", "p", name="d2")[0]] == ["d2"]
+        assert store.count("disk", "p") == 2
+
+    def test_keyset_pagination(self):
+        store = MetadataStore()
+        for i in range(5):
+            _put(store, f"d{i}", f"2026-01-0{i + 1}")
+
+        seen, token, pages = [], None, 0
+        while True:
+            records, token = store.find("disk", "p", limit=2, page_token=token)
+            seen.extend(r["id"] for r in records)
+            pages += 1
+            if not token:
+                break
+
+        assert seen == [f"d{i}" for i in range(5)]
+        assert pages == 3
+
+    def test_invalid_page_token(self):
+        with pytest.raises(ValueError, match="Invalid page token"):
+            MetadataStore().find("disk", page_token="not-a-token")
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "meta" / "crucible.db")
+        store = MetadataStore(path)
+        _put(store, "d1", "1", state="detached")
+        _put(store, "d1", "1", state="attached")  # Upsert keeps one row
+        store.close()
+
+        reopened = MetadataStore(path)
+        assert reopened.count("disk") == 1
+        assert reopened.find("disk", state="attached")[0][0]["id"] == "d1"
+
+
+class TestStoreBackedDict:
+    def test_write_through_and_save(self):
+        store = MetadataStore()
+        mapping = StoreBackedDict(store, "vm", "p", index=lambda vm: {"name": vm["name"]})
+
+        mapping["web"] = {"name": "web", "status": "created"}
+        mapping["web"]["status"] = "running"
+        assert store.get("vm", "web")["status"] == "created"
+
+        mapping.save("web")
+        assert store.get("vm", "web")["status"] == "running"
+
+        del mapping["web"]
+        assert "web" not in mapping
+        with pytest.raises(KeyError):
+            del mapping["web"]
+
+    def test_lazy_decode(self):
+        store = MetadataStore()
+        store.put("vm", "a", {"name": "a"}, "p", created="1")
+        store.put("vm", "b", {"name": "b"}, "p", created="2")
+        decoded = []
+        mapping = StoreBackedDict(store, "vm", "p", decode=lambda data: decoded.append(data) or data)
+
+        assert list(mapping) == ["a", "b"]
+        assert len(mapping) == 2
+        assert decoded == []
+
+        assert mapping["b"] == {"name": "b"}
+        assert mapping["b"] == {"name": "b"}
+        assert len(decoded) == 1
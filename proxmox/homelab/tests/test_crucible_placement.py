@@ -0,0 +1,97 @@
+"""Tests for crucible_placement module."""
+import pytest
+
+from homelab.crucible_placement import PlacedRegion, PlacementEngine, PlacementError, SledLoad
+
+GiB = 1024**3
+
+
+def _load(ip, domain=None, used=0, regions=0, iops=0.0, latency=None, online=True, max_regions=10):
+    return SledLoad(
+        ip=ip,
+        failure_domain=domain or f"ma90-{ip.split('.')[-1]}",
+        online=online,
+        total_bytes=256 * GiB,
+        used_bytes=used,
+        region_count=regions,
+        max_regions=max_regions,
+        recent_iops=iops,
+        latency_ms=latency,
+    )
+
+
+class TestPlacementEngine:
+    def test_prefers_emptier_and_quieter_sleds(self):
+        engine = PlacementEngine()
+        loads = [
+            _load("10.0.0.1", used=200 * GiB, regions=8),
+            _load("10.0.0.2", used=10 * GiB, regions=1),
+            _load("10.0.0.3", used=50 * GiB, regions=2, iops=500.0, latency=20.0),
+        ]
+
+        decisions = engine.place(loads, 10 * GiB, 2)
+
+        assert [d.sled_ip for d in decisions] == ["10.0.0.2", "10.0.0.3"]
+        assert "new failure domain" in decisions[0].explain()
+        assert decisions[0].components["capacity"] > decisions[1].components["capacity"]
+
+    def test_spreads_across_failure_domains(self):
+        """Two sleds on one host should not both get replicas while another host is free."""
+        engine = PlacementEngine()
+        loads = [
+            _load("10.0.0.1", domain="ma90-1"),
+            _load("10.0.0.2", domain="ma90-1"),
+            _load("10.0.0.3", domain="ma90-2", used=100 * GiB, regions=5),
+        ]
+
+        decisions = engine.place(loads, GiB, 2)
+
+        assert {d.failure_domain for d in decisions} == {"ma90-1", "ma90-2"}
+
+    def test_doubles_up_domains_only_when_needed(self):
+        engine = PlacementEngine()
+        loads = [_load("10.0.0.1", domain="rack"), _load("10.0.0.2", domain="rack")]
+
+        decisions = engine.place(loads, GiB, 2)
+
+        assert "shares failure domain rack" in decisions[1].reasons
+
+    def test_region_limit_is_penalised(self):
+        engine = PlacementEngine()
+        loads = [_load("10.0.0.1", regions=3, max_regions=3), _load("10.0.0.2", regions=3, max_regions=4)]
+
+        decisions = engine.place(loads, GiB, 1)
+
+        assert decisions[0].sled_ip == "10.0.0.2"
+
+    def test_offline_and_excluded_sleds_skipped(self):
+        engine = PlacementEngine()
+        loads = [_load("10.0.0.1", online=False), _load("10.0.0.2"), _load("10.0.0.3")]
+
+        with pytest.raises(PlacementError, match="Insufficient online sleds"):
+            engine.place(loads, GiB, 2, exclude={"10.0.0.2"})
+
+    def test_rebalance_moves_regions_off_hot_sled(self):
+        engine = PlacementEngine()
+        loads = [
+            _load("10.0.0.1", regions=6),
+            _load("10.0.0.2", regions=1),
+            _load("10.0.0.3", regions=1),
+        ]
+        regions = [PlacedRegion(f"vol{i}", f"vol{i}-r1", "10.0.0.1", GiB, 0) for i in range(6)]
+        regions += [PlacedRegion("vol0", "vol0-r2", "10.0.0.2", GiB, 0)]
+
+        moves = engine.plan_rebalance(loads, regions, threshold=0.15)
+
+        assert len(moves) == 3
+        assert all(move.source_ip == "10.0.0.1" for move in moves)
+        # vol0 already has a replica on .2, so it may only move to .3
+        assert all(move.target_ip == "10.0.0.3" for move in moves if move.volume_id == "vol0")
+        assert loads[0].region_count == 6  # Inputs are not modified
+
+    def test_rebalance_noop_when_balanced(self):
+        engine = PlacementEngine()
+        loads = [_load("10.0.0.1", regions=3), _load("10.0.0.2", regions=2)]
+        regions = [PlacedRegion(f"vol{i}", f"vol{i}-r", "10.0.0.1", GiB, 0) for i in range(3)]
+
+        assert engine.plan_rebalance(loads, regions, threshold=0.15) == []
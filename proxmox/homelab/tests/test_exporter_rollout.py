@@ -0,0 +1,120 @@
+"""Tests for exporter_rollout module."""
+
+import subprocess
+import threading
+import time
+
+import pytest
+
+from homelab.exporter_rollout import (
+    clear_pending_command,
+    get_rollout_settings,
+    print_rollout_report,
+    rollout,
+    sync_file_command,
+)
+
+HOSTS = ["canary", "b", "c", "d"]
+
+
+class FakeDeploy:
+    """Records deploy order and peak concurrency."""
+
+    def __init__(self, statuses=None, delay=0.05):
+        self.statuses = statuses or {}
+        self.delay = delay
+        self.order = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, hostname):
+        with self.lock:
+            self.order.append(hostname)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        status = self.statuses.get(hostname, "success")
+        if status == "raise":
+            raise RuntimeError("Connection refused")
+        return {"hostname": hostname, "status": status, "actions": ["configured"]}
+
+
+def test_canary_then_parallel():
+    deploy = FakeDeploy()
+
+    results = rollout(HOSTS, deploy, max_parallel=3, canary=True)
+
+    assert deploy.order[0] == "canary"
+    assert deploy.peak == 3
+    assert [r["hostname"] for r in results] == HOSTS
+    assert all(r["status"] == "success" for r in results)
+    assert all(r["elapsed_sec"] >= 0.05 for r in results)
+
+
+def test_failed_canary_skips_remaining_hosts():
+    deploy = FakeDeploy({"canary": "partial"})
+
+    results = rollout(HOSTS, deploy, max_parallel=4, canary=True)
+
+    assert deploy.order == ["canary"]
+    assert [r["status"] for r in results] == ["partial", "skipped", "skipped", "skipped"]
+    assert results[1]["reason"] == "canary canary failed"
+
+
+def test_serial_without_canary_reports_exceptions_per_host():
+    deploy = FakeDeploy({"b": "raise"}, delay=0)
+
+    results = rollout(HOSTS, deploy)
+
+    assert deploy.order == HOSTS
+    assert deploy.peak == 1
+    assert [r["status"] for r in results] == ["success", "failed", "success", "success"]
+    assert results[1]["error"] == "Connection refused"
+
+
+def test_rollout_settings_precedence():
+    monitoring = {
+        "rollout": {"max_parallel": 4, "canary": True},
+        "zfs_exporter": {"rollout": {"max_parallel": 2}},
+    }
+
+    assert get_rollout_settings({}, "node_exporter") == (1, False)
+    assert get_rollout_settings(monitoring, "node_exporter") == (4, True)
+    assert get_rollout_settings(monitoring, "zfs_exporter") == (2, True)
+    assert get_rollout_settings(monitoring, "zfs_exporter", max_parallel=8, canary=False) == (8, False)
+
+    with pytest.raises(ValueError, match="Invalid max_parallel"):
+        get_rollout_settings(monitoring, "node_exporter", max_parallel=0)
+
+
+def test_sync_file_command_writes_only_on_change(tmp_path):
+    path = tmp_path / "override.conf"
+    content = "[Service]\nExecStart=/usr/bin/x \\\n    --match='^/(sys|proc)($$|/)'\n"
+
+    def run(command):
+        return subprocess.run(["sh", "-c", command], capture_output=True, text=True).stdout.strip()
+
+    pending = str(tmp_path / "pending")
+
+    assert run(sync_file_command(str(path), content, pending)) == "written"
+    assert path.read_text() == content + "\n"
+    # Not applied yet: the next run must reload and restart again
+    assert run(sync_file_command(str(path), content, pending)) == "pending"
+    run(clear_pending_command(str(path), pending))
+    assert run(sync_file_command(str(path), content, pending)) == "unchanged"
+    assert run(sync_file_command(str(path), content + "# edited\n", pending)) == "written"
+
+
+def test_print_rollout_report(capsys):
+    print_rollout_report([
+        {"hostname": "still-fawn", "status": "success", "actions": ["config_unchanged"], "elapsed_sec": 1.5},
+        {"hostname": "pve", "status": "skipped", "reason": "canary still-fawn failed", "elapsed_sec": 0.0},
+    ])
+
+    output = capsys.readouterr().out
+    assert "config_unchanged" in output
+    assert "canary still-fawn failed" in output
+    assert "Slowest host: 1.5s" in output
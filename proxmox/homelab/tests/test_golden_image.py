@@ -0,0 +1,143 @@
+"""Tests for golden_image module."""
+
+import time
+
+import pytest
+
+from homelab.golden_image import GoldenImage, GoldenImageCache
+
+IMAGE = "/var/lib/vz/template/iso/noble.img"
+DIGEST = "ab" * 32
+GOLDEN = f"rpool/data/golden-{DIGEST[:16]}-200G"
+
+
+class FakeHost:
+    """Scripted SSH responses keyed by command prefix; records every command."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.commands = []
+
+    def __call__(self, cmd):
+        self.commands.append(cmd)
+        for prefix, response in self.responses.items():
+            if cmd.startswith(prefix):
+                return response
+        return ("", "", 0)
+
+    def ran(self, prefix):
+        return [cmd for cmd in self.commands if cmd.startswith(prefix)]
+
+
+def _cache(responses):
+    cache = GoldenImageCache("pve", storage="local-zfs", dataset="rpool/data")
+    host = FakeHost(responses)
+    cache._ssh_exec = host
+    return cache, host
+
+
+def _zfs_list(*rows):
+    return ("\n".join("\t".join(row) for row in rows), "", 0)
+
+
+class TestEnsure:
+    def test_builds_missing_golden_once(self):
+        cache, host = _cache({
+            "stat": ("2361393152 1760000000", "", 0),
+            "zfs list": _zfs_list(("rpool/data/vm-100-disk-0", "1024", "-", "-", "-")),
+            "sha256sum": (f"{DIGEST}  {IMAGE}", "", 0),
+        })
+
+        golden = cache.ensure(IMAGE, "200g")
+
+        assert golden.dataset == GOLDEN
+        assert golden.size == "200G"
+        create = host.ran("zfs create")[0]
+        assert "-s -V 200G" in create
+        assert f"homelab:digest={DIGEST}" in create
+        assert host.ran("udevadm settle && qemu-img convert -n -O raw")
+        assert host.ran(f"zfs snapshot {GOLDEN}-partial@base && zfs rename {GOLDEN}-partial {GOLDEN}")
+
+    def test_cached_golden_skips_hash_and_import(self):
+        source = f"{IMAGE}:2361393152:1760000000"
+        cache, host = _cache({
+            "stat": ("2361393152 1760000000", "", 0),
+            "zfs list": _zfs_list((GOLDEN, "4096", DIGEST, source, "1760000000")),
+            "zfs get": (f"{GOLDEN}@base\trpool/data/vm-120-disk-0,rpool/data/vm-121-disk-0", "", 0),
+        })
+
+        golden = cache.ensure(IMAGE, "200G")
+
+        assert golden.dataset == GOLDEN
+        assert golden.clones == 2
+        assert not host.ran("sha256sum")
+        assert not host.ran("zfs create")
+
+    def test_same_content_new_path_reuses_golden(self):
+        cache, host = _cache({
+            "stat": ("2361393152 1760009999", "", 0),
+            "zfs list": _zfs_list((GOLDEN, "4096", DIGEST, "/old/path.img:1:2", "1760000000")),
+            "sha256sum": (f"{DIGEST}  {IMAGE}", "", 0),
+        })
+
+        golden = cache.ensure(IMAGE, "200G")
+
+        assert golden.source == f"{IMAGE}:2361393152:1760009999"
+        assert host.ran("zfs set homelab:source=")
+        assert not host.ran("zfs create")
+
+    def test_failed_import_removes_staging_volume(self):
+        cache, host = _cache({
+            "stat": ("1 2", "", 0),
+            "zfs list": ("", "", 0),
+            "sha256sum": (f"{DIGEST}  {IMAGE}", "", 0),
+            "udevadm": ("", "qemu-img: Could not open", 1),
+        })
+
+        with pytest.raises(RuntimeError, match="Could not open"):
+            cache.ensure(IMAGE, "200G")
+
+        assert host.ran(f"zfs destroy -r {GOLDEN}-partial")[-1] == f"zfs destroy -r {GOLDEN}-partial"
+
+    def test_invalid_size(self):
+        cache, _ = _cache({})
+        with pytest.raises(ValueError, match="Invalid disk size"):
+            cache.ensure(IMAGE, "lots")
+
+
+class TestCloneAndGc:
+    def test_clone_returns_proxmox_volume(self):
+        cache, host = _cache({})
+        golden = GoldenImage(dataset=GOLDEN, digest=DIGEST, size="200G")
+
+        volume = cache.clone(golden, vmid=120)
+
+        assert volume == "local-zfs:vm-120-disk-0"
+        assert host.commands[0].startswith(
+            f"zfs clone {GOLDEN}@base rpool/data/vm-120-disk-0 && zfs set homelab:last-used="
+        )
+        assert golden.clones == 1
+
+    def test_gc_destroys_only_idle_unreferenced_goldens(self):
+        idle = str(int(time.time()) - 30 * 86400)
+        recent = str(int(time.time()) - 86400)
+        cache, host = _cache({
+            "zfs list": _zfs_list(
+                ("rpool/data/golden-1111111111111111-200G", "1", "1" * 64, "-", idle),
+                ("rpool/data/golden-2222222222222222-200G", "1", "2" * 64, "-", idle),
+                ("rpool/data/golden-3333333333333333-200G", "1", "3" * 64, "-", recent),
+            ),
+            "zfs get": (
+                "rpool/data/golden-1111111111111111-200G@base\t-\n"
+                "rpool/data/golden-2222222222222222-200G@base\trpool/data/vm-120-disk-0\n"
+                "rpool/data/golden-3333333333333333-200G@base\t-",
+                "", 0
+            ),
+        })
+
+        dry = cache.gc(max_idle_days=14, dry_run=True)
+        assert [g.digest[0] for g in dry] == ["1"]
+        assert not host.ran("zfs destroy")
+
+        cache.gc(max_idle_days=14)
+        assert host.ran("zfs destroy") == ["zfs destroy -r rpool/data/golden-1111111111111111-200G"]
@@ -0,0 +1,78 @@
+"""Tests for host_probe module."""
+
+import subprocess
+import threading
+
+import pytest
+
+from homelab.host_probe import build_probe_script, parse_probe_output, probe_hosts, run_probe
+
+
+def _local_exec(command):
+    """Run a command in a local shell, like _execute_command does over SSH."""
+    proc = subprocess.run(command, shell=True, capture_output=True, text=True)
+    return proc.stdout.strip(), proc.stderr.strip(), proc.returncode
+
+
+class RecordingExec:
+    def __init__(self):
+        self.commands = []
+
+    def __call__(self, command):
+        self.commands.append(command)
+        return _local_exec(command)
+
+
+def test_run_probe_collects_every_fact_in_one_exec():
+    execute = RecordingExec()
+
+    facts = run_probe(execute, {
+        "quoted": "echo 'it'\"'\"'s \"quoted\"'; echo second line",
+        "failing": "echo partial; exit 3",
+        "format": "printf '%s' 200",
+        "empty": "cat /nonexistent/file",
+        "unicode": "echo 'ünïcode'",
+    })
+
+    assert len(execute.commands) == 1
+    assert facts == {
+        "quoted": ("it's \"quoted\"\nsecond line", 0),
+        "failing": ("partial", 3),
+        "format": ("200", 0),
+        "empty": ("", 1),
+        "unicode": ("ünïcode", 0),
+    }
+
+
+def test_failing_command_does_not_stop_later_checks():
+    facts = run_probe(_local_exec, {"first": "exit 1", "second": "echo ok"})
+
+    assert facts["second"] == ("ok", 0)
+
+
+def test_invalid_fact_name():
+    with pytest.raises(ValueError, match="Invalid probe fact name"):
+        build_probe_script({"bad name": "true"})
+
+
+def test_malformed_output():
+    with pytest.raises(ValueError, match="Malformed probe output"):
+        parse_probe_output("sh: 1: base64: not found")
+
+
+def test_probe_failure_without_output():
+    with pytest.raises(RuntimeError, match="Probe failed"):
+        run_probe(lambda command: ("", "Connection reset", 255), {"x": "true"})
+
+
+def test_probe_hosts_runs_concurrently_in_order():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def probe(host):
+        barrier.wait()  # Times out unless all hosts are probed at once
+        return {"hostname": host}
+
+    results = probe_hosts(["a", "b", "c"], probe)
+
+    assert [r["hostname"] for r in results] == ["a", "b", "c"]
+    assert probe_hosts([], probe) == []
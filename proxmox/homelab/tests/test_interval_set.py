@@ -0,0 +1,61 @@
+"""Tests for interval_set module."""
+from homelab.interval_set import IntervalSet
+
+
+class TestIntervalSet:
+    def test_sequential_ranges_merge_into_one(self):
+        """Adjacent chunks should collapse into a single interval."""
+        coverage = IntervalSet()
+        for i in range(1000):
+            coverage.add(i * 512, (i + 1) * 512)
+
+        assert len(coverage) == 1
+        assert coverage.to_list() == [(0, 512000)]
+        assert coverage.covered_bytes() == 512000
+
+    def test_out_of_order_and_overlapping_ranges(self):
+        coverage = IntervalSet()
+        coverage.add(100, 200)
+        coverage.add(0, 50)
+        coverage.add(300, 400)
+        coverage.add(150, 320)
+
+        assert coverage.to_list() == [(0, 50), (100, 400)]
+        assert coverage.covered_bytes() == 350
+
+    def test_empty_range_is_ignored(self):
+        coverage = IntervalSet()
+        coverage.add(10, 10)
+        assert len(coverage) == 0
+
+    def test_contains(self):
+        coverage = IntervalSet([(0, 100), (200, 300)])
+        assert coverage.contains(10, 90)
+        assert coverage.contains(200, 300)
+        assert not coverage.contains(90, 210)
+        assert not coverage.contains(150, 160)
+
+    def test_missing(self):
+        coverage = IntervalSet([(100, 200), (300, 400)])
+        assert coverage.missing(0, 500) == [(0, 100), (200, 300), (400, 500)]
+        assert coverage.missing(150, 350) == [(200, 300)]
+        assert coverage.missing(100, 200) == []
+        assert IntervalSet().missing(0, 10) == [(0, 10)]
+
+    def test_remove_splits_and_trims(self):
+        coverage = IntervalSet([(0, 100), (200, 300)])
+        coverage.remove(50, 250)
+        assert coverage.to_list() == [(0, 50), (250, 300)]
+
+        coverage.remove(20, 30)
+        assert coverage.to_list() == [(0, 20), (30, 50), (250, 300)]
+
+        coverage.remove(50, 250)  # Touching only, nothing removed
+        assert coverage.to_list() == [(0, 20), (30, 50), (250, 300)]
+
+    def test_overlaps(self):
+        coverage = IntervalSet([(100, 200)])
+        assert coverage.overlaps(150, 160)
+        assert coverage.overlaps(0, 101)
+        assert not coverage.overlaps(200, 300)
+        assert not coverage.overlaps(0, 100)
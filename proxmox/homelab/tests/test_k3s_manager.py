@@ -3,6 +3,7 @@ import pytest
 from unittest import mock
 import subprocess
 from homelab.k3s_manager import K3sManager
+from homelab.kube_client import KubeClientError
 
 
 class TestK3sManager:
@@ -38,29 +39,23 @@ class TestK3sManager:
 
     def test_node_in_cluster_returns_true_when_exists(self):
         """Should return True when node is in cluster."""
-        with mock.patch('subprocess.run') as mock_run:
-            mock_run.return_value = mock.MagicMock(
-                returncode=0,
-                stdout='{"items": [{"metadata": {"name": "k3s-vm-test"}}]}'
-            )
+        kube = mock.MagicMock()
+        kube.list_node_names.return_value = ["k3s-vm-test"]
 
-            manager = K3sManager()
-            result = manager.node_in_cluster("k3s-vm-test")
+        manager = K3sManager(kube_client=kube)
+        result = manager.node_in_cluster("k3s-vm-test")
 
-            assert result is True
+        assert result is True
 
     def test_node_in_cluster_returns_false_when_not_exists(self):
         """Should return False when node not in cluster."""
-        with mock.patch('subprocess.run') as mock_run:
-            mock_run.return_value = mock.MagicMock(
-                returncode=0,
-                stdout='{"items": [{"metadata": {"name": "other-node"}}]}'
-            )
+        kube = mock.MagicMock()
+        kube.list_node_names.return_value = ["other-node"]
 
-            manager = K3sManager()
-            result = manager.node_in_cluster("k3s-vm-test")
+        manager = K3sManager(kube_client=kube)
+        result = manager.node_in_cluster("k3s-vm-test")
 
-            assert result is False
+        assert result is False
 
     def test_get_cluster_token_handles_timeout(self):
         """Should raise RuntimeError on SSH timeout."""
@@ -72,54 +67,55 @@ class TestK3sManager:
             with pytest.raises(RuntimeError, match="Timeout getting k3s token"):
                 manager.get_cluster_token("192.168.4.212")
 
-    def test_node_in_cluster_handles_kubectl_error(self):
-        """Should return False when kubectl fails."""
-        with mock.patch('subprocess.run') as mock_run:
-            mock_run.return_value = mock.MagicMock(
-                returncode=1,
-                stderr="connection refused"
-            )
+    def test_node_in_cluster_handles_api_error(self):
+        """Should return False when the API call fails."""
+        kube = mock.MagicMock()
+        kube.list_node_names.side_effect = KubeClientError("connection refused")
 
-            manager = K3sManager()
-            result = manager.node_in_cluster("k3s-vm-test")
+        manager = K3sManager(kube_client=kube)
+        result = manager.node_in_cluster("k3s-vm-test")
 
-            assert result is False
+        assert result is False
+
+    def test_node_in_cluster_does_not_spawn_kubectl(self):
+        """Should query the shared API client instead of forking kubectl."""
+        kube = mock.MagicMock()
+        kube.list_node_names.return_value = ["k3s-vm-test"]
 
-    def test_node_in_cluster_handles_timeout(self):
-        """Should return False on kubectl timeout."""
         with mock.patch('subprocess.run') as mock_run:
-            mock_run.side_effect = subprocess.TimeoutExpired("kubectl", 30)
+            manager = K3sManager(kube_client=kube)
+            manager.node_in_cluster("k3s-vm-test")
 
-            manager = K3sManager()
-            result = manager.node_in_cluster("k3s-vm-test")
+        mock_run.assert_not_called()
 
-            assert result is False
+    def test_drain_node_uses_eviction_client(self):
+        """Should drain through the API client and report failures."""
+        kube = mock.MagicMock()
+        kube.drain_node.return_value = True
+        manager = K3sManager(kube_client=kube)
 
-    def test_node_in_cluster_handles_json_decode_error(self):
-        """Should return False on invalid JSON response."""
-        with mock.patch('subprocess.run') as mock_run:
-            mock_run.return_value = mock.MagicMock(
-                returncode=0,
-                stdout='not valid json'
-            )
+        assert manager.drain_node("k3s-vm-test", timeout=60) is True
+        kube.drain_node.assert_called_once_with("k3s-vm-test", timeout=60)
 
-            manager = K3sManager()
-            result = manager.node_in_cluster("k3s-vm-test")
+        kube.drain_node.side_effect = KubeClientError("forbidden")
+        assert manager.drain_node("k3s-vm-test") is False
 
-            assert result is False
+    def test_uncordon_node_clears_unschedulable(self):
+        """Should patch the node schedulable again."""
+        kube = mock.MagicMock()
+        manager = K3sManager(kube_client=kube)
 
-    def test_node_in_cluster_handles_missing_items_key(self):
-        """Should return False when items key missing."""
-        with mock.patch('subprocess.run') as mock_run:
-            mock_run.return_value = mock.MagicMock(
-                returncode=0,
-                stdout='{"metadata": {}}'
-            )
+        assert manager.uncordon_node("k3s-vm-test") is True
+        kube.set_unschedulable.assert_called_once_with("k3s-vm-test", False)
 
-            manager = K3sManager()
-            result = manager.node_in_cluster("k3s-vm-test")
+    def test_wait_for_node_ready_delegates_to_watch(self):
+        """Should return the watch-backed readiness result."""
+        kube = mock.MagicMock()
+        kube.wait_for_node_ready.return_value = False
+        manager = K3sManager(kube_client=kube)
 
-            assert result is False
+        assert manager.wait_for_node_ready("k3s-vm-test", timeout=5) is False
+        kube.wait_for_node_ready.assert_called_once_with("k3s-vm-test", timeout=5)
 
     def test_install_k3s_on_new_node(self):
         """Should install k3s and join cluster."""
@@ -164,3 +160,100 @@ class TestK3sManager:
 
             with pytest.raises(RuntimeError, match="K3s installation timeout"):
                 manager.install_k3s("k3s-vm-test", "token", "https://server:6443")
+
+
+class TestK3sStatusCollection:
+    @staticmethod
+    def _qm_result(stdout: str) -> subprocess.CompletedProcess:
+        return subprocess.CompletedProcess(args=[], returncode=0, stdout=stdout, stderr="")
+
+    def _fake_qm_exec(self, proxmox_host, vmid, command, check=True):
+        if "config.yaml" in command:
+            return self._qm_result("tls-san:\n  - 192.168.4.79\n")
+        return self._qm_result("k3s version v1.35.0+k3s1 (abc123)\n")
+
+    def test_collect_status_queries_all_nodes(self):
+        """Should return a snapshot with TLS-SAN, version and latency per node."""
+        manager = K3sManager()
+        with mock.patch.object(manager, "_run_qm_exec", side_effect=self._fake_qm_exec):
+            snapshot = manager.collect_status()
+
+        names = {n.name for n in manager.config.control_plane_nodes}
+        assert set(snapshot.nodes) == names
+        for node_status in snapshot.nodes.values():
+            assert node_status.current_tls_san == ["192.168.4.79"]
+            assert node_status.k3s_version == "v1.35.0+k3s1"
+            assert node_status.latency_seconds >= 0
+            assert node_status.error is None
+
+    def test_collect_status_is_cached_until_refresh(self):
+        """Later callers should reuse the snapshot instead of re-querying."""
+        manager = K3sManager()
+        with mock.patch.object(manager, "_run_qm_exec", side_effect=self._fake_qm_exec) as mock_exec:
+            first = manager.collect_status()
+            calls = mock_exec.call_count
+            manager.status()
+            manager.configure_tls_san(dry_run=True)
+            assert manager.collect_status() is first
+            assert mock_exec.call_count == calls
+
+            manager.collect_status(refresh=True)
+            assert mock_exec.call_count == calls * 2
+
+    def test_status_reports_vip_and_version_from_snapshot(self):
+        """Status should be built from the collected snapshot."""
+        manager = K3sManager()
+        with mock.patch.object(manager, "_run_qm_exec", side_effect=self._fake_qm_exec):
+            status = manager.status()
+
+        for info in status["nodes"].values():
+            assert info["vip_in_san"] is True
+            assert info["k3s_version"] == "v1.35.0+k3s1"
+            assert info["latency_seconds"] is not None
+        assert status["collection_seconds"] >= 0
+
+    def test_configure_tls_san_invalidates_cache_after_update(self):
+        """Writing a new config should drop the cached snapshot."""
+        manager = K3sManager()
+
+        def qm_exec(proxmox_host, vmid, command, check=True):
+            if "cat /etc/rancher/k3s/config.yaml" in command:
+                return self._qm_result("no-config")
+            return self._qm_result("Config written")
+
+        with mock.patch.object(manager, "_run_qm_exec", side_effect=qm_exec):
+            manager.collect_status()
+            result = manager.configure_tls_san()
+
+        assert all(n["action"] == "updated" for n in result["nodes"].values())
+        assert manager._status_snapshot is None
+
+    def test_configure_tls_san_single_node_queries_only_that_node(self):
+        """Configuring one node should not collect status from the others."""
+        manager = K3sManager()
+        node = manager.config.control_plane_nodes[0]
+        with mock.patch.object(manager, "_run_qm_exec", side_effect=self._fake_qm_exec) as mock_exec:
+            result = manager.configure_tls_san(node_name=node.name, dry_run=True)
+
+        assert list(result["nodes"]) == [node.name]
+        assert {c.args[1] for c in mock_exec.call_args_list} == {node.vmid}
+        assert manager._status_snapshot is None
+
+    def test_upgrade_node_invalidates_cache(self):
+        """Upgrading should drop the cached snapshot so k3s_version is re-read."""
+        manager = K3sManager()
+        node = manager.config.control_plane_nodes[0]
+        versions = iter(["v1.34.3+k3s1", "v1.35.0+k3s1", "v1.35.0+k3s1"])
+        with mock.patch.object(manager, "_run_qm_exec", side_effect=self._fake_qm_exec):
+            manager.collect_status()
+        with mock.patch.object(manager, "get_node_k3s_version", side_effect=lambda n: next(versions)), \
+                mock.patch.object(manager, "validate_version_skew"), \
+                mock.patch.object(manager, "drain_node", return_value=True), \
+                mock.patch.object(manager, "uncordon_node", return_value=True), \
+                mock.patch.object(manager, "wait_for_node_ready", return_value=True), \
+                mock.patch.object(manager, "_run_qm_exec"), \
+                mock.patch("time.sleep"):
+            result = manager.upgrade_node(node, "v1.35.0+k3s1")
+
+        assert result["action"] == "upgraded"
+        assert manager._status_snapshot is None
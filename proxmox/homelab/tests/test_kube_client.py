@@ -0,0 +1,182 @@
+"""Tests for kube_client module."""
+import json
+import queue
+import threading
+from unittest import mock
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from homelab.kube_client import KubeClient, KubeClientError, ResourceCache, node_is_ready
+
+
+def _node(name, ready="True", unschedulable=False, taints=None, rv="1"):
+    return {
+        "kind": "Node",
+        "metadata": {"name": name, "resourceVersion": rv, "labels": {}},
+        "spec": {"unschedulable": unschedulable, "taints": taints or []},
+        "status": {"conditions": [{"type": "Ready", "status": ready}]},
+    }
+
+
+def _pod(namespace, name, phase="Running", owner_kind=None):
+    metadata = {"namespace": namespace, "name": name}
+    if owner_kind:
+        metadata["ownerReferences"] = [{"kind": owner_kind, "name": "owner"}]
+    return {"kind": "Pod", "metadata": metadata, "status": {"phase": phase}}
+
+
+def _list_response(items, rv="1"):
+    return mock.MagicMock(data=json.dumps({"metadata": {"resourceVersion": rv}, "items": items}))
+
+
+class FakeWatch:
+    """Watch stand-in that yields events pushed onto a shared queue."""
+
+    def __init__(self, events: "queue.Queue"):
+        self.events = events
+        self.stopped = threading.Event()
+
+    def stream(self, func, **kwargs):
+        while not self.stopped.is_set():
+            try:
+                event = self.events.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            yield event
+
+    def stop(self):
+        self.stopped.set()
+
+
+@pytest.fixture
+def node_events():
+    return queue.Queue()
+
+
+@pytest.fixture
+def core():
+    api = mock.MagicMock()
+    api.list_node.return_value = _list_response([_node("k3s-vm-a"), _node("k3s-vm-b", ready="False")])
+    return api
+
+
+@pytest.fixture
+def kube(core, node_events):
+    client = KubeClient(core_api=core, watch_factory=lambda: FakeWatch(node_events))
+    yield client
+    client.close()
+
+
+class TestResourceCache:
+    def test_seeds_from_single_list_call(self, core, node_events):
+        """Should list once and serve later lookups from memory."""
+        cache = ResourceCache(core.list_node, lambda: FakeWatch(node_events)).start()
+        try:
+            assert cache.get("k3s-vm-a") is not None
+            assert {n["metadata"]["name"] for n in cache.items()} == {"k3s-vm-a", "k3s-vm-b"}
+            cache.get("k3s-vm-b")
+            assert core.list_node.call_count == 1
+        finally:
+            cache.stop()
+
+    def test_applies_watch_events(self, core, node_events):
+        """Should add, modify and delete objects from watch events."""
+        cache = ResourceCache(core.list_node, lambda: FakeWatch(node_events)).start()
+        try:
+            node_events.put({"type": "ADDED", "raw_object": _node("k3s-vm-c", rv="2")})
+            node_events.put({"type": "DELETED", "raw_object": _node("k3s-vm-a", rv="3")})
+            assert cache.wait_for(lambda c: c.get("k3s-vm-c") and not c.get("k3s-vm-a"), timeout=2)
+        finally:
+            cache.stop()
+
+
+class TestKubeClient:
+    def test_node_is_ready(self):
+        assert node_is_ready(_node("a")) is True
+        assert node_is_ready(_node("a", ready="False")) is False
+        assert node_is_ready({"status": {}}) is False
+
+    def test_list_node_names(self, kube):
+        assert sorted(kube.list_node_names()) == ["k3s-vm-a", "k3s-vm-b"]
+
+    def test_wait_for_node_ready_wakes_on_event(self, kube, node_events):
+        """Should return as soon as a MODIFIED event reports Ready."""
+        assert kube.get_node("k3s-vm-b") is not None
+        timer = threading.Timer(
+            0.1, lambda: node_events.put({"type": "MODIFIED", "raw_object": _node("k3s-vm-b", rv="5")})
+        )
+        timer.start()
+        assert kube.wait_for_node_ready("k3s-vm-b", timeout=5) is True
+
+    def test_wait_for_node_ready_times_out(self, kube):
+        assert kube.wait_for_node_ready("k3s-vm-b", timeout=0.2) is False
+
+    def test_set_unschedulable_skips_when_unchanged(self, kube, core):
+        assert kube.set_unschedulable("k3s-vm-a", False) is False
+        core.patch_node.assert_not_called()
+
+        assert kube.set_unschedulable("k3s-vm-a", True) is True
+        core.patch_node.assert_called_once_with("k3s-vm-a", {"spec": {"unschedulable": True}})
+
+    def test_taint_node_replaces_same_key_and_effect(self, kube, core):
+        core.list_node.return_value = _list_response(
+            [_node("k3s-vm-a", taints=[{"key": "gpu", "value": "old", "effect": "NoSchedule"}])]
+        )
+        assert kube.taint_node("k3s-vm-a", "gpu", "new", "NoSchedule") is True
+        core.patch_node.assert_called_once_with(
+            "k3s-vm-a", {"spec": {"taints": [{"key": "gpu", "value": "new", "effect": "NoSchedule"}]}}
+        )
+
+    def test_taint_node_is_idempotent(self, kube, core):
+        core.list_node.return_value = _list_response(
+            [_node("k3s-vm-a", taints=[{"key": "gpu", "value": "yes", "effect": "NoSchedule"}])]
+        )
+        assert kube.taint_node("k3s-vm-a", "gpu", "yes", "NoSchedule") is False
+        core.patch_node.assert_not_called()
+
+    def test_list_pods_on_node_uses_field_selector(self, kube, core):
+        core.list_pod_for_all_namespaces.return_value = _list_response([_pod("default", "web")])
+
+        pods = kube.list_pods_on_node("k3s-vm-a", include_finished=False)
+
+        assert [p["metadata"]["name"] for p in pods] == ["web"]
+        selector = core.list_pod_for_all_namespaces.call_args.kwargs["field_selector"]
+        assert selector == "spec.nodeName=k3s-vm-a,status.phase!=Succeeded,status.phase!=Failed"
+
+    def test_evict_pod_handles_pdb_and_missing(self, kube, core):
+        core.create_namespaced_pod_eviction.side_effect = ApiException(status=429)
+        assert kube.evict_pod("default", "web") is False
+
+        core.create_namespaced_pod_eviction.side_effect = ApiException(status=404)
+        assert kube.evict_pod("default", "web") is True
+
+        core.create_namespaced_pod_eviction.side_effect = ApiException(status=403, reason="Forbidden")
+        with pytest.raises(KubeClientError, match="Forbidden"):
+            kube.evict_pod("default", "web")
+
+    def test_drain_node_evicts_non_daemonset_pods(self, core):
+        pods = [_pod("default", "web"), _pod("kube-system", "svclb", owner_kind="DaemonSet")]
+        core.list_pod_for_all_namespaces.side_effect = [
+            _list_response(pods),
+            _list_response([]),
+        ]
+        client = KubeClient(core_api=core, watch_factory=lambda: FakeWatch(queue.Queue()))
+        try:
+            assert client.drain_node("k3s-vm-a", timeout=5) is True
+        finally:
+            client.close()
+
+        core.patch_node.assert_called_once_with("k3s-vm-a", {"spec": {"unschedulable": True}})
+        core.create_namespaced_pod_eviction.assert_called_once()
+        assert core.create_namespaced_pod_eviction.call_args.args[:2] == ("web", "default")
+
+    def test_drain_node_fails_when_eviction_blocked(self, core):
+        core.list_pod_for_all_namespaces.return_value = _list_response([_pod("default", "web")])
+        core.create_namespaced_pod_eviction.side_effect = ApiException(status=429)
+        client = KubeClient(core_api=core, watch_factory=lambda: FakeWatch(queue.Queue()))
+        try:
+            with mock.patch("homelab.kube_client.time.sleep"):
+                assert client.drain_node("k3s-vm-a", timeout=0.1) is False
+        finally:
+            client.close()
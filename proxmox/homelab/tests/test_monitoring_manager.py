@@ -1,12 +1,21 @@
 """Tests for monitoring_manager module."""
 
+import base64
+import json
+import threading
 import time
 from unittest import mock
 
 import pytest
 import requests
 
-from homelab.monitoring_manager import MonitoringManager, deploy_monitoring_to_all_nodes, get_monitoring_status_all_nodes
+from homelab.monitoring_manager import (
+    MonitoringManager,
+    deploy_monitoring_to_all_nodes,
+    get_fleet_inventory,
+    get_monitoring_status_all_nodes,
+    parse_container_inventory,
+)
 
 
 @pytest.fixture
@@ -470,4 +479,102 @@ def test_cleanup(monitoring_manager):
     monitoring_manager.cleanup()
     
     mock_ssh.close.assert_called_once()
-    assert monitoring_manager.ssh_client is None
\ No newline at end of file
+    assert monitoring_manager.ssh_client is None
+
+
+def _inventory_output(lines):
+    """Probe document carrying CONTAINER_INVENTORY_COMMAND output."""
+    out = base64.b64encode("\n".join(lines).encode()).decode()
+    return json.dumps({"containers": {"rc": 0, "out": out}}), "", 0
+
+
+def test_parse_container_inventory():
+    """Inventory lines become container dicts; junk lines are skipped."""
+    containers = parse_container_inventory("100 running docker yes\n101 stopped - no\ncommand output\n")
+
+    assert containers == [
+        {"vmid": 100, "status": "running", "hostname": "docker", "docker": True},
+        {"vmid": 101, "status": "stopped", "hostname": "", "docker": False},
+    ]
+
+
+def test_collect_inventory_single_exec_and_cached(monitoring_manager):
+    """The inventory is read in one SSH exec and reused afterwards."""
+    with mock.patch.object(monitoring_manager, "_execute_command") as mock_exec:
+        mock_exec.return_value = _inventory_output(["105 running web no", "110 running apps yes"])
+
+        assert monitoring_manager._find_docker_lxc() == 110
+        assert monitoring_manager.get_monitoring_status()["docker_lxc"]["vmid"] == 110
+        assert [ct["vmid"] for ct in monitoring_manager.collect_inventory()] == [105, 110]
+
+    # Uptime Kuma checks aside, the inventory was read only once
+    inventory_calls = [c for c in mock_exec.call_args_list if "pct list" in c.args[0]]
+    assert len(inventory_calls) == 1
+
+
+def test_find_docker_lxc_prefers_known_container(monitoring_manager):
+    """The node's known Docker LXC wins over other Docker containers."""
+    monitoring_manager.node_name = "fun-bedbug"
+    with mock.patch.object(monitoring_manager, "_execute_command") as mock_exec:
+        mock_exec.return_value = _inventory_output([
+            "101 running docker-old yes", "112 running apps yes", "113 stopped docker no",
+        ])
+
+        assert monitoring_manager._find_docker_lxc() == 112
+
+
+def test_find_docker_lxc_by_hostname_from_inventory(monitoring_manager):
+    """A running docker-* container is used when Docker was not detected."""
+    with mock.patch.object(monitoring_manager, "_execute_command") as mock_exec:
+        mock_exec.return_value = _inventory_output(["101 stopped docker no", "102 running docker-host no"])
+
+        assert monitoring_manager._find_docker_lxc() == 102
+
+
+@mock.patch('homelab.monitoring_manager.Config')
+def test_get_monitoring_status_all_nodes_concurrent(mock_config):
+    """All nodes are queried at once and results keep node order."""
+    mock_config.get_nodes.return_value = [{"name": "node1"}, {"name": "node2"}, {"name": "node3"}]
+    barrier = threading.Barrier(3, timeout=5)
+
+    def status(node_name):
+        manager = mock.MagicMock()
+        manager.__enter__.return_value = manager
+
+        def get_status():
+            barrier.wait()  # Only passes if all three nodes run concurrently
+            if node_name == "node2":
+                raise RuntimeError("unreachable")
+            return {"node": node_name}
+
+        manager.get_monitoring_status.side_effect = get_status
+        return manager
+
+    with mock.patch('homelab.monitoring_manager.MonitoringManager', side_effect=status):
+        results = get_monitoring_status_all_nodes()
+
+    assert results == [
+        {"node": "node1"},
+        {"node": "node2", "error": "unreachable"},
+        {"node": "node3"},
+    ]
+
+
+@mock.patch('homelab.monitoring_manager.Config')
+def test_get_fleet_inventory(mock_config):
+    """Fleet inventory maps nodes to containers, or an error."""
+    mock_config.get_nodes.return_value = [{"name": "node1"}, {"name": "node2"}]
+
+    def manager_for(node_name):
+        manager = mock.MagicMock()
+        manager.__enter__.return_value = manager
+        if node_name == "node2":
+            manager.collect_inventory.side_effect = RuntimeError("ssh failed")
+        else:
+            manager.collect_inventory.return_value = [{"vmid": 100}]
+        return manager
+
+    with mock.patch('homelab.monitoring_manager.MonitoringManager', side_effect=manager_for):
+        inventory = get_fleet_inventory()
+
+    assert inventory == {"node1": [{"vmid": 100}], "node2": {"error": "ssh failed"}}
@@ -291,6 +291,43 @@ def test_validate_storage_config_invalid_fingerprint(
     assert any("Fingerprint" in err for err in result["errors"])
 
 
+def test_validate_storage_config_fingerprint_mismatch(
+    pbs_manager: PBSStorageManager,
+    sample_config: PBSStorageConfig
+) -> None:
+    """Test validation against the certificate fingerprint the server presents."""
+    connectivity = {
+        "reachable": True,
+        "dns_resolved": True,
+        "ip": "192.168.4.211",
+        "port_open": True,
+        "ssl_valid": True,
+        "fingerprint": "AA:" * 31 + "AA",
+        "error": None,
+    }
+
+    result = pbs_manager.validate_storage_config(sample_config, connectivity=connectivity)
+    assert result["valid"] is False
+    assert any("Fingerprint mismatch" in err for err in result["errors"])
+
+    connectivity["fingerprint"] = sample_config.fingerprint.lower()
+    result = pbs_manager.validate_storage_config(sample_config, connectivity=connectivity)
+    assert result["valid"] is True
+
+
+def test_probe_connectivity_keys_by_server(pbs_manager: PBSStorageManager) -> None:
+    """Test bulk probing dedupes servers and feeds check_pbs_connectivity."""
+    with mock.patch(
+        "homelab.pbs_connectivity.probe_target", return_value={"reachable": True}
+    ) as mock_probe:
+        results = pbs_manager.probe_connectivity(["pbs.maas", "pbs.maas", "pbs2.maas"])
+
+        assert list(results) == ["pbs.maas", "pbs2.maas"]
+        assert mock_probe.call_count == 2
+        assert pbs_manager.check_pbs_connectivity("pbs.maas") is results["pbs.maas"]
+        assert mock_probe.call_count == 2
+
+
 # ===== Storage Management Tests =====
 
 def test_get_storage_exists(
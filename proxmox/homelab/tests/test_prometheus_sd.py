@@ -0,0 +1,106 @@
+"""Tests for prometheus_sd module."""
+
+import json
+import os
+import socket
+import threading
+import urllib.request
+
+import pytest
+import yaml
+
+from homelab.prometheus_sd import REACHABLE_LABEL, TargetSet, check_target, make_server
+
+
+def _config(nodes):
+    return {
+        "nodes": [{"name": name, "ip": ip, "enabled": True} for name, ip in nodes],
+        "monitoring": {"node_exporter": {"port": 9100}},
+    }
+
+
+def _write(path, config, bump=0):
+    path.write_text(yaml.dump(config))
+    # Distinct mtime even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "cluster.yaml"
+    _write(path, _config([("pve", "192.168.4.122"), ("still-fawn", "192.168.4.17")]))
+    return path
+
+
+def test_refresh_is_incremental(config_file):
+    target_set = TargetSet(config_file)
+    assert target_set.refresh() is True
+    before = target_set.groups()
+    assert target_set.refresh() is False
+
+    _write(config_file, _config([("pve", "192.168.4.122"), ("chief-horse", "192.168.4.19")]), bump=1)
+    assert target_set.refresh() is True
+    after = target_set.groups()
+
+    assert [g["labels"]["hostname"] for g in after] == ["pve", "chief-horse"]
+    assert after[0] is before[0]
+
+
+def test_invalid_config_keeps_previous_targets(config_file):
+    target_set = TargetSet(config_file)
+    target_set.refresh()
+
+    config_file.write_text("nodes: [unclosed")
+    os.utime(config_file, ns=(0, config_file.stat().st_mtime_ns + 2_000_000_000))
+
+    assert target_set.refresh() is False
+    assert len(target_set.groups()) == 2
+
+
+def test_liveness_labels_targets(tmp_path):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    up_port = listener.getsockname()[1]
+
+    path = tmp_path / "cluster.yaml"
+    _write(path, {"nodes": [], "monitoring": {"extra_targets": [{"job": "test", "targets": [
+        {"host": "up", "ip": "127.0.0.1", "port": up_port},
+        {"host": "down", "ip": "127.0.0.1", "port": 1},
+    ]}]}})
+
+    try:
+        groups = TargetSet(path, liveness=True).groups()
+    finally:
+        listener.close()
+
+    assert {g["labels"]["hostname"]: g["labels"][REACHABLE_LABEL] for g in groups} == {
+        "up": "true",
+        "down": "false",
+    }
+
+
+def test_check_target_invalid_address():
+    assert check_target("no-port") is False
+
+
+def test_http_sd_endpoint(config_file):
+    server = make_server(TargetSet(config_file), host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with urllib.request.urlopen(f"{base}/targets") as response:
+            assert response.headers["Content-Type"] == "application/json"
+            assert len(json.load(response)) == 2
+        with urllib.request.urlopen(f"{base}/targets?job=proxmox-node-exporter") as response:
+            assert len(json.load(response)) == 2
+        with urllib.request.urlopen(f"{base}/targets?job=other") as response:
+            assert json.load(response) == []
+        with urllib.request.urlopen(f"{base}/healthz") as response:
+            assert response.read() == b"ok\n"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -8,7 +8,9 @@ import pytest
 import yaml
 
 from homelab.prometheus_targets import (
+    HASH_ANNOTATION,
     apply_targets_configmap,
+    build_configmap,
     generate_targets,
     generate_targets_json,
     load_cluster_config,
@@ -275,3 +277,31 @@ def test_apply_configmap_kubectl_failure(config_file):
 
     assert result["success"] is False
     assert "connection refused" in result["error"]
+
+
+def test_apply_configmap_unchanged_skips_apply(config_file):
+    targets_json = generate_targets_json(config_file)
+    current = mock.MagicMock()
+    current.stdout = build_configmap(targets_json, "monitoring")["metadata"]["annotations"][HASH_ANNOTATION]
+
+    with mock.patch("subprocess.run", return_value=current) as mock_run:
+        result = apply_targets_configmap(config_file)
+
+    assert result["success"] is True
+    assert result["unchanged"] is True
+    assert mock_run.call_count == 1
+
+
+def test_apply_configmap_creates_missing(config_file):
+    missing = mock.MagicMock()
+    missing.stdout = ""  # --ignore-not-found prints nothing
+    applied = mock.MagicMock()
+    applied.stdout = "configmap/prometheus-scrape-targets created"
+
+    with mock.patch("subprocess.run", side_effect=[missing, applied]) as mock_run:
+        result = apply_targets_configmap(config_file)
+
+    assert result["unchanged"] is False
+    manifest = json.loads(mock_run.call_args_list[1][1]["input"])
+    assert manifest["metadata"]["annotations"][HASH_ANNOTATION]
+    assert json.loads(manifest["data"]["targets.json"]) == json.loads(generate_targets_json(config_file))
@@ -0,0 +1,184 @@
+"""Tests for resilver_monitor module."""
+
+import json
+import textwrap
+
+import pytest
+
+from homelab.resilver_monitor import (
+    ResilverMonitor,
+    ScanSample,
+    ScanTracker,
+    format_duration,
+    format_metrics,
+    next_interval,
+    watch,
+    write_metrics,
+)
+
+TIB = 1024 ** 4
+GIB = 1024 ** 3
+
+
+def _resilver(timestamp, issued, to_examine=2 * TIB, state="SCANNING"):
+    return ScanSample(timestamp, "RESILVER", state, examined=issued, issued=issued, to_examine=to_examine)
+
+
+def _status_text(issued, total):
+    return textwrap.dedent(f"""\
+          pool: rpool
+         state: ONLINE
+          scan: resilver in progress since Fri Jan 31 10:00:00 2026
+        \t{issued} / {total} scanned at 262144000/s, {issued} / {total} issued at 262144000/s
+        \t{issued} resilvered, 45.00% done, 01:20:00 to go
+        config:
+
+        \tNAME           STATE     READ WRITE CKSUM
+        \trpool          ONLINE       0     0     0
+        \t  mirror-0     ONLINE       0     0     0
+        \t    /dev/sda3  ONLINE       0     0     0
+        \t    /dev/sdb3  ONLINE       0     0     0
+
+        errors: No known data errors
+    """)
+
+
+def test_tracker_rate_and_eta():
+    tracker = ScanTracker("rpool", smoothing=0.5)
+    assert tracker.add(_resilver(0, 0)).issue_rate is None
+
+    progress = tracker.add(_resilver(100, 100 * GIB))
+    assert progress.issue_rate == pytest.approx(GIB)
+    assert progress.eta_seconds == pytest.approx((2 * TIB - 100 * GIB) / GIB)
+
+    # Smoothing: a burst at 3 GiB/s moves the rate halfway
+    progress = tracker.add(_resilver(200, 400 * GIB))
+    assert progress.issue_rate == pytest.approx(2 * GIB)
+    assert progress.percent_done == pytest.approx(100 * 400 / 2048)
+
+
+def test_tracker_detects_throttling():
+    tracker = ScanTracker("rpool", smoothing=1.0)
+    issued = 0
+    for t, rate in enumerate([200, 200, 200, 200, 50, 50]):
+        issued += rate * 1024 ** 2 * 10
+        progress = tracker.add(_resilver(t * 10, issued))
+    assert progress.throttled is True
+    assert progress.peak_rate == pytest.approx(200 * 1024 ** 2)
+
+
+def test_tracker_resets_on_new_scan():
+    tracker = ScanTracker("rpool")
+    tracker.add(_resilver(0, 0))
+    tracker.add(_resilver(10, 10 * GIB))
+    progress = tracker.add(ScanSample(20, "SCRUB", "SCANNING", issued=GIB, to_examine=TIB))
+    assert progress.function == "SCRUB"
+    assert progress.samples == 1
+    assert progress.issue_rate is None
+
+
+def test_next_interval_adapts():
+    tracker = ScanTracker("rpool", smoothing=1.0)
+    tracker.add(_resilver(0, 0))
+    assert next_interval(tracker.progress()) == 5.0  # warming up
+
+    days_out = tracker.add(_resilver(10, 10 * 1024 ** 2))
+    assert next_interval(days_out) == 60.0
+
+    nearly_done = tracker.add(_resilver(20, 2 * TIB - 1024 ** 2, to_examine=2 * TIB))
+    assert next_interval(nearly_done) == 5.0
+
+    finished = tracker.add(_resilver(30, 2 * TIB, state="FINISHED"))
+    assert next_interval(finished) == 60.0
+
+
+def test_monitor_samples_text_and_json():
+    clock = iter([0.0, 60.0])
+    replies = [
+        (_status_text(900 * GIB, 2 * TIB), "", 0),
+        (json.dumps({"pools": {"rpool": {
+            "name": "rpool", "state": "ONLINE", "vdevs": {},
+            "scan_stats": {"function": "RESILVER", "state": "SCANNING",
+                           "examined": 960 * GIB, "issued": 960 * GIB, "to_examine": 2 * TIB},
+        }}}), "", 0),
+    ]
+    commands = []
+
+    def execute(command):
+        commands.append(command)
+        return replies.pop(0)
+
+    monitor = ResilverMonitor(execute, "rpool", smoothing=1.0, clock=lambda: next(clock))
+    assert monitor.poll().issued == 900 * GIB
+    progress = monitor.poll()
+    assert progress.issue_rate == pytest.approx(GIB)
+    assert commands[0].startswith("zpool status -P -j --json-int rpool")
+
+
+def test_monitor_missing_pool():
+    monitor = ResilverMonitor(lambda command: ("", "cannot open 'rpool': no such pool", 1), "rpool")
+    with pytest.raises(RuntimeError, match="no such pool"):
+        monitor.poll()
+
+
+def test_watch_until_idle():
+    issued = iter([0, 10 * GIB, 2 * TIB])
+    states = iter(["SCANNING", "SCANNING", "FINISHED"])
+    sleeps = []
+    rounds = []
+
+    class FakeMonitor(ResilverMonitor):
+        def sample(self):
+            return _resilver(len(sleeps) * 10, next(issued), state=next(states))
+
+    monitor = FakeMonitor(lambda command: ("", "", 0), "rpool")
+    final = watch([monitor], rounds.append, sleep=sleeps.append)
+
+    assert len(rounds) == 3
+    assert len(sleeps) == 2
+    assert final[0].state == "FINISHED"
+
+
+def test_watch_timeout():
+    now = [0.0]
+    sleeps = []
+
+    class BusyMonitor(ResilverMonitor):
+        def sample(self):
+            return _resilver(now[0], int(now[0]) * GIB)
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monitor = BusyMonitor(lambda command: ("", "", 0), "rpool")
+    final = watch([monitor], lambda results: None, timeout=12, sleep=sleep, clock=lambda: now[0])
+
+    assert final[0].active is True
+    # Warm-up sample, then a long ETA interval cut short by the deadline
+    assert sleeps == [5.0, 7.0]
+
+
+def test_format_metrics_and_write(tmp_path):
+    tracker = ScanTracker("rpool", smoothing=1.0)
+    tracker.add(_resilver(0, 0))
+    progress = tracker.add(_resilver(10, 10 * GIB))
+
+    text = format_metrics([("still-fawn", progress)])
+    labels = 'host="still-fawn",pool="rpool",function="resilver"'
+    assert f"homelab_zfs_scan_active{{{labels}}} 1" in text
+    assert f"homelab_zfs_scan_issued_bytes{{{labels}}} {10 * GIB}" in text
+    assert f"homelab_zfs_scan_issue_rate_bytes_per_second{{{labels}}} {float(GIB)}" in text
+    assert "# TYPE homelab_zfs_scan_eta_seconds gauge" in text
+
+    path = tmp_path / "textfile" / "zfs_scan.prom"
+    write_metrics(path, text)
+    assert path.read_text() == text
+    assert [p.name for p in path.parent.iterdir()] == ["zfs_scan.prom"]
+
+
+def test_format_duration():
+    assert format_duration(None) == "n/a"
+    assert format_duration(45) == "45s"
+    assert format_duration(4800) == "1h 20m"
+    assert format_duration(2 * 86400 + 3 * 3600) == "2d 3h"
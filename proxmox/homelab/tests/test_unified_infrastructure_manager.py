@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Unified Infrastructure Manager plan/apply.
+
+Tests cover:
+- Batched inventory and typed diff
+- Plan rendering
+- Concurrent apply with per-resource timing
+- Validation probing each PBS server once
+- Per-resource validation gating and probe-free dry runs
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+import yaml
+
+from homelab.unified_infrastructure_manager import (
+    ChangeAction,
+    InfrastructureConfig,
+    UnifiedInfrastructureManager,
+)
+
+FINGERPRINT = "54:52:3A:D2:43:F0:80:66:E3:D0:BB:D6:0B:28:50:9F:C6:1C:73:BD:45:EA:D0:38:BC:25:54:EE:A4:D5:D1:54"
+
+REACHABLE = {
+    "reachable": True,
+    "ip": "192.168.4.218",
+    "dns_resolved": True,
+    "port_open": True,
+    "ssl_valid": True,
+    "error": None,
+}
+
+
+def _storage(name: str, **overrides: Any) -> Dict[str, Any]:
+    data = {
+        "name": name,
+        "server": "pbs.maas",
+        "datastore": name,
+        "fingerprint": FINGERPRINT,
+    }
+    data.update(overrides)
+    return data
+
+
+def _existing(name: str, **overrides: Any) -> Dict[str, Any]:
+    data = {
+        "storage": name,
+        "type": "pbs",
+        "server": "pbs.maas",
+        "datastore": name,
+        "content": "backup",
+        "username": "root@pam",
+        "fingerprint": FINGERPRINT,
+    }
+    data.update(overrides)
+    return data
+
+
+# ===== Fixtures =====
+
+@pytest.fixture
+def mock_proxmox() -> Any:
+    """Mock Proxmox API client."""
+    return mock.MagicMock()
+
+
+@pytest.fixture
+def manager(mock_proxmox: Any) -> UnifiedInfrastructureManager:
+    """Create manager with mocked Proxmox client."""
+    return UnifiedInfrastructureManager(mock_proxmox)
+
+
+@pytest.fixture
+def config() -> InfrastructureConfig:
+    """Config covering every PBS storage action."""
+    return InfrastructureConfig({
+        "metadata": {"name": "test", "version": "1"},
+        "dns_resources": [{"name": "pbs.maas"}],
+        "pbs_storages": [
+            _storage("new-store"),
+            _storage("same-store"),
+            _storage("changed-store", content=["backup", "vztmpl"]),
+            _storage("disabled-store"),
+            _storage("retired-store", enabled=False),
+            _storage("absent-store", enabled=False),
+        ],
+    })
+
+
+@pytest.fixture
+def inventory(mock_proxmox: Any) -> List[Dict[str, Any]]:
+    """Current storages returned by the single list call."""
+    storages = [
+        _existing("same-store"),
+        _existing("changed-store"),
+        _existing("disabled-store", disable=1),
+        _existing("retired-store"),
+        {"storage": "local-zfs", "type": "zfspool"},
+    ]
+    mock_proxmox.storage.get.return_value = storages
+    return storages
+
+
+# ===== Plan Tests =====
+
+def test_plan_reads_inventory_once_and_diffs(
+    manager: UnifiedInfrastructureManager,
+    mock_proxmox: Any,
+    config: InfrastructureConfig,
+    inventory: List[Dict[str, Any]],
+) -> None:
+    """Test plan builds a typed diff from one list call."""
+    plan = manager.plan(config, skip_validation=True)
+
+    actions = {change.resource_name: change.action for change in plan.changes}
+    assert actions == {
+        "pbs.maas": ChangeAction.SKIP,
+        "new-store": ChangeAction.CREATE,
+        "same-store": ChangeAction.NO_CHANGE,
+        "changed-store": ChangeAction.UPDATE,
+        "disabled-store": ChangeAction.ENABLE,
+        "retired-store": ChangeAction.DISABLE,
+        "absent-store": ChangeAction.NO_CHANGE,
+    }
+    changed = next(c for c in plan.changes if c.resource_name == "changed-store")
+    assert changed.changes == {"content": {"from": "backup", "to": "backup,vztmpl"}}
+
+    mock_proxmox.storage.get.assert_called_once_with()
+    mock_proxmox.storage.assert_not_called()
+    assert plan.validation is None
+
+
+def test_plan_render(
+    manager: UnifiedInfrastructureManager,
+    config: InfrastructureConfig,
+    inventory: List[Dict[str, Any]],
+) -> None:
+    """Test plan renders Terraform-style lines."""
+    lines = manager.plan(config, skip_validation=True).render()
+
+    assert "+ pbs_storage/new-store: create" in lines
+    assert "~ pbs_storage/changed-store: update" in lines
+    assert "    content: 'backup' -> 'backup,vztmpl'" in lines
+    assert "- pbs_storage/retired-store: disable" in lines
+    assert lines[-1] == "Plan: 4 to change, 3 unchanged."
+
+
+def test_plan_probes_each_server_once(
+    manager: UnifiedInfrastructureManager, inventory: List[Dict[str, Any]]
+) -> None:
+    """Test validation probes distinct servers once, not once per storage."""
+    config = InfrastructureConfig({
+        "pbs_storages": [
+            _storage("a"), _storage("b"), _storage("c", server="pbs2.maas"),
+            _storage("d", enabled=False, server="gone.maas"),
+        ],
+    })
+
+    with mock.patch(
+        "homelab.pbs_connectivity.probe_target", return_value=REACHABLE
+    ) as probe:
+        plan = manager.plan(config)
+
+    assert sorted(call.args[0] for call in probe.call_args_list) == ["pbs.maas", "pbs2.maas"]
+    assert plan.validation["valid"] is True
+
+
+# ===== Apply Tests =====
+
+def test_apply_plan_uses_inventory_records(
+    manager: UnifiedInfrastructureManager,
+    mock_proxmox: Any,
+    config: InfrastructureConfig,
+    inventory: List[Dict[str, Any]],
+) -> None:
+    """Test apply issues only write calls for pending changes."""
+    plan = manager.plan(config, skip_validation=True)
+    results = manager.apply_plan(plan)
+
+    assert [(r.resource_name, r.action) for r in results] == [
+        ("pbs.maas", "skipped"),
+        ("new-store", "created"),
+        ("same-store", "no_change"),
+        ("changed-store", "updated"),
+        ("disabled-store", "enabled_and_updated"),
+        ("retired-store", "disabled"),
+        ("absent-store", "no_change"),
+    ]
+    assert all(r.success for r in results)
+
+    mock_proxmox.storage.create.assert_called_once()
+    assert mock_proxmox.storage.create.call_args.kwargs["storage"] == "new-store"
+    # No per-resource reads: every storage(name) call is a write
+    mock_proxmox.storage.return_value.get.assert_not_called()
+    puts = mock_proxmox.storage.return_value.put.call_args_list
+    assert mock.call(disable=0) in puts
+    assert mock.call(disable=1) in puts
+
+
+def test_apply_plan_runs_independent_resources_concurrently(
+    manager: UnifiedInfrastructureManager, mock_proxmox: Any
+) -> None:
+    """Test apply time stays flat as the number of resources grows."""
+    mock_proxmox.storage.get.return_value = []
+    config = InfrastructureConfig({
+        "pbs_storages": [_storage(f"store-{i}") for i in range(8)],
+    })
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_create(**params: Any) -> None:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    mock_proxmox.storage.create.side_effect = slow_create
+
+    plan = manager.plan(config, skip_validation=True)
+    start = time.monotonic()
+    results = manager.apply_plan(plan, max_workers=8)
+    elapsed = time.monotonic() - start
+
+    assert peak > 1
+    assert elapsed < 8 * 0.05
+    assert all(r.elapsed_sec >= 0.05 for r in results)
+    assert [r.resource_name for r in results] == [f"store-{i}" for i in range(8)]
+
+
+def test_apply_plan_reports_failures_per_resource(
+    manager: UnifiedInfrastructureManager, mock_proxmox: Any
+) -> None:
+    """Test one failing resource does not stop the others."""
+    mock_proxmox.storage.get.return_value = []
+    mock_proxmox.storage.create.side_effect = [Exception("API error"), None]
+    config = InfrastructureConfig({"pbs_storages": [_storage("a"), _storage("b")]})
+
+    results = manager.apply_plan(manager.plan(config, skip_validation=True), max_workers=1)
+
+    assert [(r.action, r.success) for r in results] == [("error", False), ("created", True)]
+    assert results[0].message == "API error"
+
+
+def test_apply_dry_run_makes_no_changes(
+    manager: UnifiedInfrastructureManager,
+    mock_proxmox: Any,
+    tmp_path: Path,
+    inventory: List[Dict[str, Any]],
+) -> None:
+    """Test dry run returns the plan without applying it."""
+    config_file = tmp_path / "homelab.yaml"
+    config_file.write_text(yaml.dump({"pbs_storages": [_storage("new-store")]}))
+
+    result = manager.apply(str(config_file), skip_validation=True, dry_run=True)
+
+    assert result["success"] is True
+    assert result["results"] == []
+    assert [c.action for c in result["plan"].changes] == [ChangeAction.CREATE]
+    mock_proxmox.storage.create.assert_not_called()
+
+
+def test_apply_aborts_on_validation_failure(
+    manager: UnifiedInfrastructureManager,
+    mock_proxmox: Any,
+    tmp_path: Path,
+    inventory: List[Dict[str, Any]],
+) -> None:
+    """Test apply refuses to change anything when validation fails."""
+    config_file = tmp_path / "homelab.yaml"
+    config_file.write_text(yaml.dump({"pbs_storages": [_storage("new-store")]}))
+    unreachable = dict(REACHABLE, reachable=False, dns_resolved=False, port_open=False, ssl_valid=False)
+
+    with mock.patch("homelab.pbs_connectivity.probe_target", return_value=unreachable):
+        result = manager.apply(str(config_file))
+
+    assert result["success"] is False
+    assert result["validation"]["valid"] is False
+    mock_proxmox.storage.create.assert_not_called()
+
+
+def test_reconcile_holds_back_only_invalid_resources(
+    manager: UnifiedInfrastructureManager, mock_proxmox: Any
+) -> None:
+    """Test one unreachable PBS server does not block storages on other servers."""
+    mock_proxmox.storage.get.return_value = []
+    config = InfrastructureConfig({
+        "pbs_storages": [_storage("good"), _storage("bad", server="down.maas")],
+    })
+    unreachable = dict(REACHABLE, reachable=False, dns_resolved=False, port_open=False, ssl_valid=False)
+
+    def probe(server: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return unreachable if server == "down.maas" else REACHABLE
+
+    with mock.patch("homelab.pbs_connectivity.probe_target", side_effect=probe):
+        results = manager.reconcile_infrastructure(config)
+
+    assert [(r.resource_name, r.action, r.success) for r in results] == [
+        ("good", "created", True),
+        ("bad", "validation_failed", False),
+    ]
+    assert "down.maas" in results[1].message
+    mock_proxmox.storage.create.assert_called_once()
+    assert mock_proxmox.storage.create.call_args.kwargs["storage"] == "good"
+
+
+def test_dry_run_does_not_probe_connectivity(
+    manager: UnifiedInfrastructureManager,
+    mock_proxmox: Any,
+    tmp_path: Path,
+    inventory: List[Dict[str, Any]],
+) -> None:
+    """Test dry runs only diff, as before the plan engine."""
+    config_file = tmp_path / "homelab.yaml"
+    config_file.write_text(yaml.dump({"pbs_storages": [_storage("new-store")]}))
+
+    with mock.patch("homelab.pbs_connectivity.probe_target") as probe:
+        result = manager.apply(str(config_file), dry_run=True)
+        manager.reconcile_infrastructure(manager.load_config(str(config_file)), dry_run=True)
+
+    probe.assert_not_called()
+    assert result["success"] is True
+    assert result["plan"].validation is None
+    mock_proxmox.storage.create.assert_not_called()
@@ -267,10 +267,10 @@ def test_setup_monitoring_for_all_instances_success(monkeypatch):
         assert "pve" in result
         assert "fun-bedbug" in result
         
-        # Verify secondary flag passed correctly
+        # Verify secondary flag passed correctly (instances run concurrently)
         calls = mock_setup.call_args_list
-        assert calls[0] == mock.call("http://pve:3001", False)
-        assert calls[1] == mock.call("http://funbedbug:3001", True)
+        assert mock.call("http://pve:3001", False) in calls
+        assert mock.call("http://funbedbug:3001", True) in calls
 
 
 def test_setup_monitoring_for_all_instances_no_env_vars(monkeypatch):
@@ -0,0 +1,186 @@
+"""Tests for uptime_kuma_monitors module."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+import yaml
+from uptime_kuma_api import MonitorType
+
+from homelab.uptime_kuma_monitors import DEFAULT_CONFIG_PATH, ManifestCache, generate_monitors
+
+CONFIG = {
+    "nodes": [
+        {"name": "pve", "ip": "192.168.4.122", "enabled": True},
+        {"name": "old-node", "ip": "192.168.4.99", "enabled": False},
+    ],
+    "monitoring": {
+        "uptime_kuma": {
+            "gitops_path": "gitops",
+            "monitors": [
+                {"name": "OPNsense Gateway", "type": "ping", "hostname": "192.168.4.1", "interval": 60},
+            ],
+        },
+    },
+}
+
+INGRESS = """\
+apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: ollama-ingress
+  namespace: ollama
+spec:
+  rules:
+  - host: ollama.app.homelab
+  - host: ollama.app.example.com
+"""
+
+INGRESS_ROUTE = """\
+apiVersion: traefik.io/v1alpha1
+kind: IngressRoute
+metadata:
+  name: homeassistant
+  namespace: kube-system
+spec:
+  entryPoints: [websecure]
+  routes:
+    - match: Host(`ha.example.com`) && PathPrefix(`/`)
+---
+apiVersion: traefik.io/v1alpha1
+kind: IngressRouteTCP
+metadata:
+  name: postgres
+spec:
+  routes:
+    - match: HostSNI(`*`)
+"""
+
+SERVICES = """\
+apiVersion: v1
+kind: Service
+metadata:
+  name: samba-lb
+  namespace: samba
+  annotations:
+    metallb.universe.tf/loadBalancerIPs: 192.168.4.120
+    homelab/uptime-kuma-name: Samba File Server
+spec:
+  type: LoadBalancer
+  ports:
+  - port: 445
+  - port: 139
+---
+apiVersion: v1
+kind: Service
+metadata:
+  name: webrtc-udp
+  namespace: frigate
+  annotations:
+    metallb.universe.tf/loadBalancerIPs: 192.168.4.84
+spec:
+  type: LoadBalancer
+  ports:
+  - port: 8555
+    protocol: UDP
+---
+apiVersion: v1
+kind: Service
+metadata:
+  name: internal
+  annotations:
+    metallb.universe.tf/loadBalancerIPs: 192.168.4.86
+    homelab/uptime-kuma: "false"
+spec:
+  type: LoadBalancer
+  ports:
+  - port: 80
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "cluster.yaml"
+    path.write_text(yaml.dump(CONFIG))
+    apps = tmp_path / "gitops" / "apps"
+    apps.mkdir(parents=True)
+    (apps / "ingress.yaml").write_text(INGRESS)
+    (apps / "ingressroute.yaml").write_text(INGRESS_ROUTE)
+    (apps / "service.yml").write_text(SERVICES)
+    return path
+
+
+def _by_name(monitors):
+    return {m["name"]: m for m in monitors}
+
+
+def test_generate_monitors(config_file):
+    monitors = _by_name(generate_monitors(config_file, cache=ManifestCache()))
+
+    assert sorted(monitors) == [
+        "Ingress ha.example.com",
+        "Ingress ollama.app.homelab",
+        "OPNsense Gateway",
+        "Proxmox pve Node",
+        "Samba File Server",
+    ]
+    assert monitors["Ingress ollama.app.homelab"]["url"] == "http://ollama.app.homelab"
+    assert monitors["Ingress ha.example.com"]["url"] == "https://ha.example.com"
+    assert monitors["Samba File Server"]["hostname"] == "192.168.4.120"
+    assert monitors["Samba File Server"]["port"] == 445
+    assert monitors["Samba File Server"]["description"] == "samba/samba-lb via MetalLB LoadBalancer"
+    assert monitors["Proxmox pve Node"]["hostname"] == "192.168.4.122"
+    assert monitors["OPNsense Gateway"]["type"] == MonitorType.PING
+
+
+def test_secondary_instance_timing(config_file):
+    primary = _by_name(generate_monitors(config_file, cache=ManifestCache()))
+    secondary = _by_name(generate_monitors(config_file, is_secondary_instance=True, cache=ManifestCache()))
+
+    assert primary["OPNsense Gateway"]["interval"] == 60
+    assert primary["OPNsense Gateway"]["retryInterval"] == 60
+    assert primary["Ingress ollama.app.homelab"]["interval"] == 300
+    assert primary["Ingress ollama.app.homelab"]["retryInterval"] == 120
+    assert secondary["OPNsense Gateway (Secondary)"]["interval"] == 120
+    assert secondary["OPNsense Gateway (Secondary)"]["retryInterval"] == 600
+    assert secondary["Ingress ollama.app.homelab (Secondary)"]["retryInterval"] == 1200
+
+
+def test_manifest_cache_rereads_only_changed_files(config_file):
+    cache = ManifestCache()
+    generate_monitors(config_file, cache=cache)
+
+    ingress = config_file.parent / "gitops" / "apps" / "ingress.yaml"
+    ingress.write_text(INGRESS.replace("ollama.app.homelab", "llm.app.homelab"))
+    os.utime(ingress, ns=(0, ingress.stat().st_mtime_ns + 1_000_000_000))
+
+    with mock.patch("homelab.uptime_kuma_monitors.yaml.safe_load_all", wraps=yaml.safe_load_all) as load:
+        monitors = _by_name(generate_monitors(config_file, cache=cache))
+
+    assert load.call_count == 1
+    assert "Ingress llm.app.homelab" in monitors
+
+
+def test_missing_gitops_directory(tmp_path):
+    config = dict(CONFIG, monitoring={"uptime_kuma": {"gitops_path": "nowhere"}})
+    path = tmp_path / "cluster.yaml"
+    path.write_text(yaml.dump(config))
+
+    assert [m["name"] for m in generate_monitors(path, cache=ManifestCache())] == ["Proxmox pve Node"]
+
+
+def test_shared_cache_across_threads(config_file):
+    cache = ManifestCache()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: generate_monitors(config_file, cache=cache), range(8)))
+
+    assert all(result == results[0] for result in results)
+
+
+def test_repo_gitops_keeps_legacy_monitor_names():
+    """Monitors that predate generation keep their names, so syncs update rather than duplicate them."""
+    names = {m["name"] for m in generate_monitors(DEFAULT_CONFIG_PATH, cache=ManifestCache())}
+
+    assert {"Ollama GPU Server", "Stable Diffusion WebUI", "Samba File Server"} <= names
+    assert not names & {"Ingress ollama.app.homelab", "LoadBalancer samba/samba-lb"}
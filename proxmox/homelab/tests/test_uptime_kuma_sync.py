@@ -0,0 +1,94 @@
+"""Tests for uptime_kuma_sync module."""
+
+import threading
+from unittest.mock import MagicMock
+
+from uptime_kuma_api import MonitorType
+
+from homelab.uptime_kuma_sync import apply_sync, diff_monitor, plan_sync, sync_monitors
+
+DESIRED = [
+    {"name": "Gateway", "type": MonitorType.PING, "hostname": "192.168.4.1", "interval": 60},
+    {"name": "MAAS", "type": MonitorType.HTTP, "url": "http://192.168.4.53:5240/MAAS/", "interval": 300},
+    {"name": "Samba", "type": MonitorType.PORT, "hostname": "192.168.4.120", "port": 445},
+]
+
+EXISTING = [
+    {"id": 1, "name": "Gateway", "type": MonitorType.PING, "hostname": "192.168.4.1", "interval": 60},
+    {"id": 2, "name": "MAAS", "type": MonitorType.HTTP, "url": "http://192.168.4.53:5240/MAAS/", "interval": 60},
+    {"id": 3, "name": "Old Monitor", "type": MonitorType.PING, "hostname": "10.0.0.1"},
+]
+
+
+def test_plan_sync():
+    changes = plan_sync(DESIRED, EXISTING)
+
+    assert [(c.name, c.action) for c in changes] == [
+        ("Gateway", "unchanged"),
+        ("MAAS", "update"),
+        ("Samba", "create"),
+    ]
+    assert changes[1].monitor_id == 2
+    assert changes[1].diff == {"interval": (60, 300)}
+    assert "name" not in changes[2].config
+
+
+def test_plan_sync_prune_deletes_unwanted():
+    changes = plan_sync(DESIRED, EXISTING, prune=True)
+
+    assert (changes[-1].name, changes[-1].action, changes[-1].monitor_id) == ("Old Monitor", "delete", 3)
+
+
+def test_diff_compares_enum_values():
+    assert diff_monitor({"type": MonitorType.PING}, {"type": "ping"}) == {}
+    assert diff_monitor({"type": MonitorType.HTTP}, {"type": "ping"}) == {"type": ("ping", MonitorType.HTTP)}
+
+
+def test_sync_fetches_monitor_list_once():
+    api = MagicMock()
+    api.get_monitors.return_value = EXISTING
+    api.add_monitor.return_value = {"monitorID": 4}
+
+    results = sync_monitors(api, DESIRED, prune=True)
+
+    api.get_monitors.assert_called_once()
+    api.add_monitor.assert_called_once_with(
+        name="Samba", type=MonitorType.PORT, hostname="192.168.4.120", port=445,
+    )
+    api.edit_monitor.assert_called_once_with(
+        2, type=MonitorType.HTTP, url="http://192.168.4.53:5240/MAAS/", interval=300,
+    )
+    api.delete_monitor.assert_called_once_with(3)
+    assert [(r["name"], r["status"], r["monitor_id"]) for r in results] == [
+        ("Gateway", "up_to_date", 1),
+        ("MAAS", "updated", 2),
+        ("Samba", "created", 4),
+        ("Old Monitor", "deleted", 3),
+    ]
+
+
+def test_apply_sync_pipelines_calls():
+    desired = [{"name": f"Host {i}", "type": MonitorType.PING, "hostname": f"10.0.0.{i}"} for i in range(1, 5)]
+    barrier = threading.Barrier(4, timeout=5)
+
+    def add_monitor(**config):
+        barrier.wait()  # Times out unless all four calls are in flight together
+        return {"monitorID": int(config["hostname"].rsplit(".", 1)[1])}
+
+    api = MagicMock()
+    api.add_monitor.side_effect = add_monitor
+
+    results = apply_sync(api, plan_sync(desired, []), batch_size=4)
+
+    assert [r["monitor_id"] for r in results] == [1, 2, 3, 4]
+
+
+def test_apply_sync_reports_failures():
+    api = MagicMock()
+    api.add_monitor.return_value = {"error": "Creation failed"}
+    api.edit_monitor.side_effect = Exception("monitor does not exist")
+    api.delete_monitor.side_effect = Exception("timeout")
+
+    results = apply_sync(api, plan_sync(DESIRED, EXISTING, prune=True))
+
+    assert [r["status"] for r in results] == ["up_to_date", "update_failed", "failed", "delete_failed"]
@@ -6,6 +6,7 @@ from unittest import mock
 
 import pytest
 
+from homelab.config import Config
 from homelab.vm_manager import VMManager
 from homelab.health_checker import VMHealthStatus
 
@@ -515,3 +516,85 @@ def test_create_or_update_vm_unhealthy_but_no_delete(
 
     # Should NOT have tried to create new VM
     mock_proxmox.nodes.return_value.qemu.create.assert_not_called()
+
+
+@mock.patch('homelab.vm_manager.GoldenImageCache')
+@mock.patch('homelab.vm_manager.VMManager._resize_disk_via_cli')
+@mock.patch('homelab.vm_manager.VMManager._import_disk_via_cli')
+@mock.patch('homelab.vm_manager.VMManager.get_next_available_vmid')
+@mock.patch('homelab.vm_manager.VMManager.vm_exists')
+@mock.patch('homelab.vm_manager.ResourceManager.calculate_vm_resources')
+@mock.patch('homelab.vm_manager.ProxmoxClient')
+@mock.patch('homelab.vm_manager.Config.get_nodes')
+@mock.patch('homelab.vm_manager.Config.get_network_ifaces_for')
+@mock.patch('time.sleep')
+def test_create_or_update_vm_clones_golden_image(
+    mock_sleep, mock_get_ifaces, mock_get_nodes, mock_client_class,
+    mock_calc_resources, mock_vm_exists, mock_get_vmid,
+    mock_import_disk, mock_resize_disk, mock_cache_class, mock_env, monkeypatch
+):
+    """Test create_or_update_vm boots from a golden image clone when enabled."""
+    monkeypatch.setenv("GOLDEN_IMAGE_CACHE", "true")
+    mock_get_nodes.return_value = [{"name": "test-node", "img_storage": "local-zfs"}]
+    mock_get_ifaces.return_value = ["vmbr0"]
+    mock_vm_exists.return_value = None
+    mock_get_vmid.return_value = 108
+    mock_calc_resources.return_value = (4, 8 * 1024**3)
+
+    mock_client = mock.MagicMock()
+    mock_client_class.return_value = mock_client
+    mock_proxmox = mock_client.proxmox
+    mock_proxmox.nodes.return_value.qemu.return_value.status.current.get.return_value = {"status": "running"}
+    mock_proxmox.storage.return_value.get.return_value = {"type": "zfspool", "pool": "tank/vms"}
+
+    cache = mock_cache_class.return_value.__enter__.return_value
+    cache.clone.return_value = "local-zfs:vm-108-disk-0"
+
+    VMManager.create_or_update_vm()
+
+    mock_proxmox.storage.assert_called_once_with("local-zfs")
+    mock_cache_class.assert_called_once_with("test-node", storage="local-zfs", dataset="tank/vms")
+    cache.ensure.assert_called_once_with(f"/var/lib/vz/template/iso/{Config.ISO_NAME}", "200G")
+    cache.clone.assert_called_once_with(cache.ensure.return_value, 108)
+    mock_import_disk.assert_not_called()
+    mock_resize_disk.assert_not_called()
+    config_calls = mock_proxmox.nodes.return_value.qemu.return_value.config.post.call_args_list
+    assert config_calls[0][1]["scsi0"] == "local-zfs:vm-108-disk-0"
+
+
+@mock.patch('homelab.vm_manager.GoldenImageCache')
+@mock.patch('homelab.vm_manager.VMManager._resize_disk_via_cli')
+@mock.patch('homelab.vm_manager.VMManager._import_disk_via_cli')
+@mock.patch('homelab.vm_manager.VMManager.get_next_available_vmid')
+@mock.patch('homelab.vm_manager.VMManager.vm_exists')
+@mock.patch('homelab.vm_manager.ResourceManager.calculate_vm_resources')
+@mock.patch('homelab.vm_manager.ProxmoxClient')
+@mock.patch('homelab.vm_manager.Config.get_nodes')
+@mock.patch('homelab.vm_manager.Config.get_network_ifaces_for')
+@mock.patch('time.sleep')
+def test_create_or_update_vm_skips_golden_image_on_non_zfs_storage(
+    mock_sleep, mock_get_ifaces, mock_get_nodes, mock_client_class,
+    mock_calc_resources, mock_vm_exists, mock_get_vmid,
+    mock_import_disk, mock_resize_disk, mock_cache_class, mock_env, monkeypatch
+):
+    """Test create_or_update_vm imports the image directly when storage is not ZFS."""
+    monkeypatch.setenv("GOLDEN_IMAGE_CACHE", "true")
+    mock_get_nodes.return_value = [{"name": "test-node", "img_storage": "local-lvm"}]
+    mock_get_ifaces.return_value = ["vmbr0"]
+    mock_vm_exists.return_value = None
+    mock_get_vmid.return_value = 108
+    mock_calc_resources.return_value = (4, 8 * 1024**3)
+
+    mock_client = mock.MagicMock()
+    mock_client_class.return_value = mock_client
+    mock_proxmox = mock_client.proxmox
+    mock_proxmox.nodes.return_value.qemu.return_value.status.current.get.return_value = {"status": "running"}
+    mock_proxmox.storage.return_value.get.return_value = {"type": "lvmthin", "thinpool": "data"}
+
+    VMManager.create_or_update_vm()
+
+    mock_cache_class.assert_not_called()
+    mock_import_disk.assert_called_once()
+    mock_resize_disk.assert_called_once()
+    config_calls = mock_proxmox.nodes.return_value.qemu.return_value.config.post.call_args_list
+    assert config_calls[0][1]["scsi0"] == "local-lvm:vm-108-disk-0"
@@ -1,5 +1,7 @@
 """Tests for zfs_exporter_manager module."""
 
+import base64
+import json
 import os
 import tempfile
 from pathlib import Path
@@ -9,6 +11,7 @@ import pytest
 import yaml
 
 from homelab.zfs_exporter_manager import (
+    ReleaseBinary,
     ZfsExporterManager,
     apply_from_config,
     get_status_from_config,
@@ -89,6 +92,15 @@ def _mock_exec(ssh_client, responses):
     ssh_client.exec_command.side_effect = side_effects
 
 
+def _probe_response(facts):
+    """Build the single (stdout, stderr, exit_code) reply of a host probe."""
+    document = {
+        name: {"rc": code, "out": base64.b64encode(out.encode()).decode()}
+        for name, (out, code) in facts.items()
+    }
+    return (json.dumps(document), "", 0)
+
+
 # --- Config loading tests ---
 
 
@@ -233,33 +245,45 @@ def test_get_version_not_installed(manager, mock_ssh):
 
 
 def test_get_status_running(manager, mock_ssh):
-    """Test get_status for a running exporter."""
-    _mock_exec(mock_ssh, [
-        ("installed", "", 0),          # is_installed
-        ("2.3.11", "", 0),             # get_version
-        ("active", "", 0),             # is_running
-        ("enabled", "", 0),            # is_enabled
-        ("200", "", 0),                # curl metrics check
-        ("rpool", "", 0),              # zpool list
-        ('zfs_pool_health{pool="rpool"} 0', "", 0),  # curl pool health
-    ])
+    """Test get_status for a running exporter in one SSH round trip."""
+    _mock_exec(mock_ssh, [_probe_response({
+        "installed": ("installed", 0),
+        "version": ("zfs_exporter, version 2.3.11 (branch: HEAD)", 0),
+        "active": ("active", 0),
+        "enabled": ("enabled", 0),
+        "metrics": ("200", 0),
+        "pools": ("rpool\ntank", 0),
+        "pool_health": ('zfs_pool_health{pool="rpool"} 0', 0),
+    })])
     with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
         status = manager.get_status()
     assert status["hostname"] == "still-fawn"
     assert status["installed"] is True
     assert status["running"] is True
+    assert status["version"] == "2.3.11"
     assert status["metrics_available"] is True
-    assert "rpool" in status["pools"]
+    assert status["pools"] == ["rpool", "tank"]
+    assert status["pool_health_raw"] == 'zfs_pool_health{pool="rpool"} 0'
+    assert mock_ssh.exec_command.call_count == 1
 
 
 def test_get_status_not_installed(manager, mock_ssh):
     """Test get_status when exporter is not installed."""
-    _mock_exec(mock_ssh, [("", "", 1)])  # is_installed returns false
+    _mock_exec(mock_ssh, [_probe_response({
+        "installed": ("", 1),
+        "version": ("sh: 1: /usr/local/bin/zfs_exporter: not found", 127),
+        "active": ("inactive", 3),
+        "enabled": ("", 1),
+        "metrics": ("000", 7),
+        "pools": ("rpool", 0),
+        "pool_health": ("", 1),
+    })])
     with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
         status = manager.get_status()
     assert status["installed"] is False
     assert status["running"] is False
     assert status["metrics_available"] is False
+    assert "error" not in status
 
 
 def test_get_status_ssh_error(manager, mock_ssh):
@@ -307,6 +331,111 @@ def test_install_extract_failure(manager, mock_ssh):
     assert "Extract failed" in result["error"]
 
 
+@pytest.fixture
+def controller_manager(manager, tmp_path):
+    """Manager in controller distribution mode with a prefetched release binary."""
+    binary = tmp_path / "zfs_exporter"
+    binary.write_bytes(b"binary")
+    manager.distribution = "controller"
+    manager.release = mock.MagicMock()
+    manager.release.get.return_value = (binary, "abc123")
+    return manager
+
+
+def test_push_binary_skips_matching_hash(controller_manager, mock_ssh):
+    """Test the binary is not pushed when the host already has the same hash."""
+    _mock_exec(mock_ssh, [("abc123  /usr/local/bin/zfs_exporter", "", 0)])
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        result = controller_manager.install()
+
+    assert result["status"] == "unchanged"
+    mock_ssh.open_sftp.assert_not_called()
+
+
+def test_push_binary_uploads_and_renames(controller_manager, mock_ssh):
+    """Test a missing or outdated binary is uploaded over SFTP and moved into place."""
+    _mock_exec(mock_ssh, [
+        ("", "", 1),   # sha256sum: binary missing
+        ("", "", 0),   # chmod + mv
+    ])
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        result = controller_manager.install()
+
+    assert result["status"] == "installed"
+    local_path = str(controller_manager.release.get.return_value[0])
+    mock_ssh.open_sftp.return_value.put.assert_called_once_with(
+        local_path, "/usr/local/bin/zfs_exporter.partial"
+    )
+    assert "mv -f /usr/local/bin/zfs_exporter.partial /usr/local/bin/zfs_exporter" in (
+        mock_ssh.exec_command.call_args_list[1][0][0]
+    )
+
+
+def test_deploy_controller_unchanged_binary(controller_manager, mock_ssh):
+    """Test deploy in controller mode reports a matching binary as already installed."""
+    with mock.patch.object(controller_manager, "install", return_value={"status": "unchanged"}):
+        with mock.patch.object(controller_manager, "configure", return_value={"status": "unchanged"}):
+            with mock.patch.object(controller_manager, "enable_and_start", return_value={"status": "running"}) as start:
+                with mock.patch.object(controller_manager, "get_status", return_value={
+                    "running": True,
+                    "metrics_available": True,
+                    "version": "2.3.11",
+                    "pools": ["rpool"],
+                }):
+                    result = controller_manager.deploy()
+
+    start.assert_called_once_with(restart=False)
+    assert result["actions"] == ["already_installed", "config_unchanged", "already_running"]
+
+
+def test_release_binary_fetches_once(tmp_path):
+    """Test every get() after the first reuses the same download."""
+    cache = mock.MagicMock()
+    binary = tmp_path / "zfs_exporter"
+    binary.write_bytes(b"binary")
+    cache.cached_checksum.return_value = None
+    cache.fetch_checksum.return_value = "feed"
+    cache.extract.return_value = binary
+
+    release = ReleaseBinary("2.3.11", cache=cache)
+    first = release.get()
+    second = release.get()
+
+    assert first == second
+    cache.fetch.assert_called_once_with(
+        "https://github.com/pdf/zfs_exporter/releases/download/"
+        "v2.3.11/zfs_exporter-2.3.11.linux-amd64.tar.gz",
+        sha256="feed",
+    )
+    cache.extract.assert_called_once_with(cache.fetch.return_value, "zfs_exporter", archive_sha256="feed")
+
+
+def test_release_binary_prefers_pinned_then_cached_checksum(tmp_path):
+    """Test the checksums file is only downloaded when no digest is known locally."""
+    binary = tmp_path / "zfs_exporter"
+    binary.write_bytes(b"binary")
+
+    cache = mock.MagicMock()
+    cache.extract.return_value = binary
+    cache.cached_checksum.return_value = "cafe"
+    ReleaseBinary("2.3.11", cache=cache).get()
+    cache.fetch_checksum.assert_not_called()
+    assert cache.fetch.call_args.kwargs["sha256"] == "cafe"
+
+    ReleaseBinary("2.3.11", sha256="beef", cache=cache).get()
+    cache.fetch_checksum.assert_not_called()
+    assert cache.fetch.call_args.kwargs["sha256"] == "beef"
+
+
+def test_manager_invalid_distribution():
+    """Test an unknown distribution mode is rejected."""
+    config = yaml.safe_load(yaml.dump(SAMPLE_CONFIG))
+    config["monitoring"]["zfs_exporter"]["distribution"] = "torrent"
+
+    with pytest.raises(ValueError, match="Invalid zfs_exporter distribution"):
+        ZfsExporterManager("still-fawn", config=config)
+
+
 # --- configure tests ---
 
 
@@ -321,6 +450,28 @@ def test_configure_success(manager, mock_ssh):
     assert result["status"] == "configured"
 
 
+def test_configure_unchanged_skips_daemon_reload(manager, mock_ssh):
+    """Test configure does not reload systemd when the unit file already matches."""
+    _mock_exec(mock_ssh, [("unchanged", "", 0)])
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        result = manager.configure()
+    assert result["status"] == "unchanged"
+    assert mock_ssh.exec_command.call_count == 1
+    assert "sha256sum" in mock_ssh.exec_command.call_args[0][0]
+
+
+def test_configure_pending_reloads_again(manager, mock_ssh):
+    """Test a unit written by a run that never reloaded systemd is reloaded."""
+    _mock_exec(mock_ssh, [
+        ("pending", "", 0),  # unit file matches, but its marker is still there
+        ("", "", 0),  # daemon-reload
+    ])
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        result = manager.configure()
+    assert result["status"] == "configured"
+    assert mock_ssh.exec_command.call_args[0][0] == "systemctl daemon-reload"
+
+
 def test_configure_write_failure(manager, mock_ssh):
     """Test configure fails on write error."""
     _mock_exec(mock_ssh, [("", "Permission denied", 1)])
@@ -343,6 +494,16 @@ def test_enable_and_start_success(manager, mock_ssh):
     assert result["status"] == "started"
 
 
+def test_enable_and_start_without_restart(manager, mock_ssh):
+    """Test enable_and_start leaves a running service alone when restart=False."""
+    _mock_exec(mock_ssh, [("running", "", 0)])
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        result = manager.enable_and_start(restart=False)
+    assert result["status"] == "running"
+    assert mock_ssh.exec_command.call_count == 1
+    assert "restart" not in mock_ssh.exec_command.call_args[0][0]
+
+
 def test_enable_and_start_enable_failure(manager, mock_ssh):
     """Test enable_and_start fails on enable error."""
     _mock_exec(mock_ssh, [("", "Unit not found", 5)])
@@ -395,6 +556,48 @@ def test_deploy_already_installed(manager, mock_ssh):
     assert "already_installed" in result["actions"]
 
 
+def test_deploy_unchanged_does_not_restart(manager, mock_ssh):
+    """Test deploy skips the restart when nothing changed on the host."""
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        with mock.patch.object(manager, "is_installed", return_value=True):
+            with mock.patch.object(manager, "configure", return_value={"status": "unchanged"}):
+                with mock.patch.object(manager, "enable_and_start", return_value={"status": "running"}) as start:
+                    with mock.patch.object(manager, "get_status", return_value={
+                        "running": True,
+                        "metrics_available": True,
+                        "version": "2.3.11",
+                        "pools": ["rpool"],
+                    }):
+                        result = manager.deploy()
+
+    start.assert_called_once_with(restart=False)
+    assert result["status"] == "success"
+    assert result["actions"] == ["already_installed", "config_unchanged", "already_running"]
+
+
+def test_deploy_clears_pending_marker_only_after_restart(manager, mock_ssh):
+    """Test the unit is marked applied only once the service restarted with it."""
+    status = {"running": True, "metrics_available": True, "version": "2.3.11", "pools": ["rpool"]}
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        with mock.patch.object(manager, "is_installed", return_value=True):
+            with mock.patch.object(manager, "configure", return_value={"status": "configured"}):
+                with mock.patch.object(manager, "get_status", return_value=status):
+                    with mock.patch.object(manager, "enable_and_start", return_value={
+                        "status": "failed", "error": "systemctl restart failed"
+                    }):
+                        failed = manager.deploy()
+                    assert mock_ssh.exec_command.call_count == 0
+
+                    with mock.patch.object(manager, "enable_and_start", return_value={"status": "started"}):
+                        result = manager.deploy()
+
+    assert failed["status"] == "failed"
+    assert result["status"] == "success"
+    mock_ssh.exec_command.assert_called_once_with(
+        "rm -f /run/homelab-rollout/etc_systemd_system_zfs-exporter.service.pending"
+    )
+
+
 def test_deploy_install_failure(manager, mock_ssh):
     """Test deploy fails when install fails."""
     with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
@@ -490,6 +693,45 @@ def test_apply_from_config(config_file, mock_ssh):
     assert all(r["status"] == "success" for r in results)
 
 
+def test_apply_from_config_canary_failure_stops_rollout(config_file, mock_ssh):
+    """Test a failed canary host stops the rollout to the other hosts."""
+    deployed = []
+
+    def deploy_side_effect(self):
+        deployed.append(self.hostname)
+        return {"hostname": self.hostname, "status": "partial", "actions": []}
+
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        with mock.patch(
+            "homelab.zfs_exporter_manager.ZfsExporterManager.deploy",
+            deploy_side_effect,
+        ):
+            results = apply_from_config(config_file, max_parallel=3, canary=True)
+
+    assert deployed == ["still-fawn"]
+    assert [r["status"] for r in results] == ["partial", "skipped", "skipped"]
+    assert all("elapsed_sec" in r for r in results)
+
+
+def test_apply_from_config_shares_release(config_file, mock_ssh):
+    """Test every host in a rollout uses the same controller-side release."""
+    releases = []
+
+    def deploy_side_effect(self):
+        releases.append(self.release)
+        return {"hostname": self.hostname, "status": "success", "actions": []}
+
+    with mock.patch("socket.gethostbyname", return_value="192.168.4.17"):
+        with mock.patch(
+            "homelab.zfs_exporter_manager.ZfsExporterManager.deploy",
+            deploy_side_effect,
+        ):
+            apply_from_config(config_file, max_parallel=3)
+
+    assert len(releases) == 3
+    assert len({id(r) for r in releases}) == 1
+
+
 def test_apply_from_config_disabled(config_file):
     """Test apply_from_config skips when disabled."""
     config = SAMPLE_CONFIG.copy()
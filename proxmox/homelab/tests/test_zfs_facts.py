@@ -0,0 +1,187 @@
+"""Tests for zfs_facts module."""
+
+import base64
+import json
+import textwrap
+
+from homelab.zfs_facts import (
+    build_zfs_facts,
+    collect_zfs_facts,
+    parse_zpool_status,
+    parse_zpool_status_text,
+    zfs_fact_checks,
+)
+
+DISK_A = "ata-DISK_A"
+DISK_B = "ata-DISK_B"
+
+ZPOOL_JSON = {
+    "output_version": {"command": "zpool status", "vers_major": 0, "vers_minor": 1},
+    "pools": {
+        "rpool": {
+            "name": "rpool",
+            "state": "ONLINE",
+            "scan_stats": {"function": "RESILVER", "state": "SCANNING", "examined": "1000", "to_examine": "4000"},
+            "vdevs": {
+                "rpool": {
+                    "name": "rpool",
+                    "vdev_type": "root",
+                    "state": "ONLINE",
+                    "vdevs": {
+                        "mirror-0": {
+                            "name": "mirror-0",
+                            "vdev_type": "mirror",
+                            "state": "ONLINE",
+                            "vdevs": {
+                                f"/dev/disk/by-id/{DISK_A}-part3": {
+                                    "name": f"/dev/disk/by-id/{DISK_A}-part3",
+                                    "vdev_type": "disk",
+                                    "path": f"/dev/disk/by-id/{DISK_A}-part3",
+                                    "state": "ONLINE",
+                                },
+                                "/dev/sdb3": {
+                                    "name": "/dev/sdb3",
+                                    "vdev_type": "disk",
+                                    "path": "/dev/sdb3",
+                                    "state": "ONLINE",
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+            "logs": {
+                "/dev/nvme0n1p1": {"name": "/dev/nvme0n1p1", "vdev_type": "disk", "path": "/dev/nvme0n1p1"},
+            },
+        },
+    },
+}
+
+ZPOOL_TEXT_TWO_POOLS = textwrap.dedent("""\
+      pool: rpool
+     state: ONLINE
+      scan: scrub in progress since Sun Jan 12 00:24:01 2026
+    config:
+
+    \tNAME                                   STATE     READ WRITE CKSUM
+    \trpool                                  ONLINE       0     0     0
+    \t  /dev/disk/by-id/ata-DISK_A-part3     ONLINE       0     0     0
+
+    errors: No known data errors
+
+      pool: tank
+     state: DEGRADED
+      scan: none requested
+    config:
+
+    \tNAME           STATE     READ WRITE CKSUM
+    \ttank           DEGRADED     0     0     0
+    \t  raidz1-0     DEGRADED     0     0     0
+    \t    /dev/sdc1  ONLINE       0     0     0
+    \t    /dev/sdd1  FAULTED      0     0     0
+    \tcache
+    \t  /dev/nvme0n1p2  ONLINE    0     0     0
+
+    errors: No known data errors
+""")
+
+LSBLK = json.dumps({"blockdevices": [
+    {"name": "sda", "path": "/dev/sda", "size": 500, "type": "disk", "children": [
+        {"name": "sda3", "path": "/dev/sda3", "size": 400, "type": "part"},
+    ]},
+    {"name": "sdb", "path": "/dev/sdb", "size": 500, "type": "disk", "children": [
+        {"name": "sdb3", "path": "/dev/sdb3", "size": 400, "type": "part"},
+    ]},
+]})
+
+
+def _results(**overrides):
+    results = {
+        "zpool": (json.dumps(ZPOOL_JSON), 0),
+        "lsblk": (LSBLK, 0),
+        "links": (f"{DISK_A} /dev/sda\n{DISK_B} /dev/sdb", 0),
+        "blkid": ("/dev/sda3\n/dev/sdb3", 0),
+        "tools": ("sgdisk\nzpool", 0),
+        "boot": ("", 2),
+        "sgdisk_0": ("Disk identifier (GUID): AAAA\n   1  2048  4095  1.0 MiB  EF02", 0),
+        "sgdisk_1": ("Disk identifier (GUID): BBBB\n   1  2048  4095  1.0 MiB  EF02", 0),
+    }
+    results.update(overrides)
+    return results
+
+
+def test_parse_zpool_status_json():
+    pools = parse_zpool_status(json.dumps(ZPOOL_JSON))
+    rpool = pools["rpool"]
+    assert rpool.is_mirror is True
+    assert rpool.scan == "resilver in progress"
+    assert rpool.scan_stats["to_examine"] == "4000"
+    assert rpool.leaf_paths() == [f"/dev/disk/by-id/{DISK_A}-part3", "/dev/sdb3", "/dev/nvme0n1p1"]
+
+
+def test_parse_zpool_status_text_multiple_pools():
+    pools = parse_zpool_status_text(ZPOOL_TEXT_TWO_POOLS)
+    assert set(pools) == {"rpool", "tank"}
+    assert pools["rpool"].topology() == {
+        "state": "ONLINE",
+        "is_mirror": False,
+        "vdev_disks": [f"{DISK_A}-part3"],
+        "scan": "scrub in progress since Sun Jan 12 00:24:01 2026",
+    }
+    tank = pools["tank"]
+    assert [(v.name, v.vdev_type) for v in tank.vdevs] == [("raidz1-0", "raidz1"), ("cache", "cache")]
+    assert [leaf.state for leaf in tank.vdevs[0].leaves()] == ["ONLINE", "FAULTED"]
+
+
+def test_build_zfs_facts_indexes_disks():
+    facts = build_zfs_facts([DISK_A, DISK_B], _results())
+    assert facts.disk(DISK_A).device == "/dev/sda"
+    assert facts.disk(DISK_A).size_bytes == 500
+    assert facts.disk(DISK_B).partitions == ["/dev/sdb3"]
+    assert facts.tools == {"sgdisk": True, "proxmox-boot-tool": False, "zpool": True}
+    assert facts.boot_status is None
+    assert facts.partitions_match(DISK_A, DISK_B) is True
+    assert facts.guids_differ(DISK_A, DISK_B) is True
+
+
+def test_disk_in_any_pool_by_id_and_kernel_path():
+    facts = build_zfs_facts([DISK_A, DISK_B], _results())
+    # DISK_A is in the pool by its by-id path, DISK_B by its kernel partition
+    assert facts.disk_in_any_pool(DISK_A) is True
+    assert facts.disk_in_any_pool(DISK_B) is True
+    assert facts.disk_in_any_pool("ata-OTHER") is False
+    assert facts.disk_in_pool(DISK_B, "rpool") is True
+    assert facts.disk_in_pool(DISK_B, "tank") is False
+
+
+def test_missing_disk_and_pool():
+    facts = build_zfs_facts([DISK_A, DISK_B], _results(zpool=("", 1), links=(f"{DISK_A} /dev/sda", 0)))
+    assert facts.pools == {}
+    assert facts.pool_topology("rpool")["state"] == "MISSING"
+    assert facts.disk(DISK_B).exists is False
+    assert facts.disk(DISK_B).partition_table == ""
+    assert facts.disk_has_zfs_label(DISK_A) is True
+    assert facts.disk_has_zfs_label(DISK_B) is False
+
+
+def test_collect_zfs_facts_single_exec():
+    commands = []
+
+    def execute(command):
+        commands.append(command)
+        document = {
+            name: {"rc": rc, "out": base64.b64encode(out.encode()).decode()}
+            for name, (out, rc) in _results().items()
+        }
+        return json.dumps(document), "", 0
+
+    facts = collect_zfs_facts(execute, [DISK_A, DISK_B, DISK_A])
+    assert len(commands) == 1
+    assert set(facts.disks) == {DISK_A, DISK_B}
+    assert facts.pools["rpool"].is_mirror is True
+
+
+def test_zfs_fact_checks_quotes_disk_ids():
+    checks = zfs_fact_checks(["ata-X; rm -rf /"])
+    assert "'ata-X; rm -rf /'" in checks["links"]
+    assert checks["sgdisk_0"] == "sgdisk -p /dev/disk/by-id/'ata-X; rm -rf /'"
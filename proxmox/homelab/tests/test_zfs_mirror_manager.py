@@ -1,13 +1,17 @@
 """Tests for zfs_mirror_manager module."""
 
+import base64
+import json
 import textwrap
+import threading
 from pathlib import Path
 from unittest import mock
 
 import pytest
 import yaml
 
-from homelab.zfs_mirror_manager import ZfsMirrorManager, load_cluster_config
+from homelab.resilver_monitor import ScanProgress
+from homelab.zfs_mirror_manager import ZfsMirrorManager, _fleet_preflight, apply_fleet, load_cluster_config
 
 
 # -- fixtures --
@@ -136,6 +140,34 @@ def _make_exec_return(stdout_text: str, stderr_text: str = "", rc: int = 0):
     return (None, stdout, stderr)
 
 
+LSBLK_JSON = json.dumps({"blockdevices": [
+    {"name": "sda", "path": "/dev/sda", "size": 2000398934016, "type": "disk", "children": [
+        {"name": f"sda{n}", "path": f"/dev/sda{n}", "size": 1, "type": "part"} for n in (1, 2, 3)
+    ]},
+    {"name": "sdb", "path": "/dev/sdb", "size": 2000398934016, "type": "disk"},
+]})
+
+
+def _probe_return(zpool=(ZPOOL_STATUS_SINGLE, 0), new_table=SGDISK_NEW_EMPTY, **overrides):
+    """exec_command reply to the batched fact probe (see zfs_facts)."""
+    facts = {
+        "zpool": zpool,
+        "lsblk": (LSBLK_JSON, 0),
+        "links": (f"{EXISTING_DISK} /dev/sda\n{NEW_DISK} /dev/sdb", 0),
+        "blkid": ("/dev/sda3", 0),
+        "tools": ("sgdisk\nproxmox-boot-tool\nzpool", 0),
+        "boot": (BOOT_TOOL_STATUS_SINGLE, 0),
+        "sgdisk_0": (SGDISK_EXISTING, 0),
+        "sgdisk_1": (new_table, 0),
+        **overrides,
+    }
+    document = {
+        name: {"rc": rc, "out": base64.b64encode(out.encode()).decode()}
+        for name, (out, rc) in facts.items()
+    }
+    return _make_exec_return(json.dumps(document))
+
+
 @pytest.fixture
 def mock_ssh():
     """Patch paramiko.SSHClient so no real SSH happens."""
@@ -305,48 +337,40 @@ def test_required_tools_present(manager, mock_ssh):
 # -- pre-flight --
 
 def test_preflight_all_pass(manager, mock_ssh, mirror_cfg):
-    calls = []
+    mock_ssh.exec_command.return_value = _probe_return()
+    checks = manager.preflight(mirror_cfg)
+    assert all(check["passed"] for check in checks.values()), checks
+    # Every check reads the same snapshot, collected in one exec
+    assert mock_ssh.exec_command.call_count == 1
 
-    def side_effect(cmd):
-        calls.append(cmd)
-        if cmd.startswith("zpool status rpool"):
-            return _make_exec_return(ZPOOL_STATUS_SINGLE)
-        if cmd.startswith("test -e"):
-            return _make_exec_return("", "", 0)
-        if cmd.startswith("zpool status -L"):
-            # new disk not in any pool output
-            return _make_exec_return(ZPOOL_STATUS_SINGLE)
-        if cmd.startswith("lsblk"):
-            return _make_exec_return("2000398934016")
-        if cmd.startswith("which"):
-            return _make_exec_return("/usr/sbin/tool", "", 0)
-        return _make_exec_return("")
 
-    mock_ssh.exec_command.side_effect = side_effect
+def test_preflight_pool_missing(manager, mock_ssh, mirror_cfg):
+    mock_ssh.exec_command.return_value = _probe_return(zpool=("", 1))
     checks = manager.preflight(mirror_cfg)
-    assert checks["pool_online"]["passed"] is True
-    assert checks["existing_disk_present"]["passed"] is True
-    assert checks["new_disk_present"]["passed"] is True
-    assert checks["required_tools"]["passed"] is True
+    assert checks["pool_online"]["passed"] is False
 
 
-def test_preflight_pool_missing(manager, mock_ssh, mirror_cfg):
-    def side_effect(cmd):
-        if cmd.startswith("zpool status rpool"):
-            return _make_exec_return("", "no such pool", 1)
-        if cmd.startswith("test -e"):
-            return _make_exec_return("", "", 0)
-        if cmd.startswith("zpool status -L"):
-            return _make_exec_return("", "no such pool", 1)
-        if cmd.startswith("lsblk"):
-            return _make_exec_return("2000398934016")
-        if cmd.startswith("which"):
-            return _make_exec_return("/usr/sbin/tool", "", 0)
-        return _make_exec_return("")
+def test_preflight_new_disk_in_pool_or_labelled(manager, mock_ssh, mirror_cfg):
+    mock_ssh.exec_command.return_value = _probe_return(zpool=(ZPOOL_STATUS_MIRROR, 0))
+    checks = manager.preflight(mirror_cfg)
+    assert checks["new_disk_free"]["detail"] == "already in a pool"
+    assert checks["pool_not_busy"]["passed"] is False
 
-    mock_ssh.exec_command.side_effect = side_effect
+    mock_ssh.exec_command.return_value = _probe_return(blkid=("/dev/sda3\n/dev/sdb", 0))
     checks = manager.preflight(mirror_cfg)
-    assert checks["pool_online"]["passed"] is False
+    assert checks["new_disk_free"]["passed"] is False
+    assert "ZFS label" in checks["new_disk_free"]["detail"]
+
+
+def test_preflight_missing_disk_and_tools(manager, mock_ssh, mirror_cfg):
+    mock_ssh.exec_command.return_value = _probe_return(
+        links=(f"{EXISTING_DISK} /dev/sda", 0), tools=("zpool", 0),
+    )
+    checks = manager.preflight(mirror_cfg)
+    assert checks["existing_disk_present"]["passed"] is True
+    assert checks["new_disk_present"]["passed"] is False
+    assert checks["disk_sizes_match"]["passed"] is False
+    assert "sgdisk" in checks["required_tools"]["detail"]
 
 
 # -- operation tests --
@@ -471,38 +495,15 @@ def test_check_resilver(manager, mock_ssh):
     result = manager.check_resilver("rpool")
     assert result["is_mirror"] is True
     assert "resilver in progress" in result["scan"]
+    assert result["progress"]["function"] == "resilver"
+    assert result["progress"]["state"] == "scanning"
 
 
 # -- apply orchestration --
 
 def test_apply_dry_run(manager, mock_ssh, mirror_cfg):
     """Full dry-run: all steps should say would_execute or skipped."""
-    def side_effect(cmd):
-        # pool status => single
-        if cmd.startswith("zpool status"):
-            if "-L" in cmd:
-                return _make_exec_return(ZPOOL_STATUS_SINGLE)
-            return _make_exec_return(ZPOOL_STATUS_SINGLE)
-        # disk exists
-        if cmd.startswith("test -e"):
-            return _make_exec_return("", "", 0)
-        # lsblk sizes
-        if cmd.startswith("lsblk"):
-            return _make_exec_return("2000398934016")
-        # which tools
-        if cmd.startswith("which"):
-            return _make_exec_return("/usr/sbin/tool", "", 0)
-        # sgdisk -p for partition checks
-        if "sgdisk -p" in cmd:
-            if EXISTING_DISK in cmd:
-                return _make_exec_return(SGDISK_EXISTING)
-            return _make_exec_return(SGDISK_NEW_EMPTY)
-        # proxmox-boot-tool status
-        if "proxmox-boot-tool status" in cmd:
-            return _make_exec_return(BOOT_TOOL_STATUS_SINGLE)
-        return _make_exec_return("")
-
-    mock_ssh.exec_command.side_effect = side_effect
+    mock_ssh.exec_command.return_value = _probe_return()
     result = manager.apply(dry_run=True)
     assert result["success"] is True
     assert len(result["mirrors"]) == 1
@@ -511,17 +512,67 @@ def test_apply_dry_run(manager, mock_ssh, mirror_cfg):
     assert len(m["steps"]) == 4
     for step in m["steps"]:
         assert step["status"] in ("would_execute", "skipped")
+    # Pre-flight and every step's state check come from the one probe
+    assert mock_ssh.exec_command.call_count == 1
+
+
+def test_apply_rereads_state_after_a_change(manager, mock_ssh, mirror_cfg):
+    """Steps after one that changed the disks query the host again."""
+    commands = []
+
+    def side_effect(cmd):
+        commands.append(cmd)
+        if cmd.startswith("sh -c"):
+            return _probe_return(blkid=("", 2))
+        if cmd.startswith("sgdisk -p"):
+            if EXISTING_DISK in cmd:
+                return _make_exec_return(SGDISK_EXISTING)
+            return _make_exec_return(SGDISK_NEW_CLONED_SAME_GUID)
+        if cmd.startswith("zpool status"):
+            return _make_exec_return(ZPOOL_STATUS_MIRROR)
+        if cmd == "proxmox-boot-tool status":
+            return _make_exec_return(BOOT_TOOL_STATUS_BOTH)
+        return _make_exec_return("", "", 0)
+
+    mock_ssh.exec_command.side_effect = side_effect
+    result = manager.apply()
+    steps = [step["status"] for step in result["mirrors"][0]["steps"]]
+    assert steps == ["done", "done", "skipped", "skipped"]
+    assert commands[1].startswith("sgdisk -R")
+    assert any(cmd.startswith("sgdisk -p") for cmd in commands)
 
 
 def test_apply_already_mirrored(manager, mock_ssh):
     """If both disks already in mirror, everything is skipped."""
-    mock_ssh.exec_command.return_value = _make_exec_return(ZPOOL_STATUS_MIRROR_COMPLETE)
+    def side_effect(cmd):
+        if cmd.startswith("sh -c"):
+            return _probe_return(zpool=(ZPOOL_STATUS_MIRROR_COMPLETE, 0))
+        return _make_exec_return(ZPOOL_STATUS_MIRROR_COMPLETE)
+
+    mock_ssh.exec_command.side_effect = side_effect
     result = manager.apply()
     assert result["success"] is True
     m = result["mirrors"][0]
     assert m["status"] == "already_mirrored"
 
 
+@pytest.mark.parametrize("probe", [
+    # New disk carries an exported pool's label
+    {"blkid": ("/dev/sda3\n/dev/sdb", 0)},
+    # New disk is a vdev of another imported pool
+    {"zpool": (ZPOOL_STATUS_SINGLE + ZPOOL_STATUS_SINGLE.replace("rpool", "tank").replace(EXISTING_DISK, NEW_DISK), 0)},
+])
+def test_apply_refuses_new_disk_owned_elsewhere(manager, mock_ssh, probe):
+    """new_disk_free is only waived for a disk already in this pool's mirror."""
+    mock_ssh.exec_command.return_value = _probe_return(**probe)
+    result = manager.apply()
+    m = result["mirrors"][0]
+    assert m["status"] == "preflight_failed"
+    assert m["failed_checks"] == ["new_disk_free"]
+    assert m["steps"] == []
+    assert mock_ssh.exec_command.call_count == 1
+
+
 # -- status --
 
 def test_status(manager, mock_ssh):
@@ -551,3 +602,135 @@ def test_load_cluster_config_valid(tmp_path):
     cfg.write_text(yaml.dump(SAMPLE_CONFIG))
     result = load_cluster_config(cfg)
     assert result["nodes"][0]["name"] == "still-fawn"
+
+
+# -- fleet apply --
+
+def _fleet_config(*hostnames, pools=("rpool",)):
+    return {"nodes": [
+        {
+            "name": hostname,
+            "zfs_mirrors": [
+                {"pool": pool, "existing_disk": f"{hostname}-{pool}-a", "new_disk": f"{hostname}-{pool}-b"}
+                for pool in pools
+            ],
+        }
+        for hostname in hostnames
+    ]}
+
+
+def _plan(mgr, states=None):
+    states = states or {}
+    return {"hostname": mgr.hostname, "mirrors": [
+        {"pool": m["pool"], "state": states.get(m["pool"], "ready"), "failed_checks": []}
+        for m in mgr._mirrors
+    ]}
+
+
+def _idle(mgr, pools=None, timeout=None):
+    return [ScanProgress(m["pool"], "RESILVER", "FINISHED") for m in mgr._mirrors]
+
+
+def test_fleet_preflight_blocks_disk_owned_by_another_pool(manager, mock_ssh):
+    tank = ZPOOL_STATUS_SINGLE.replace("rpool", "tank").replace(EXISTING_DISK, NEW_DISK)
+    mock_ssh.exec_command.return_value = _probe_return(zpool=(ZPOOL_STATUS_SINGLE + tank, 0))
+    plan = _fleet_preflight(manager)
+    assert plan["mirrors"] == [{"pool": "rpool", "state": "blocked", "failed_checks": ["new_disk_free"]}]
+
+    # A busy pool is still only waited on
+    mock_ssh.exec_command.return_value = _probe_return(zpool=(ZPOOL_STATUS_SINGLE.replace(
+        "scrub repaired 0B in 00:02:30 with 0 errors on", "scrub in progress since"), 0))
+    assert _fleet_preflight(manager)["mirrors"][0]["state"] == "busy"
+
+
+def test_apply_fleet_attaches_hosts_in_parallel():
+    config = _fleet_config("host-a", "host-b", "host-c")
+    # All three hosts must be inside apply_mirror at once to get past the barrier
+    barrier = threading.Barrier(3, timeout=5)
+
+    def apply_mirror(mgr, mcfg, dry_run=False):
+        barrier.wait()
+        return {"pool": mcfg["pool"], "status": "success"}
+
+    with mock.patch("homelab.zfs_mirror_manager._fleet_preflight", side_effect=lambda mgr: _plan(mgr)), \
+            mock.patch.object(ZfsMirrorManager, "apply_mirror", apply_mirror), \
+            mock.patch.object(ZfsMirrorManager, "wait_for_idle", _idle):
+        result = apply_fleet(config=config, max_parallel=3)
+
+    assert result["success"] is True
+    assert [h["hostname"] for h in result["hosts"]] == ["host-a", "host-b", "host-c"]
+    host = result["hosts"][0]
+    assert host["actions"] == ["rpool: success"]
+    assert [e["event"] for e in host["timeline"]] == [
+        "preflight started", "preflight finished", "queued",
+        "apply started", "rpool started", "rpool success", "apply finished",
+    ]
+
+
+def test_apply_fleet_skips_blocked_and_mirrored_hosts():
+    config = _fleet_config("host-a", "host-b", "host-c")
+    states = {"host-a": {"rpool": "blocked"}, "host-b": {"rpool": "already_mirrored"}}
+
+    def preflight(mgr):
+        plan = _plan(mgr, states.get(mgr.hostname))
+        plan["mirrors"][0]["failed_checks"] = ["disk_sizes_match"] if mgr.hostname == "host-a" else []
+        return plan
+
+    applied = []
+
+    def apply_mirror(mgr, mcfg, dry_run=False):
+        applied.append(mgr.hostname)
+        return {"pool": mcfg["pool"], "status": "success"}
+
+    with mock.patch("homelab.zfs_mirror_manager._fleet_preflight", side_effect=preflight), \
+            mock.patch.object(ZfsMirrorManager, "apply_mirror", apply_mirror), \
+            mock.patch.object(ZfsMirrorManager, "wait_for_idle", _idle):
+        result = apply_fleet(config=config)
+
+    assert applied == ["host-c"]
+    statuses = {h["hostname"]: h for h in result["hosts"]}
+    assert statuses["host-a"]["status"] == "preflight_failed"
+    assert statuses["host-a"]["error"] == "rpool: disk_sizes_match"
+    assert statuses["host-b"]["actions"] == ["rpool: already_mirrored"]
+    assert statuses["host-c"]["status"] == "success"
+    assert result["success"] is False
+
+
+def test_apply_fleet_one_pool_at_a_time_per_host():
+    config = _fleet_config("host-a", pools=("rpool", "tank"))
+    calls = []
+
+    def apply_mirror(mgr, mcfg, dry_run=False):
+        calls.append(f"apply {mcfg['pool']}")
+        return {"pool": mcfg["pool"], "status": "success"}
+
+    def wait_for_idle(mgr, pools=None, timeout=None):
+        calls.append("wait")
+        if len(calls) == 3:
+            # The rpool resilver outlives the timeout, so tank is deferred
+            return [ScanProgress("rpool", "RESILVER", "SCANNING"), ScanProgress("tank", "NONE", "NONE")]
+        return _idle(mgr)
+
+    with mock.patch("homelab.zfs_mirror_manager._fleet_preflight", side_effect=lambda mgr: _plan(mgr)), \
+            mock.patch.object(ZfsMirrorManager, "apply_mirror", apply_mirror), \
+            mock.patch.object(ZfsMirrorManager, "wait_for_idle", wait_for_idle):
+        result = apply_fleet(config=config, resilver_timeout=60)
+
+    assert calls == ["wait", "apply rpool", "wait"]
+    host = result["hosts"][0]
+    assert host["status"] == "failed"
+    assert host["actions"] == ["rpool: success", "tank: deferred"]
+    assert "gave up waiting for scan on rpool" in [e["event"] for e in host["timeline"]]
+
+
+def test_apply_fleet_dry_run_does_not_wait():
+    config = _fleet_config("host-a")
+    with mock.patch("homelab.zfs_mirror_manager._fleet_preflight",
+                    side_effect=lambda mgr: _plan(mgr, {"rpool": "blocked"})), \
+            mock.patch.object(ZfsMirrorManager, "apply_mirror",
+                              lambda mgr, mcfg, dry_run=False: {"pool": mcfg["pool"], "status": "dry_run"}), \
+            mock.patch.object(ZfsMirrorManager, "wait_for_idle", side_effect=AssertionError("waited")):
+        result = apply_fleet(config=config, dry_run=True, wait_for_resilver=True)
+
+    assert result["success"] is True
+    assert result["hosts"][0]["status"] == "dry_run"